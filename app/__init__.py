@@ -2,9 +2,7 @@ import json
 import logging
 import os
 import re
-import threading
 import time
-import traceback
 
 from logging.handlers import SMTPHandler, WatchedFileHandler
 from urllib.parse import quote_plus
@@ -15,13 +13,6 @@ from redis import Redis
 from redlock import Redlock
 from rq.exceptions import NoSuchJobError
 from rq.job import Job
-from rq.registry import StartedJobRegistry
-from watchdog.events import (
-    FileCreatedEvent,
-    FileMovedEvent,
-    FileSystemEventHandler,
-)
-from watchdog.observers.polling import PollingObserver
 from werkzeug.middleware.proxy_fix import ProxyFix
 
 from config import Config
@@ -186,6 +177,15 @@ def cron_table(config):
             3600,
             "Recomputing the streaming rail",
         ),
+        # Render every user's landing shelves for the day once the
+        # recommendations and the streaming rail are both fresh, so the
+        # morning's first visit reads cached fragments too
+        (
+            "35 2 * * *",
+            "app.landing_shelves.warm_landing_shelves",
+            1800,
+            "Pre-rendering the landing page shelves",
+        ),
         # Pre-warm estimate payloads nightly, after the recompute has
         # dropped the overlays and the rail's enrichments are cached —
         # affinity people's careers plus the TMDb charts, pre-scored
@@ -196,6 +196,14 @@ def cron_table(config):
             3600,
             "Pre-warming estimate payloads",
         ),
+        # Fill the artwork cache for the posters the shelves and
+        # galleries are about to show, once the day's picks are known
+        (
+            "55 2 * * *",
+            "app.artwork.warm_artwork",
+            3600,
+            "Warming the TMDb artwork cache",
+        ),
         # Top up and rotate the Name that Frame pool nightly;
         # the coordinator queues per-film extractions on the serial
         # transcode lane, so a big backfill can't crowd anything out
@@ -213,10 +221,35 @@ def cron_table(config):
             3600,
             "Refreshing in-production TV series",
         ),
-        # Refresh every film's streaming availability nightly, last in
-        # the TMDb-heavy window: the watchlist, Criterion catalog, and
-        # filmography pages render from this cache and never fetch
-        # inline, so it has to be full before the day starts
+        # Rebuild the library search index nightly from the database,
+        # snapshotting it for restarts and trimming the replay journal
+        (
+            "50 3 * * *",
+            "app.search_index.rebuild_search_index",
+            1800,
+            "Rebuilding the library search index",
+        ),
+        # Recompute every TV season summary nightly, catching any file
+        # rows written or deleted around the ORM's listeners
+        (
+            "55 3 * * *",
+            "app.tv_summary.rebuild_season_summaries",
+            1800,
+            "Rebuilding the TV season summaries",
+        ),
+        # Recompute the movie shopping list nightly, for the same reason
+        # and to pick up any change to the quality ladder
+        (
+            "57 3 * * *",
+            "app.shopping_list.rebuild_shopping_list",
+            1800,
+            "Rebuilding the movie shopping list",
+        ),
+        # Refresh streaming availability nightly, last in the TMDb-heavy
+        # window: the watchlist, Criterion catalog, and filmography pages
+        # render from this cache and never fetch inline, so it has to be
+        # full before the day starts. Tiered: the daily set, a seventh of
+        # the long tail, and whatever TMDb's change feed reported
         (
             "30 4 * * *",
             "app.streaming.refresh_availability",
@@ -225,8 +258,10 @@ def cron_table(config):
         ),
     ]
 
-    # Download files restored from Glacier: poll SQS hourly, offset from
-    # the import sweep so the maintenance worker isn't handed both at once
+    # Download files restored from Glacier: the fitzflix-sqs consumer
+    # long-polls continuously; this hourly poll is its backstop and stands
+    # down while the consumer's heartbeat is fresh. Offset from the import
+    # sweep so the maintenance worker isn't handed both at once
 
     if config.get("AWS_SQS_URL"):
         table.append(
@@ -424,75 +459,34 @@ def check_config(app):
         )
 
 
-def create_app(config_class=Config, watch_import_dir=False):
-    """Application factory: build and fully wire an app instance.
-
-    watch_import_dir starts the import-directory filesystem observer;
-    supervisor.py enables it for the import-program workers alone.
-    """
-
-    class MyHandler(FileSystemEventHandler):
-        """Handlers for watchdog to fire when filesystem events occur."""
-
-        def process_new_file(self, path):
-            """Queue a localization for a file newly visible in the import directory."""
-
-            # Create redis lock using the filename, to prevent multiple workers
-            # from grabbing the same file at once
-
-            lock = app.lock_manager.lock(os.path.basename(path), 30000)
-            if lock:
-                job_queue = []
-                localization_tasks_running = StartedJobRegistry(
-                    "fitzflix-import", connection=app.redis
-                )
-                job_queue.extend(localization_tasks_running.get_job_ids())
-                job_queue.extend(app.import_queue.job_ids)
-                app.logger.debug(job_queue)
-
-                # Use the file basename as the job id, so we can see if this file is
-                # already in the job_queue, and only add it if it doesn't already exist
-
-                if safe_job_id(os.path.basename(path)) not in job_queue:
-                    app.logger.info(
-                        f"'{os.path.basename(path)}' Found in import directory"
-                    )
-                    app.import_queue.enqueue(
-                        "app.videos.localization_task",
-                        args=(path,),
-                        job_timeout=app.config["LOCALIZATION_TASK_TIMEOUT"],
-                        description=f"'{os.path.basename(path)}'",
-                        job_id=safe_job_id(os.path.basename(path)),
-                    )
+def _phase_timer(phases):
+    """A function that records (phase, seconds since the last record —
+    or since now, for the first) in phases."""
 
-                app.lock_manager.unlock(lock)
+    last = [time.perf_counter()]
 
-        def on_moved(self, event):
-            """Process a file when it's moved within the watched directory."""
+    def mark(phase):
+        """Close a phase: record how long it took."""
 
-            # Process only those moved files that were previously invisible
+        now = time.perf_counter()
+        phases.append((phase, round(now - last[0], 6)))
+        last[0] = now
 
-            if (
-                os.path.basename(event.src_path).startswith(".")
-                and not os.path.basename(event.dest_path).startswith(".")
-                and os.path.isfile(event.dest_path)
-            ):
-                self.process_new_file(event.dest_path)
+    return mark
 
-        def on_created(self, event):
-            """Process a file when it appears in the watched directory."""
 
-            # Process only those files that are not invisible
+def create_app(config_class=Config, watch_import_dir=False):
+    """Application factory: build and fully wire an app instance.
 
-            if not os.path.basename(event.src_path).startswith(".") and os.path.isfile(
-                event.src_path
-            ):
-                self.process_new_file(event.src_path)
+    watch_import_dir joins the import-directory watcher election;
+    supervisor.py enables it for the import-program workers alone.
+    """
 
-        def on_any_event(self, event):
-            """Process on any filesystem event."""
+    # Where startup time goes, for `flask startup-profile`: each phase's
+    # seconds, in order, left on the app as startup_phases
 
-            app.logger.debug(event)
+    phases = []
+    mark = _phase_timer(phases)
 
     app = Flask(__name__)
 
@@ -513,6 +507,12 @@ def create_app(config_class=Config, watch_import_dir=False):
 
     app.jinja_env.globals["csrf_token"] = generate_csrf
 
+    # TMDb artwork renders through the local cache's proxy route
+
+    from app.artwork import tmdb_image
+
+    app.jinja_env.globals["tmdb_image"] = tmdb_image
+
     # The built-in SECRET_KEY fallback lets anyone forge session cookies and
     # password-reset tokens, so it's only acceptable in debug mode
 
@@ -522,6 +522,8 @@ def create_app(config_class=Config, watch_import_dir=False):
             "built-in default outside debug mode"
         )
 
+    mark("configuration and templates")
+
     # Configure the Redis connection and queues. TrackedQueue leaves
     # per-file trail entries at enqueue time; jobs that aren't
     # pipeline stages record nothing
@@ -539,6 +541,7 @@ def create_app(config_class=Config, watch_import_dir=False):
     # Configure the Redis redlock manager
 
     app.lock_manager = Redlock([app.redis])
+    mark("redis and queues")
 
     # Initialize application components
 
@@ -551,9 +554,42 @@ def create_app(config_class=Config, watch_import_dir=False):
     # Needed to be able to set X- headers by web server to configure https protocol, etc.
 
     ProxyFix(app, x_proto=1, x_host=1, x_prefix=1)
+    mark("extensions")
 
     from app import models
 
+    # The search index's session listeners journal every searchable
+    # write, so every process — web and worker — has to load them
+
+    from app import search_index
+
+    # Likewise the reference-data listeners, which tell every process
+    # when a quality, feature type, or genre changed
+
+    from app import reference_data
+
+    # ...and the TV season summaries', which recompute a season inside
+    # the same commit that changed its files
+
+    from app import tv_summary
+
+    # ...and the movie shopping list's, which do the same for a film's
+    # shopping rows
+
+    from app import shopping_list
+
+    # ...and the landing shelves', which retire a user's cached shelves
+    # when their diary, watchlist, or the library's files change
+
+    from app import landing_shelves
+
+    # ...and the movie page's, which retire a film's cached view model
+    # when its TMDb data, awards, or files change
+
+    from app import movie_detail
+
+    mark("models and listeners")
+
     # Build blueprints
 
     from app.errors import bp as errors_bp
@@ -571,6 +607,7 @@ def create_app(config_class=Config, watch_import_dir=False):
     from app.api import bp as api_bp
 
     app.register_blueprint(api_bp, url_prefix="/api")
+    mark("blueprints")
 
     # Credentials never reach the log, whichever handler writes it; see
     # app.redaction. Installed in every mode so tests cover it too
@@ -579,6 +616,13 @@ def create_app(config_class=Config, watch_import_dir=False):
 
     install_redaction(app.logger, app.config)
 
+    # Admins profile a page with ?profile=1 (or =cpu); the hooks are
+    # inert until a profile is active. See app.profiling
+
+    from app.profiling import install as install_profiling
+
+    install_profiling(app)
+
     if not app.debug:
         # Configure how to handle logs when running in production mode
 
@@ -629,9 +673,12 @@ def create_app(config_class=Config, watch_import_dir=False):
         app.logger.setLevel(logging.INFO)
         app.logger.info("Fitzflix startup")
 
+    mark("logging and profiling hooks")
+
     # Warn about configuration problems that would make tasks fail later
 
     check_config(app)
+    mark("check_config")
 
     # Create the import and local staging directories
 
@@ -644,86 +691,23 @@ def create_app(config_class=Config, watch_import_dir=False):
         app.logger.warning(
             f"STAGING_DIR '{app.config['STAGING_DIR']}' could not be created"
         )
+    mark("directories")
 
     # Watch the import directory for file changes — but only when asked:
-    # supervisor.py enables this for the import-program workers alone, so
-    # the other workers and the web process don't each poll the (network-
-    # mounted) directory for no benefit. The polling emitter shuts itself
-    # down permanently on any OSError from that mount, so a keeper thread
-    # rebuilds the observer whenever it dies, then sweeps the directory for
-    # anything that arrived while blind
+    # supervisor.py enables this for the import-program workers alone.
+    # Each of them joins an election and only the Redis lease holder
+    # actually watches (see app.import_watcher), so directory traffic
+    # doesn't grow with the worker count; the new leader sweeps the
+    # directory for anything that arrived while nobody was watching
 
     if watch_import_dir:
-        event_handler = MyHandler()
-
-        def start_observer():
-            observer = PollingObserver()
-            # Only created/moved file events matter to the handler, so
-            # the emitter filters everything else before dispatch
-            observer.schedule(
-                event_handler,
-                path=app.config["IMPORT_DIR"],
-                recursive=False,
-                event_filter=[FileCreatedEvent, FileMovedEvent],
-            )
-            observer.start()
-            return observer
-
-        def enqueue_import_sweep():
-            enqueue_import_scan(app.import_queue)
+        from app.import_watcher import ImportWatcher
 
-        def write_observer_heartbeat():
-            # Expiring per-process heartbeat: the admin health card counts
-            # these keys to show how many processes are actually watching the
-            # import directory, and a dead or wedged process simply stops
-            # refreshing
+        app.import_watcher = ImportWatcher(app)
+        app.import_watcher.start()
+        mark("import watcher")
 
-            try:
-                app.redis.set(
-                    f"fitzflix:observer:{os.getpid()}", int(time.time()), ex=180
-                )
-            except Exception:
-                pass
-
-        def keep_observer_alive(observer):
-            while True:
-                time.sleep(60)
-                try:
-                    # The failed emitter thread stays in the emitters set after
-                    # it dies, so check liveness rather than presence
-
-                    healthy = (
-                        observer.is_alive()
-                        and observer.emitters
-                        and all(emitter.is_alive() for emitter in observer.emitters)
-                    )
-                    if not healthy:
-                        app.logger.warning(
-                            "Import directory observer died; "
-                            "rebuilding it and sweeping for missed files"
-                        )
-                        try:
-                            observer.stop()
-                        except Exception:
-                            pass
-                        observer = start_observer()
-                        enqueue_import_sweep()
-                    write_observer_heartbeat()
-                except Exception:
-                    app.logger.error(traceback.format_exc())
-
-        observer = start_observer()
-        write_observer_heartbeat()
-        threading.Thread(
-            target=keep_observer_alive,
-            args=(observer,),
-            daemon=True,
-            name="import-observer-keeper",
-        ).start()
-
-        # Process anything that arrived while the application wasn't watching
-
-        enqueue_import_sweep()
+    app.startup_phases = phases
 
     # The first application created becomes this process's instance for
     # modules that resolve their app through get_app()
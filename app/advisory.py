@@ -0,0 +1,20 @@
+"""Advisory bookkeeping's error logging (Oct 2026).
+
+The pipeline trails, the per-job metrics, and the profiler all record
+alongside real work, and none of them may ever fail it: each catches
+its own errors and hands them to log_warning, which logs the traceback
+when there's an app to log to and swallows everything otherwise.
+"""
+
+import traceback
+
+
+def log_warning():
+    """Log the current exception if there's an app to log to."""
+
+    try:
+        from flask import current_app
+
+        current_app.logger.warning(traceback.format_exc())
+    except Exception:
+        pass
@@ -0,0 +1,272 @@
+"""Local TMDb artwork cache (Oct 2026).
+
+Every gallery used to hotlink TMDb's image CDN, so each page view had
+every client pull dozens of full-quality JPEGs from the internet and
+nothing was kept on our side. Templates now ask tmdb_image() for an
+artwork URL, which points at the app's own /artwork route; the first
+request for a size fetches TMDb's JPEG once and later ones are served
+from the LAN box.
+
+The cache is content-addressed under ARTWORK_CACHE_DIR:
+
+    refs/<size>/<name>          the SHA-256 of what TMDb served for it
+    objects/<aa>/<sha256>       those bytes
+    objects/<aa>/<sha256>.webp  derivatives, made with Pillow
+    objects/<aa>/<sha256>.avif
+
+A TMDb image path never changes content (a new upload gets a new
+path), so responses carry a strong ETag — the object's digest plus its
+format — and a year's immutable Cache-Control; browsers stop asking
+at all. Clients that accept AVIF or WebP get the much smaller
+derivative, chosen from the Accept header, and everyone else the
+original. A fetch TMDb can't answer redirects to the CDN, so a poster
+never goes missing because the cache couldn't fill.
+
+A nightly job warms the tile size for every film the landing shelves
+and galleries are about to show: each user's recommendations and
+watchlist, the streaming rail, and the leaving-Criterion set.
+ARTWORK_HOTLINK turns the proxy off and restores the old URLs.
+"""
+
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+import traceback
+
+import requests
+
+from flask import current_app, url_for
+from werkzeug.local import LocalProxy
+
+from app import get_app
+from app.leaving_criterion import LEAVING_KEY
+from app.models import Movie, User, UserWatchlist
+from app.recommendations import stored_recommendations
+from app.streaming_rail import stored_rail
+
+# This process's app instance, resolved lazily so the warm job can run
+# on a worker without building a second application
+
+app = LocalProxy(get_app)
+
+# The TMDb sizes templates ask for; "original" stays a CDN link since
+# only the poster picker's downloads want it
+
+ARTWORK_SIZES = ("w45", "w92", "w154", "w185", "w342", "w500", "w780")
+
+# The size gallery tiles render at, which the warm job fills
+
+TILE_SIZE = "w342"
+
+# TMDb image names are an opaque id plus the extension of the upload
+
+NAME_PATTERN = re.compile(r"[A-Za-z0-9_-]+\.(?:jpg|jpeg|png)")
+
+# Derivatives in preference order, with what Pillow needs to write them
+
+FORMATS = {
+    "avif": {"mimetype": "image/avif", "format": "AVIF", "quality": 55},
+    "webp": {"mimetype": "image/webp", "format": "WEBP", "quality": 80},
+}
+
+ORIGINAL_MIMETYPES = {"jpg": "image/jpeg", "jpeg": "image/jpeg", "png": "image/png"}
+
+# An immutable URL can be cached for as long as HTTP allows
+
+CACHE_SECONDS = 365 * 86400
+
+
+class ArtworkUnavailable(Exception):
+    """TMDb couldn't supply the image."""
+
+
+def tmdb_image(size, path):
+    """The URL to render a TMDb image at a size: the local proxy's, or
+    the CDN's when the proxy is off or the path isn't one it serves.
+    None for a missing path, so templates can fall back to the
+    placeholder as before."""
+
+    if not path:
+        return None
+    name = path.lstrip("/")
+    if (
+        current_app.config["ARTWORK_HOTLINK"]
+        or size not in ARTWORK_SIZES
+        or not NAME_PATTERN.fullmatch(name)
+    ):
+        return f"{current_app.config['TMDB_IMAGE_URL']}/{size}/{name}"
+    return url_for("main.artwork", size=size, name=name)
+
+
+def supported_formats():
+    """The derivative formats this Pillow build can write, best first."""
+
+    # Pillow loads on first use rather than at import: create_app
+    # imports this module for tmdb_image in every process, workers too
+
+    from PIL import features
+
+    return [fmt for fmt in FORMATS if features.check(fmt)]
+
+
+def _cache_path(*parts):
+    """A path under the artwork cache."""
+
+    return os.path.join(current_app.config["ARTWORK_CACHE_DIR"], *parts)
+
+
+def _object_path(digest, fmt=None):
+    """Where an object (or one of its derivatives) lives."""
+
+    filename = f"{digest}.{fmt}" if fmt else digest
+    return _cache_path("objects", digest[:2], filename)
+
+
+def write_atomically(path, data):
+    """Write bytes so a reader sees the old file or the whole new one,
+    never a partial write."""
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.unlink(temporary)
+        raise
+
+
+def _download(url):
+    """The image bytes TMDb serves at url."""
+
+    response = requests.get(url, timeout=30)
+    if response.status_code != 200 or not response.content:
+        raise ArtworkUnavailable(f"{url} answered {response.status_code}")
+    return response.content
+
+
+def cached_object(size, name):
+    """The digest of a TMDb image at a size, fetching it on first use."""
+
+    ref = _cache_path("refs", size, name)
+    try:
+        with open(ref) as f:
+            digest = f.read().strip()
+        if os.path.exists(_object_path(digest)):
+            return digest
+    except OSError:
+        pass
+
+    data = _download(f"{current_app.config['TMDB_IMAGE_URL']}/{size}/{name}")
+    digest = hashlib.sha256(data).hexdigest()
+    if not os.path.exists(_object_path(digest)):
+        write_atomically(_object_path(digest), data)
+    write_atomically(ref, digest.encode())
+    return digest
+
+
+def derivative(digest, fmt):
+    """The path of an object's derivative in fmt, made on first use."""
+
+    path = _object_path(digest, fmt)
+    if os.path.exists(path):
+        return path
+
+    from PIL import Image
+
+    options = FORMATS[fmt]
+    with Image.open(_object_path(digest)) as image:
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+        buffer = io.BytesIO()
+        image.save(buffer, options["format"], quality=options["quality"])
+    write_atomically(path, buffer.getvalue())
+    return path
+
+
+def negotiated_format(accept_mimetypes):
+    """The best derivative format a client names in its Accept header,
+    or None for the original. A bare */* doesn't count: it's what
+    browsers that can't decode AVIF or WebP send too."""
+
+    named = {mimetype for mimetype, quality in accept_mimetypes if quality}
+    for fmt in supported_formats():
+        if FORMATS[fmt]["mimetype"] in named:
+            return fmt
+    return None
+
+
+def artwork_file(size, name, accept_mimetypes):
+    """(path, mimetype, etag) for a client's request, fetching and
+    converting as needed."""
+
+    digest = cached_object(size, name)
+    fmt = negotiated_format(accept_mimetypes)
+    if fmt:
+        try:
+            return derivative(digest, fmt), FORMATS[fmt]["mimetype"], f"{digest}.{fmt}"
+        except Exception:
+            current_app.logger.warning(traceback.format_exc())
+    extension = name.rsplit(".", 1)[1].lower()
+    return _object_path(digest), ORIGINAL_MIMETYPES[extension], digest
+
+
+def _warm_paths():
+    """Poster paths for every film the galleries are about to show."""
+
+    movie_ids = {
+        movie_id
+        for (movie_id,) in UserWatchlist.query.with_entities(UserWatchlist.movie_id)
+    }
+    paths = set()
+    for user in User.query.all():
+        stored = stored_recommendations(current_app.redis, user.id) or {}
+        movie_ids.update(item["movie_id"] for item in stored.get("items", []))
+        rail = stored_rail(current_app.redis, user.id) or {}
+        paths.update(item.get("poster_path") for item in rail.get("items", []))
+
+    leaving = current_app.redis.get(LEAVING_KEY)
+    if leaving:
+        paths.update(
+            item.get("poster_path") for item in json.loads(leaving).get("items", [])
+        )
+
+    if movie_ids:
+        paths.update(
+            path
+            for (path,) in Movie.query.with_entities(Movie.tmdb_poster_path)
+            .filter(Movie.id.in_(movie_ids))
+            .filter(Movie.custom_poster.is_(None))
+        )
+    return sorted(
+        path.lstrip("/")
+        for path in paths
+        if path and NAME_PATTERN.fullmatch(path.lstrip("/"))
+    )
+
+
+def warm_artwork():
+    """Nightly task: fill the cache, derivatives included, for the tile
+    posters of every user's recommendations and watchlist, the streaming
+    rail, and the leaving-Criterion set. Returns the number of posters
+    warmed."""
+
+    with app.app_context():
+        if current_app.config["ARTWORK_HOTLINK"]:
+            return 0
+        formats = supported_formats()
+        warmed = 0
+        for name in _warm_paths():
+            try:
+                digest = cached_object(TILE_SIZE, name)
+                for fmt in formats:
+                    derivative(digest, fmt)
+                warmed += 1
+            except Exception:
+                current_app.logger.warning(traceback.format_exc())
+        current_app.logger.info(f"Artwork: warmed {warmed} posters")
+        return warmed
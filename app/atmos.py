@@ -27,14 +27,13 @@ import time
 import traceback
 from datetime import datetime, timezone
 
-import boto3
 from flask import current_app
-from pymediainfo import MediaInfo
 from rq import get_current_job
 from rq.registry import StartedJobRegistry
 
 from app import db, get_app, safe_job_id
 from app.models import File, FileAudioTrack, FileSubtitleTrack
+from app.tracks import parse_media_info
 
 app = get_app()
 
@@ -182,12 +181,12 @@ def build_remux_command(
 def mediaconvert_client():
     """A MediaConvert client on the app's AWS credentials."""
 
-    return boto3.client(
+    from app.aws_storage import aws_client
+
+    return aws_client(
         "mediaconvert",
         region_name=current_app.config["MEDIACONVERT_REGION"],
         endpoint_url=current_app.config["MEDIACONVERT_ENDPOINT"],
-        aws_access_key_id=current_app.config["AWS_ACCESS_KEY"],
-        aws_secret_access_key=current_app.config["AWS_SECRET_KEY"],
     )
 
 
@@ -566,7 +565,7 @@ def _atmos_supplement_unlocked(file_id):
             # reading the staged source and writing beside it, all local
 
             inserts.sort(key=lambda insert: insert[0])
-            media_info = MediaInfo.parse(staging_source)
+            media_info = parse_media_info(staging_source)
             video_orders, audio_orders, text_orders = [], [], []
             for track in media_info.tracks:
                 track_order = track.to_data().get("streamorder")
@@ -25,14 +25,27 @@ matters: the qualifier lookup anchored on a bound film resolves a
 61,000 credited people timed WDQS out on every batch. Person awards
 without a for-work qualifier (career honors, knighthoods) never
 match.
+
+Weekly runs are incremental (Oct 2026): each batch first asks WDQS
+for its film items' revision ids (schema:version, a trivially cheap
+query), and only films whose item changed since the last run — or
+that have no recorded baseline — are asked for their awards. The film
+pass remembers each film's last row set in Redis as its fingerprint
+and writes just the difference, so an unchanged catalog costs a few
+dozen light queries and no table churn. Batches run two or three at a
+time under an adaptive pacer that backs off on slow responses and
+429s, inside WDQS's five-parallel-queries-per-client allowance.
 """
 
+import json
 import time
 import traceback
 
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
 import requests
 
-from flask import current_app
+from flask import current_app, g
 from werkzeug.local import LocalProxy
 
 from app import db, get_app
@@ -57,6 +70,29 @@ AWARDS_BATCH_PAUSE_SECONDS = 1.0
 AWARDS_ERROR_PAUSE_SECONDS = 10.0
 AWARDS_MAX_CONSECUTIVE_FAILURES = 5
 
+# The pacer's bounds: up to three batches in flight (WDQS allows five
+# parallel queries per client), a pause between submissions that
+# shrinks on fast answers and doubles on slow ones or a 429, and the
+# response time past which WDQS counts as struggling
+
+AWARDS_MAX_CONCURRENCY = 3
+AWARDS_MIN_PAUSE_SECONDS = 0.25
+AWARDS_MAX_PAUSE_SECONDS = 30.0
+AWARDS_SLOW_RESPONSE_SECONDS = 10.0
+
+# Per-film sync state, keyed by movie id: the film item's revision at
+# the last refresh, and the film pass's last row set (its fingerprint,
+# and the baseline the next diff is taken against)
+
+AWARDS_REVISIONS_KEY = "fitzflix:awards:revisions"
+AWARDS_FILM_ROWS_KEY = "fitzflix:awards:film-rows"
+
+# Each refresh renews both hashes for five weekly runs; state that
+# outlives them (a paused schedule) costs nothing to lose, since a film
+# without a baseline is reconciled against the table outright
+
+AWARDS_STATE_SECONDS = 35 * 86400
+
 # One query shape serves both id systems: {id_prop} is the Wikidata
 # property the external ids match against (P345 = IMDb, P4947 = TMDb)
 
@@ -91,6 +127,18 @@ SELECT ?ext ?award ?awardLabel ?kind (YEAR(?when) AS ?year) WHERE {{
 """
 
 
+# Revision ids for a batch's film items, so unchanged films skip the
+# awards query entirely
+
+REVISIONS_QUERY = """
+SELECT ?ext ?rev WHERE {{
+  VALUES ?ext {{ {values} }}
+  ?film wdt:{id_prop} ?ext ;
+        schema:version ?rev .
+}}
+"""
+
+
 def _wikidata_sparql(query):
     """Run one SPARQL query against Wikidata, per its access guidelines.
 
@@ -115,6 +163,9 @@ def _wikidata_sparql(query):
             timeout=120,
         )
         if getattr(r, "status_code", None) == 429 and attempt == 0:
+            # The batch runner's pacer reads this off the job's own
+            # app context and slows the whole crawl down
+            g.wikidata_throttled = True
             delay = wikidata_retry_after_seconds(r)
             current_app.logger.warning(
                 f"Wikidata throttled the awards query (429); retrying in {delay}s"
@@ -167,29 +218,218 @@ def _award_rows(bindings, movie_ids_by_ext):
     return rows
 
 
-def _replace_awards(batch_movie_ids, rows):
-    """Replace the batch's stored awards with the fresh rows.
+def _revisions(bindings, movie_ids_by_ext):
+    """Revision bindings as {movie_id: "rev[,rev…]"} — an external id
+    occasionally sits on two items (a duplicate awaiting a merge), so
+    every matching item's revision joins the stamp."""
+
+    revisions = {}
+    for binding in bindings:
+        movie_id = movie_ids_by_ext.get(binding.get("ext", {}).get("value"))
+        rev = binding.get("rev", {}).get("value")
+        if movie_id is None or not rev:
+            continue
+        revisions.setdefault(movie_id, set()).add(rev)
+    return {movie_id: ",".join(sorted(revs)) for movie_id, revs in revisions.items()}
+
+
+def _encode_rows(entries):
+    """A film's row set as its stored fingerprint: sorted JSON, so
+    equal sets always encode identically."""
+
+    return json.dumps(sorted(entries, key=lambda entry: json.dumps(entry)))
+
+
+def _sync_awards(batch_movie_ids, rows, previous):
+    """Bring the batch's stored awards to the fresh rows, writing only
+    the difference.
 
-    Every film in the batch is cleared, not just films with results:
-    an empty result means Wikidata lists nothing for it now, and stale
-    rows would linger forever otherwise (current-truth semantics).
+    Every film in the batch is synced, not just films with results: an
+    empty result means Wikidata lists nothing for it now, and stale
+    rows would linger forever otherwise (current-truth semantics). A
+    film with a recorded baseline from the last film pass only loses
+    the rows that left that baseline, so craft rows the person pass
+    merged on top stay put; a film without one (first run, or Redis
+    lost its state) is reconciled against the table outright, and the
+    person pass layers its craft rows back. Returns (films written,
+    rows inserted, rows deleted).
     """
 
-    MovieAward.query.filter(MovieAward.movie_id.in_(batch_movie_ids)).delete(
-        synchronize_session=False
-    )
-    for movie_id, entries in rows.items():
-        for award_id, name, win, year in entries:
-            db.session.add(
-                MovieAward(
-                    movie_id=movie_id,
-                    award_id=award_id,
-                    award_name=name[:512],
-                    win=win,
-                    year=year,
+    stored = {}
+    for row in MovieAward.query.filter(MovieAward.movie_id.in_(batch_movie_ids)):
+        stored.setdefault(row.movie_id, {})[(row.award_id, row.win, row.year)] = row
+
+    written = set()
+    inserted = 0
+    deleted = 0
+    for movie_id in batch_movie_ids:
+        fresh = {
+            (award_id, win, year): name
+            for award_id, name, win, year in rows.get(movie_id, ())
+        }
+        existing = stored.get(movie_id, {})
+        if movie_id in previous:
+            baseline = {
+                (award_id, win, year) for award_id, _, win, year in previous[movie_id]
+            }
+            stale = (baseline - set(fresh)) & set(existing)
+        else:
+            stale = set(existing) - set(fresh)
+        for key in stale:
+            db.session.delete(existing[key])
+            deleted += 1
+            written.add(movie_id)
+        for key, name in fresh.items():
+            row = existing.get(key)
+            if row is None:
+                award_id, win, year = key
+                db.session.add(
+                    MovieAward(
+                        movie_id=movie_id,
+                        award_id=award_id,
+                        award_name=name[:512],
+                        win=win,
+                        year=year,
+                    )
                 )
-            )
+                inserted += 1
+                written.add(movie_id)
+            elif row.award_name != name[:512]:
+                row.award_name = name[:512]
+                written.add(movie_id)
     db.session.commit()
+    return written, inserted, deleted
+
+
+class WikidataPacer:
+    """Adaptive rate control for a WDQS crawl.
+
+    Starts with one batch in flight and the configured pause; every
+    few fast answers shrink the pause and open another slot (up to
+    AWARDS_MAX_CONCURRENCY), while a slow answer or a 429 drops back
+    to one slot and doubles the pause — the WDQS manual asks clients
+    to slow down when the service does, not just when it refuses.
+    """
+
+    def __init__(self):
+        """Start cautious: one slot, the standard pause."""
+
+        self.concurrency = 1
+        self.pause = AWARDS_BATCH_PAUSE_SECONDS
+        self.streak = 0
+
+    def record(self, elapsed, throttled=False):
+        """Fold one finished request's response time (and whether it
+        was throttled) into the slot count and pause."""
+
+        if throttled or elapsed >= AWARDS_SLOW_RESPONSE_SECONDS:
+            self.concurrency = 1
+            self.pause = min(self.pause * 2, AWARDS_MAX_PAUSE_SECONDS)
+            self.streak = 0
+            return
+        self.pause = max(self.pause * 0.8, AWARDS_MIN_PAUSE_SECONDS)
+        self.streak += 1
+        if self.streak >= 3 and self.concurrency < AWARDS_MAX_CONCURRENCY:
+            self.concurrency += 1
+            self.streak = 0
+
+    def failed(self):
+        """A failed request: back to one slot (the caller waits out the
+        longer error pause itself)."""
+
+        self.concurrency = 1
+        self.streak = 0
+
+
+def _run_batches(batches, fetch, handle, label):
+    """Run WDQS batches through the pacer, a few at a time.
+
+    fetch(batch) runs on a worker thread under its own app context and
+    does the network work; handle(batch, result) runs here, on the
+    calling thread, so every database write stays on one session. A
+    failed batch logs and moves on after the error pause; a run of
+    AWARDS_MAX_CONSECUTIVE_FAILURES means Wikidata is having a bad day,
+    so the crawl stops. Returns the consecutive-failure count when it
+    aborts, else 0.
+    """
+
+    flask_app = current_app._get_current_object()
+    pacer = WikidataPacer()
+
+    def timed(batch):
+        """One batch's fetch, with its elapsed time and throttle flag."""
+
+        with flask_app.app_context():
+            started = time.monotonic()
+            result = fetch(batch)
+            return result, time.monotonic() - started, g.get("wikidata_throttled")
+
+    pending = list(batches)
+    in_flight = {}
+    consecutive_failures = 0
+    delay = None
+    with ThreadPoolExecutor(max_workers=AWARDS_MAX_CONCURRENCY) as pool:
+        while pending or in_flight:
+            while pending and len(in_flight) < pacer.concurrency:
+                if delay is not None:
+                    time.sleep(delay)
+                batch = pending.pop(0)
+                in_flight[pool.submit(timed, batch)] = batch
+                delay = pacer.pause
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch = in_flight.pop(future)
+                try:
+                    result, elapsed, throttled = future.result()
+                except Exception:
+                    current_app.logger.warning(traceback.format_exc())
+                    current_app.logger.warning(
+                        f"{label} batch failed ({len(batch[1])} ids), moving on"
+                    )
+                    pacer.failed()
+                    consecutive_failures += 1
+                    delay = AWARDS_ERROR_PAUSE_SECONDS
+                    continue
+                consecutive_failures = 0
+                pacer.record(elapsed, throttled)
+                handle(batch, result)
+            if consecutive_failures >= AWARDS_MAX_CONSECUTIVE_FAILURES:
+                for future in in_flight:
+                    future.cancel()
+                current_app.logger.warning(
+                    f"{label} refresh aborted after {consecutive_failures} "
+                    f"consecutive failed batches — Wikidata is having a bad "
+                    f"day; the weekly run will pick it back up"
+                )
+                return consecutive_failures
+    return 0
+
+
+def _library_batches():
+    """The library's films as (id_prop, ext_ids, mapping) batches:
+    IMDb ids through P345, the IMDb-less remainder through their TMDb
+    id on P4947."""
+
+    by_imdb = {
+        imdb_id: movie_id
+        for movie_id, imdb_id in db.session.query(Movie.id, Movie.imdb_id).filter(
+            Movie.imdb_id.isnot(None), Movie.imdb_id != ""
+        )
+    }
+    by_tmdb = {
+        str(tmdb_id): movie_id
+        for movie_id, tmdb_id in db.session.query(Movie.id, Movie.tmdb_id)
+        .filter(Movie.tmdb_id.isnot(None))
+        .filter(db.or_(Movie.imdb_id.is_(None), Movie.imdb_id == ""))
+    }
+    batches = []
+    for id_prop, mapping in (("P345", by_imdb), ("P4947", by_tmdb)):
+        ext_ids = sorted(mapping)
+        for start in range(0, len(ext_ids), AWARDS_BATCH_SIZE):
+            batches.append(
+                (id_prop, ext_ids[start : start + AWARDS_BATCH_SIZE], mapping)
+            )
+    return batches
 
 
 def _merge_person_awards(rows):
@@ -241,70 +481,47 @@ def refresh_person_awards():
     The same IMDb-first/TMDb-fallback id maps as refresh_movie_awards,
     but the query walks from each film into award statements that name
     it as their "for work" — the craft categories person items hold.
-    Runs AFTER refresh_movie_awards in the weekly task: the film pass
-    replaces rows wholesale, so the craft rows are rebuilt on top of
-    each fresh baseline (and the merge dedupes against it). Standalone
-    runs are idempotent — already-stored rows just skip.
+    Person items change independently of the film's, so this pass
+    can't skip by revision; it's already write-light, inserting only
+    rows the film doesn't carry. Runs AFTER refresh_movie_awards in the
+    weekly task, so the craft rows merge against each fresh baseline.
+    Standalone runs are idempotent — already-stored rows just skip.
     """
 
     if not current_app.config["WIKIDATA_SPARQL_URL"]:
         return "WIKIDATA_SPARQL_URL is not configured, skipping awards refresh"
 
-    by_imdb = {
-        imdb_id: movie_id
-        for movie_id, imdb_id in db.session.query(Movie.id, Movie.imdb_id).filter(
-            Movie.imdb_id.isnot(None), Movie.imdb_id != ""
-        )
-    }
-    by_tmdb = {
-        str(tmdb_id): movie_id
-        for movie_id, tmdb_id in db.session.query(Movie.id, Movie.tmdb_id)
-        .filter(Movie.tmdb_id.isnot(None))
-        .filter(db.or_(Movie.imdb_id.is_(None), Movie.imdb_id == ""))
-    }
-
     films = 0
     touched = set()
     inserted = 0
-    consecutive_failures = 0
-    for id_prop, mapping in (("P345", by_imdb), ("P4947", by_tmdb)):
-        ext_ids = sorted(mapping)
-        for start in range(0, len(ext_ids), AWARDS_BATCH_SIZE):
-            batch = ext_ids[start : start + AWARDS_BATCH_SIZE]
-            values = " ".join(f'"{ext}"' for ext in batch)
-            try:
-                bindings = _wikidata_sparql(
-                    CRAFT_AWARDS_QUERY.format(values=values, id_prop=id_prop)
-                )
-            except Exception:
-                current_app.logger.warning(traceback.format_exc())
-                current_app.logger.warning(
-                    f"Craft-awards batch failed ({id_prop}, {len(batch)} ids), "
-                    f"moving on"
-                )
-                consecutive_failures += 1
-                if consecutive_failures >= AWARDS_MAX_CONSECUTIVE_FAILURES:
-                    current_app.logger.warning(
-                        f"Craft-awards refresh aborted after "
-                        f"{consecutive_failures} consecutive failed batches — "
-                        f"Wikidata is having a bad day; the weekly run will "
-                        f"pick it back up"
-                    )
-                    return (
-                        f"Craft-awards refresh aborted after "
-                        f"{consecutive_failures} consecutive failures; "
-                        f"scanned {films} films, added {inserted} records"
-                    )
-                time.sleep(AWARDS_ERROR_PAUSE_SECONDS)
-                continue
-            consecutive_failures = 0
-            rows = _award_rows(bindings, mapping)
-            batch_films, batch_inserted = _merge_person_awards(rows)
-            films += len(batch)
-            touched |= batch_films
-            inserted += batch_inserted
-            time.sleep(AWARDS_BATCH_PAUSE_SECONDS)
 
+    def fetch(batch):
+        """The batch's for-work award statements."""
+
+        id_prop, ext_ids, _ = batch
+        values = " ".join(f'"{ext}"' for ext in ext_ids)
+        return _wikidata_sparql(
+            CRAFT_AWARDS_QUERY.format(values=values, id_prop=id_prop)
+        )
+
+    def handle(batch, bindings):
+        """Merge the batch's craft rows into the table."""
+
+        nonlocal films, inserted
+        _, ext_ids, mapping = batch
+        batch_films, batch_inserted = _merge_person_awards(
+            _award_rows(bindings, mapping)
+        )
+        films += len(ext_ids)
+        touched.update(batch_films)
+        inserted += batch_inserted
+
+    failures = _run_batches(_library_batches(), fetch, handle, "Craft-awards")
+    if failures:
+        return (
+            f"Craft-awards refresh aborted after {failures} "
+            f"consecutive failures; scanned {films} films, added {inserted} records"
+        )
     return (
         f"Scanned {films} films for craft awards, "
         f"added {inserted} records for {len(touched)} films"
@@ -315,71 +532,128 @@ def refresh_movie_awards():
     """Refresh every film's award rows from Wikidata, in polite batches.
 
     Films with an IMDb id match through P345; the remainder fall back
-    to their TMDb id through P4947. A failed batch logs and moves on —
-    the weekly cadence self-heals partial refreshes.
+    to their TMDb id through P4947. Each batch reads its items'
+    revisions first and queries awards only for films whose item moved
+    since their recorded baseline, then writes the diff against that
+    baseline. A failed batch logs and moves on — the weekly cadence
+    self-heals partial refreshes, and a failed film keeps its old
+    revision, so it's retried next week.
     """
 
     if not current_app.config["WIKIDATA_SPARQL_URL"]:
         return "WIKIDATA_SPARQL_URL is not configured, skipping awards refresh"
 
-    by_imdb = {
-        imdb_id: movie_id
-        for movie_id, imdb_id in db.session.query(Movie.id, Movie.imdb_id).filter(
-            Movie.imdb_id.isnot(None), Movie.imdb_id != ""
-        )
-    }
-    by_tmdb = {
-        str(tmdb_id): movie_id
-        for movie_id, tmdb_id in db.session.query(Movie.id, Movie.tmdb_id)
-        .filter(Movie.tmdb_id.isnot(None))
-        .filter(db.or_(Movie.imdb_id.is_(None), Movie.imdb_id == ""))
-    }
-
+    redis = current_app.redis
     films = 0
+    unchanged = 0
     awarded = 0
-    consecutive_failures = 0
-    for id_prop, mapping in (("P345", by_imdb), ("P4947", by_tmdb)):
-        ext_ids = sorted(mapping)
-        for start in range(0, len(ext_ids), AWARDS_BATCH_SIZE):
-            batch = ext_ids[start : start + AWARDS_BATCH_SIZE]
-            values = " ".join(f'"{ext}"' for ext in batch)
-            try:
-                bindings = _wikidata_sparql(
-                    AWARDS_QUERY.format(values=values, id_prop=id_prop)
-                )
-            except Exception:
-                current_app.logger.warning(traceback.format_exc())
-                current_app.logger.warning(
-                    f"Awards batch failed ({id_prop}, {len(batch)} ids), moving on"
-                )
-                consecutive_failures += 1
-                if consecutive_failures >= AWARDS_MAX_CONSECUTIVE_FAILURES:
-                    current_app.logger.warning(
-                        f"Awards refresh aborted after {consecutive_failures} "
-                        f"consecutive failed batches — Wikidata is having a "
-                        f"bad day; the weekly run will pick it back up"
-                    )
-                    return (
-                        f"Awards refresh aborted after {consecutive_failures} "
-                        f"consecutive failures; refreshed {films} films"
-                    )
-                time.sleep(AWARDS_ERROR_PAUSE_SECONDS)
-                continue
-            consecutive_failures = 0
-            rows = _award_rows(bindings, mapping)
-            _replace_awards([mapping[ext] for ext in batch], rows)
-            films += len(batch)
-            awarded += len(rows)
-            time.sleep(AWARDS_BATCH_PAUSE_SECONDS)
 
-    return f"Refreshed awards for {films} films, {awarded} with award records"
+    def fetch(batch):
+        """The batch's revisions, then awards for the films that moved."""
+
+        id_prop, ext_ids, mapping = batch
+        movie_ids = [mapping[ext] for ext in ext_ids]
+        values = " ".join(f'"{ext}"' for ext in ext_ids)
+        revisions = _revisions(
+            _wikidata_sparql(REVISIONS_QUERY.format(values=values, id_prop=id_prop)),
+            mapping,
+        )
+        stored_revisions = redis.hmget(AWARDS_REVISIONS_KEY, movie_ids)
+        has_baseline = redis.hmget(AWARDS_FILM_ROWS_KEY, movie_ids)
+        changed = {
+            movie_id
+            for movie_id, stored, baseline in zip(
+                movie_ids, stored_revisions, has_baseline
+            )
+            if baseline is None
+            or stored is None
+            or stored.decode() != revisions.get(movie_id)
+        }
+        changed_ext = [ext for ext in ext_ids if mapping[ext] in changed]
+        bindings = []
+        if changed_ext:
+            values = " ".join(f'"{ext}"' for ext in changed_ext)
+            bindings = _wikidata_sparql(
+                AWARDS_QUERY.format(values=values, id_prop=id_prop)
+            )
+        return revisions, sorted(changed), bindings
+
+    def handle(batch, result):
+        """Write the changed films' diffs and record their new state."""
+
+        nonlocal films, unchanged, awarded
+        _, ext_ids, mapping = batch
+        revisions, changed, bindings = result
+        films += len(ext_ids)
+        unchanged += len(ext_ids) - len(changed)
+        if not changed:
+            return
+        rows = _award_rows(bindings, mapping)
+        previous = {
+            movie_id: [tuple(entry) for entry in json.loads(raw)]
+            for movie_id, raw in zip(
+                changed, redis.hmget(AWARDS_FILM_ROWS_KEY, changed)
+            )
+            if raw is not None
+        }
+        _sync_awards(changed, rows, previous)
+        awarded += len(rows)
+
+        # State follows the committed write: the film rows always, the
+        # revision only when WDQS reported one (an item-less film keeps
+        # being asked, cheaply, in case it gains an item)
+
+        pipe = redis.pipeline()
+        pipe.hset(
+            AWARDS_FILM_ROWS_KEY,
+            mapping={
+                movie_id: _encode_rows(rows.get(movie_id, ())) for movie_id in changed
+            },
+        )
+        stamped = {
+            movie_id: revisions[movie_id]
+            for movie_id in changed
+            if movie_id in revisions
+        }
+        if stamped:
+            pipe.hset(AWARDS_REVISIONS_KEY, mapping=stamped)
+        pipe.execute()
+
+    batches = _library_batches()
+    failures = _run_batches(batches, fetch, handle, "Awards")
+    _prune_award_state(
+        redis, {movie_id for _, _, mapping in batches for movie_id in mapping.values()}
+    )
+    if failures:
+        return (
+            f"Awards refresh aborted after {failures} "
+            f"consecutive failures; refreshed {films} films"
+        )
+    return f"Refreshed awards for {films} films, {awarded} with award records" + (
+        f", {unchanged} unchanged since the last run" if unchanged else ""
+    )
+
+
+def _prune_award_state(redis, movie_ids):
+    """Drop the sync state of films no longer in the library (deleted,
+    or without an id to match on) and renew both hashes' TTL, so
+    neither grows for as long as the install runs."""
+
+    pipe = redis.pipeline()
+    for key in (AWARDS_REVISIONS_KEY, AWARDS_FILM_ROWS_KEY):
+        stale = [field for field in redis.hkeys(key) if int(field) not in movie_ids]
+        if stale:
+            pipe.hdel(key, *stale)
+        pipe.expire(key, AWARDS_STATE_SECONDS)
+    pipe.execute()
 
 
 def refresh_awards():
     """Weekly task wrapper: both award passes inside an app context.
 
-    Order matters — the film pass wipes and rebuilds each film's rows,
-    the person pass then layers the craft categories back on top.
+    Order matters — the film pass brings each changed film's rows to
+    current truth, the person pass then layers the craft categories
+    back on top.
     """
 
     with app.app_context():
@@ -23,14 +23,13 @@ import time
 import traceback
 import urllib.parse
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
 
-import boto3
-import botocore
 import rq
 
-from botocore.client import Config
 from rq import get_current_job
+from rq.job import Job
 from rq.registry import StartedJobRegistry
 
 from flask import current_app, render_template
@@ -51,31 +50,90 @@ from app.models import (
 EIGHT_MEGABYTES = 8388608
 
 
-def aws_s3_client(with_retries=False):
-    """Build an S3 client using the application credentials."""
+# Clients built so far, by service and everything that shapes them.
+# boto3 and botocore load lazily in aws_client: they cost a worker
+# whose queues never touch AWS about 150ms of startup for nothing.
+# Building a client is far slower than using one (it loads and parses
+# the service model), and clients are safe to share across threads
+# where the default session that builds them isn't, hence the lock
 
-    kwargs = {
-        "aws_access_key_id": current_app.config["AWS_ACCESS_KEY"],
-        "aws_secret_access_key": current_app.config["AWS_SECRET_KEY"],
-    }
-    if with_retries:
-        kwargs["config"] = Config(
-            connect_timeout=20, retries={"mode": "standard", "max_attempts": 10}
-        )
-    return boto3.client("s3", **kwargs)
+_clients = {}
+_clients_lock = threading.Lock()
 
 
-def aws_sqs_client():
-    """Build an SQS client using the application credentials."""
+def aws_client(
+    service,
+    region_name=None,
+    endpoint_url=None,
+    with_retries=False,
+    max_pool_connections=None,
+):
+    """A boto3 client for service on the application credentials,
+    built once per process for each set of options."""
+
+    key = (
+        service,
+        current_app.config["AWS_ACCESS_KEY"],
+        current_app.config["AWS_SECRET_KEY"],
+        region_name,
+        endpoint_url,
+        with_retries,
+        max_pool_connections,
+    )
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is not None:
+            return client
+
+        import boto3
+
+        from botocore.client import Config
+
+        from app.profiling import install_aws_hook
+
+        install_aws_hook()
+        kwargs = {
+            "aws_access_key_id": key[1],
+            "aws_secret_access_key": key[2],
+        }
+        if region_name:
+            kwargs["region_name"] = region_name
+        if endpoint_url:
+            kwargs["endpoint_url"] = endpoint_url
+        config = None
+        if with_retries:
+            config = Config(
+                connect_timeout=20, retries={"mode": "standard", "max_attempts": 10}
+            )
+        if max_pool_connections:
+            pool = Config(max_pool_connections=max_pool_connections)
+            config = config.merge(pool) if config else pool
+        if config is not None:
+            kwargs["config"] = config
+        client = _clients[key] = boto3.client(service, **kwargs)
+        return client
+
+
+def aws_s3_client(with_retries=False, max_pool_connections=None):
+    """The S3 client for the application credentials, built once per
+    process for each set of options.
+
+    max_pool_connections sizes the connection pool for callers that share
+    one client across that many threads (botocore's default is 10).
+    """
 
-    return boto3.client(
-        "sqs",
-        aws_access_key_id=current_app.config["AWS_ACCESS_KEY"],
-        aws_secret_access_key=current_app.config["AWS_SECRET_KEY"],
-        region_name="us-east-1",
+    return aws_client(
+        "s3", with_retries=with_retries, max_pool_connections=max_pool_connections
     )
 
 
+def aws_sqs_client():
+    """The SQS client for the application credentials, built once per
+    process."""
+
+    return aws_client("sqs", region_name="us-east-1")
+
+
 def delete_sqs_message(sqs_client, receipt_handle, note="message"):
     """Delete a message from the SQS queue; returns False when deletion fails."""
 
@@ -137,9 +195,11 @@ class UploadProgressPercentage(object):
 class DownloadProgressPercentage(object):
     """Return the download progress as a callback when downloading a file from AWS S3."""
 
-    def __init__(self, client, bucket, key, basename):
+    def __init__(self, client, bucket, key, basename, size=None):
         self._file_path = basename
-        self._size = client.head_object(Bucket=bucket, Key=key).get("ContentLength", 0)
+        if size is None:
+            size = client.head_object(Bucket=bucket, Key=key).get("ContentLength", 0)
+        self._size = size
         app.logger.info(f"'{basename}' Download size: {self._size} bytes")
         self._seen_so_far = 0
         self._previous_percent = None
@@ -279,11 +339,16 @@ def sync_aws_s3_storage_task():
             inventory_export = []
             orphaned_files = []
             unreferenced_files = []
+            uploads = []
 
             for i, (file, rank) in enumerate(files):
-                if job:
+                # Progress is saved only when the percentage moves, not
+                # once per file
+
+                progress = int((i / len(files)) * 100)
+                if job and (i == 0 or job.meta.get("progress") != progress):
                     job.meta["description"] = "Queuing local files for S3 upload"
-                    job.meta["progress"] = int((i / len(files)) * 100)
+                    job.meta["progress"] = progress
                     job.save_meta()
 
                 file_path = os.path.join(
@@ -304,15 +369,17 @@ def sync_aws_s3_storage_task():
                         f"'{file.aws_untouched_key}' Queuing for upload to AWS"
                     )
 
-                    current_app.file_queue.enqueue(
-                        "app.videos.upload_task",
-                        args=(
-                            file.id,
-                            current_app.config["AWS_UNTOUCHED_PREFIX"],
-                            True,
-                        ),
-                        job_timeout=current_app.config["LOCALIZATION_TASK_TIMEOUT"],
-                        description=f"'{file.basename}'",
+                    uploads.append(
+                        current_app.file_queue.prepare_data(
+                            "app.videos.upload_task",
+                            args=(
+                                file.id,
+                                current_app.config["AWS_UNTOUCHED_PREFIX"],
+                                True,
+                            ),
+                            timeout=current_app.config["LOCALIZATION_TASK_TIMEOUT"],
+                            description=f"'{file.basename}'",
+                        )
                     )
 
                 # ...exists in s3...
@@ -356,6 +423,10 @@ def sync_aws_s3_storage_task():
                     )
                     orphaned_files.append([file.id, file.untouched_basename])
 
+            # The uploads fan out in bulk, a few round trips for the lot
+
+            current_app.file_queue.enqueue_many(uploads)
+
             # Persist any backfilled AWS object sizes
 
             db.session.commit()
@@ -601,84 +672,242 @@ def download_task(key, basename, sqs_receipt_handle=None, transient_retries=0):
             return True
 
 
-def sqs_retrieve_task():
-    """Poll AWS SQS for possible files ready to download."""
+# SQS batch calls take at most ten entries, and receive_message returns at
+# most ten messages; long polls wait up to twenty seconds
 
-    with app.app_context():
-        sqs_client = aws_sqs_client()
-        s3_client = aws_s3_client(with_retries=True)
+SQS_BATCH_SIZE = 10
+SQS_LONG_POLL_SECONDS = 20
 
-        # Extend timeout and restoration period for messages whose downloads
-        # are running or waiting in the download queue
+# A received message stays invisible this long; the consumer re-extends it
+# for every download still queued or running well before it lapses
 
-        file_operations = StartedJobRegistry(
-            "fitzflix-file-operation", connection=current_app.redis
-        )
-        download_job_ids = file_operations.get_job_ids() + list(
-            current_app.file_queue.job_ids
+SQS_VISIBILITY_SECONDS = 600
+SQS_EXTEND_EVERY_SECONDS = 300
+
+# Restored copies last a day (Days=1); re-requesting that twice a day per
+# waiting download keeps them alive without a restore_object per poll
+
+RESTORE_EXTENDED_KEY_PREFIX = "fitzflix:sqs:restore-extended:"
+RESTORE_EXTEND_EVERY_SECONDS = 12 * 3600
+
+# The continuous consumer's heartbeat; while it's fresh, the hourly
+# sqs_retrieve_task stands down rather than compete for messages
+
+SQS_CONSUMER_KEY = "fitzflix:sqs:consumer"
+SQS_CONSUMER_HEARTBEAT_SECONDS = 120
+
+
+def waiting_downloads(flask_app):
+    """The download jobs running or queued on the file-operation queue
+    that still hold an SQS message.
+
+    The registry and queue listings come back in one pipelined call, and
+    the job hashes in one more via Job.fetch_many, however many downloads
+    are waiting.
+    """
+
+    queue = flask_app.file_queue
+    registry = StartedJobRegistry(queue.name, connection=flask_app.redis)
+    with flask_app.redis.pipeline(transaction=False) as pipe:
+        pipe.zrange(registry.key, 0, -1)
+        pipe.lrange(queue.key, 0, -1)
+        started, queued = pipe.execute()
+    job_ids = list(
+        dict.fromkeys(
+            [registry.parse_job_id(entry) for entry in started]
+            + [entry.decode() for entry in queued]
         )
-        for job_id in download_job_ids:
-            job = current_app.file_queue.fetch_job(job_id)
-            if job:
-                if job.meta.get("sqs_receipt_handle"):
-                    response = sqs_client.change_message_visibility(
-                        QueueUrl=current_app.config["AWS_SQS_URL"],
-                        ReceiptHandle=job.meta.get("sqs_receipt_handle"),
-                        VisibilityTimeout=600,
-                    )
-                    job_description = job.meta.get("description", job.description)
-                    current_app.logger.info(
-                        f"'{job_description}' Extending SQS message timeout by 600 seconds"
-                    )
-                    response = s3_client.restore_object(
-                        Bucket=current_app.config["AWS_BUCKET"],
-                        Key=job.args[0],
-                        RestoreRequest={
-                            "Days": 1,
-                            "GlacierJobParameters": {"Tier": "Standard"},
-                        },
-                    )
-                    current_app.logger.info(
-                        f"'{job.args[0]}' Extending restoration period by 1 day"
-                    )
+    )
+    jobs = Job.fetch_many(
+        job_ids, connection=flask_app.redis, serializer=queue.serializer
+    )
+    return [job for job in jobs if job and job.meta.get("sqs_receipt_handle")]
 
-        response = sqs_client.receive_message(
+
+def extend_download_leases(sqs_client, s3_client, jobs):
+    """Keep the SQS messages and restored copies behind waiting downloads
+    alive: one change_message_visibility_batch call per ten messages,
+    and a restore extension per object at most twice a day."""
+
+    for offset in range(0, len(jobs), SQS_BATCH_SIZE):
+        batch = jobs[offset : offset + SQS_BATCH_SIZE]
+        response = sqs_client.change_message_visibility_batch(
             QueueUrl=current_app.config["AWS_SQS_URL"],
-            AttributeNames=["SentTimestamp"],
-            MaxNumberOfMessages=1,
-            MessageAttributeNames=["All"],
-            VisibilityTimeout=600,
-            WaitTimeSeconds=0,
+            Entries=[
+                {
+                    "Id": str(index),
+                    "ReceiptHandle": job.meta["sqs_receipt_handle"],
+                    "VisibilityTimeout": SQS_VISIBILITY_SECONDS,
+                }
+                for index, job in enumerate(batch)
+            ],
+        )
+        for failure in response.get("Failed", []):
+            job = batch[int(failure["Id"])]
+            current_app.logger.warning(
+                f"'{job.meta.get('description', job.description)}' Unable to "
+                f"extend its SQS message timeout: {failure.get('Message')}"
+            )
+        current_app.logger.info(
+            f"Extended the SQS message timeout of {len(batch)} waiting "
+            f"download(s) by {SQS_VISIBILITY_SECONDS} seconds"
         )
 
-        while response.get("Messages"):
-            response_body = json.loads(response["Messages"][0]["Body"])
+    for job in jobs:
+        key = job.args[0]
+        if not current_app.redis.set(
+            f"{RESTORE_EXTENDED_KEY_PREFIX}{key}",
+            1,
+            ex=RESTORE_EXTEND_EVERY_SECONDS,
+            nx=True,
+        ):
+            continue
+        s3_client.restore_object(
+            Bucket=current_app.config["AWS_BUCKET"],
+            Key=key,
+            RestoreRequest={
+                "Days": 1,
+                "GlacierJobParameters": {"Tier": "Standard"},
+            },
+        )
+        current_app.logger.info(f"'{key}' Extending restoration period by 1 day")
+
+
+def receive_restore_notifications(sqs_client, wait_seconds):
+    """Long-poll SQS for up to ten restore notifications.
+
+    Each actionable message becomes a download_task on the file-operation
+    queue. Anything else is deleted in one delete_message_batch call:
+    S3's s3:TestEvent when the notification is wired up, or a body that
+    isn't a restore record. Returns the number of messages received, so
+    a caller can drain the queue until it comes back empty.
+    """
+
+    response = sqs_client.receive_message(
+        QueueUrl=current_app.config["AWS_SQS_URL"],
+        AttributeNames=["SentTimestamp"],
+        MaxNumberOfMessages=SQS_BATCH_SIZE,
+        MessageAttributeNames=["All"],
+        VisibilityTimeout=SQS_VISIBILITY_SECONDS,
+        WaitTimeSeconds=wait_seconds,
+    )
+    messages = response.get("Messages", [])
 
-            receipt_handle = response["Messages"][0]["ReceiptHandle"]
+    discard = []
+    for message in messages:
+        receipt_handle = message["ReceiptHandle"]
+        try:
             key = urllib.parse.unquote_plus(
-                response_body["Records"][0]["s3"]["object"]["key"]
+                json.loads(message["Body"])["Records"][0]["s3"]["object"]["key"]
             )
+        except (ValueError, KeyError, IndexError, TypeError):
+            discard.append(receipt_handle)
+            continue
+
+        current_app.file_queue.enqueue(
+            "app.videos.download_task",
+            args=(key, os.path.basename(key), receipt_handle),
+            job_timeout=current_app.config["TRANSCODE_TASK_TIMEOUT"],
+            description=f"'{os.path.basename(key)}' — Downloading from AWS",
+            meta={"sqs_receipt_handle": receipt_handle},
+        )
 
-            current_app.file_queue.enqueue(
-                "app.videos.download_task",
-                args=(key, os.path.basename(key), receipt_handle),
-                job_timeout=current_app.config["TRANSCODE_TASK_TIMEOUT"],
-                description=f"'{os.path.basename(key)}' — Downloading from AWS",
-                meta={"sqs_receipt_handle": receipt_handle},
-            )
+    if discard:
+        response = sqs_client.delete_message_batch(
+            QueueUrl=current_app.config["AWS_SQS_URL"],
+            Entries=[
+                {"Id": str(index), "ReceiptHandle": receipt_handle}
+                for index, receipt_handle in enumerate(discard)
+            ],
+        )
+        current_app.logger.info(
+            f"Deleted {len(discard) - len(response.get('Failed', []))} SQS "
+            f"message(s) that weren't restore notifications"
+        )
 
-            response = sqs_client.receive_message(
-                QueueUrl=current_app.config["AWS_SQS_URL"],
-                AttributeNames=["SentTimestamp"],
-                MaxNumberOfMessages=1,
-                MessageAttributeNames=["All"],
-                VisibilityTimeout=600,
-                WaitTimeSeconds=0,
+    return len(messages)
+
+
+def sqs_consumer_alive(connection):
+    """Whether a continuous SQS consumer has checked in recently."""
+
+    return bool(connection.exists(SQS_CONSUMER_KEY))
+
+
+def sqs_retrieve_task():
+    """Poll AWS SQS for possible files ready to download.
+
+    The hourly backstop for when the continuous consumer isn't running:
+    it extends the waiting downloads' leases, then drains the queue in
+    batches of ten. Long polls (rather than WaitTimeSeconds=0, which
+    samples only some SQS servers and can come back empty with messages
+    waiting) make an empty answer mean the queue really is drained.
+    """
+
+    with app.app_context():
+        if sqs_consumer_alive(current_app.redis):
+            current_app.logger.info(
+                "The continuous SQS consumer is running; skipping the poll"
             )
+            return True
+
+        sqs_client = aws_sqs_client()
+        s3_client = aws_s3_client(with_retries=True)
+
+        # Extend timeout and restoration period for messages whose downloads
+        # are running or waiting in the download queue
+
+        extend_download_leases(sqs_client, s3_client, waiting_downloads(current_app))
+
+        while receive_restore_notifications(sqs_client, wait_seconds=5):
+            pass
 
         return True
 
 
+def consume_sqs_notifications(stop=None):
+    """Run the continuous SQS consumer until stop (a threading.Event) is
+    set.
+
+    Each pass long-polls for up to twenty seconds, so a restore completed
+    at AWS starts downloading within seconds instead of waiting for the
+    hourly poll. Every SQS_EXTEND_EVERY_SECONDS it also extends the
+    leases of waiting downloads. Its heartbeat tells the hourly task to
+    stand down. One consumer is enough, and a second one would only
+    split the batches, so run it as a single process (`flask sqs
+    --follow`, the fitzflix-sqs supervisor program).
+    """
+
+    stop = stop or threading.Event()
+    sqs_client = aws_sqs_client()
+    s3_client = aws_s3_client(with_retries=True)
+    last_extension = None
+
+    current_app.logger.info("Continuous SQS restore consumer started")
+    while not stop.is_set():
+        try:
+            current_app.redis.set(
+                SQS_CONSUMER_KEY, os.getpid(), ex=SQS_CONSUMER_HEARTBEAT_SECONDS
+            )
+            if (
+                last_extension is None
+                or time.monotonic() - last_extension >= SQS_EXTEND_EVERY_SECONDS
+            ):
+                extend_download_leases(
+                    sqs_client, s3_client, waiting_downloads(current_app)
+                )
+                last_extension = time.monotonic()
+            receive_restore_notifications(
+                sqs_client, wait_seconds=SQS_LONG_POLL_SECONDS
+            )
+        except Exception:
+            current_app.logger.error(traceback.format_exc())
+            stop.wait(SQS_LONG_POLL_SECONDS)
+
+    current_app.redis.delete(SQS_CONSUMER_KEY)
+    current_app.logger.info("Continuous SQS restore consumer stopped")
+
+
 def upload_task(
     file_id,
     key_prefix="",
@@ -885,6 +1114,209 @@ def _spend_download_retry(retry):
     return retry
 
 
+# Ranged downloads. An object uploaded in parts is fetched in those same
+# parts, so each part's MD5 feeds the multipart ETag check without reading
+# the finished file again; single-part objects use DOWNLOAD_PART_SIZE ranges
+
+DOWNLOAD_PART_SIZE = 16 * 1024 * 1024
+DOWNLOAD_READ_SIZE = 1024 * 1024
+
+# Beside each partial download: a header line describing the object, then
+# one "<part> <md5>" line per part already written to disk
+
+DOWNLOAD_MANIFEST_SUFFIX = ".parts"
+
+
+class DownloadVerificationError(Exception):
+    """A finished download's contents don't match the object's ETag."""
+
+
+def _discard_partial_download(partial_path):
+    """Remove a partial download and its resume manifest."""
+
+    for path in (partial_path, f"{partial_path}{DOWNLOAD_MANIFEST_SUFFIX}"):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _object_layout(s3_client, bucket, key):
+    """What a ranged download of key needs: its size and ETag, and the
+    part size its ETag was computed over."""
+
+    head = s3_client.head_object(Bucket=bucket, Key=key)
+    etag = head.get("ETag") or ""
+    part_size = DOWNLOAD_PART_SIZE
+    if "-" in etag:
+        first = s3_client.head_object(Bucket=bucket, Key=key, PartNumber=1)
+        part_size = first.get("ContentLength") or part_size
+    return {
+        "key": key,
+        "etag": etag,
+        "size": head.get("ContentLength", 0),
+        "part_size": part_size,
+    }
+
+
+def _completed_parts(manifest_path, partial_path, layout):
+    """The parts an earlier attempt finished, as {part: md5 hex} — empty
+    unless it was downloading this same object version into this same
+    partial file."""
+
+    try:
+        with open(manifest_path) as f:
+            if json.loads(f.readline()) != layout:
+                return {}
+            if os.path.getsize(partial_path) != layout["size"]:
+                return {}
+            done = {}
+            for line in f:
+                index, _, digest = line.strip().partition(" ")
+                if len(digest) == 32:
+                    done[int(index)] = digest
+            return done
+    except (OSError, ValueError):
+        return {}
+
+
+def _pwrite_all(fd, data, offset):
+    """Write all of data at offset, however many pwrite calls it takes."""
+
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view = view[written:]
+        offset += written
+
+
+def ranged_download(
+    s3_client, bucket, key, partial_path, progress=None, concurrency=8, layout=None
+):
+    """Download key into partial_path in concurrent ranged parts.
+
+    Parts are written at their offsets with pwrite as they arrive, and
+    each finished part is synced to disk, then journaled to the sidecar
+    manifest. A retry, or
+    a rerun after a worker restart, fetches only the parts that are
+    missing. Every request carries If-Match, so an object replaced
+    mid-download fails with a 412 instead of splicing two versions, and
+    the next attempt starts over. The result is checked against the
+    object's ETag unless IGNORE_ETAGS is set. A mismatch discards
+    everything and raises DownloadVerificationError.
+    """
+
+    layout = layout or _object_layout(s3_client, bucket, key)
+    size = layout["size"]
+    part_size = layout["part_size"]
+    count = -(-size // part_size)
+    manifest_path = f"{partial_path}{DOWNLOAD_MANIFEST_SUFFIX}"
+
+    done = _completed_parts(manifest_path, partial_path, layout)
+    if done:
+        current_app.logger.info(
+            f"'{os.path.basename(key)}' Resuming download with "
+            f"{len(done)} of {count} parts already on disk"
+        )
+    else:
+        with open(manifest_path, "w") as f:
+            f.write(json.dumps(layout) + "\n")
+
+    lock = threading.Lock()
+    failed = threading.Event()
+    fd = os.open(partial_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        os.ftruncate(fd, size)
+        if progress:
+            progress(sum(min(part_size, size - index * part_size) for index in done))
+
+        with open(manifest_path, "a") as journal:
+
+            def fetch(index):
+                if failed.is_set():
+                    return
+                try:
+                    fetch_part(index)
+                except Exception:
+                    # Parts still waiting for a thread are skipped, so
+                    # the retry begins promptly; finished ones stay
+                    # journaled
+                    failed.set()
+                    raise
+
+            def fetch_part(index):
+                start = index * part_size
+                end = min(start + part_size, size)
+                request = {
+                    "Bucket": bucket,
+                    "Key": key,
+                    "Range": f"bytes={start}-{end - 1}",
+                }
+                if layout["etag"]:
+                    request["IfMatch"] = layout["etag"]
+                body = s3_client.get_object(**request)["Body"]
+                digest = hashlib.md5()
+                offset = start
+                for chunk in body.iter_chunks(DOWNLOAD_READ_SIZE):
+                    digest.update(chunk)
+                    _pwrite_all(fd, chunk, offset)
+                    offset += len(chunk)
+                    if progress:
+                        progress(len(chunk))
+                if offset != end:
+                    raise IOError(
+                        f"Part {index + 1} of '{key}' ended after "
+                        f"{offset - start} of {end - start} bytes"
+                    )
+
+                # The part's bytes reach the disk before its journal line
+                # does: a resume after an OS crash trusts the journal, and
+                # the ETag check reads journaled MD5s, not the file
+
+                os.fsync(fd)
+                with lock:
+                    journal.write(f"{index} {digest.hexdigest()}\n")
+                    journal.flush()
+                    done[index] = digest.hexdigest()
+
+            pool = ThreadPoolExecutor(
+                max_workers=max(1, concurrency), thread_name_prefix="s3-download"
+            )
+            try:
+                futures = [
+                    pool.submit(fetch, index)
+                    for index in range(count)
+                    if index not in done
+                ]
+                for future in as_completed(futures):
+                    future.result()
+            finally:
+                pool.shutdown(cancel_futures=True)
+    finally:
+        os.close(fd)
+
+    etag = layout["etag"].strip('"')
+    if etag and not current_app.config["IGNORE_ETAGS"]:
+        if "-" in etag:
+            joined = b"".join(bytes.fromhex(done[index]) for index in range(count))
+            actual = f"{hashlib.md5(joined).hexdigest()}-{count}"
+        elif count == 1:
+            actual = done[0]
+        else:
+            whole = hashlib.md5()
+            with open(partial_path, "rb") as f:
+                for chunk in iter(lambda: f.read(EIGHT_MEGABYTES), b""):
+                    whole.update(chunk)
+            actual = whole.hexdigest()
+        if actual != etag:
+            _discard_partial_download(partial_path)
+            raise DownloadVerificationError(
+                f"'{key}' downloaded with ETag {actual}, expected {etag}"
+            )
+
+    os.remove(manifest_path)
+
+
 def aws_download(key, basename, sqs_receipt_handle=None):
     """Download an object from AWS S3 storage.
 
@@ -894,6 +1326,10 @@ def aws_download(key, basename, sqs_receipt_handle=None):
     restore's completion notification will re-trigger the download; all three
     are truthy and mean the SQS message was handled. Returns False when the
     retry budget was exhausted or the SQS message couldn't be deleted.
+
+    The transfer itself is ranged_download's: concurrent ranged parts that
+    a retry resumes rather than restarting from byte zero, verified
+    against the object's ETag.
     """
 
     # Retry plumbing still lives in app.videos; imported lazily so the
@@ -901,6 +1337,10 @@ def aws_download(key, basename, sqs_receipt_handle=None):
 
     from app.videos import TRANSIENT_COPY_ERRNOS
 
+    # botocore loads with the first client (see aws_client)
+
+    import botocore.exceptions
+
     retry = MAX_DOWNLOAD_RETRIES
 
     # Rename "(edition-foo bar baz)" to "{edition-foo bar baz}"
@@ -911,21 +1351,28 @@ def aws_download(key, basename, sqs_receipt_handle=None):
 
     current_app.logger.info(f"'{basename}' downloading from AWS S3 storage")
 
-    s3_client = aws_s3_client()
+    concurrency = current_app.config["AWS_DOWNLOAD_CONCURRENCY"]
+    s3_client = aws_s3_client(max_pool_connections=concurrency)
     sqs_client = aws_sqs_client()
+    partial_path = os.path.join(current_app.config["IMPORT_DIR"], f".{basename}")
 
     while retry > 0:
         try:
-            s3_client.download_file(
+            layout = _object_layout(s3_client, current_app.config["AWS_BUCKET"], key)
+            ranged_download(
+                s3_client,
                 current_app.config["AWS_BUCKET"],
                 key,
-                os.path.join(current_app.config["IMPORT_DIR"], f".{basename}"),
-                Callback=DownloadProgressPercentage(
+                partial_path,
+                progress=DownloadProgressPercentage(
                     s3_client,
                     current_app.config["AWS_BUCKET"],
                     key,
                     basename,
+                    size=layout["size"],
                 ),
+                concurrency=concurrency,
+                layout=layout,
             )
 
         # Don't resume if the file doesn't exist in AWS!
@@ -938,6 +1385,7 @@ def aws_download(key, basename, sqs_receipt_handle=None):
             )
             if error_code in ("404", "NoSuchKey") or status_code == 404:
                 current_app.logger.info(f"'{basename}' doesn't exist in AWS S3")
+                _discard_partial_download(partial_path)
                 if sqs_receipt_handle:
                     if not delete_sqs_message(sqs_client, sqs_receipt_handle):
                         return False
@@ -973,6 +1421,7 @@ def aws_download(key, basename, sqs_receipt_handle=None):
                     )
                     aws_restore(key)
 
+                _discard_partial_download(partial_path)
                 if sqs_receipt_handle:
                     if not delete_sqs_message(
                         sqs_client, sqs_receipt_handle, note="stale message"
@@ -980,6 +1429,16 @@ def aws_download(key, basename, sqs_receipt_handle=None):
                         return False
                 return DOWNLOAD_RESTORE_PENDING
 
+            elif error_code == "PreconditionFailed" or status_code == 412:
+                # The object was replaced since the download began; its
+                # parts on disk belong to the old version
+
+                current_app.logger.warning(
+                    f"'{basename}' changed at AWS mid-download; starting over"
+                )
+                _discard_partial_download(partial_path)
+                retry = _spend_download_retry(retry)
+
             elif error_code in NON_RETRYABLE_DOWNLOAD_ERRORS or status_code == 403:
                 current_app.logger.error(traceback.format_exc())
                 current_app.logger.error(
@@ -996,14 +1455,10 @@ def aws_download(key, basename, sqs_receipt_handle=None):
             if e.errno in TRANSIENT_COPY_ERRNOS:
                 # A dead import volume fails instantly, so burning the whole
                 # in-place retry budget on it is pointless: drop the partial
-                # download and let the caller defer until the mount settles
+                # download (what reached a dying mount can't be trusted to
+                # resume from) and let the caller defer until it settles
 
-                try:
-                    os.remove(
-                        os.path.join(current_app.config["IMPORT_DIR"], f".{basename}")
-                    )
-                except OSError:
-                    pass
+                _discard_partial_download(partial_path)
                 raise
             current_app.logger.error(traceback.format_exc())
             retry = _spend_download_retry(retry)
@@ -1016,7 +1471,7 @@ def aws_download(key, basename, sqs_receipt_handle=None):
             current_app.logger.info(f"'{basename}' downloaded from AWS S3 storage")
 
             os.rename(
-                os.path.join(current_app.config["IMPORT_DIR"], f".{basename}"),
+                partial_path,
                 os.path.join(current_app.config["IMPORT_DIR"], f"{basename}"),
             )
 
@@ -1033,16 +1488,15 @@ def aws_download(key, basename, sqs_receipt_handle=None):
     # Import scans skip dotfiles, so an abandoned partial download would
     # otherwise sit invisibly in the import directory forever
 
-    try:
-        os.remove(os.path.join(current_app.config["IMPORT_DIR"], f".{basename}"))
-    except OSError:
-        pass
+    _discard_partial_download(partial_path)
     return False
 
 
 def aws_restore(key, days=2, tier="Standard"):
     """Request a file at AWS to be restored from Glacier status for download."""
 
+    import botocore.exceptions
+
     with app.app_context():
         try:
             s3_client = aws_s3_client(with_retries=True)
@@ -1128,6 +1582,8 @@ def aws_upload(
 
     from app.videos import move_to_rejects
 
+    import boto3.exceptions
+
     if not os.path.isfile(file_path):
         current_app.logger.error(
             f"'{file_path}' can't be uploaded to AWS since it's not a file!"
@@ -0,0 +1,283 @@
+"""Streaming compression, upload and sectioned reads for database backups.
+
+The nightly dump used to go through Python's gzip on one core, land on
+disk, and then be read a second time by upload_file. Here the dump is cut
+into blocks that a thread pool compresses into independent gzip members.
+Concatenated members are still one valid .sql.gz, so zcat, gzip.open and
+the disaster-recovery runbook read the result unchanged. Each compressed
+block goes to every sink in order as it completes: the local backup file
+and an S3 multipart upload. mysqldump's output is therefore read exactly
+once.
+
+The writer also records where each table's section begins. Every section
+starts on a fresh member, so a restore can decompress the sections on
+their own and load tables in parallel (see app.maintenance.restore_dump).
+View definitions and the dump's closing statements are recorded as
+postamble sections instead, which a restore replays serially once every
+table exists.
+"""
+
+import zlib
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Uncompressed bytes per gzip member. Large enough that each member
+# compresses nearly as well as one continuous stream, small enough that a
+# handful in flight keep every compressor thread busy
+
+BLOCK_SIZE = 4 * 1024 * 1024
+
+# S3 requires every multipart part but the last to be at least 5 MiB
+
+PART_SIZE = 16 * 1024 * 1024
+UPLOAD_CONCURRENCY = 4
+
+READ_SIZE = 1024 * 1024
+
+# mysqldump's header comment above each table's DROP/CREATE/INSERTs
+
+TABLE_MARKER = b"-- Table structure for table "
+
+# The headers of what must load after every table: the stand-in a view
+# gets where it sorts among the tables (MySQL says "view", MariaDB
+# "table"), the real definitions mysqldump writes at the end, and the
+# first of the statements that restore the session settings
+
+VIEW_MARKERS = (
+    b"-- Temporary view structure for view ",
+    b"-- Temporary table structure for view ",
+    b"-- Final view structure for view ",
+)
+TRAILER_MARKER = b"/*!40103 SET TIME_ZONE=@OLD_TIME_ZONE */;"
+
+
+class ParallelGzipWriter:
+    """A write-only file object that compresses in parallel gzip blocks.
+
+    zlib releases the GIL while it compresses, so the blocks really run
+    concurrently. Compressed blocks are written to the sinks strictly in
+    submission order. At most twice as many blocks as threads are held
+    in memory at once.
+    """
+
+    def __init__(self, sinks, threads=4, level=6, block_size=BLOCK_SIZE):
+        self.sinks = sinks
+        self.level = level
+        self.block_size = block_size
+        self.threads = max(1, threads)
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+        self.sections = []
+        self._buffer = []
+        self._buffered = 0
+        self._starting = []
+        self._pending = deque()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.threads, thread_name_prefix="backup-gzip"
+        )
+
+    def write(self, data):
+        """Buffer data, handing a full block to the compressor threads."""
+
+        self._buffer.append(data)
+        self._buffered += len(data)
+        self.raw_bytes += len(data)
+        if self._buffered >= self.block_size:
+            self._submit()
+
+    def section(self, name, postamble=False):
+        """Start a named section on a fresh gzip member, so the bytes from
+        here to the next section decompress without anything before.
+        A postamble section is replayed after every table section."""
+
+        self._submit()
+        self._starting.append((name, postamble))
+
+    def _submit(self):
+        """Send the buffered bytes off to compress as one gzip member."""
+
+        if not self._buffer:
+            return
+        data = b"".join(self._buffer)
+        self._buffer = []
+        self._buffered = 0
+        future = self._executor.submit(zlib.compress, data, self.level, 31)
+        self._pending.append((future, self._starting))
+        self._starting = []
+        while len(self._pending) > self.threads * 2:
+            self._write_next()
+
+    def _write_next(self):
+        """Wait for the oldest block and write it to every sink."""
+
+        future, names = self._pending.popleft()
+        compressed = future.result()
+        for name, postamble in names:
+            self._open_section(name, postamble)
+        for sink in self.sinks:
+            sink.write(compressed)
+        self.compressed_bytes += len(compressed)
+
+    def close(self):
+        """Flush every block to the sinks and close off the sections."""
+
+        self._submit()
+        while self._pending:
+            self._write_next()
+        for name, postamble in self._starting:
+            self._open_section(name, postamble)
+        self._starting = []
+        self._executor.shutdown()
+        for section, following in zip(self.sections, self.sections[1:]):
+            section["end"] = following["start"]
+        if self.sections:
+            self.sections[-1]["end"] = self.compressed_bytes
+
+    def _open_section(self, name, postamble):
+        """Record a section starting at the current compressed offset."""
+
+        section = {"name": name, "start": self.compressed_bytes}
+        if postamble:
+            section["postamble"] = True
+        self.sections.append(section)
+
+    def abort(self):
+        """Stop compressing without writing anything further."""
+
+        self._executor.shutdown(cancel_futures=True)
+        self._pending.clear()
+
+    def manifest(self):
+        """The byte ranges a parallel restore needs: the preamble that sets
+        up each session, one range per table, and the postamble ranges
+        (views and the closing statements) to replay after them, in
+        dump order."""
+
+        first = self.sections[0]["start"] if self.sections else self.compressed_bytes
+        return {
+            "preamble": [0, first],
+            "tables": [
+                section for section in self.sections if not section.get("postamble")
+            ],
+            "postamble": [
+                [section["start"], section["end"]]
+                for section in self.sections
+                if section.get("postamble")
+            ],
+        }
+
+
+class S3MultipartSink:
+    """A write-only file object that streams into an S3 multipart upload.
+
+    Writes are grouped into PART_SIZE parts and several parts upload at
+    once, so slow uploads don't hold up the compressor. close() completes
+    the upload. abort() discards it; the bucket's lifecycle rule also
+    removes abandoned parts after a day, in case even that fails.
+    """
+
+    def __init__(
+        self, client, bucket, key, part_size=PART_SIZE, concurrency=UPLOAD_CONCURRENCY
+    ):
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self.part_size = part_size
+        self.concurrency = concurrency
+        self.upload_id = client.create_multipart_upload(Bucket=bucket, Key=key)[
+            "UploadId"
+        ]
+        self._buffer = bytearray()
+        self._parts = []
+        self._pending = deque()
+        self._next_part = 1
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="backup-upload"
+        )
+
+    def write(self, data):
+        """Buffer data, uploading each full part as it fills."""
+
+        self._buffer += data
+        if len(self._buffer) >= self.part_size:
+            self._upload(bytes(self._buffer))
+            self._buffer = bytearray()
+
+    def _upload(self, body):
+        """Queue one part, waiting if too many are already in flight."""
+
+        self._pending.append(
+            self._executor.submit(self._upload_part, self._next_part, body)
+        )
+        self._next_part += 1
+        while len(self._pending) > self.concurrency:
+            self._parts.append(self._pending.popleft().result())
+
+    def _upload_part(self, number, body):
+        """Upload one part and return the entry complete needs."""
+
+        response = self.client.upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            PartNumber=number,
+            Body=body,
+        )
+        return {"ETag": response["ETag"], "PartNumber": number}
+
+    def close(self):
+        """Upload the final part and complete the multipart upload."""
+
+        if self._buffer or self._next_part == 1:
+            self._upload(bytes(self._buffer))
+            self._buffer = bytearray()
+        while self._pending:
+            self._parts.append(self._pending.popleft().result())
+        self._executor.shutdown()
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            MultipartUpload={
+                "Parts": sorted(self._parts, key=lambda part: part["PartNumber"])
+            },
+        )
+
+    def abort(self):
+        """Abandon the upload so no parts linger."""
+
+        self._executor.shutdown(cancel_futures=True)
+        try:
+            self.client.abort_multipart_upload(
+                Bucket=self.bucket, Key=self.key, UploadId=self.upload_id
+            )
+        except Exception:
+            pass
+
+
+def read_gzip_range(path, start, end, chunk_size=READ_SIZE):
+    """Yield the decompressed contents of the gzip members in [start, end).
+
+    The range must begin on a member boundary. ParallelGzipWriter's
+    section offsets always do.
+    """
+
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        decompressor = zlib.decompressobj(31)
+        while remaining > 0:
+            data = f.read(min(chunk_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            while data:
+                output = decompressor.decompress(data)
+                if output:
+                    yield output
+                if decompressor.eof:
+                    data = decompressor.unused_data
+                    decompressor = zlib.decompressobj(31)
+                else:
+                    data = b""
@@ -130,9 +130,31 @@ def register(app):
         app.logger.info("Scanning import directory for files")
 
     @app.cli.command()
-    def sqs():
+    @click.option(
+        "--follow",
+        is_flag=True,
+        help="Keep long-polling until stopped, instead of queuing one poll.",
+    )
+    def sqs(follow=False):
         """Check for restored files at AWS S3."""
 
+        if follow:
+            import signal
+            import threading
+
+            from app.aws_storage import consume_sqs_notifications
+
+            # supervisor stops the program with SIGTERM; finish the
+            # current long poll and exit cleanly
+
+            stop = threading.Event()
+            signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+            try:
+                consume_sqs_notifications(stop)
+            except KeyboardInterrupt:
+                pass
+            return
+
         app.request_queue.enqueue(
             "app.videos.sqs_retrieve_task",
             job_timeout="2h",
@@ -140,6 +162,51 @@ def register(app):
         )
         app.logger.info("Polling AWS SQS for files to download")
 
+    @app.cli.command("startup-profile")
+    @click.option(
+        "--queue",
+        "queues",
+        multiple=True,
+        help="Profile a worker on this queue (repeatable), as supervisor.py "
+        "starts it; without one, a web process.",
+    )
+    @click.option(
+        "--top",
+        default=25,
+        show_default=True,
+        help="How many of the slowest imports to list.",
+    )
+    def startup_profile(queues, top):
+        """Measure a cold start in a fresh interpreter: the slowest
+        imports, and how long each create_app phase took."""
+
+        from app.startup import profile_startup
+
+        try:
+            profile = profile_startup(queues)
+        except RuntimeError as e:
+            raise click.ClickException(str(e))
+
+        click.echo(
+            f"Imports {profile['import_seconds'] * 1000:.0f}ms, "
+            f"create_app {profile['create_app_seconds'] * 1000:.0f}ms, "
+            f"worker preload {profile['preload_seconds'] * 1000:.0f}ms"
+        )
+
+        click.echo("\ncreate_app phases:")
+        for phase, seconds in profile["phases"]:
+            click.echo(f"  {seconds * 1000:8.1f}ms  {phase}")
+
+        # Cumulative time includes a module's own imports, so the list
+        # names the expensive subtrees; self time, which module pays
+        # for them
+
+        click.echo(f"\nSlowest imports (of {len(profile['imports'])}):")
+        click.echo(f"  {'cumulative':>10}  {'self':>8}  module")
+        slowest = sorted(profile["imports"], key=lambda row: row[2], reverse=True)
+        for module, own, cumulative in slowest[:top]:
+            click.echo(f"  {cumulative / 1000:8.1f}ms  {own / 1000:6.1f}ms  {module}")
+
     @app.cli.group()
     def aws():
         """Manage the AWS infrastructure Fitzflix depends on."""
@@ -331,6 +398,7 @@ def register(app):
         diary rows: those are real library data, not catalog junk."""
 
         from app import db
+        from app.criterion_catalog import invalidate_criterion_index
         from app.models import CatalogExclusion, Movie, UserMovieReview
 
         movie = db.session.get(Movie, movie_id)
@@ -353,6 +421,7 @@ def register(app):
             db.session.add(CatalogExclusion(tmdb_id=movie.tmdb_id, title=title))
         db.session.delete(movie)
         db.session.commit()
+        invalidate_criterion_index()
         click.echo(
             f"Deleted '{title}'"
             + (
@@ -362,6 +431,50 @@ def register(app):
             )
         )
 
+    @app.cli.group()
+    def backup():
+        """Database backup tools."""
+        pass
+
+    @backup.command()
+    @click.argument("dump", type=click.Path(exists=True, dir_okay=False))
+    @click.option(
+        "--database",
+        help="Database to load into (default: the configured database).",
+    )
+    @click.option(
+        "--jobs",
+        type=int,
+        help="Concurrent mysql sessions (default: DB_RESTORE_JOBS).",
+    )
+    def restore(dump, database=None, jobs=None):
+        """Restore a backup dump, loading tables in parallel when the
+        dump's .tables.json manifest sits beside it. The database must
+        already exist (see Disaster recovery in the README)."""
+
+        import json
+        import time
+
+        from sqlalchemy.engine import make_url
+
+        from app.maintenance import MANIFEST_SUFFIX, restore_dump
+
+        database = database or make_url(app.config["SQLALCHEMY_DATABASE_URI"]).database
+        jobs = jobs or app.config["DB_RESTORE_JOBS"]
+        manifest = None
+        if os.path.isfile(f"{dump}{MANIFEST_SUFFIX}"):
+            with open(f"{dump}{MANIFEST_SUFFIX}") as f:
+                manifest = json.load(f)
+        else:
+            click.echo("No table manifest beside the dump, restoring serially")
+
+        started = time.monotonic()
+        loaded = restore_dump(dump, database, manifest, jobs)
+        click.echo(
+            f"Restored {loaded / 1024 / 1024:.1f} MB into '{database}' "
+            f"in {time.monotonic() - started:.1f}s"
+        )
+
     @app.cli.group()
     def triage():
         """Manage the subtitle-triage inspection aids."""
@@ -438,6 +551,30 @@ def register(app):
                 )
         click.echo(f"Queued {queued} of {len(candidates)} candidate file(s)")
 
+    def reviewer_ids():
+        """Every user with a diary row — the users the engine profiles."""
+
+        from app import db
+        from app.models import UserMovieReview
+
+        return [
+            user_id
+            for (user_id,) in db.session.query(UserMovieReview.user_id)
+            .filter(UserMovieReview.user_id.isnot(None))
+            .distinct()
+        ]
+
+    def metrics_line(metrics):
+        """One evaluation's metrics as a line of output."""
+
+        return (
+            f"{metrics['positives']} positives, "
+            f"mean percentile {metrics['mean_percentile']:.3f} "
+            f"(0 = always ranked first), "
+            f"hit@10 {metrics['hit_at_10']:.1%}, "
+            f"hit@25 {metrics['hit_at_25']:.1%}"
+        )
+
     @recs.command()
     @click.option(
         "--weights",
@@ -446,13 +583,17 @@ def register(app):
         "'genre=1.2,director=2.0'; unlisted classes keep their "
         "current weight.",
     )
-    def evaluate(weights):
+    @click.option(
+        "--workers",
+        default=os.cpu_count() or 1,
+        show_default=True,
+        help="Processes to split each user's folds across.",
+    )
+    def evaluate(weights, workers):
         """Leave-one-out ranking metrics per user: how highly the films
         each user demonstrably liked would have been recommended. Use to
         compare trial feature-class weights against the current ones."""
 
-        from app import db
-        from app.models import UserMovieReview
         from app.recommendations import FEATURE_CLASS_WEIGHTS, evaluate_user
 
         class_weights = dict(FEATURE_CLASS_WEIGHTS)
@@ -464,21 +605,48 @@ def register(app):
                 class_weights[cls.strip()] = float(value)
         click.echo(f"Class weights: {class_weights}")
 
-        user_ids = [
-            user_id
-            for (user_id,) in db.session.query(UserMovieReview.user_id)
-            .filter(UserMovieReview.user_id.isnot(None))
-            .distinct()
-        ]
-        for user_id in user_ids:
-            metrics = evaluate_user(user_id, class_weights=class_weights)
+        for user_id in reviewer_ids():
+            metrics = evaluate_user(
+                user_id, class_weights=class_weights, workers=workers
+            )
             if metrics is None:
                 click.echo(f"user {user_id}: not enough positive films to measure")
                 continue
-            click.echo(
-                f"user {user_id}: {metrics['positives']} positives, "
-                f"mean percentile {metrics['mean_percentile']:.3f} "
-                f"(0 = always ranked first), "
-                f"hit@10 {metrics['hit_at_10']:.1%}, "
-                f"hit@25 {metrics['hit_at_25']:.1%}"
-            )
+            click.echo(f"user {user_id}: {metrics_line(metrics)}")
+
+    @recs.command()
+    @click.option(
+        "--workers",
+        default=os.cpu_count() or 1,
+        show_default=True,
+        help="Processes to run trial weightings across.",
+    )
+    @click.option(
+        "--rounds",
+        default=2,
+        show_default=True,
+        help="Coordinate-descent passes over every class.",
+    )
+    def tune(workers, rounds):
+        """Search feature-class weights and shrinkage for the settings
+        that rank every user's liked films highest, by coordinate
+        descent over the leave-one-out evaluation, and print them for
+        FEATURE_CLASS_WEIGHTS and FEATURE_CLASS_SHRINKAGE."""
+
+        from app.recommendations import evaluation_data, tune_weights
+
+        datasets = {}
+        for user_id in reviewer_ids():
+            data = evaluation_data(user_id)
+            if data is None:
+                click.echo(f"user {user_id}: not enough positive films to measure")
+                continue
+            datasets[user_id] = data
+        if not datasets:
+            raise click.ClickException("No user has enough positive films to tune on")
+
+        result = tune_weights(datasets, workers=workers, rounds=rounds, log=click.echo)
+        click.echo(f"Current: {metrics_line(result['baseline'])}")
+        click.echo(f"Best:    {metrics_line(result['metrics'])}")
+        click.echo(f"FEATURE_CLASS_WEIGHTS = {result['class_weights']}")
+        click.echo(f"FEATURE_CLASS_SHRINKAGE = {result['shrinkage']}")
@@ -15,6 +15,7 @@ via lazy imports, keeping the module import direction one-way.
 """
 
 import json
+import re
 import time
 import traceback
 
@@ -24,7 +25,7 @@ from flask import current_app
 from werkzeug.local import LocalProxy
 
 from app import db, get_app
-from app.models import CatalogExclusion, Movie
+from app.models import CatalogExclusion, File, Movie, RefQuality, movie_file_rank
 
 # Wikidata models Criterion spine numbers as property P12279, TMDb movie ids
 # as P4947, and publication dates as P577; the earliest publication year is
@@ -69,6 +70,23 @@ CRITERION_CACHE_KEY = "fitzflix:criterion:releases"
 CRITERION_CACHE_SECONDS = 7 * 86400
 
 
+# The catalog page's precomputed index (Oct 2026): one Redis list per
+# filter, rows in spine order, so a page view is an LRANGE of its own
+# rows instead of the whole-catalog merge and sort. The meta hash holds
+# the library fingerprint the lists were built against
+
+CRITERION_INDEX_KEY = "fitzflix:criterion:index:{filter}"
+
+
+CRITERION_INDEX_META_KEY = "fitzflix:criterion:index:meta"
+
+
+CRITERION_INDEX_FILTERS = ("all", "library", "settled")
+
+
+CRITERION_INDEX_SECONDS = 2 * 86400
+
+
 def wikidata_retry_after_seconds(response, default=60, cap=300):
     """Seconds to wait out a WDQS 429, from its Retry-After header.
 
@@ -179,6 +197,7 @@ def get_criterion_collection_from_wikidata(force_refresh=False):
         json.dumps(criterion_collection),
         ex=CRITERION_CACHE_SECONDS,
     )
+    invalidate_criterion_index()
     current_app.logger.info(
         f"Fetched {len(criterion_collection)} Criterion Collection releases "
         f"from Wikidata"
@@ -294,6 +313,371 @@ def create_criterion_catalog_records(criterion_collection, by_tmdb_id, by_title_
     return created_count
 
 
+def criterion_library_fingerprint():
+    """A cheap stamp of everything a library row reads that no write
+    site invalidates for: the movie files (count and highest id, which
+    change with every import, delete, and upgrade, plus a sum weighting
+    each file's quality and fullscreen flag by its id, which changes
+    when either is edited in place), the owned-disc flags (count and id
+    sum), the newest TMDb refresh (titles and years), and the upgrade
+    threshold. Editing ownership or a file anywhere — the Criterion
+    form, a release assignment, the file page, the shell — or
+    re-ranking the qualities moves the stamp, so the index never shows
+    stale rows until its TTL. One statement, so a warm page view still
+    costs a single query."""
+
+    # The threshold lives with the web helpers; lazy so the module
+    # import direction stays one-way
+
+    from app.main.helpers import _upgrade_threshold
+
+    files = (
+        db.session.query(
+            File.id,
+            (
+                File.id
+                * (
+                    2 * db.func.coalesce(File.quality_id, 0)
+                    + db.case((File.fullscreen.is_(True), 1), else_=0)
+                )
+            ).label("weight"),
+        )
+        .filter(File.movie_id.isnot(None))
+        .subquery()
+    )
+    owned = (
+        db.session.query(Movie.id)
+        .filter(Movie.criterion_disc_owned.is_(True))
+        .subquery()
+    )
+    (
+        file_count,
+        last_id,
+        file_weight,
+        owned_count,
+        owned_sum,
+        refreshed_at,
+    ) = db.session.query(
+        db.session.query(db.func.count(files.c.id)).scalar_subquery(),
+        db.session.query(db.func.max(files.c.id)).scalar_subquery(),
+        db.session.query(db.func.sum(files.c.weight)).scalar_subquery(),
+        db.session.query(db.func.count(owned.c.id)).scalar_subquery(),
+        db.session.query(db.func.sum(owned.c.id)).scalar_subquery(),
+        db.session.query(db.func.max(Movie.tmdb_data_as_of)).scalar_subquery(),
+    ).one()
+    return (
+        f"{file_count}:{last_id or 0}:{file_weight or 0}:"
+        f"{owned_count}:{owned_sum or 0}:{refreshed_at or ''}:"
+        f"{_upgrade_threshold()}"
+    )
+
+
+def criterion_catalog_rows(releases):
+    """The whole Criterion catalog in spine order, as the user-
+    independent rows the catalog page renders from.
+
+    Library rows are the best main-feature file per film, for films
+    marked with Criterion metadata OR matching a release by TMDb id (a
+    film whose record predates its release never got marked, but the
+    catalog knows its spine); the rest of the catalog follows as
+    beyond-the-library rows. Each row is a plain dict — kind, movie_id,
+    tmdb_id, title, year, spine, set_title, settled — so the list
+    stores as JSON; the page hydrates its own rows' records.
+    """
+
+    # The threshold lives with the web helpers; lazy so the module
+    # import direction stays one-way
+
+    from app.main.helpers import _upgrade_threshold
+
+    by_tmdb_id, by_title_year = criterion_release_lookups(releases)
+    release_tmdb_ids = [
+        release["tmdb_id"] for release in releases if release.get("tmdb_id")
+    ]
+
+    ranked_files = (
+        db.session.query(
+            File.id,
+            movie_file_rank(),
+        )
+        .join(Movie, (Movie.id == File.movie_id))
+        .join(RefQuality, (RefQuality.id == File.quality_id))
+        .subquery()
+    )
+
+    results = (
+        db.session.query(File, Movie, RefQuality)
+        .join(Movie, (Movie.id == File.movie_id))
+        .join(RefQuality, (RefQuality.id == File.quality_id))
+        .join(ranked_files, (ranked_files.c.id == File.id))
+        .filter(File.feature_type_id == None)
+        .filter(ranked_files.c.rank == 1)
+        .filter(File.edition == None)
+        .filter(
+            db.or_(
+                Movie.criterion_spine_number != None,
+                Movie.criterion_set_title != None,
+                Movie.tmdb_id.in_(release_tmdb_ids or [0]),
+            )
+        )
+        .all()
+    )
+
+    # A library row is SETTLED — the Fitzflix library badge, nothing to
+    # do — when the Criterion disc is owned AND the local file matches
+    # the release's own format, with the bar CAPPED at the app-wide
+    # threshold (Glenn: an owned disc with a Bluray-1080p file is
+    # settled here even if Criterion re-released it in 2160p — chasing
+    # that upgrade is the shopping list's job, not this page's). The
+    # threshold also covers releases whose quality was never recorded.
+    # Anything else shows its amber quality tier: go find the Criterion
+    # version
+
+    movie_ids = [movie.id for _, movie, _ in results]
+    CriterionQuality = db.aliased(RefQuality)
+    criterion_prefs = dict(
+        db.session.query(Movie.id, CriterionQuality.preference)
+        .join(CriterionQuality, CriterionQuality.id == Movie.criterion_quality_id)
+        .filter(Movie.id.in_(movie_ids or [0]))
+    )
+    threshold = _upgrade_threshold()
+
+    # Each library film consumes its catalog release (TMDb id first,
+    # title+year fallback — the import's own matching order), so the
+    # remainder renders as beyond-the-library rows. A film with both a
+    # standalone release and a set membership consumes both through its
+    # shared TMDb id
+
+    consumed_tmdb = set()
+    consumed_title_year = set()
+    library_rows = []
+    for file, movie, quality in results:
+        release = by_tmdb_id.get(movie.tmdb_id) if movie.tmdb_id else None
+        if release is None and movie.title and movie.year:
+            release = by_title_year.get((movie.title.upper(), movie.year))
+        if movie.tmdb_id:
+            consumed_tmdb.add(movie.tmdb_id)
+        if release:
+            if release.get("tmdb_id"):
+                consumed_tmdb.add(release["tmdb_id"])
+            if release.get("title") and release.get("year"):
+                consumed_title_year.add((release["title"], release["year"]))
+        target = min(criterion_prefs.get(movie.id) or threshold, threshold)
+        upgradable = bool(file.fullscreen) or quality.preference < target
+        library_rows.append(
+            {
+                "kind": "library",
+                "movie_id": movie.id,
+                "settled": bool(movie.criterion_disc_owned) and not upgradable,
+                "tmdb_id": movie.tmdb_id,
+                "title": movie.tmdb_title or movie.title,
+                "year": (
+                    movie.tmdb_release_date.year
+                    if movie.tmdb_title and movie.tmdb_release_date
+                    else movie.year
+                ),
+                "spine": movie.criterion_spine_number
+                or (release or {}).get("spine_number"),
+                "set_title": movie.criterion_set_title
+                or (release or {}).get("set_title"),
+            }
+        )
+
+    # The rest of the catalog. Standalone entries precede set entries
+    # in the cache, so a film with both keeps its own spine; releases
+    # without a TMDb id render as plain spine rows. Box-set CONTAINER
+    # items are redundant: Wikidata gives the set item the spine (and
+    # no TMDb id — TMDb has no set entries) while its member films
+    # arrive separately wearing the set title, so a TMDb-less row whose
+    # spine belongs to a set would just shadow its own members ("#88
+    # Ivan the Terrible" between the actual Parts I–III)
+
+    set_spines = {
+        release["spine_number"] for release in releases if release.get("set_title")
+    }
+    excluded_tmdb = {
+        tmdb_id for (tmdb_id,) in db.session.query(CatalogExclusion.tmdb_id)
+    }
+    catalog_rows = []
+    catalog_keys = set()
+    for release in releases:
+        tmdb_id = release.get("tmdb_id")
+        if (
+            not tmdb_id
+            and not release.get("set_title")
+            and release.get("spine_number") in set_spines
+        ):
+            continue
+        # Hand-excluded ids (Wikidata junk — see CatalogExclusion)
+        # neither render nor get records created
+        if tmdb_id and tmdb_id in excluded_tmdb:
+            continue
+        if tmdb_id and tmdb_id in consumed_tmdb:
+            continue
+        title_year = (release.get("title"), release.get("year"))
+        if title_year in consumed_title_year:
+            continue
+        key = tmdb_id or title_year
+        if key in catalog_keys:
+            continue
+        catalog_keys.add(key)
+        catalog_rows.append(
+            {
+                "kind": "tmdb" if tmdb_id else "plain",
+                "movie_id": None,
+                "settled": False,
+                "tmdb_id": tmdb_id,
+                "title": release.get("label") or release.get("title"),
+                "year": release.get("year"),
+                "spine": release.get("spine_number"),
+                "set_title": release.get("set_title"),
+            }
+        )
+
+    # File-less local records (logged or watchlisted unowned films)
+    # dress their catalog rows with the stored title and year; the page
+    # hydrates the record itself for the poster and funnel badges
+
+    catalog_tmdb_ids = [row["tmdb_id"] for row in catalog_rows if row["tmdb_id"]]
+    records = {}
+    if catalog_tmdb_ids:
+        records = {
+            tmdb_id: (movie_id, tmdb_title, tmdb_release_date)
+            for movie_id, tmdb_id, tmdb_title, tmdb_release_date in db.session.query(
+                Movie.id, Movie.tmdb_id, Movie.tmdb_title, Movie.tmdb_release_date
+            ).filter(Movie.tmdb_id.in_(catalog_tmdb_ids))
+        }
+    for row in catalog_rows:
+        record = records.get(row["tmdb_id"]) if row["tmdb_id"] else None
+        if record is None:
+            continue
+        movie_id, tmdb_title, tmdb_release_date = record
+        row["movie_id"] = movie_id
+        if tmdb_title:
+            row["title"] = tmdb_title
+            if tmdb_release_date:
+                row["year"] = tmdb_release_date.year
+
+    # One spine order across owned and unowned: set members sort at
+    # their set's spine (year, then title within), spine-less local
+    # rows keep their old place at the end
+
+    def sort_key(row):
+        """Spine order, set members at their set's number."""
+
+        spine = row.get("spine")
+        title = re.sub(
+            r"^(The|A|An)\s+", "", row.get("title") or "", flags=re.IGNORECASE
+        )
+        return (
+            0 if spine is not None else 1,
+            spine if spine is not None else 0,
+            row.get("set_title") or "",
+            row.get("year") or 9999,
+            title.upper(),
+        )
+
+    return sorted(library_rows + catalog_rows, key=sort_key)
+
+
+def rebuild_criterion_index(releases=None):
+    """Materialize the catalog page's per-filter row lists in Redis.
+
+    The full refresh and the nightly availability refresh rebuild it
+    after their writes; a page view that finds it missing or stale
+    (the library fingerprint moved) rebuilds inline, which costs what
+    every view used to. One MULTI swaps all three lists and the meta
+    hash together, so a concurrent view never reads a half-built
+    index. Returns the rows by filter.
+    """
+
+    if releases is None:
+        try:
+            releases = get_criterion_collection_from_wikidata()
+        except Exception:
+            # Library-only rows if the cache is cold and Wikidata is
+            # unreachable; the short TTL retries soon
+            current_app.logger.warning(traceback.format_exc())
+            releases = []
+
+    fingerprint = criterion_library_fingerprint()
+    merged = criterion_catalog_rows(releases)
+    rows_by_filter = {
+        "all": merged,
+        "library": [row for row in merged if row["kind"] == "library"],
+        "settled": [
+            row for row in merged if row["kind"] == "library" and row["settled"]
+        ],
+    }
+    seconds = CRITERION_INDEX_SECONDS if releases else 3600
+
+    pipe = current_app.redis.pipeline(transaction=True)
+    for filter_status, rows in rows_by_filter.items():
+        key = CRITERION_INDEX_KEY.format(filter=filter_status)
+        pipe.delete(key)
+        if rows:
+            pipe.rpush(key, *(json.dumps(row) for row in rows))
+            pipe.expire(key, seconds)
+    pipe.delete(CRITERION_INDEX_META_KEY)
+    pipe.hset(
+        CRITERION_INDEX_META_KEY,
+        mapping={"fingerprint": fingerprint, "built_at": int(time.time())},
+    )
+    pipe.expire(CRITERION_INDEX_META_KEY, seconds)
+    pipe.execute()
+    return rows_by_filter
+
+
+def invalidate_criterion_index():
+    """Drop the catalog page's index so the next view rebuilds it —
+    for the writes the fingerprint can't see: a fresh release list,
+    a hand-edited spine or release format, a catalog exclusion."""
+
+    current_app.redis.delete(CRITERION_INDEX_META_KEY)
+
+
+def criterion_index_page(filter_status, page, per_page):
+    """One page of the catalog index: (rows, counts, page), the page
+    clamped to the last. A warm, current index answers in one pipelined
+    round trip — the meta stamp, the three list lengths, and the page's
+    LRANGE — plus the fingerprint query; a cold or stale one rebuilds
+    first."""
+
+    redis = current_app.redis
+    fingerprint = criterion_library_fingerprint()
+
+    pipe = redis.pipeline(transaction=False)
+    pipe.hget(CRITERION_INDEX_META_KEY, "fingerprint")
+    for name in CRITERION_INDEX_FILTERS:
+        pipe.llen(CRITERION_INDEX_KEY.format(filter=name))
+    start = (page - 1) * per_page
+    pipe.lrange(
+        CRITERION_INDEX_KEY.format(filter=filter_status), start, start + per_page - 1
+    )
+    stamp, *lengths, raw_rows = pipe.execute()
+
+    if stamp is None or stamp.decode() != fingerprint:
+        rows_by_filter = rebuild_criterion_index()
+        counts = {name: len(rows) for name, rows in rows_by_filter.items()}
+        last_page = max((counts[filter_status] + per_page - 1) // per_page, 1)
+        page = min(page, last_page)
+        start = (page - 1) * per_page
+        rows = rows_by_filter[filter_status][start : start + per_page]
+        return [dict(row) for row in rows], counts, page
+
+    counts = dict(zip(CRITERION_INDEX_FILTERS, lengths))
+    last_page = max((counts[filter_status] + per_page - 1) // per_page, 1)
+    if page > last_page:
+        page = last_page
+        start = (page - 1) * per_page
+        raw_rows = redis.lrange(
+            CRITERION_INDEX_KEY.format(filter=filter_status),
+            start,
+            start + per_page - 1,
+        )
+    return [json.loads(row) for row in raw_rows], counts, page
+
+
 def refresh_criterion_collection_info(movie_id=None):
     """Refresh Criterion Collection information from Wikidata.
 
@@ -340,6 +724,15 @@ def refresh_criterion_collection_info(movie_id=None):
                 f"created {created} catalog record(s)"
             )
 
+            # The catalog page's index follows the refresh's writes: a
+            # full refresh rebuilds it outright, a single film's spine
+            # just marks it for the next view
+
+            if movie_id is None:
+                rebuild_criterion_index(criterion_collection)
+            else:
+                invalidate_criterion_index()
+
         except Exception:
             current_app.logger.error(traceback.format_exc())
             db.session.rollback()
@@ -200,15 +200,19 @@ def refresh_frame_pool_task():
                 Movie.id.in_(to_extract or [0])
             )
         }
-        for movie_id in to_extract:
-            current_app.transcode_queue.enqueue(
-                "app.frames.extract_frame_task",
-                args=(movie_id,),
-                job_timeout=600,
-                description=(
-                    f"Extracting a frame from '{titles.get(movie_id, movie_id)}'"
-                ),
-            )
+        current_app.transcode_queue.enqueue_many(
+            [
+                current_app.transcode_queue.prepare_data(
+                    "app.frames.extract_frame_task",
+                    args=(movie_id,),
+                    timeout=600,
+                    description=(
+                        f"Extracting a frame from '{titles.get(movie_id, movie_id)}'"
+                    ),
+                )
+                for movie_id in to_extract
+            ]
+        )
         current_app.logger.info(
             f"Frame pool: {len(valid)} pooled, {len(entries) - len(valid)} "
             f"pruned, {len(to_extract)} extractions queued"
@@ -0,0 +1,496 @@
+"""The import-directory watcher: one elected process watches IMPORT_DIR
+for the whole installation.
+
+Every import-program worker used to run its own watchdog
+PollingObserver, each snapshot-diffing the network-mounted directory
+every second and racing the others for a per-file Redlock on every
+arrival. Now each of those processes runs an ImportWatcher, but only
+the holder of a Redis lease actually watches; the rest stand by and
+take over within a lease period when the leader dies, so directory
+traffic stays flat however many workers are configured.
+
+The leader watches with native filesystem events (inotify, FSEvents)
+when the directory's mount delivers them, and with adaptive stat
+polling otherwise — SMB and NFS mounts never report another client's
+writes to a local event API. The poller lists the directory once per
+tick and tightens its interval the moment something changes, relaxing
+back toward IMPORT_POLL_MAX_SECONDS while the directory is quiet.
+
+Arrivals are deduplicated through a Redis set of claimed basenames:
+SADD decides who enqueues, so a file gets exactly one localization_task
+no matter how many events (or sweeps, or a leadership handover's
+initial snapshot) report it. A basename leaves the set when its file
+leaves the directory, which is how a re-drop of the same name later
+is seen as new.
+
+Every participating process keeps writing its observer heartbeat, the
+key the health card counts, so a standby that could take over still
+counts as a watcher.
+"""
+
+import os
+import socket
+import threading
+import time
+import traceback
+
+from app import enqueue_import_scan, safe_job_id
+from app.maintenance import OBSERVER_KEY_PREFIX
+
+LEASE_KEY = "fitzflix:import-watcher:leader"
+ARRIVALS_KEY = "fitzflix:import-watcher:arrivals"
+
+# The lease outlives a couple of missed renewals, so a slow tick never
+# hands leadership over; a dead leader is replaced within LEASE_SECONDS
+
+LEASE_SECONDS = 30
+TICK_SECONDS = 5
+HEARTBEAT_SECONDS = 180
+
+# Native events can be dropped (an inotify queue overflow, a mount
+# remounted underneath), so the leader reconciles the claimed set with
+# a real listing every few minutes
+
+RECONCILE_SECONDS = 300
+
+# Filesystems whose remote writes never surface as local events
+
+NETWORK_FILESYSTEMS = {
+    "9p",
+    "afpfs",
+    "cifs",
+    "davfs",
+    "fuse.sshfs",
+    "ncpfs",
+    "nfs",
+    "nfs4",
+    "smb3",
+    "smbfs",
+    "webdav",
+}
+
+# Compare-and-act lease scripts: only the current holder may extend or
+# release the lease, so a leader that stalled past its TTL can't stomp
+# on its successor's
+
+RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def is_import_candidate(path):
+    """True for a visible regular file: dotfiles are in-progress copies
+    waiting to be renamed into place, and never imported."""
+
+    return not os.path.basename(path).startswith(".") and os.path.isfile(path)
+
+
+def visible_files(directory):
+    """The importable basenames in a directory, from one listing."""
+
+    names = set()
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            try:
+                if entry.is_file():
+                    names.add(entry.name)
+            except OSError:
+                continue
+    return names
+
+
+def claim_arrival(connection, basename):
+    """Claim a basename for enqueueing; False when it's already claimed."""
+
+    return bool(connection.sadd(ARRIVALS_KEY, basename))
+
+
+def release_arrivals(connection, basenames):
+    """Forget claimed basenames whose files have left the directory."""
+
+    basenames = list(basenames)
+    if basenames:
+        connection.srem(ARRIVALS_KEY, *basenames)
+
+
+def enqueue_arrival(flask_app, path):
+    """Queue a localization for a newly visible import file, exactly once.
+
+    The claim is taken before the enqueue and handed back if the
+    enqueue fails, so a Redis hiccup can't strand a file as claimed
+    but never queued. Returns True when a job was queued.
+    """
+
+    basename = os.path.basename(path)
+    if not is_import_candidate(path):
+        return False
+    if not claim_arrival(flask_app.redis, basename):
+        return False
+    try:
+        flask_app.logger.info(f"'{basename}' Found in import directory")
+        flask_app.import_queue.enqueue(
+            "app.videos.localization_task",
+            args=(path,),
+            job_timeout=flask_app.config["LOCALIZATION_TASK_TIMEOUT"],
+            description=f"'{basename}'",
+            job_id=safe_job_id(basename),
+        )
+    except Exception:
+        release_arrivals(flask_app.redis, [basename])
+        raise
+    return True
+
+
+def mount_filesystem_type(path):
+    """The filesystem type of the mount holding path, or None when the
+    platform can't say (no /proc/mounts)."""
+
+    try:
+        with open("/proc/mounts") as f:
+            mounts = [line.split() for line in f]
+    except OSError:
+        return None
+
+    path = os.path.realpath(path)
+    best, best_type = "", None
+    for fields in mounts:
+        if len(fields) < 3:
+            continue
+        mount_point = fields[1].replace("\\040", " ")
+        if (
+            path == mount_point
+            or path.startswith(mount_point.rstrip("/") + "/")
+            or mount_point == "/"
+        ) and len(mount_point) > len(best):
+            best, best_type = mount_point, fields[2]
+    return best_type
+
+
+def native_events_supported(path):
+    """Whether local filesystem events will report arrivals in path.
+
+    On Linux the mount table names the filesystem. Elsewhere (the
+    production Mac) the NAS shares are mounted under /Volumes — the
+    same convention the health checks use to find network volumes.
+    """
+
+    fs_type = mount_filesystem_type(path)
+    if fs_type is not None:
+        return fs_type not in NETWORK_FILESYSTEMS
+    return not os.path.realpath(path).startswith("/Volumes/")
+
+
+class AdaptivePoller(object):
+    """Stat-polls a directory with an interval that adapts to activity:
+    back to the minimum as soon as a listing changes, stretching by half
+    again per quiet listing up to the maximum.
+    """
+
+    def __init__(
+        self, directory, on_arrival, on_departure, minimum, maximum, logger=None
+    ):
+        self.directory = directory
+        self.logger = logger
+        self.on_arrival = on_arrival
+        self.on_departure = on_departure
+        self.minimum = minimum
+        self.maximum = maximum
+        self.interval = minimum
+        self.known = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def poll(self):
+        """List the directory once, report changes, and adapt the
+        interval. The first listing only primes the snapshot; the
+        leader sweeps on election for anything already present."""
+
+        current = visible_files(self.directory)
+        if self.known is None:
+            self.known = current
+            return
+        arrived = current - self.known
+        departed = self.known - current
+        self.known = current
+        for name in sorted(arrived):
+            self.on_arrival(os.path.join(self.directory, name))
+        if departed:
+            self.on_departure(departed)
+        if arrived or departed:
+            self.interval = self.minimum
+        else:
+            self.interval = min(self.interval * 1.5, self.maximum)
+
+    def run(self):
+        """Poll until stopped; a failed listing (a dropped mount) backs
+        off to the maximum interval rather than killing the thread."""
+
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except OSError:
+                self.interval = self.maximum
+            except Exception:
+                self.interval = self.maximum
+                if self.logger is not None:
+                    self.logger.error(traceback.format_exc())
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Start polling on a daemon thread."""
+
+        self._thread = threading.Thread(
+            target=self.run, daemon=True, name="import-poller"
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop polling."""
+
+        self._stop.set()
+
+    def is_alive(self):
+        """Whether the polling thread is still running."""
+
+        return self._thread is not None and self._thread.is_alive()
+
+
+class ImportWatcher(object):
+    """One process's seat in the import-directory watcher election.
+
+    start() runs the election loop on a daemon thread: heartbeat,
+    acquire or renew the lease, and — while leading — keep a native
+    observer or adaptive poller running, rebuilding it (and sweeping
+    for what arrived while blind) whenever it dies.
+    """
+
+    def __init__(self, flask_app):
+        self.app = flask_app
+        self.connection = flask_app.redis
+        self.directory = flask_app.config["IMPORT_DIR"]
+        self.identity = f"{socket.gethostname()}:{os.getpid()}"
+        self.leading = False
+        self.watch = None
+        self.mode = None
+        self.last_reconcile = 0
+        self._renew = self.connection.register_script(RENEW_SCRIPT)
+        self._release = self.connection.register_script(RELEASE_SCRIPT)
+
+    def heartbeat(self):
+        """Refresh this process's expiring observer heartbeat."""
+
+        self.connection.set(
+            f"{OBSERVER_KEY_PREFIX}{os.getpid()}",
+            int(time.time()),
+            ex=HEARTBEAT_SECONDS,
+        )
+
+    def hold_lease(self):
+        """Acquire the lease, or extend it if already held; True while
+        this process leads."""
+
+        ttl_ms = LEASE_SECONDS * 1000
+        if self.leading and self._renew(keys=[LEASE_KEY], args=[self.identity, ttl_ms]):
+            return True
+        return bool(self.connection.set(LEASE_KEY, self.identity, px=ttl_ms, nx=True))
+
+    def on_arrival(self, path):
+        """A file became visible: queue it (once)."""
+
+        try:
+            enqueue_arrival(self.app, path)
+        except Exception:
+            self.app.logger.error(traceback.format_exc())
+
+    def on_departure(self, basenames):
+        """Files left the directory: release their claims."""
+
+        try:
+            release_arrivals(self.connection, basenames)
+        except Exception:
+            self.app.logger.error(traceback.format_exc())
+
+    def _start_native(self):
+        """A watchdog observer on the platform's native event API."""
+
+        from watchdog.events import (
+            FileCreatedEvent,
+            FileDeletedEvent,
+            FileMovedEvent,
+            FileSystemEventHandler,
+        )
+        from watchdog.observers import Observer
+
+        watcher = self
+
+        class ArrivalHandler(FileSystemEventHandler):
+            """Route native events to the watcher's arrival and
+            departure handling."""
+
+            def on_created(self, event):
+                """A file appeared (dotfiles are filtered downstream)."""
+
+                watcher.on_arrival(event.src_path)
+
+            def on_moved(self, event):
+                """A rename: the old name departs, the new one arrives
+                — which is how a dot-prefixed copy becomes visible."""
+
+                watcher.on_departure([os.path.basename(event.src_path)])
+                if os.path.dirname(event.dest_path) == os.path.dirname(event.src_path):
+                    watcher.on_arrival(event.dest_path)
+
+            def on_deleted(self, event):
+                """A file left the directory."""
+
+                watcher.on_departure([os.path.basename(event.src_path)])
+
+        observer = Observer()
+        observer.schedule(
+            ArrivalHandler(),
+            path=self.directory,
+            recursive=False,
+            event_filter=[FileCreatedEvent, FileMovedEvent, FileDeletedEvent],
+        )
+        observer.start()
+        return observer
+
+    def _start_poller(self):
+        """An adaptive stat poller, for mounts without native events."""
+
+        poller = AdaptivePoller(
+            self.directory,
+            self.on_arrival,
+            self.on_departure,
+            minimum=self.app.config["IMPORT_POLL_MIN_SECONDS"],
+            maximum=self.app.config["IMPORT_POLL_MAX_SECONDS"],
+            logger=self.app.logger,
+        )
+        poller.start()
+        return poller
+
+    def start_watching(self):
+        """Start the leader's watch, preferring native events; an
+        observer that can't start (an exhausted inotify watch limit)
+        falls back to polling."""
+
+        mode = self.app.config["IMPORT_WATCH_MODE"]
+        if mode == "native" or (
+            mode == "auto" and native_events_supported(self.directory)
+        ):
+            try:
+                self.watch = self._start_native()
+                self.mode = "native"
+                return
+            except Exception:
+                self.app.logger.warning(
+                    "Native import-directory events unavailable, polling "
+                    f"instead: {traceback.format_exc()}"
+                )
+        self.watch = self._start_poller()
+        self.mode = "poll"
+
+    def stop_watching(self):
+        """Stop the leader's watch, if any."""
+
+        if self.watch is not None:
+            try:
+                self.watch.stop()
+            except Exception:
+                pass
+        self.watch = None
+        self.mode = None
+
+    def reconcile(self):
+        """Drop claims for files no longer in the directory — native
+        events can be lost, and a stale claim would hide a re-drop."""
+
+        claimed = {
+            member.decode() if isinstance(member, bytes) else member
+            for member in self.connection.smembers(ARRIVALS_KEY)
+        }
+        if claimed:
+            release_arrivals(self.connection, claimed - visible_files(self.directory))
+        self.last_reconcile = time.monotonic()
+
+    def tick(self):
+        """One pass of the election loop."""
+
+        self.heartbeat()
+        was_leading = self.leading
+        self.leading = self.hold_lease()
+
+        if was_leading and not self.leading:
+            self.app.logger.warning(
+                "Lost the import-directory watcher lease; standing by"
+            )
+            self.stop_watching()
+            return
+
+        if not self.leading:
+            return
+
+        if not was_leading:
+            self.app.logger.info(
+                f"Import-directory watcher elected ({self.identity}); "
+                "sweeping for files that arrived unwatched"
+            )
+            self.start_watching()
+            enqueue_import_scan(self.app.import_queue)
+            self.reconcile()
+            return
+
+        if self.watch is None or not self.watch.is_alive():
+            self.app.logger.warning(
+                "Import directory watch died; rebuilding it and sweeping "
+                "for missed files"
+            )
+            self.stop_watching()
+            self.start_watching()
+            enqueue_import_scan(self.app.import_queue)
+
+        if time.monotonic() - self.last_reconcile >= RECONCILE_SECONDS:
+            self.reconcile()
+
+    def run(self):
+        """Run the election loop forever; failures are logged and the
+        next tick tries again."""
+
+        while True:
+            try:
+                self.tick()
+            except Exception:
+                self.app.logger.error(traceback.format_exc())
+            time.sleep(TICK_SECONDS)
+
+    def start(self):
+        """Take the first tick synchronously, so a lone process is
+        already watching when create_app returns, then keep the loop
+        going on a daemon thread."""
+
+        try:
+            self.tick()
+        except Exception:
+            self.app.logger.error(traceback.format_exc())
+        threading.Thread(target=self.run, daemon=True, name="import-watcher").start()
+
+    def release(self):
+        """Give the lease up (a clean shutdown), so a standby takes over
+        at its next tick instead of waiting out the TTL."""
+
+        self.stop_watching()
+        if self.leading:
+            self._release(keys=[LEASE_KEY], args=[self.identity])
+            self.leading = False
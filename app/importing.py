@@ -28,7 +28,6 @@ import traceback
 from datetime import datetime, timedelta, timezone
 
 from pathvalidate import sanitize_filename
-from pymediainfo import MediaInfo
 from rq import get_current_job
 from rq.registry import StartedJobRegistry
 from unidecode import unidecode
@@ -45,6 +44,7 @@ from app.criterion_catalog import (
 )
 from app.email import send_email as send_email_async
 from app.email import task_send_email as send_email
+from app.import_watcher import claim_arrival
 from app.models import (
     File,
     FileAudioTrack,
@@ -57,11 +57,13 @@ from app.models import (
     tmdb_get,
 )
 from app.pipeline import migrate_trail, record_task_stage
+from app.reference_data import reference_data
 from app.tracks import (
     _extract_media_details,
     flag_possibly_forced_subtitles,
     get_audio_tracks_from_file,
     get_subtitle_tracks_from_file,
+    parse_media_info,
     remove_empty_subtitle_tracks,
     supplement_lossless_tracks,
     watch_mkvmerge_progress,
@@ -129,7 +131,7 @@ def probe_file_completeness(file_path):
     """
 
     try:
-        media_info = MediaInfo.parse(file_path)
+        media_info = parse_media_info(file_path)
     except Exception:
         return None
 
@@ -508,7 +510,7 @@ def localization_task(
             # Parse the incoming file and get its details with MediaInfo
 
             current_app.logger.info(f"'{basename}' Parsing with MediaInfo")
-            media_info = MediaInfo.parse(file_path)
+            media_info = parse_media_info(file_path)
             current_app.logger.debug(f"'{basename}' -> {media_info.to_json()}")
 
             for track in media_info.tracks:
@@ -608,7 +610,7 @@ def localization_task(
                 current_app.logger.info(
                     f"'{basename}' Parsing added statistics with MediaInfo"
                 )
-                media_info = MediaInfo.parse(file_path)
+                media_info = parse_media_info(file_path)
                 current_app.logger.debug(f"'{basename}' -> {media_info.to_json()}")
                 audio_tracks = get_audio_tracks_from_file(file_path)
                 subtitle_tracks = get_subtitle_tracks_from_file(file_path)
@@ -952,7 +954,7 @@ def inspect_localized_file(file_path, container, job=None):
     name = os.path.basename(file_path)
 
     if container == "Matroska":
-        media_info = MediaInfo.parse(file_path)
+        media_info = parse_media_info(file_path)
         audio_tracks = get_audio_tracks_from_file(file_path)
         subtitle_tracks = get_subtitle_tracks_from_file(file_path)
 
@@ -1342,9 +1344,14 @@ def finalize_localization(
                 # Set the special feature type if the file is a special feature
 
                 if file_details.get("feature_type_name"):
-                    feature_type = RefFeatureType.query.filter_by(
-                        feature_type=file_details.get("feature_type_name")
-                    ).first()
+                    feature_type_id = reference_data().feature_type_ids.get(
+                        file_details.get("feature_type_name")
+                    )
+                    feature_type = (
+                        db.session.get(RefFeatureType, feature_type_id)
+                        if feature_type_id
+                        else None
+                    )
                     file.feature_type = feature_type
                     current_app.logger.info(f"{file} Marking as {feature_type}")
 
@@ -1367,9 +1374,12 @@ def finalize_localization(
 
             # Set file quality details
 
-            quality = RefQuality.query.filter_by(
-                quality_title=file_details.get("quality_title")
-            ).first()
+            # The reference snapshot maps the title to its id; get() then
+            # finds the row in the session's identity map after the first
+            # import a worker runs
+
+            quality_id = reference_data().quality_id(file_details.get("quality_title"))
+            quality = db.session.get(RefQuality, quality_id) if quality_id else None
             file.quality = quality
             current_app.logger.info(f"{file} Setting file_quality {quality}")
 
@@ -1837,12 +1847,9 @@ def manual_import_task():
         try:
             import_directory_files = os.listdir(current_app.config["IMPORT_DIR"])
             import_directory_files.sort()
-            qualities = (
-                db.session.query(RefQuality.quality_title)
-                .order_by(RefQuality.preference.asc())
-                .all()
-            )
-            qualities = [quality_title for (quality_title,) in qualities]
+            qualities = [
+                quality.quality_title for quality in reference_data().qualities
+            ]
 
             # A filename can contain more than one quality string; track the
             # files already handled so each is only enqueued once per scan
@@ -1871,6 +1878,13 @@ def manual_import_task():
                             job_queue.extend(localization_tasks_running.get_job_ids())
                             job_queue.extend(current_app.import_queue.job_ids)
                             if safe_job_id(os.path.basename(file)) not in job_queue:
+                                # Claim it in the watcher's arrival set
+                                # too, so the watcher doesn't queue it a
+                                # second time; the sweep itself still
+                                # re-queues a claimed file whose job is
+                                # gone, which is its safety-net job
+
+                                claim_arrival(current_app.redis, os.path.basename(file))
                                 current_app.logger.info(
                                     f"'{os.path.basename(file)}' Found in import directory"
                                 )
@@ -2123,7 +2137,7 @@ def evaluate_filename(file_path, tmdb_id=None, log=True):
         # If the file quality name doesn't match a expected name, then we must reject
 
         quality_title = tv.group("quality_title")
-        if not RefQuality.query.filter_by(quality_title=quality_title).first():
+        if quality_title not in reference_data().quality_by_title:
             return False
 
         extension = tv.group("extension")
@@ -2213,7 +2227,7 @@ def evaluate_filename(file_path, tmdb_id=None, log=True):
         # If the file quality name doesn't match a expected name, then we must reject
 
         quality_title = movie.group("quality_title")
-        if not RefQuality.query.filter_by(quality_title=quality_title).first():
+        if quality_title not in reference_data().quality_by_title:
             return False
 
         # Name the film according to how it's named in TMDb, as a film can have alternate
@@ -2321,8 +2335,7 @@ def evaluate_filename(file_path, tmdb_id=None, log=True):
 
             # Get a list of the current possible special feature types
 
-            special_feature_types = db.session.query(RefFeatureType.feature_type).all()
-            special_feature_types = [result[0] for result in special_feature_types]
+            special_feature_types = list(reference_data().feature_types)
 
             if fullscreen == True:
                 # Rearrange "Full Screen" in the version string.
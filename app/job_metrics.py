@@ -0,0 +1,272 @@
+"""Per-job performance history (Oct 2026).
+
+The pipeline trails say where a file is; nothing said how long each
+kind of work takes. PipelineWorker now measures every job it runs —
+wall time, CPU time (the worker's and any ffmpeg or mkvmerge children
+it waited on), peak RSS, bytes read and written, and how long the job
+sat in its queue — and appends one compact sample per job to two
+rolling Redis lists: one for the task type (the job's function) and
+one for the queue. Each list keeps the newest SAMPLE_LIMIT samples and
+expires a month after its last write, so a retired task ages out.
+
+The System page summarizes both as p50/p95/p99 and flags a REGRESSION
+when the newest RECENT_SAMPLES runs' p95 wall time exceeds the older
+samples' by REGRESSION_FACTOR — a task that got slower after a deploy
+or a library grown past an index shows up without anyone timing it.
+
+Recording is advisory like the trails: every failure is logged and
+swallowed, never surfaced to the job.
+"""
+
+import json
+import math
+import resource
+import sys
+import time
+
+from datetime import datetime, timezone
+
+from app.advisory import log_warning
+
+TASK_KEY = "fitzflix:metrics:task:{name}"
+QUEUE_KEY = "fitzflix:metrics:queue:{name}"
+TASKS_KEY = "fitzflix:metrics:tasks"
+QUEUES_KEY = "fitzflix:metrics:queues"
+
+SAMPLE_LIMIT = 1000
+SAMPLE_TTL_SECONDS = 30 * 86400
+
+# Regression check: the newest runs against everything older, once
+# there's enough of both to mean something
+
+RECENT_SAMPLES = 20
+MIN_BASELINE_SAMPLES = 20
+REGRESSION_FACTOR = 1.5
+
+# A sample is one JSON array in this order: epoch seconds, 1 for
+# success or 0 for failure, then milliseconds, KiB, and bytes as named
+
+FIELDS = (
+    "at",
+    "ok",
+    "wall_ms",
+    "cpu_ms",
+    "peak_rss_kb",
+    "read_bytes",
+    "written_bytes",
+    "wait_ms",
+)
+
+# getrusage counts I/O in 512-byte blocks
+
+_BLOCK_BYTES = 512
+
+
+def _usage():
+    """(cpu seconds, blocks read, blocks written, max RSS KiB) for this
+    process plus the children it has waited on."""
+
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    max_rss = max(own.ru_maxrss, children.ru_maxrss)
+
+    # macOS reports ru_maxrss in bytes, Linux in KiB
+
+    if sys.platform == "darwin":
+        max_rss //= 1024
+    return (
+        own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime,
+        own.ru_inblock + children.ru_inblock,
+        own.ru_oublock + children.ru_oublock,
+        max_rss,
+    )
+
+
+def _reset_peak_rss():
+    """Reset the kernel's RSS high-water mark, so the next reading is
+    this job's own peak rather than the worker's lifetime one. Linux
+    only; elsewhere there's no per-job reading to reset."""
+
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_kb():
+    """VmHWM from /proc, or None where there's no /proc."""
+
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _queue_wait_seconds(job, started):
+    """Seconds between the job landing on its queue and a worker taking
+    it, or None if rq recorded no enqueue time."""
+
+    enqueued_at = job.enqueued_at
+    if enqueued_at is None:
+        return None
+    if enqueued_at.tzinfo is None:
+        enqueued_at = enqueued_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (started - enqueued_at).total_seconds())
+
+
+class JobMeasurement:
+    """The readings taken as a job starts, finished into a sample once
+    it lands."""
+
+    def __init__(self, job):
+        started = datetime.now(timezone.utc)
+        self.wait = _queue_wait_seconds(job, started)
+        self.rss_reset = _reset_peak_rss()
+        self.usage = _usage()
+        self.clock = time.monotonic()
+
+    def sample(self, ok):
+        """The finished job's sample, in FIELDS order."""
+
+        wall = time.monotonic() - self.clock
+        cpu, blocks_in, blocks_out, _ = _usage()
+
+        # Without a reset (macOS) the only reading is the worker's
+        # lifetime high-water mark, which says nothing about this job
+
+        peak_rss = _peak_rss_kb() if self.rss_reset else None
+        return [
+            int(time.time()),
+            1 if ok else 0,
+            round(wall * 1000),
+            round((cpu - self.usage[0]) * 1000),
+            peak_rss,
+            (blocks_in - self.usage[1]) * _BLOCK_BYTES,
+            (blocks_out - self.usage[2]) * _BLOCK_BYTES,
+            round(self.wait * 1000) if self.wait is not None else None,
+        ]
+
+
+def start_measurement(job):
+    """A JobMeasurement for a job about to run, or None if the readings
+    couldn't be taken."""
+
+    try:
+        return JobMeasurement(job)
+    except Exception:
+        log_warning()
+        return None
+
+
+def record_job_metrics(connection, job, queue_name, measurement, ok):
+    """Append the landed job's sample to its task's and its queue's
+    series, in one round trip."""
+
+    if measurement is None:
+        return
+    try:
+        sample = json.dumps(measurement.sample(ok), separators=(",", ":"))
+        pipe = connection.pipeline(transaction=False)
+        for key, index, name in (
+            (TASK_KEY, TASKS_KEY, job.func_name),
+            (QUEUE_KEY, QUEUES_KEY, queue_name),
+        ):
+            series = key.format(name=name)
+            pipe.lpush(series, sample)
+            pipe.ltrim(series, 0, SAMPLE_LIMIT - 1)
+            pipe.expire(series, SAMPLE_TTL_SECONDS)
+            pipe.sadd(index, name)
+        pipe.execute()
+    except Exception:
+        log_warning()
+
+
+def percentile(values, fraction):
+    """The nearest-rank percentile of values, or None for none."""
+
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(len(ordered) * fraction)) - 1]
+
+
+def _samples(connection, key):
+    """A series' samples as dicts, newest first."""
+
+    return [
+        dict(zip(FIELDS, json.loads(raw)))
+        for raw in connection.lrange(key, 0, SAMPLE_LIMIT - 1)
+    ]
+
+
+def summarize_series(name, samples):
+    """One row of the System page's table for a series' samples."""
+
+    walls = [sample["wall_ms"] for sample in samples]
+    peaks = [
+        sample["peak_rss_kb"] for sample in samples if sample["peak_rss_kb"] is not None
+    ]
+    waits = [sample["wait_ms"] for sample in samples if sample["wait_ms"] is not None]
+    recent, baseline = walls[:RECENT_SAMPLES], walls[RECENT_SAMPLES:]
+    recent_p95 = percentile(recent, 0.95)
+    baseline_p95 = percentile(baseline, 0.95)
+    regressed = (
+        len(recent) == RECENT_SAMPLES
+        and len(baseline) >= MIN_BASELINE_SAMPLES
+        and baseline_p95
+        and recent_p95 > baseline_p95 * REGRESSION_FACTOR
+    )
+    return {
+        "name": name,
+        "count": len(samples),
+        "failures": sum(1 for sample in samples if not sample["ok"]),
+        "last": datetime.fromtimestamp(samples[0]["at"], timezone.utc).replace(
+            tzinfo=None
+        ),
+        "p50": percentile(walls, 0.5),
+        "p95": percentile(walls, 0.95),
+        "p99": percentile(walls, 0.99),
+        "wait_p50": percentile(waits, 0.5),
+        "wait_p95": percentile(waits, 0.95),
+        "cpu_p50": percentile([sample["cpu_ms"] for sample in samples], 0.5),
+        "peak_rss_kb": max(peaks) if peaks else None,
+        "io_p50": percentile(
+            [sample["read_bytes"] + sample["written_bytes"] for sample in samples],
+            0.5,
+        ),
+        "regressed": bool(regressed),
+        "recent_p95": recent_p95,
+        "baseline_p95": baseline_p95,
+    }
+
+
+def job_performance(connection):
+    """{"tasks": [...], "queues": [...]} summaries for the System page,
+    slowest p95 first; empty lists if Redis can't be read."""
+
+    performance = {"tasks": [], "queues": [], "sample_limit": SAMPLE_LIMIT}
+    try:
+        for section, index, key in (
+            ("tasks", TASKS_KEY, TASK_KEY),
+            ("queues", QUEUES_KEY, QUEUE_KEY),
+        ):
+            names = sorted(
+                name.decode() if isinstance(name, bytes) else name
+                for name in connection.smembers(index)
+            )
+            for name in names:
+                samples = _samples(connection, key.format(name=name))
+                if not samples:
+                    connection.srem(index, name)
+                    continue
+                performance[section].append(summarize_series(name, samples))
+            performance[section].sort(key=lambda row: row["p95"], reverse=True)
+    except Exception:
+        log_warning()
+    return performance
@@ -0,0 +1,582 @@
+"""The landing page's shelves, rendered once a day per user (Oct 2026).
+
+The landing page used to rebuild every shelf on every visit: the seen
+and not-interested sets, the watchlisted-owned join and its pins, the
+rewatch ranking, the rail's owned/logged/refused drops, the leaving
+shelf's taste ranking, and each shelf's daily rotation and shuffle —
+all to arrive at the same twelve films the last visit that day drew.
+Here each shelf is rendered to an HTML fragment the first time it's
+wanted on a day (or by the warm job after the nightly recompute) and
+kept in one Redis hash per user per day; a visit is then one pipelined
+read of that hash and two generation counters.
+
+Fragments are stamped with the generations they were rendered under.
+Diary, watchlist, not-interested, and streaming-service writes bump
+the writing user's counter; file writes and edits to what a tile shows
+bump the household's, as do the recomputes that replace the stored
+recommendations, rail, and leaving set. A stale stamp is a miss, so a
+render that races an invalidation is never served.
+
+The tiles' forms carry the session's CSRF token, which differs from
+device to device; fragments are rendered with a placeholder that each
+visit swaps for its own token. Runtime-filtered views (?minutes=) are
+rarer and render live, and the Criterion24/7 card stays live since it
+follows the feed minute by minute.
+"""
+
+import traceback
+
+from datetime import date
+
+from flask import current_app, has_app_context, render_template, request
+from flask_wtf.csrf import generate_csrf
+from markupsafe import Markup
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from werkzeug.local import LocalProxy
+
+from app import db, get_app
+from app.models import (
+    File,
+    Movie,
+    User,
+    UserMovieReview,
+    UserMovieStatus,
+    UserStreamingProvider,
+    UserWatchlist,
+)
+from app.leaving_criterion import leaving_shelf
+from app.recommendations import (
+    not_interested_movie_ids,
+    rotate_daily,
+    rotate_partition,
+    shuffle_daily,
+    stored_profile,
+    stored_recommendations,
+    watch_again_shelf,
+)
+from app.streaming import user_provider_ids
+from app.streaming_rail import stored_rail
+
+# This process's app instance, resolved lazily so the warm job can run
+# on a worker without building a second application
+
+app = LocalProxy(get_app)
+
+SHELVES_KEY = "fitzflix:landing:{user_id}:{day}"
+GENERATION_KEY = "fitzflix:landing:generation"
+USER_GENERATION_KEY = "fitzflix:landing:generation:{user_id}"
+
+# A day's hash outlives its day by long enough to cover a late visit
+# across midnight, then ages out on its own
+
+SHELVES_TTL = 2 * 86400
+
+# The shelves in page order, each with its partial template
+
+SHELVES = (
+    ("recs", "_landing_recs.html"),
+    ("leaving", "_landing_leaving.html"),
+    ("rail", "_landing_rail.html"),
+    ("again", "_landing_again.html"),
+)
+
+# Stands in for the session's CSRF token in stored fragments
+
+CSRF_PLACEHOLDER = "__fitzflix_landing_csrf__"
+
+# At most this many of a rail's 12 daily slots go to watchlist pins;
+# bigger watchlists rotate through the pinned slots day by day, so the
+# list always surfaces without ever crowding out discovery
+
+WATCHLIST_PIN_LIMIT = 4
+
+# The Movie columns a landing tile shows or filters on
+
+_MOVIE_FIELDS = ("title", "year", "custom_poster", "tmdb_poster_path", "tmdb_runtime")
+
+# Rows whose writes change only their own user's shelves
+
+_USER_MODELS = (UserMovieReview, UserWatchlist, UserMovieStatus, UserStreamingProvider)
+
+
+def _fits(runtime, minutes):
+    """True when a film of this runtime passes the ?minutes= filter;
+    unknown runtimes pass only an unfiltered view."""
+
+    return not minutes or bool(runtime and runtime <= minutes)
+
+
+def _recs_context(user, minutes):
+    """The recommendations grid: the day's rotation through the stored
+    ranking, with watchlisted owned films pinned."""
+
+    user_id = int(user.id)
+    today = date.today()
+    stored = stored_recommendations(current_app.redis, user_id)
+
+    has_history = (
+        db.session.query(UserMovieReview.id)
+        .filter(UserMovieReview.user_id == user_id)
+        .first()
+        is not None
+    )
+
+    recs = []
+    computed_at = None
+    if stored:
+        computed_at = stored.get("computed_at")
+
+        # Films logged since the nightly recompute drop out immediately
+        # rather than lingering as recommendations until tonight
+
+        seen = {
+            movie_id
+            for (movie_id,) in db.session.query(UserMovieReview.movie_id)
+            .filter(UserMovieReview.user_id == user_id)
+            .filter(UserMovieReview.movie_id.isnot(None))
+        }
+        # Films waved off since the nightly run drop immediately too
+        seen |= not_interested_movie_ids(user_id)
+        movie_ids = [item["movie_id"] for item in stored.get("items", [])]
+        movies = {
+            movie.id: movie
+            for movie in Movie.query.filter(Movie.id.in_(movie_ids or [0]))
+        }
+        # Watchlisted owned films pin ahead of the rotation regardless
+        # of where (or whether) they sit in the stored ranking — the
+        # library is big, but these are the ones specifically wanted.
+        # Pins are capped so a long watchlist rotates through its slots
+        # instead of freezing the rail — the discovery slots always
+        # keep the majority
+
+        because_by_id = {
+            item["movie_id"]: item.get("because", [])[:3]
+            for item in stored.get("items", [])
+        }
+        wanted_owned = (
+            db.session.query(Movie)
+            .join(UserWatchlist, UserWatchlist.movie_id == Movie.id)
+            .filter(UserWatchlist.user_id == user_id)
+            .filter(Movie.files.any(File.feature_type_id.is_(None)))
+            .order_by(UserWatchlist.date_added.desc())
+            .all()
+        )
+        watchlist_ids = {movie.id for movie in wanted_owned}
+        pin_candidates = [
+            {
+                "movie": movie,
+                "because": because_by_id.get(movie.id, []),
+                "watchlisted": True,
+            }
+            for movie in wanted_owned
+            if _fits(movie.tmdb_runtime, minutes)
+        ]
+        pinned = rotate_partition(
+            pin_candidates, WATCHLIST_PIN_LIMIT, today.toordinal()
+        )
+
+        for item in stored.get("items", []):
+            movie = movies.get(item["movie_id"])
+            if movie is None or item["movie_id"] in seen:
+                continue
+            if item["movie_id"] in watchlist_ids:
+                continue
+            if not _fits(movie.tmdb_runtime, minutes):
+                continue
+            recs.append(
+                {
+                    "movie": movie,
+                    "because": item.get("because", [])[:3],
+                    "watchlisted": False,
+                }
+            )
+
+        # A no-repeat daily partition through the deep stored ranking:
+        # twelve films a day, one per quality tier, cycling the whole
+        # set (400+ films, roughly monthly) before anything repeats.
+        # The day's cards then shuffle so neither the amber pins nor
+        # the quality tiers hold fixed positions (Glenn: slot one must
+        # not always be a pin or a top-tier film)
+
+        recs = shuffle_daily(
+            pinned + rotate_partition(recs, 12 - len(pinned), today.toordinal()),
+            f"mix:recs:{user_id}:{today.isoformat()}",
+        )
+    elif has_history:
+        # Diary rows but nothing stored yet (first deploy, or a brand-new
+        # reviewer): compute once now instead of waiting for tonight; the
+        # marker keeps repeat page loads from re-enqueueing, and the
+        # finished recompute invalidates this "being computed" fragment
+
+        if current_app.redis.set(
+            f"fitzflix:recs:requested:{user_id}", "1", nx=True, ex=3600
+        ):
+            current_app.maintenance_queue.enqueue(
+                "app.recommendations.recompute_recommendations",
+                job_timeout="1h",
+                description="Computing film recommendations",
+            )
+
+    return {"recs": recs, "computed_at": computed_at, "has_history": has_history}
+
+
+def _again_context(user, minutes):
+    """The rewatch shelf: owned films the user liked whose last watch is
+    long past — old favorites otherwise have no surface, since the
+    engine's candidates exclude logged films. Watchlisted ones
+    (re-added = declared rewatch intent) pin first under the same cap
+    as the other rails; the rest rotates daily."""
+
+    user_id = int(user.id)
+    today = date.today()
+    again_items = []
+    again_ranked = watch_again_shelf(user_id)
+    if again_ranked:
+        again_movies = {
+            m.id: m
+            for m in Movie.query.filter(
+                Movie.id.in_([item["movie_id"] for item in again_ranked])
+            )
+        }
+        again_watchlisted = {
+            movie_id
+            for (movie_id,) in db.session.query(UserWatchlist.movie_id).filter(
+                UserWatchlist.user_id == user_id
+            )
+        }
+        again_rows = []
+        for item in again_ranked:
+            again_movie = again_movies.get(item["movie_id"])
+            if again_movie is None:
+                continue
+            if not _fits(again_movie.tmdb_runtime, minutes):
+                continue
+            again_rows.append(
+                {
+                    "movie": again_movie,
+                    "last_watched": item["last_watched"],
+                    "watchlisted": item["movie_id"] in again_watchlisted,
+                }
+            )
+        again_pinned = rotate_partition(
+            [row for row in again_rows if row["watchlisted"]],
+            WATCHLIST_PIN_LIMIT,
+            today.toordinal(),
+        )
+        again_rest = [row for row in again_rows if not row["watchlisted"]]
+        again_items = shuffle_daily(
+            again_pinned
+            + rotate_daily(
+                again_rest,
+                12 - len(again_pinned),
+                f"again:{user_id}:{today.isoformat()}",
+            ),
+            f"mix:again:{user_id}:{today.isoformat()}",
+        )
+    return {"again": again_items}
+
+
+def _rail_context(user, minutes):
+    """The second rail: films streaming on this user's services, from
+    the nightly discover-pool recompute. Films logged or acquired since
+    the run drop out immediately; a user with a profile and provider
+    picks but no stored rail gets a one-off compute enqueued."""
+
+    user_id = int(user.id)
+    today = date.today()
+    rail = []
+    rail_computed_at = None
+    rail_payload = stored_rail(current_app.redis, user_id)
+    if rail_payload:
+        rail_computed_at = rail_payload.get("computed_at")
+        rail_ids = [item["tmdb_id"] for item in rail_payload.get("items", [])]
+        dropped = set()
+        if rail_ids:
+            owned_now = db.session.query(Movie.tmdb_id).filter(
+                Movie.tmdb_id.in_(rail_ids),
+                Movie.files.any(File.feature_type_id.is_(None)),
+            )
+            logged_now = (
+                db.session.query(Movie.tmdb_id)
+                .join(UserMovieReview, UserMovieReview.movie_id == Movie.id)
+                .filter(Movie.tmdb_id.in_(rail_ids))
+                .filter(UserMovieReview.user_id == user_id)
+            )
+            refused_now = (
+                db.session.query(Movie.tmdb_id)
+                .join(UserMovieStatus, UserMovieStatus.movie_id == Movie.id)
+                .filter(Movie.tmdb_id.in_(rail_ids))
+                .filter(UserMovieStatus.user_id == user_id)
+                .filter(UserMovieStatus.kind == "not_interested")
+            )
+            dropped = (
+                {t for (t,) in owned_now}
+                | {t for (t,) in logged_now}
+                | {t for (t,) in refused_now}
+            )
+        # A watchlisted film on the rail is the best kind of match —
+        # wanted, and streaming on a service already paid for — so it
+        # pins ahead of the daily rotation, capped like the library
+        # rail so discovery keeps most of the slots
+
+        watchlisted_now = set()
+        if rail_ids:
+            watchlisted_now = {
+                tmdb_id
+                for (tmdb_id,) in db.session.query(Movie.tmdb_id)
+                .join(UserWatchlist, UserWatchlist.movie_id == Movie.id)
+                .filter(Movie.tmdb_id.in_(rail_ids))
+                .filter(UserWatchlist.user_id == user_id)
+            }
+        for item in rail_payload.get("items", []):
+            if item["tmdb_id"] in dropped:
+                continue
+            if not _fits(item.get("runtime"), minutes):
+                continue
+            # The payload is shared with other requests: flag a copy
+            rail.append({**item, "watchlisted": item["tmdb_id"] in watchlisted_now})
+        pinned = rotate_partition(
+            [item for item in rail if item["watchlisted"]],
+            WATCHLIST_PIN_LIMIT,
+            today.toordinal(),
+        )
+        rest = [item for item in rail if not item["watchlisted"]]
+        rail = shuffle_daily(
+            pinned
+            + rotate_daily(
+                rest,
+                12 - len(pinned),
+                f"rail:{user_id}:{today.isoformat()}",
+            ),
+            f"mix:rail:{user_id}:{today.isoformat()}",
+        )
+    elif user_provider_ids(user) and stored_profile(current_app.redis, user_id):
+        if current_app.redis.set(
+            f"fitzflix:rail:requested:{user_id}", "1", nx=True, ex=3600
+        ):
+            current_app.maintenance_queue.enqueue(
+                "app.streaming_rail.recompute_streaming_rail",
+                job_timeout="1h",
+                description="Computing the streaming rail",
+            )
+    return {"rail": rail, "rail_computed_at": rail_computed_at}
+
+
+def _leaving_context(user, minutes):
+    """The departure shelf: what leaves the Criterion Channel at month's
+    end, taste-ranked, for Criterion subscribers. The runtime filter
+    applies like everywhere else."""
+
+    shelf = leaving_shelf(user)
+    shelf_items = []
+    shelf_departs = None
+    if shelf:
+        shelf_departs = shelf["departs"].strftime("%B %-d")
+        fitting = [
+            item for item in shelf["items"] if _fits(item.get("runtime"), minutes)
+        ]
+
+        # Watchlist urgencies stay pinned; the rest rotates daily so a
+        # month-long departure set doesn't look frozen
+
+        pinned = [item for item in fitting if item.get("watchlisted")][:12]
+        rest = [item for item in fitting if not item.get("watchlisted")]
+        shelf_items = pinned + rotate_daily(
+            rest,
+            12 - len(pinned),
+            f"shelf:{int(user.id)}:{date.today().isoformat()}",
+        )
+    return {"shelf": shelf_items, "shelf_departs": shelf_departs}
+
+
+def _render_shelves(user, minutes=None):
+    """{shelf: fragment} for one user, CSRF tokens left as the
+    placeholder, plus "filterable" — whether either rail has films, the
+    runtime filter's cue to show itself."""
+
+    contexts = {
+        "recs": _recs_context(user, minutes),
+        "leaving": _leaving_context(user, minutes),
+        "rail": _rail_context(user, minutes),
+        "again": _again_context(user, minutes),
+    }
+    fragments = {
+        name: render_template(
+            template,
+            minutes=minutes,
+            csrf_token=lambda: CSRF_PLACEHOLDER,
+            **contexts[name],
+        )
+        for name, template in SHELVES
+    }
+    fragments["filterable"] = (
+        "1" if contexts["recs"]["recs"] or contexts["rail"]["rail"] else ""
+    )
+    return fragments
+
+
+def _with_csrf(fragments):
+    """Stored fragments made servable: the placeholder swapped for this
+    session's token, each marked safe for the page template."""
+
+    token = generate_csrf()
+    shelves = {
+        name: Markup(fragments.get(name, "").replace(CSRF_PLACEHOLDER, token))
+        for name, _ in SHELVES
+    }
+    shelves["filterable"] = bool(fragments.get("filterable"))
+    return shelves
+
+
+def _decoded(value):
+    """A Redis reply as text."""
+
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _stamp(household, user_generation):
+    """The generations (and script root, which every link is relative
+    to) that a set of fragments was rendered under."""
+
+    return f"{_decoded(household) or 0}:{_decoded(user_generation) or 0}:{request.script_root}"
+
+
+def _store(user_id, fragments, stamp):
+    """Write a user's rendered shelves for today."""
+
+    key = SHELVES_KEY.format(user_id=user_id, day=date.today().isoformat())
+    pipe = current_app.redis.pipeline()
+    pipe.delete(key)
+    pipe.hset(key, mapping={**fragments, "stamp": stamp})
+    pipe.expire(key, SHELVES_TTL)
+    pipe.execute()
+
+
+def landing_shelves(user, minutes=None):
+    """The landing page's shelves for one user, ready to render:
+    today's stored fragments when they're current, otherwise freshly
+    rendered (and, for an unfiltered view, stored)."""
+
+    if minutes is not None:
+        return _with_csrf(_render_shelves(user, minutes))
+
+    user_id = int(user.id)
+    pipe = current_app.redis.pipeline()
+    pipe.hgetall(SHELVES_KEY.format(user_id=user_id, day=date.today().isoformat()))
+    pipe.get(GENERATION_KEY)
+    pipe.get(USER_GENERATION_KEY.format(user_id=user_id))
+    stored, household, user_generation = pipe.execute()
+
+    stamp = _stamp(household, user_generation)
+    stored = {_decoded(field): _decoded(value) for field, value in stored.items()}
+    if stored.get("stamp") == stamp:
+        return _with_csrf(stored)
+
+    fragments = _render_shelves(user)
+    _store(user_id, fragments, stamp)
+    return _with_csrf(fragments)
+
+
+def warm_landing_shelves():
+    """Nightly task: render every user's shelves for the day, so the
+    morning's first visit is a cache hit too. Returns the number of
+    users warmed."""
+
+    with app.app_context():
+        users = User.query.all()
+        warmed = 0
+
+        # Fragments link with url_for, which wants a request; a synthetic
+        # one under the configured script root stands in, and the stamp
+        # records that root so a proxied prefix renders its own
+        with app.test_request_context():
+            for user in users:
+                try:
+                    pipe = current_app.redis.pipeline()
+                    pipe.get(GENERATION_KEY)
+                    pipe.get(USER_GENERATION_KEY.format(user_id=user.id))
+                    stamp = _stamp(*pipe.execute())
+                    _store(user.id, _render_shelves(user), stamp)
+                    warmed += 1
+                except Exception:
+                    current_app.logger.warning(traceback.format_exc())
+        current_app.logger.info(f"Landing shelves: warmed {warmed} users")
+        return warmed
+
+
+def invalidate_landing_shelves(user_ids=None):
+    """Retire stored shelves: the given users', or everyone's for None."""
+
+    pipe = current_app.redis.pipeline()
+    if user_ids is None:
+        pipe.incr(GENERATION_KEY)
+    else:
+        for user_id in user_ids:
+            pipe.incr(USER_GENERATION_KEY.format(user_id=int(user_id)))
+    pipe.execute()
+
+
+def _collect(session):
+    """Note whose shelves the pending flush changes: user ids, or
+    "household" for a write every user's shelves can show."""
+
+    touched = session.info.setdefault("landing_shelf_changes", set())
+    written = list(session.new | session.deleted) + [
+        instance
+        for instance in session.dirty
+        if session.is_modified(instance, include_collections=False)
+    ]
+    with session.no_autoflush:
+        for instance in written:
+            if isinstance(instance, _USER_MODELS):
+                touched.add(instance.user_id)
+            elif isinstance(instance, File):
+                touched.add("household")
+            elif isinstance(instance, Movie):
+                state = inspect(instance)
+                if instance in session.deleted or any(
+                    state.attrs[field].history.has_changes() for field in _MOVIE_FIELDS
+                ):
+                    touched.add("household")
+    touched.discard(None)
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_previous(session, flush_context, instances):
+    """Note the shelves written rows belong to before the flush, while a
+    deleted row's user can still be read."""
+
+    _collect(session)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_current(session, flush_context):
+    """Note them after it too — a row attached through its user
+    relationship only has its user_id now."""
+
+    _collect(session)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changes(session):
+    """Retire the shelves the committed writes changed. Advisory: the
+    commit has landed whatever Redis says."""
+
+    touched = session.info.pop("landing_shelf_changes", None)
+    if not touched or not has_app_context():
+        return
+    try:
+        if "household" in touched:
+            invalidate_landing_shelves()
+        else:
+            invalidate_landing_shelves(touched)
+    except Exception:
+        current_app.logger.warning(traceback.format_exc())
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    """A rolled-back flush changed nothing."""
+
+    session.info.pop("landing_shelf_changes", None)
@@ -340,6 +340,13 @@ def refresh_leaving_criterion():
             f"Leaving-Criterion: stored {len(items)} of {len(films)} films "
             f"departing {departs.isoformat()}"
         )
+
+        # The landing shelves were drawn from the old set; imported here
+        # since that module imports this one
+
+        from app.landing_shelves import invalidate_landing_shelves
+
+        invalidate_landing_shelves()
         return True
 
 
@@ -55,7 +55,7 @@ from app.email import send_email
 from app.streaming import (
     provider_registry,
 )
-from app.videos import (
+from app.diary import (
     parse_letterboxd_export,
     star_rating_fields,
 )
@@ -498,7 +498,11 @@ def history():
     estimates = {}
     profile = stored_profile(current_app.redis, current_user.id)
     if profile:
-        scores = stored_scores(current_app.redis, current_user.id)
+        scores = stored_scores(
+            current_app.redis,
+            current_user.id,
+            [review.movie_id for review in reviews.items if review.rating is None],
+        )
         for review in reviews.items:
             if review.rating is not None or review.movie_id in estimates:
                 continue
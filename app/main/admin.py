@@ -33,6 +33,7 @@ from app.main.forms import (
     RejectActionForm,
     SyncAWSStorageForm,
     QualityFilterForm,
+    TaskProfilingForm,
     TMDBRefreshForm,
     TrackMetadataScanForm,
 )
@@ -48,16 +49,20 @@ from app.models import (
     tv_file_rank,
 )
 from app.main import bp
+from app.job_metrics import job_performance
 from app.main.helpers import admin_required
 from app.maintenance import system_health
+from app.profiling import (
+    load_report,
+    profiled_tasks,
+    recent_reports,
+    set_task_profiling,
+)
 from app.triage import (
     forced_subtitle_candidates,
     remove_triage_snapshots,
     triage_presentation,
 )
-from app.videos import (
-    evaluate_filename,
-)
 from rq.cron import CronScheduler
 from rq.exceptions import NoSuchJobError
 from rq.job import Job
@@ -68,7 +73,8 @@ from rq.registry import FailedJobRegistry
 @login_required
 @admin_required
 def system():
-    """System status: health, worker and scheduler state, and failed jobs."""
+    """System status: health, worker and scheduler state, task
+    performance, profiling, and failed jobs."""
 
     queues_by_name = {
         queue.name: queue
@@ -108,6 +114,22 @@ def system():
 
         return redirect(url_for("main.system"))
 
+    # Form to profile every run of a task type, or stop
+
+    task_profiling_form = TaskProfilingForm()
+    if (
+        task_profiling_form.profile_submit.data or task_profiling_form.stop_submit.data
+    ) and task_profiling_form.validate_on_submit():
+        task_name = task_profiling_form.task_name.data.strip()
+        if task_profiling_form.profile_submit.data:
+            mode = "cpu" if task_profiling_form.cpu.data else "counts"
+            set_task_profiling(current_app.redis, task_name, mode)
+            flash(f"Profiling every run of '{task_name}'", "info")
+        else:
+            set_task_profiling(current_app.redis, task_name, None)
+            flash(f"Stopped profiling '{task_name}'", "info")
+        return redirect(url_for("main.system"))
+
     failed_jobs = []
     for queue_name, queue in queues_by_name.items():
         registry = FailedJobRegistry(queue=queue)
@@ -156,6 +178,26 @@ def system():
         local_time=_local_time_text,
         failed_jobs=failed_jobs,
         failed_job_form=failed_job_form,
+        performance=job_performance(current_app.redis),
+        profiled_tasks=profiled_tasks(current_app.redis),
+        profile_reports=recent_reports(current_app.redis),
+        task_profiling_form=task_profiling_form,
+    )
+
+
+@bp.route("/system/profiles/<report_id>")
+@login_required
+@admin_required
+def profile_report(report_id):
+    """One stored profiling report: SQL with N+1 suspects first, Redis,
+    outbound calls, and the CPU samples if it took any."""
+
+    report = load_report(current_app.redis, report_id)
+    if report is None:
+        flash("That profiling report has expired.", "warning")
+        return redirect(url_for("main.system"))
+    return render_template(
+        "profile_report.html", title="Profiling report", report=report
     )
 
 
@@ -369,21 +411,29 @@ def maintenance():
         # artwork downloads, and thousands of them would starve the single
         # sql worker of import work for the whole run
 
-        for movie in movies:
-            current_app.request_queue.enqueue(
-                "app.videos.refresh_tmdb_info",
-                args=("Movies", movie.id, movie.tmdb_id),
-                job_timeout=current_app.config["SQL_TASK_TIMEOUT"],
-                description=f"Refreshing TMDB data for '{movie.title} ({movie.year})'",
-            )
-
-        for tv in tv_shows:
-            current_app.request_queue.enqueue(
-                "app.videos.refresh_tmdb_info",
-                args=("TV Shows", tv.id, tv.tmdb_id),
-                job_timeout=current_app.config["SQL_TASK_TIMEOUT"],
-                description=f"Refreshing TMDB data for '{tv.title}'",
-            )
+        queue = current_app.request_queue
+        queue.enqueue_many(
+            [
+                queue.prepare_data(
+                    "app.videos.refresh_tmdb_info",
+                    args=("Movies", movie.id, movie.tmdb_id),
+                    timeout=current_app.config["SQL_TASK_TIMEOUT"],
+                    description=(
+                        f"Refreshing TMDB data for '{movie.title} ({movie.year})'"
+                    ),
+                )
+                for movie in movies
+            ]
+            + [
+                queue.prepare_data(
+                    "app.videos.refresh_tmdb_info",
+                    args=("TV Shows", tv.id, tv.tmdb_id),
+                    timeout=current_app.config["SQL_TASK_TIMEOUT"],
+                    description=f"Refreshing TMDB data for '{tv.title}'",
+                )
+                for tv in tv_shows
+            ]
+        )
 
         flash("Refreshing TMDb information for entire library", "info")
         return redirect(url_for("main.maintenance"))
@@ -477,6 +527,12 @@ def maintenance():
         and filename_test_form.validate_on_submit()
     ):
         test_filename = filename_test_form.test_filename.data.strip()
+
+        # The import pipeline loads with the first preview rather than
+        # with the blueprint, which every process registers
+
+        from app.importing import evaluate_filename
+
         filename_test_result = {
             "filename": test_filename,
             "details": evaluate_filename(test_filename, log=False),
@@ -8,7 +8,7 @@ import traceback
 from concurrent.futures import ThreadPoolExecutor
 from types import SimpleNamespace
 
-from datetime import date, datetime, timezone
+from datetime import datetime, timezone
 
 from flask import (
     abort,
@@ -65,16 +65,10 @@ from app.recommendations import (
     TMDB_PATCH_SCORES_KEY,
     TOP_BILLING_CUTOFF,
     estimated_rating,
-    not_interested_movie_ids,
     resolved_score,
     resolved_tmdb_score,
-    rotate_daily,
-    rotate_partition,
-    shuffle_daily,
     stored_profile,
-    stored_recommendations,
     stored_scores,
-    watch_again_shelf,
 )
 from app.streaming import (
     batch_title_availability,
@@ -97,22 +91,17 @@ from app.radarr_push import (
     request_movie,
     withdraw_movie,
 )
-from app.leaving_criterion import leaving_inventory, leaving_shelf
-from app.streaming_rail import ENRICHED_KEY, enriched_movie, stored_rail
-from app.videos import (
+from app.landing_shelves import landing_shelves
+from app.leaving_criterion import leaving_inventory
+from app.streaming_rail import ENRICHED_KEY, enriched_movie
+from app.diary import (
     clear_not_interested,
     clear_watchlist,
-    find_or_create_tmdb_movie,
     star_rating_fields,
 )
+from app.tmdb_refresh import find_or_create_tmdb_movie
 from rq.registry import ScheduledJobRegistry, StartedJobRegistry
 
-# At most this many of a rail's 12 daily slots go to watchlist pins;
-# bigger watchlists rotate through the pinned slots day by day, so the
-# list always surfaces without ever crowding out discovery
-
-WATCHLIST_PIN_LIMIT = 4
-
 
 @bp.route("/")
 @bp.route("/index")
@@ -124,292 +113,18 @@ def index():
     ?minutes=N filters both rails at view time to films that fit the
     evening — the computed recommendations themselves never consider
     length, and films with unknown runtimes hide only from filtered
-    views."""
+    views. The shelves come from app.landing_shelves: an unfiltered
+    view reads today's rendered fragments, a filtered one renders its
+    own."""
 
     minutes = request.args.get("minutes", type=int)
     if minutes is not None and minutes < 1:
         minutes = None
 
-    stored = stored_recommendations(current_app.redis, current_user.id)
-
-    has_history = (
-        db.session.query(UserMovieReview.id)
-        .filter(UserMovieReview.user_id == int(current_user.id))
-        .first()
-        is not None
-    )
-
-    recs = []
-    computed_at = None
-    if stored:
-        computed_at = stored.get("computed_at")
-
-        # Films logged since the nightly recompute drop out immediately
-        # rather than lingering as recommendations until tonight
-
-        seen = {
-            movie_id
-            for (movie_id,) in db.session.query(UserMovieReview.movie_id)
-            .filter(UserMovieReview.user_id == int(current_user.id))
-            .filter(UserMovieReview.movie_id.isnot(None))
-        }
-        # Films waved off since the nightly run drop immediately too
-        seen |= not_interested_movie_ids(current_user.id)
-        movie_ids = [item["movie_id"] for item in stored.get("items", [])]
-        movies = {
-            movie.id: movie
-            for movie in Movie.query.filter(Movie.id.in_(movie_ids or [0]))
-        }
-        # Watchlisted owned films pin ahead of the rotation regardless
-        # of where (or whether) they sit in the stored ranking — the
-        # library is big, but these are the ones specifically wanted.
-        # Pins are capped so a long watchlist rotates through its slots
-        # instead of freezing the rail — the discovery slots always
-        # keep the majority
-
-        because_by_id = {
-            item["movie_id"]: item.get("because", [])[:3]
-            for item in stored.get("items", [])
-        }
-        wanted_owned = (
-            db.session.query(Movie)
-            .join(UserWatchlist, UserWatchlist.movie_id == Movie.id)
-            .filter(UserWatchlist.user_id == int(current_user.id))
-            .filter(Movie.files.any(File.feature_type_id.is_(None)))
-            .order_by(UserWatchlist.date_added.desc())
-            .all()
-        )
-        watchlist_ids = {movie.id for movie in wanted_owned}
-        pin_candidates = [
-            {
-                "movie": movie,
-                "because": because_by_id.get(movie.id, []),
-                "watchlisted": True,
-            }
-            for movie in wanted_owned
-            if not minutes or (movie.tmdb_runtime and movie.tmdb_runtime <= minutes)
-        ]
-        pinned = rotate_partition(
-            pin_candidates, WATCHLIST_PIN_LIMIT, date.today().toordinal()
-        )
-
-        for item in stored.get("items", []):
-            movie = movies.get(item["movie_id"])
-            if movie is None or item["movie_id"] in seen:
-                continue
-            if item["movie_id"] in watchlist_ids:
-                continue
-            if minutes and not (movie.tmdb_runtime and movie.tmdb_runtime <= minutes):
-                continue
-            recs.append(
-                {
-                    "movie": movie,
-                    "because": item.get("because", [])[:3],
-                    "watchlisted": False,
-                }
-            )
-
-        # A no-repeat daily partition through the deep stored ranking:
-        # twelve films a day, one per quality tier, cycling the whole
-        # set (400+ films, roughly monthly) before anything repeats.
-        # The day's cards then shuffle so neither the amber pins nor
-        # the quality tiers hold fixed positions (Glenn: slot one must
-        # not always be a pin or a top-tier film)
-
-        recs = shuffle_daily(
-            pinned + rotate_partition(recs, 12 - len(pinned), date.today().toordinal()),
-            f"mix:recs:{int(current_user.id)}:{date.today().isoformat()}",
-        )
-    elif has_history:
-        # Diary rows but nothing stored yet (first deploy, or a brand-new
-        # reviewer): compute once now instead of waiting for tonight; the
-        # marker keeps repeat page loads from re-enqueueing
-
-        if current_app.redis.set(
-            f"fitzflix:recs:requested:{int(current_user.id)}", "1", nx=True, ex=3600
-        ):
-            current_app.maintenance_queue.enqueue(
-                "app.recommendations.recompute_recommendations",
-                job_timeout="1h",
-                description="Computing film recommendations",
-            )
-
-    # The rewatch shelf: owned films the user liked whose last watch is
-    # long past — old favorites otherwise have no surface, since the
-    # engine's candidates exclude logged films. Watchlisted ones
-    # (re-added = declared rewatch intent) pin first under the same cap
-    # as the other rails; the rest rotates daily
-
-    again_items = []
-    again_ranked = watch_again_shelf(current_user.id)
-    if again_ranked:
-        again_movies = {
-            m.id: m
-            for m in Movie.query.filter(
-                Movie.id.in_([item["movie_id"] for item in again_ranked])
-            )
-        }
-        again_watchlisted = {
-            movie_id
-            for (movie_id,) in db.session.query(UserWatchlist.movie_id).filter(
-                UserWatchlist.user_id == int(current_user.id)
-            )
-        }
-        again_rows = []
-        for item in again_ranked:
-            again_movie = again_movies.get(item["movie_id"])
-            if again_movie is None:
-                continue
-            if minutes and not (
-                again_movie.tmdb_runtime and again_movie.tmdb_runtime <= minutes
-            ):
-                continue
-            again_rows.append(
-                {
-                    "movie": again_movie,
-                    "last_watched": item["last_watched"],
-                    "watchlisted": item["movie_id"] in again_watchlisted,
-                }
-            )
-        again_pinned = rotate_partition(
-            [row for row in again_rows if row["watchlisted"]],
-            WATCHLIST_PIN_LIMIT,
-            date.today().toordinal(),
-        )
-        again_rest = [row for row in again_rows if not row["watchlisted"]]
-        again_items = shuffle_daily(
-            again_pinned
-            + rotate_daily(
-                again_rest,
-                12 - len(again_pinned),
-                f"again:{int(current_user.id)}:{date.today().isoformat()}",
-            ),
-            f"mix:again:{int(current_user.id)}:{date.today().isoformat()}",
-        )
-
-    # The second rail: films streaming on this user's services, from the
-    # nightly discover-pool recompute. Films logged or acquired since
-    # the run drop out immediately; a user with a profile and provider
-    # picks but no stored rail gets a one-off compute enqueued
-
-    rail = []
-    rail_computed_at = None
-    rail_payload = stored_rail(current_app.redis, current_user.id)
-    if rail_payload:
-        rail_computed_at = rail_payload.get("computed_at")
-        rail_ids = [item["tmdb_id"] for item in rail_payload.get("items", [])]
-        dropped = set()
-        if rail_ids:
-            owned_now = db.session.query(Movie.tmdb_id).filter(
-                Movie.tmdb_id.in_(rail_ids),
-                Movie.files.any(File.feature_type_id.is_(None)),
-            )
-            logged_now = (
-                db.session.query(Movie.tmdb_id)
-                .join(UserMovieReview, UserMovieReview.movie_id == Movie.id)
-                .filter(Movie.tmdb_id.in_(rail_ids))
-                .filter(UserMovieReview.user_id == int(current_user.id))
-            )
-            refused_now = (
-                db.session.query(Movie.tmdb_id)
-                .join(UserMovieStatus, UserMovieStatus.movie_id == Movie.id)
-                .filter(Movie.tmdb_id.in_(rail_ids))
-                .filter(UserMovieStatus.user_id == int(current_user.id))
-                .filter(UserMovieStatus.kind == "not_interested")
-            )
-            dropped = (
-                {t for (t,) in owned_now}
-                | {t for (t,) in logged_now}
-                | {t for (t,) in refused_now}
-            )
-        # A watchlisted film on the rail is the best kind of match —
-        # wanted, and streaming on a service already paid for — so it
-        # pins ahead of the daily rotation, capped like the library
-        # rail so discovery keeps most of the slots
-
-        watchlisted_now = set()
-        if rail_ids:
-            watchlisted_now = {
-                tmdb_id
-                for (tmdb_id,) in db.session.query(Movie.tmdb_id)
-                .join(UserWatchlist, UserWatchlist.movie_id == Movie.id)
-                .filter(Movie.tmdb_id.in_(rail_ids))
-                .filter(UserWatchlist.user_id == int(current_user.id))
-            }
-        for item in rail_payload.get("items", []):
-            if item["tmdb_id"] in dropped:
-                continue
-            if minutes and not (item.get("runtime") and item["runtime"] <= minutes):
-                continue
-            item["watchlisted"] = item["tmdb_id"] in watchlisted_now
-            rail.append(item)
-        pinned = rotate_partition(
-            [item for item in rail if item["watchlisted"]],
-            WATCHLIST_PIN_LIMIT,
-            date.today().toordinal(),
-        )
-        rest = [item for item in rail if not item["watchlisted"]]
-        rail = shuffle_daily(
-            pinned
-            + rotate_daily(
-                rest,
-                12 - len(pinned),
-                f"rail:{int(current_user.id)}:{date.today().isoformat()}",
-            ),
-            f"mix:rail:{int(current_user.id)}:{date.today().isoformat()}",
-        )
-    elif user_provider_ids(current_user) and stored_profile(
-        current_app.redis, current_user.id
-    ):
-        if current_app.redis.set(
-            f"fitzflix:rail:requested:{int(current_user.id)}", "1", nx=True, ex=3600
-        ):
-            current_app.maintenance_queue.enqueue(
-                "app.streaming_rail.recompute_streaming_rail",
-                job_timeout="1h",
-                description="Computing the streaming rail",
-            )
-
-    # The departure shelf: what leaves the Criterion Channel at month's
-    # end, taste-ranked, for Criterion subscribers. The runtime filter
-    # applies like everywhere else
-
-    shelf = leaving_shelf(current_user)
-    shelf_items = []
-    shelf_departs = None
-    shelf_url = None
-    if shelf:
-        shelf_departs = shelf["departs"].strftime("%B %-d")
-        shelf_url = shelf["url"]
-        fitting = [
-            item
-            for item in shelf["items"]
-            if not minutes or (item.get("runtime") and item["runtime"] <= minutes)
-        ]
-
-        # Watchlist urgencies stay pinned; the rest rotates daily so a
-        # month-long departure set doesn't look frozen
-
-        pinned = [item for item in fitting if item.get("watchlisted")][:12]
-        rest = [item for item in fitting if not item.get("watchlisted")]
-        shelf_items = pinned + rotate_daily(
-            rest,
-            12 - len(pinned),
-            f"shelf:{int(current_user.id)}:{date.today().isoformat()}",
-        )
-
     return render_template(
         "index.html",
         title="Home",
-        recs=recs,
-        computed_at=computed_at,
-        has_history=has_history,
-        again=again_items,
-        rail=rail,
-        rail_computed_at=rail_computed_at,
-        shelf=shelf_items,
-        shelf_departs=shelf_departs,
-        shelf_url=shelf_url,
+        shelves=landing_shelves(current_user, minutes),
         now_playing=criterion_now_card(current_user),
         criterion_subscriber=is_criterion_subscriber(current_user),
         review_form=MovieReviewForm(),
@@ -883,7 +598,7 @@ def movie_states():
         }
 
     profile = stored_profile(current_app.redis, current_user.id)
-    scores = stored_scores(current_app.redis, current_user.id)
+    scores = stored_scores(current_app.redis, current_user.id, all_ids)
 
     # Estimate-eligible films the map doesn't cover — records created
     # since the last nightly recompute — score live through the shared
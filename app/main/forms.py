@@ -20,6 +20,7 @@ from wtforms.validators import (
     DataRequired,
     Email,
     EqualTo,
+    Length,
     Optional,
     ValidationError,
 )
@@ -380,6 +381,15 @@ class FailedJobForm(FlaskForm):
     forget_submit = SubmitField("Forget")
 
 
+class TaskProfilingForm(FlaskForm):
+    """System page: profile every run of a task type, or stop."""
+
+    task_name = StringField("Task", validators=[DataRequired(), Length(max=200)])
+    cpu = BooleanField("Sample CPU")
+    profile_submit = SubmitField("Profile")
+    stop_submit = SubmitField("Stop")
+
+
 class RejectActionForm(FlaskForm):
     """Rejects page: send a file back for import, or delete it."""
 
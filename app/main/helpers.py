@@ -25,12 +25,13 @@ from app.models import (
     UserMovieStatus,
     UserWatchlist,
 )
+from app.reference_data import reference_data
 from app.recommendations import (
     estimated_rating,
     resolved_score,
     stored_profile,
 )
-from app.videos import (
+from app.diary import (
     clear_watchlist,
     star_rating_fields,
 )
@@ -226,12 +227,7 @@ def admin_required(view):
 def _upgrade_threshold():
     """The quality preference below which a copy counts as upgradable."""
 
-    return (
-        db.session.query(RefQuality.preference)
-        .filter(RefQuality.quality_title == "Bluray-1080p")
-        .scalar()
-        or 0
-    )
+    return reference_data().preference("Bluray-1080p") or 0
 
 
 def library_upgradable(movie, criterion=False):
@@ -262,13 +258,12 @@ def library_upgradable(movie, criterion=False):
     file, quality = best
     threshold = _upgrade_threshold()
     if criterion:
-        criterion_pref = (
-            db.session.query(RefQuality.preference)
-            .filter(RefQuality.id == movie.criterion_quality_id)
-            .scalar()
+        criterion_quality = (
+            reference_data().quality(movie.criterion_quality_id)
             if movie.criterion_quality_id
             else None
         )
+        criterion_pref = criterion_quality.preference if criterion_quality else None
         target = min(criterion_pref or threshold, threshold)
         upgradable = bool(file.fullscreen) or quality.preference < target
         return not (bool(movie.criterion_disc_owned) and not upgradable)
@@ -2,6 +2,7 @@
 filmographies, the Criterion spine catalog, people, and the per-title
 movie/tv/season/file detail pages."""
 
+import base64
 import json
 import os
 import re
@@ -51,22 +52,20 @@ from app.main.forms import (
     WatchlistForm,
 )
 from app.models import (
-    CatalogExclusion,
     File,
     FileAudioTrack,
     FileSubtitleTrack,
     Movie,
-    MovieAward,
     MovieCast,
     MovieCrew,
     RefFeatureType,
     RefQuality,
     TMDBCredit,
     PEOPLE_RANKING_KEY,
-    TMDBGenre,
     TVCast,
     TVCrew,
     TVEpisode,
+    TVSeasonSummary,
     TVSeries,
     UserMovieReview,
     UserMovieStatus,
@@ -91,6 +90,8 @@ from app.main.helpers import (
     library_upgradable,
     _watched_timestamp,
 )
+from app.movie_detail import movie_detail
+from app.reference_data import reference_data
 from app.recommendations import (
     CREW_ROLE_JOBS,
     coarse_interest_score,
@@ -120,15 +121,14 @@ from app.radarr_push import (
 from app.triage import (
     forced_subtitle_candidates,
 )
-from app.videos import (
+from app.criterion_catalog import criterion_index_page, invalidate_criterion_index
+from app.aws_storage import untouched_key_still_claimed
+from app.diary import (
     clear_not_interested,
     clear_watchlist,
-    criterion_release_lookups,
-    get_criterion_collection_from_wikidata,
     star_rating_fields,
-    track_metadata_scan,
-    untouched_key_still_claimed,
 )
+from app.tracks import track_metadata_scan
 
 # The crew jobs that count as key roles for search and filmographies —
 # the same roles the taste engine scores, labeled as nouns (Glenn's
@@ -682,10 +682,10 @@ def movie_library():
         # filtered to films carrying the TMDb genre, composable with
         # the quality dropdown
 
-        genre_row = db.session.get(TMDBGenre, int(genre))
-        if genre_row is None:
+        genre_name = reference_data().genres.get(int(genre))
+        if genre_name is None:
             abort(404)
-        title = f"{genre_row.name} Movies"
+        title = f"{genre_name} Movies"
         movies = (
             db.session.query(File, Movie, RefQuality)
             .join(Movie, (Movie.id == File.movie_id))
@@ -878,185 +878,32 @@ def criterion_collection():
         filter_status = "all"
     page = max(request.args.get("page", 1, type=int) or 1, 1)
 
-    # The whole spine catalog from the weekly Wikidata cache; the page
-    # degrades to library-only rows if the cache is cold and Wikidata
-    # is unreachable
+    # The spine-ordered rows come precomputed (Oct 2026): the full and
+    # nightly refreshes materialize the merged catalog per filter, so
+    # the view reads just this page's rows and the filter counts. The
+    # index rebuilds inline if it's cold or the library's files moved
 
-    try:
-        releases = get_criterion_collection_from_wikidata()
-    except Exception:
-        current_app.logger.warning(traceback.format_exc())
-        releases = []
-    by_tmdb_id, by_title_year = criterion_release_lookups(releases)
-    release_tmdb_ids = [
-        release["tmdb_id"] for release in releases if release.get("tmdb_id")
-    ]
-
-    # Library rows: best main-feature file per film, for films marked
-    # with Criterion metadata OR matching a release by TMDb id (a film
-    # whose record predates its release never got marked, but the
-    # catalog knows its spine)
-
-    ranked_files = (
-        db.session.query(
-            File.id,
-            movie_file_rank(),
-        )
-        .join(Movie, (Movie.id == File.movie_id))
-        .join(RefQuality, (RefQuality.id == File.quality_id))
-        .subquery()
+    rows, counts, page = criterion_index_page(
+        filter_status, page, CRITERION_CATALOG_PER_PAGE
     )
-
-    results = (
-        db.session.query(File, Movie, RefQuality)
-        .join(Movie, (Movie.id == File.movie_id))
-        .join(RefQuality, (RefQuality.id == File.quality_id))
-        .join(ranked_files, (ranked_files.c.id == File.id))
-        .filter(File.feature_type_id == None)
-        .filter(ranked_files.c.rank == 1)
-        .filter(File.edition == None)
-        .filter(
-            db.or_(
-                Movie.criterion_spine_number != None,
-                Movie.criterion_set_title != None,
-                Movie.tmdb_id.in_(release_tmdb_ids or [0]),
-            )
-        )
-        .all()
+    last_page = max(
+        (counts[filter_status] + CRITERION_CATALOG_PER_PAGE - 1)
+        // CRITERION_CATALOG_PER_PAGE,
+        1,
     )
 
-    # A library row is SETTLED — the Fitzflix library badge, nothing to
-    # do — when the Criterion disc is owned AND the local file matches
-    # the release's own format, with the bar CAPPED at the app-wide
-    # threshold (Glenn: an owned disc with a Bluray-1080p file is
-    # settled here even if Criterion re-released it in 2160p — chasing
-    # that upgrade is the shopping list's job, not this page's). The
-    # threshold also covers releases whose quality was never recorded.
-    # Anything else shows its amber quality tier: go find the Criterion
-    # version
-
-    movie_ids = [movie.id for _, movie, _ in results]
-    CriterionQuality = db.aliased(RefQuality)
-    criterion_prefs = dict(
-        db.session.query(Movie.id, CriterionQuality.preference)
-        .join(CriterionQuality, CriterionQuality.id == Movie.criterion_quality_id)
-        .filter(Movie.id.in_(movie_ids or [0]))
-    )
-    threshold = _upgrade_threshold()
-
-    # Each library film consumes its catalog release (TMDb id first,
-    # title+year fallback — the import's own matching order), so the
-    # remainder renders as beyond-the-library rows. A film with both a
-    # standalone release and a set membership consumes both through its
-    # shared TMDb id
-
-    consumed_tmdb = set()
-    consumed_title_year = set()
-    library_rows = []
-    for file, movie, quality in results:
-        release = by_tmdb_id.get(movie.tmdb_id) if movie.tmdb_id else None
-        if release is None and movie.title and movie.year:
-            release = by_title_year.get((movie.title.upper(), movie.year))
-        if movie.tmdb_id:
-            consumed_tmdb.add(movie.tmdb_id)
-        if release:
-            if release.get("tmdb_id"):
-                consumed_tmdb.add(release["tmdb_id"])
-            if release.get("title") and release.get("year"):
-                consumed_title_year.add((release["title"], release["year"]))
-        target = min(criterion_prefs.get(movie.id) or threshold, threshold)
-        upgradable = bool(file.fullscreen) or quality.preference < target
-        library_rows.append(
-            {
-                "kind": "library",
-                "file": file,
-                "movie": movie,
-                "quality": quality,
-                "settled": bool(movie.criterion_disc_owned) and not upgradable,
-                "tmdb_id": movie.tmdb_id,
-                "title": movie.tmdb_title or movie.title,
-                "year": (
-                    movie.tmdb_release_date.year
-                    if movie.tmdb_title and movie.tmdb_release_date
-                    else movie.year
-                ),
-                "spine": movie.criterion_spine_number
-                or (release or {}).get("spine_number"),
-                "set_title": movie.criterion_set_title
-                or (release or {}).get("set_title"),
-            }
-        )
-
-    # The rest of the catalog. Standalone entries precede set entries
-    # in the cache, so a film with both keeps its own spine; releases
-    # without a TMDb id render as plain spine rows. Box-set CONTAINER
-    # items are redundant: Wikidata gives the set item the spine (and
-    # no TMDb id — TMDb has no set entries) while its member films
-    # arrive separately wearing the set title, so a TMDb-less row whose
-    # spine belongs to a set would just shadow its own members ("#88
-    # Ivan the Terrible" between the actual Parts I–III)
-
-    set_spines = {
-        release["spine_number"] for release in releases if release.get("set_title")
-    }
-    excluded_tmdb = {
-        tmdb_id for (tmdb_id,) in db.session.query(CatalogExclusion.tmdb_id)
-    }
-    catalog_rows = []
-    catalog_keys = set()
-    for release in releases:
-        tmdb_id = release.get("tmdb_id")
-        if (
-            not tmdb_id
-            and not release.get("set_title")
-            and release.get("spine_number") in set_spines
-        ):
-            continue
-        # Hand-excluded ids (Wikidata junk — see CatalogExclusion)
-        # neither render nor get records created
-        if tmdb_id and tmdb_id in excluded_tmdb:
-            continue
-        if tmdb_id and tmdb_id in consumed_tmdb:
-            continue
-        title_year = (release.get("title"), release.get("year"))
-        if title_year in consumed_title_year:
-            continue
-        key = tmdb_id or title_year
-        if key in catalog_keys:
-            continue
-        catalog_keys.add(key)
-        catalog_rows.append(
-            {
-                "kind": "tmdb" if tmdb_id else "plain",
-                "movie": None,
-                "tmdb_id": tmdb_id,
-                "title": release.get("label") or release.get("title"),
-                "year": release.get("year"),
-                "spine": release.get("spine_number"),
-                "set_title": release.get("set_title"),
-            }
-        )
-
-    # File-less local records (logged or watchlisted unowned films)
-    # dress their catalog rows with the stored title, poster, and
-    # overview — and carry the funnel badges
+    # Hydrate only this page's records: library films and the file-
+    # less local records (logged or watchlisted unowned films) that
+    # dress catalog rows with their poster and funnel badges
 
+    page_ids = [row["movie_id"] for row in rows if row["movie_id"]]
     records = {}
-    catalog_tmdb_ids = [row["tmdb_id"] for row in catalog_rows if row["tmdb_id"]]
-    if catalog_tmdb_ids:
+    if page_ids:
         records = {
-            record.tmdb_id: record
-            for record in Movie.query.filter(Movie.tmdb_id.in_(catalog_tmdb_ids))
+            movie.id: movie for movie in Movie.query.filter(Movie.id.in_(page_ids))
         }
-    for row in catalog_rows:
-        record = records.get(row["tmdb_id"]) if row["tmdb_id"] else None
-        if record is None:
-            continue
-        row["movie"] = record
-        if record.tmdb_title:
-            row["title"] = record.tmdb_title
-            if record.tmdb_release_date:
-                row["year"] = record.tmdb_release_date.year
+    for row in rows:
+        row["movie"] = records.get(row["movie_id"]) if row["movie_id"] else None
 
     # The personal funnel, per-user like everywhere else: seen films
     # never badge might-interest. Owned films badge on stored-ranking
@@ -1064,18 +911,17 @@ def criterion_collection():
     # the coarse scorer against the profile-relative bar (rows without
     # a record have no genres to score — they stay unmarked)
 
-    funnel_ids = movie_ids + [record.id for record in records.values()]
     seen_ids = {
         movie_id
         for (movie_id,) in db.session.query(UserMovieReview.movie_id)
         .filter(UserMovieReview.user_id == int(current_user.id))
-        .filter(UserMovieReview.movie_id.in_(funnel_ids or [0]))
+        .filter(UserMovieReview.movie_id.in_(page_ids or [0]))
     }
     watchlisted_ids = {
         movie_id
         for (movie_id,) in db.session.query(UserWatchlist.movie_id)
         .filter(UserWatchlist.user_id == int(current_user.id))
-        .filter(UserWatchlist.movie_id.in_(funnel_ids or [0]))
+        .filter(UserWatchlist.movie_id.in_(page_ids or [0]))
     }
     rec_ids = recommended_movie_ids(current_app.redis, current_user.id)
     refused_ids = not_interested_movie_ids(current_user.id)
@@ -1083,82 +929,33 @@ def criterion_collection():
     bar = marker_bar(profile) if profile else None
 
     # The catalog scorer reads every record's genres: one query for the
-    # lot, not a lazy load per film (956 queries a visit before Aug 2026)
+    # page, not a lazy load per film (956 queries a visit before Aug 2026)
 
+    scored_ids = [
+        row["movie_id"] for row in rows if row["kind"] != "library" and row["movie"]
+    ]
     genre_ids_by_movie = {}
-    if profile is not None and records:
+    if profile is not None and scored_ids:
         for movie_id, genre_id in db.session.query(
             movie_genres.c.movie_id, movie_genres.c.genre_id
-        ).filter(
-            movie_genres.c.movie_id.in_([record.id for record in records.values()])
-        ):
+        ).filter(movie_genres.c.movie_id.in_(scored_ids)):
             genre_ids_by_movie.setdefault(movie_id, []).append(genre_id)
 
-    for row in library_rows:
-        movie_id = row["movie"].id
-        row["seen"] = movie_id in seen_ids
-        row["watchlisted"] = movie_id in watchlisted_ids
-        row["might_interest"] = (
-            movie_id in rec_ids
-            and movie_id not in seen_ids
-            and movie_id not in refused_ids
-        )
-    for row in catalog_rows:
+    for row in rows:
         record = row["movie"]
         row["seen"] = record is not None and record.id in seen_ids
         row["watchlisted"] = record is not None and record.id in watchlisted_ids
         row["might_interest"] = False
-        if record is not None and record.id in refused_ids:
+        if record is None or record.id in refused_ids or row["seen"]:
             continue
-        if record is not None and profile is not None and not row["seen"]:
+        if row["kind"] == "library":
+            row["might_interest"] = record.id in rec_ids
+        elif profile is not None:
             genre_ids = genre_ids_by_movie.get(record.id, [])
             if genre_ids:
                 score = coarse_interest_score(profile, genre_ids, row["year"])
                 row["might_interest"] = score > bar
 
-    # One spine order across owned and unowned: set members sort at
-    # their set's spine (year, then title within), spine-less local
-    # rows keep their old place at the end
-
-    def sort_key(row):
-        """Spine order, set members at their set's number."""
-
-        spine = row.get("spine")
-        title = re.sub(
-            r"^(The|A|An)\s+", "", row.get("title") or "", flags=re.IGNORECASE
-        )
-        return (
-            0 if spine is not None else 1,
-            spine if spine is not None else 0,
-            row.get("set_title") or "",
-            row.get("year") or 9999,
-            title.upper(),
-        )
-
-    merged = sorted(library_rows + catalog_rows, key=sort_key)
-
-    counts = {
-        "all": len(merged),
-        "library": len(library_rows),
-        "settled": sum(1 for row in library_rows if row["settled"]),
-    }
-    if filter_status == "library":
-        filtered = [row for row in merged if row["kind"] == "library"]
-    elif filter_status == "settled":
-        filtered = [
-            row for row in merged if row["kind"] == "library" and row["settled"]
-        ]
-    else:
-        filtered = merged
-
-    last_page = max(
-        (len(filtered) + CRITERION_CATALOG_PER_PAGE - 1) // CRITERION_CATALOG_PER_PAGE,
-        1,
-    )
-    page = min(page, last_page)
-    start = (page - 1) * CRITERION_CATALOG_PER_PAGE
-    rows = filtered[start : start + CRITERION_CATALOG_PER_PAGE]
-
     # The Criterion Channel badge (provider 258), for the rows on this
     # page only: availability comes from the cache the nightly refresh
     # keeps full, never fetched inline (Aug 2026 — a page of misses
@@ -1223,52 +1020,14 @@ def movie(movie_id):
 
     movie = Movie.query.filter_by(id=movie_id).first_or_404()
     title = f"{movie.tmdb_title if movie.tmdb_title else movie.title} ({movie.tmdb_release_date.strftime('%Y') if movie.tmdb_title else movie.year})"
-    # Every credited actor in billing order for the cast scroller
 
-    cast = [
-        {
-            "id": role.starring.id,
-            "name": role.starring.name,
-            "profile_path": role.starring.tmdb_profile_path,
-            "character": role.character,
-        }
-        for role in MovieCast.query.filter(MovieCast.movie_id == movie_id)
-        .order_by(MovieCast.billing_order.asc())
-        .all()
-    ]
-    # (credit id, name) pairs so the directed-by line links to
-    # filmography pages, like the rating drive's featured card
-    directors = list(
-        db.session.query(TMDBCredit.id, TMDBCredit.name)
-        .join(MovieCrew, MovieCrew.credit_id == TMDBCredit.id)
-        .filter(MovieCrew.movie_id == movie.id)
-        .filter(MovieCrew.job == "Director")
-        .distinct()
-    )
-    genres = [(genre.id, genre.name) for genre in movie.genres]
-    awards = (
-        MovieAward.query.filter_by(movie_id=movie.id)
-        .order_by(
-            MovieAward.win.desc(), MovieAward.year.asc(), MovieAward.award_name.asc()
-        )
-        .all()
-    )
+    # The household-wide part of the page — cast, directors, genres,
+    # certifications, awards, and files — comes from the cached view
+    # model; only the viewer's own state is read per visit
+
+    detail = movie_detail(movie.id)
+    films = detail["films"]
     review = _latest_review_row(current_user.id, movie.id)
-    films = (
-        File.query.join(RefQuality, (RefQuality.id == File.quality_id))
-        .filter(File.movie_id == movie_id)
-        .filter(File.feature_type_id == None)
-        .order_by(
-            File.fullscreen.asc(), File.edition.asc(), RefQuality.preference.desc()
-        )
-        .all()
-    )
-    features = (
-        File.query.filter(File.movie_id == movie_id)
-        .filter(File.feature_type_id != None)
-        .order_by(File.basename.asc())
-        .all()
-    )
 
     movie_shopping_exclude_form = MovieShoppingExcludeForm()
     if (
@@ -1635,24 +1394,18 @@ def movie(movie_id):
 
     # Form to manually update a movie's Criterion Collection information
     criterion_form = CriterionForm()
-    qualities = (
-        db.session.query(RefQuality.id, RefQuality.quality_title)
-        .filter(
-            db.or_(
-                RefQuality.id == 1,
-                db.and_(
-                    RefQuality.physical_media == 1,
-                    db.or_(
-                        RefQuality.quality_title == "DVD",
-                        RefQuality.quality_title.like("%1080p"),
-                        RefQuality.quality_title.like("%2160p"),
-                    ),
-                ),
+    qualities = [
+        (quality.id, quality.quality_title)
+        for quality in reference_data().qualities
+        if quality.id == 1
+        or (
+            quality.physical_media
+            and (
+                quality.quality_title == "DVD"
+                or quality.quality_title.endswith(("1080p", "2160p"))
             )
         )
-        .order_by(RefQuality.preference.asc())
-        .all()
-    )
+    ]
     criterion_form.quality.choices = [(str(id), title) for (id, title) in qualities]
     criterion_form.quality.default = movie.criterion_quality_id
     if criterion_form.criterion_submit.data and criterion_form.validate_on_submit():
@@ -1668,6 +1421,7 @@ def movie(movie_id):
         movie.criterion_quality_id = criterion_form.quality.data
 
         db.session.commit()
+        invalidate_criterion_index()
         flash(f"Updated Criterion Collection details for '{title}'")
         return redirect(url_for("main.movie", movie_id=movie.id))
     criterion_form.process()
@@ -1743,7 +1497,7 @@ def movie(movie_id):
                 movie.tmdb_release_date.year if movie.tmdb_release_date else movie.year
             )
             coarse = coarse_interest_score(
-                profile, [genre.id for genre in movie.genres], year
+                profile, [genre_id for genre_id, _ in detail["genres"]], year
             )
             might_interest = coarse > marker_bar(profile)
 
@@ -1762,16 +1516,17 @@ def movie(movie_id):
         "movie.html",
         title=title,
         movie=movie,
-        cast=cast,
-        directors=directors,
-        genres=genres,
-        awards=awards,
+        cast=detail["cast"],
+        directors=detail["directors"],
+        genres=detail["genres"],
+        certifications=detail["certifications"],
+        awards=detail["awards"],
         review=review,
         films=films,
         radarr_form=RadarrForm(),
         radarr_available=radarr_configured(),
         in_radarr=in_radarr,
-        features=features,
+        features=detail["features"],
         movie_shopping_exclude_form=movie_shopping_exclude_form,
         movie_review_form=movie_review_form,
         transcode_form=transcode_form,
@@ -1924,101 +1679,159 @@ def movie_files(movie_id):
     return render_template("movie_files.html", title=title, movie=movie, files=files)
 
 
-@bp.route("/library/tv")
-@login_required
-def tv_library():
-    """Show the worst quality in each season for each TV show in the library."""
+# Series per page of the TV library; the gallery fetches the rest from
+# tv_library_json as the reader scrolls
 
-    # Subquery to get the number of episodes we have for in each season,
-    # and the worst quality for each season
+TV_LIBRARY_PAGE_SIZE = 40
 
-    ranked_files = (
-        db.session.query(
-            File.id,
-            tv_file_rank(),
-        )
-        .join(TVSeries, (TVSeries.id == File.series_id))
-        .join(RefQuality, (RefQuality.id == File.quality_id))
-        .subquery()
-    )
 
-    subquery = (
-        db.session.query(
-            File.series_id,
-            File.season,
-            db.func.count(db.func.distinct(File.episode)).label("episodes"),
-            db.func.min(RefQuality.preference).label("preference"),
-        )
-        .group_by(File.series_id, File.season)
-        .join(RefQuality, (RefQuality.id == File.quality_id))
-        .join(ranked_files, (ranked_files.c.id == File.id))
-        .filter(ranked_files.c.rank == 1)
-        .subquery()
-    )
+def _tv_library_cursor(series):
+    """An opaque resume point after this series in sort order."""
 
-    upgrade_threshold = _upgrade_threshold()
+    return base64.urlsafe_b64encode(
+        json.dumps([series.sort_title, series.id]).encode()
+    ).decode()
 
-    # Run the season aggregate once for the whole library and bucket the rows
-    # by series, rather than re-running the ranked subquery once per series
 
-    season_rows = (
-        db.session.query(
-            subquery.c.series_id,
-            subquery.c.season,
-            subquery.c.episodes,
-            RefQuality.preference,
-            RefQuality.physical_media,
-            RefQuality.quality_title,
-        )
-        .join(RefQuality, (RefQuality.preference == subquery.c.preference))
-        .order_by(
-            subquery.c.series_id,
-            db.case((subquery.c.season == 0, 1), else_=0).asc(),
-            subquery.c.season.asc(),
-        )
+def tv_library_page(after=None, limit=TV_LIBRARY_PAGE_SIZE):
+    """One page of the TV library — the series with files, in sort
+    order, each with its season summaries — and the cursor for the next
+    page (None on the last).
+
+    Keyset pagination on (sort_title, id): both come from an index, and
+    the season rows are the precomputed TVSeasonSummary, so a page costs
+    the same however large the library grows. A cursor that doesn't
+    decode starts from the top.
+    """
+
+    series_query = TVSeries.query.filter(
+        db.exists().where(TVSeasonSummary.series_id == TVSeries.id)
+    )
+    if after:
+        try:
+            sort_key, series_id = json.loads(base64.urlsafe_b64decode(after))
+            series_id = int(series_id)
+        except (ValueError, TypeError):
+            pass
+        else:
+            series_query = series_query.filter(
+                db.or_(
+                    TVSeries.sort_title > sort_key,
+                    db.and_(TVSeries.sort_title == sort_key, TVSeries.id > series_id),
+                )
+            )
+    page = (
+        series_query.order_by(TVSeries.sort_title.asc(), TVSeries.id.asc())
+        .limit(limit + 1)
         .all()
     )
+    next_cursor = _tv_library_cursor(page[limit - 1]) if len(page) > limit else None
+    page = page[:limit]
 
+    reference = reference_data()
+    upgrade_threshold = _upgrade_threshold()
     seasons_by_series = {}
-    for (
-        series_id,
-        season,
-        num_episodes,
-        preference,
-        physical,
-        min_quality,
-    ) in season_rows:
-        seasons_by_series.setdefault(series_id, []).append(
+    for summary in (
+        TVSeasonSummary.query.filter(
+            TVSeasonSummary.series_id.in_([series.id for series in page])
+        )
+        .order_by(
+            TVSeasonSummary.series_id,
+            db.case((TVSeasonSummary.season == 0, 1), else_=0).asc(),
+            TVSeasonSummary.season.asc(),
+        )
+        .all()
+        if page
+        else []
+    ):
+        quality = reference.quality(summary.quality_id)
+        seasons_by_series.setdefault(summary.series_id, []).append(
             {
-                "season": season,
-                "episode_count": num_episodes,
-                "min_quality": min_quality,
+                "season": summary.season,
+                "episode_count": summary.episode_count,
+                "min_quality": quality.quality_title if quality else None,
                 # Physical-media seasons (DVD, SD/720p Blu-ray) are often the
                 # only release that will ever exist, so they don't count as
                 # upgradable
-                "upgradable": not physical and preference < upgrade_threshold,
+                "upgradable": bool(quality)
+                and not quality.physical_media
+                and quality.preference < upgrade_threshold,
             }
         )
 
-    tv = []
-    for series in (
-        TVSeries.query.join(File, (File.series_id == TVSeries.id))
-        .distinct()
-        .order_by(db.func.regexp_replace(TVSeries.title, "^(The|A|An) ", "").asc())
-        .all()
-    ):
-        tv.append(
-            {
-                "id": series.id,
-                "title": series.title,
-                "tmdb_id": series.tmdb_id,
-                "tmdb_name": series.tmdb_name,
-                "tmdb_poster_path": series.tmdb_poster_path,
-                "seasons": seasons_by_series.get(series.id, []),
-            }
-        )
+    tv = [
+        {
+            "id": series.id,
+            "title": series.title,
+            "tmdb_id": series.tmdb_id,
+            "tmdb_name": series.tmdb_name,
+            "tmdb_poster_path": series.tmdb_poster_path,
+            "seasons": seasons_by_series.get(series.id, []),
+        }
+        for series in page
+    ]
+    return tv, next_cursor
+
+
+@bp.route("/library/tv")
+@login_required
+def tv_library():
+    """Show the worst quality in each season for each TV show in the library.
+
+    ?series= (the series page's breadcrumb) extends the first page
+    through that series, so its #anchor lands without waiting for the
+    gallery to scroll there.
+    """
 
-    return render_template("library_tv.html", title="TV Library", series=tv)
+    limit = TV_LIBRARY_PAGE_SIZE
+    target = db.session.get(TVSeries, request.args.get("series", 0, type=int))
+    if target is not None and target.sort_title is not None:
+        position = TVSeries.query.filter(
+            db.exists().where(TVSeasonSummary.series_id == TVSeries.id),
+            db.or_(
+                TVSeries.sort_title < target.sort_title,
+                db.and_(
+                    TVSeries.sort_title == target.sort_title,
+                    TVSeries.id <= target.id,
+                ),
+            ),
+        ).count()
+        limit = max(limit, position + TV_LIBRARY_PAGE_SIZE // 2)
+
+    tv, next_cursor = tv_library_page(limit=limit)
+    return render_template(
+        "library_tv.html",
+        title="TV Library",
+        series=tv,
+        next_url=(
+            url_for("main.tv_library_json", after=next_cursor) if next_cursor else None
+        ),
+    )
+
+
+@bp.route("/library/tv.json")
+@login_required
+def tv_library_json():
+    """The TV library's next page for the gallery's incremental loading:
+    the series as data, the same entries rendered as the page renders
+    them, and the URL of the page after (null at the end)."""
+
+    limit = min(
+        max(request.args.get("limit", TV_LIBRARY_PAGE_SIZE, type=int), 1),
+        TV_LIBRARY_PAGE_SIZE * 5,
+    )
+    tv, next_cursor = tv_library_page(request.args.get("after"), limit)
+    return jsonify(
+        {
+            "series": tv,
+            "html": render_template("_tv_library_series.html", series=tv),
+            "next": (
+                url_for("main.tv_library_json", after=next_cursor, limit=limit)
+                if next_cursor
+                else None
+            ),
+        }
+    )
 
 
 def restore_cost_estimate(files, bulk=False):
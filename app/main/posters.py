@@ -10,13 +10,13 @@ import shutil
 import traceback
 
 
-from PIL import Image
-
 from flask import (
+    abort,
     current_app,
     render_template,
     flash,
     redirect,
+    send_file,
     url_for,
     request,
 )
@@ -29,6 +29,12 @@ from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
 
 from app import db
+from app.artwork import (
+    ARTWORK_SIZES,
+    CACHE_SECONDS,
+    NAME_PATTERN,
+    artwork_file,
+)
 from app.main.forms import (
     CustomPosterRemoveForm,
     CustomPosterUploadForm,
@@ -40,6 +46,7 @@ from app.models import (
     tmdb_get,
 )
 from app.main import bp
+from app.poster_derivatives import build_poster_derivatives
 
 
 def save_custom_poster(uploaded_data, poster_filename, custom_poster_dir):
@@ -49,42 +56,12 @@ def save_custom_poster(uploaded_data, poster_filename, custom_poster_dir):
     flash-ready message when the upload isn't a usable poster image.
     """
 
-    try:
-        Image.open(uploaded_data).verify()
-    except Exception:
-        raise ValueError(f"'{uploaded_data.filename}' is corrupted!")
-
-    with Image.open(uploaded_data) as poster:
-        current_app.logger.info(f"Uploaded poster format: {poster.format}")
-        if poster.format not in ["JPEG", "PNG"]:
-            raise ValueError(f"'{poster.format}' is not an appropriate file type!")
-
-        os.makedirs(os.path.join(custom_poster_dir, "original"), exist_ok=True)
-        original_file = os.path.join(custom_poster_dir, "original", poster_filename)
-        poster.save(original_file)
-
-        original_width, original_height = poster.size
-
-        for width in ["92", "154", "185", "342", "500", "780"]:
-            current_app.logger.info(f"'{original_file}' Creating w{width} thumbnail")
-
-            percent = int(width) / float(original_width)
-            height = int(original_height * float(percent))
-            size = (int(width), int(height))
-
-            subdir_path = os.path.join(custom_poster_dir, f"w{width}")
-            os.makedirs(subdir_path, exist_ok=True)
-
-            poster_thumbnail = poster.copy()
-            poster_thumbnail.thumbnail(size)
-            if poster.format == "JPEG":
-                poster_thumbnail.save(
-                    os.path.join(subdir_path, poster_filename), quality=95
-                )
-            else:
-                poster_thumbnail.save(os.path.join(subdir_path, poster_filename))
-
-    return original_file
+    return build_poster_derivatives(
+        uploaded_data.read(),
+        poster_filename,
+        custom_poster_dir,
+        source_name=uploaded_data.filename,
+    )
 
 
 def replace_library_poster(library_directory, original_file, poster_filename):
@@ -532,3 +509,27 @@ def file_poster(file_id):
         default_poster_path=movie.tmdb_poster_path if movie else None,
         upload_enabled=file_exists_locally,
     )
+
+
+@bp.route("/artwork/<size>/<name>")
+@login_required
+def artwork(size, name):
+    """A TMDb image from the local artwork cache, in the best format the
+    browser accepts. The URL names content that never changes, so the
+    response is cacheable forever; a fetch TMDb can't answer falls
+    back to the CDN rather than a broken image."""
+
+    if size not in ARTWORK_SIZES or not NAME_PATTERN.fullmatch(name):
+        abort(404)
+    try:
+        path, mimetype, etag = artwork_file(size, name, request.accept_mimetypes)
+    except Exception:
+        current_app.logger.warning(traceback.format_exc())
+        return redirect(f"{current_app.config['TMDB_IMAGE_URL']}/{size}/{name}")
+
+    response = send_file(path, mimetype=mimetype, etag=etag, conditional=True)
+    response.cache_control.public = True
+    response.cache_control.max_age = CACHE_SECONDS
+    response.cache_control.immutable = True
+    response.vary.add("Accept")
+    return response
@@ -32,6 +32,7 @@ from app.models import (
 from app.main import bp
 from app.main.helpers import _upgrade_threshold
 from app.main.library import _credited_film_pairs, _dominant_roles
+from app.search_index import search_library
 from app.recommendations import (
     coarse_interest_score,
     marker_bar,
@@ -46,51 +47,18 @@ from app.streaming import (
 )
 
 
-def _movie_search_results(wildcard, limit=50):
-    """Movies whose titles match, each with its best owned copy.
+def _movie_search_results(movie_ids):
+    """The index's ranked movies, each with its best owned copy.
 
-    Only films with a local main-feature file appear: review-only
+    Only films with a local main-feature file are indexed: review-only
     records (a diary entry for an unowned film) belong to the TMDb
     search, not the library search."""
 
     upgrade_threshold = _upgrade_threshold()
 
-    # Match quality outranks the alphabet: exact titles first, then
-    # prefixes, then substrings — otherwise a short query like "Up"
-    # fills the result cap with alphabetically-earlier titles that
-    # merely CONTAIN it, and the film actually named Up never shows
-
-    match_rank = db.case(
-        (
-            db.or_(
-                Movie.title.ilike(wildcard),
-                Movie.tmdb_title.ilike(wildcard),
-            ),
-            0,
-        ),
-        (
-            db.or_(
-                Movie.title.ilike(f"{wildcard}%"),
-                Movie.tmdb_title.ilike(f"{wildcard}%"),
-            ),
-            1,
-        ),
-        else_=2,
-    )
-
     results = []
-    movies = (
-        Movie.query.filter(
-            db.or_(
-                Movie.title.ilike(f"%{wildcard}%"),
-                Movie.tmdb_title.ilike(f"%{wildcard}%"),
-            )
-        )
-        .filter(Movie.files.any(File.feature_type_id.is_(None)))
-        .order_by(match_rank, Movie.title.asc(), Movie.year.asc())
-        .limit(limit)
-        .all()
-    )
+    by_id = {movie.id: movie for movie in Movie.query.filter(Movie.id.in_(movie_ids))}
+    movies = [by_id[movie_id] for movie_id in movie_ids if movie_id in by_id]
     for movie in movies:
         best = (
             movie.files.filter(File.feature_type_id == None)
@@ -114,21 +82,21 @@ def _movie_search_results(wildcard, limit=50):
     return results
 
 
-def _episode_search_results(wildcard, limit=12):
-    """Episodes whose TMDb titles match, each linking into its season
-    page. Numbering-suspect series are excluded — a matched title on a
-    misnumbered series would send the user to the wrong slot."""
+def _episode_search_results(episode_ids, limit=12):
+    """The index's ranked episodes, each linking into its season page.
+    Numbering-suspect series are excluded — a matched title on a
+    misnumbered series would send the user to the wrong slot, which is
+    why the index is asked for a few times the limit."""
 
     from app.tv_validation import series_is_suspect
 
-    rows = (
-        db.session.query(TVEpisode, TVSeries)
+    by_id = {
+        episode.id: (episode, series)
+        for episode, series in db.session.query(TVEpisode, TVSeries)
         .join(TVSeries, TVSeries.id == TVEpisode.series_id)
-        .filter(TVEpisode.title.ilike(f"%{wildcard}%"))
-        .order_by(TVSeries.title.asc(), TVEpisode.season.asc(), TVEpisode.episode.asc())
-        .limit(limit * 3)
-        .all()
-    )
+        .filter(TVEpisode.id.in_(episode_ids))
+    }
+    rows = [by_id[episode_id] for episode_id in episode_ids if episode_id in by_id]
     results = []
     verdicts = {}
     for episode, series in rows:
@@ -142,51 +110,24 @@ def _episode_search_results(wildcard, limit=12):
     return results
 
 
-def _tv_search_results(wildcard, limit=50):
-    """TV series whose titles match, each season summarized by the worst
-    quality among its best (rank-1) episode files.
+def _tv_search_results(series_ids):
+    """The index's ranked TV series, each season summarized by the
+    worst quality among its best (rank-1) episode files.
 
     TV shows are usually bought season by season, so a series-wide "best
     quality" would hide the seasons that need upgrading: what matters in a
     store is each season's weakest link.
     """
 
-    # Exact, then prefix, then substring — same ranking as the movie
-    # search, for the same buried-exact-match reason
-
-    match_rank = db.case(
-        (
-            db.or_(
-                TVSeries.title.ilike(wildcard),
-                TVSeries.tmdb_name.ilike(wildcard),
-            ),
-            0,
-        ),
-        (
-            db.or_(
-                TVSeries.title.ilike(f"{wildcard}%"),
-                TVSeries.tmdb_name.ilike(f"{wildcard}%"),
-            ),
-            1,
-        ),
-        else_=2,
-    )
-    series_list = (
-        TVSeries.query.filter(
-            db.or_(
-                TVSeries.title.ilike(f"%{wildcard}%"),
-                TVSeries.tmdb_name.ilike(f"%{wildcard}%"),
-            )
-        )
-        .order_by(match_rank, TVSeries.title.asc())
-        .limit(limit)
-        .all()
-    )
+    by_id = {
+        series.id: series
+        for series in TVSeries.query.filter(TVSeries.id.in_(series_ids))
+    }
+    series_list = [by_id[series_id] for series_id in series_ids if series_id in by_id]
     if not series_list:
         return []
 
     upgrade_threshold = _upgrade_threshold()
-    series_ids = [series.id for series in series_list]
 
     # Same shape as the TV library page: rank each episode's copies, keep
     # the best copy per episode, then take each season's worst best-copy
@@ -259,40 +200,32 @@ def _tv_search_results(wildcard, limit=50):
     ]
 
 
-def _people_search_results(wildcard, limit=12):
-    """Credited people whose names match, with their library film counts
-    and dominant role.
+def _people_search_results(credit_ids):
+    """The index's ranked people, with their library film counts and
+    dominant role.
 
     Mirrors the People page's rules: cast plus key crew roles count,
-    uncredited-only roles never do, and matches order by film count
-    with the surname tie-break.
+    and uncredited-only roles never do — the index only holds people
+    with a credited role, ranked exact full name first, then by film
+    count with the surname tie-break (no prefix tier here — "Ford
+    Beebe" shouldn't outrank Harrison Ford on a "Ford" search).
     """
 
     pairs = _credited_film_pairs()
     film_count = db.func.count(db.distinct(pairs.c.movie_id)).label("film_count")
-    matches = (
-        db.session.query(
+    by_id = {
+        person.id: person
+        for person in db.session.query(
             TMDBCredit.id,
             TMDBCredit.name,
             TMDBCredit.tmdb_profile_path,
             film_count,
         )
         .join(pairs, pairs.c.credit_id == TMDBCredit.id)
-        .filter(TMDBCredit.name.ilike(f"%{wildcard}%"))
+        .filter(TMDBCredit.id.in_(credit_ids))
         .group_by(TMDBCredit.id, TMDBCredit.name, TMDBCredit.tmdb_profile_path)
-        .order_by(
-            # An exact full-name match surfaces first; among partial
-            # matches, film count stays the better signal (no prefix
-            # tier here — "Ford Beebe" shouldn't outrank Harrison Ford
-            # on a "Ford" search)
-            db.case((TMDBCredit.name.ilike(wildcard), 0), else_=1),
-            film_count.desc(),
-            db.func.substring_index(TMDBCredit.name, " ", -1).asc(),
-            TMDBCredit.name.asc(),
-        )
-        .limit(limit)
-        .all()
-    )
+    }
+    matches = [by_id[credit_id] for credit_id in credit_ids if credit_id in by_id]
     roles = _dominant_roles([person.id for person in matches])
     return [
         {
@@ -318,13 +251,16 @@ def search():
     people_results = []
 
     if q:
-        # Spaces become wildcards so word order and punctuation don't matter
+        # One index lookup ranks all four result types; the helpers
+        # just hydrate the winners
 
-        wildcard = q.replace(" ", "%")
-        movie_results = _movie_search_results(wildcard)
-        tv_results = _tv_search_results(wildcard)
-        episode_results = _episode_search_results(wildcard)
-        people_results = _people_search_results(wildcard)
+        ranked = search_library(
+            q, {"movie": 50, "series": 50, "episode": 36, "person": 12}
+        )
+        movie_results = _movie_search_results(ranked["movie"])
+        tv_results = _tv_search_results(ranked["series"])
+        episode_results = _episode_search_results(ranked["episode"])
+        people_results = _people_search_results(ranked["person"])
 
         # The personal funnel badges: "Might interest you" (in the
         # stored recommendations — the library rail's own set) →
@@ -381,9 +317,9 @@ def search_json():
     results = []
 
     if len(q) >= 2:
-        wildcard = q.replace(" ", "%")
+        ranked = search_library(q, {"movie": 5, "series": 5, "person": 5})
 
-        for result in _movie_search_results(wildcard, limit=5):
+        for result in _movie_search_results(ranked["movie"]):
             movie = result["movie"]
             display_title = movie.tmdb_title if movie.tmdb_title else movie.title
             display_year = (
@@ -400,7 +336,7 @@ def search_json():
                 }
             )
 
-        for result in _tv_search_results(wildcard, limit=5):
+        for result in _tv_search_results(ranked["series"]):
             series = result["series"]
             seasons = result["seasons"]
             if seasons:
@@ -420,7 +356,7 @@ def search_json():
                 }
             )
 
-        for person in _people_search_results(wildcard, limit=5):
+        for person in _people_search_results(ranked["person"]):
             results.append(
                 {
                     "type": "Person",
@@ -1,6 +1,7 @@
 """The shopping lists (the routes.py split): upgrade-worthy movies and
 TV seasons, with exclusions and store links."""
 
+import math
 import re
 
 
@@ -23,17 +24,46 @@ from app.main.forms import (
     MovieShoppingFilterForm,
     TVShoppingFilterForm,
 )
+from app.reference_data import reference_data
 from app.models import (
     File,
     Movie,
     RefQuality,
+    ShoppingListItem,
+    TVSeasonSummary,
     TVSeries,
     UserMovieReview,
-    movie_file_rank,
 )
+from app.shopping_list import ensure_shopping_list
 from app.main import bp
 
 
+def _shopping_row(item, file, movie, quality):
+    """The row tuple the shopping template unpacks. The rating columns
+    are the household's average with the review form's rounding; the
+    page no longer draws them (each row's star ladder is painted live),
+    but they still ride the tuple."""
+
+    rating = item.rating
+    if rating is None:
+        modified_rating = whole_stars = None
+        half_stars = 0
+    else:
+        modified_rating = math.floor(rating * 2 + 0.5) / 2
+        whole_stars = math.floor(modified_rating)
+        half_stars = 0 if modified_rating % 1 == 0 else 1
+    return (
+        file,
+        movie,
+        quality,
+        rating,
+        modified_rating,
+        whole_stars,
+        half_stars,
+        item.instruction,
+    )
+
+
 @bp.route("/shopping-list/movie", methods=["GET", "POST"])
 @login_required
 def movie_shopping():
@@ -47,6 +77,11 @@ def movie_shopping():
                    (defaults to "Bluray-2160p Remux")
     """
 
+    # Every quality lookup on this page reads the process's reference
+    # data snapshot instead of querying RefQuality
+
+    reference = reference_data()
+
     page = request.args.get("page", 1, type=int)
     q = request.args.get("q", None, type=str)
     library = request.args.get("library", None, type=str)
@@ -54,9 +89,7 @@ def movie_shopping():
     min_quality = request.args.get("min_quality", 0, type=str)
     max_quality = request.args.get(
         "max_quality",
-        db.session.query(RefQuality.id)
-        .filter(RefQuality.quality_title == "Bluray-2160p Remux")
-        .scalar(),
+        reference.quality_id("Bluray-2160p Remux"),
         type=str,
     )
 
@@ -84,11 +117,7 @@ def movie_shopping():
 
     # Create the list of qualities for the dropdown filter
 
-    qualities = (
-        db.session.query(RefQuality.id, RefQuality.quality_title)
-        .order_by(RefQuality.preference.asc())
-        .all()
-    )
+    qualities = [(quality.id, quality.quality_title) for quality in reference.qualities]
     filter_form.min_quality.choices = [(str(id), title) for (id, title) in qualities]
     filter_form.max_quality.choices = [(str(id), title) for (id, title) in qualities]
 
@@ -96,31 +125,18 @@ def movie_shopping():
     # to "Not in library" — the virtual bottom of the scale, so the default view
     # includes liked-but-unowned films
 
-    if not RefQuality.query.filter_by(id=int(min_quality)).first():
-        min_quality = int(
-            db.session.query(RefQuality.id)
-            .filter(RefQuality.quality_title == "Not in library")
-            .scalar()
-        )
+    if not reference.quality(int(min_quality)):
+        min_quality = int(reference.quality_id("Not in library"))
 
     # If the max_quality ID doesn't exist in our RefQuality table, default to "Bluray-1080p"
 
-    if not RefQuality.query.filter_by(id=int(max_quality)).first():
-        max_quality = int(
-            db.session.query(RefQuality.id)
-            .filter(RefQuality.quality_title == "Bluray-1080p")
-            .filter(RefQuality.physical_media == True)
-            .scalar()
-        )
+    if not reference.quality(int(max_quality)):
+        max_quality = int(reference.quality_id("Bluray-1080p"))
 
     # Find the preference associated with the quality ID, and set as the dropdown default
 
-    min_preference = (
-        db.session.query(RefQuality.preference).filter_by(id=int(min_quality)).scalar()
-    )
-    max_preference = (
-        db.session.query(RefQuality.preference).filter_by(id=int(max_quality)).scalar()
-    )
+    min_preference = reference.quality(int(min_quality)).preference
+    max_preference = reference.quality(int(max_quality)).preference
 
     # If the minimum quality outranks the maximum, collapse the range to
     # just the minimum. Compared by preference — quality ids don't
@@ -143,26 +159,10 @@ def movie_shopping():
     else:
         title = "Movies to upgrade"
 
-    not_in_library_quality = bottom_quality = (
-        db.session.query(RefQuality.preference)
-        .filter(RefQuality.quality_title == "Not in library")
-        .scalar()
-    )
-    top_quality = (
-        db.session.query(RefQuality.preference)
-        .filter(RefQuality.quality_title == "Bluray-2160p Remux")
-        .scalar()
-    )
-    min_quality_title = (
-        db.session.query(RefQuality.quality_title)
-        .filter_by(id=int(min_quality))
-        .scalar()
-    )
-    max_quality_title = (
-        db.session.query(RefQuality.quality_title)
-        .filter_by(id=int(max_quality))
-        .scalar()
-    )
+    not_in_library_quality = bottom_quality = reference.preference("Not in library")
+    top_quality = reference.preference("Bluray-2160p Remux")
+    min_quality_title = reference.quality(int(min_quality)).quality_title
+    max_quality_title = reference.quality(int(max_quality)).quality_title
     if min_quality_title == max_quality_title:
         # Equal titles mean equal preferences, so testing one bound suffices
         if min_preference == not_in_library_quality:
@@ -212,343 +212,63 @@ def movie_shopping():
             )
         )
 
-    # Subquery to get the best movie titles
-
-    ranked_files = (
-        db.session.query(
-            File.id.label("file_id"),
-            Movie.id.label("movie_id"),
-            Movie.title,
-            File.edition,
-            RefQuality.quality_title,
-            movie_file_rank(),
-        )
-        .join(Movie, (Movie.id == File.movie_id))
-        .join(RefQuality, (RefQuality.id == File.quality_id))
-        .subquery()
-    )
-
-    # Subquery to get only physical-media movies
-
-    physical_media = (
-        db.session.query(Movie.id)
-        .join(File, (File.movie_id == Movie.id))
-        .join(RefQuality, (RefQuality.id == File.quality_id))
-        .filter(RefQuality.physical_media == True)
-        .filter(File.feature_type_id == None)
-        .subquery()
-    )
-
-    # Subquery to get the current user's average ratings for each movie.
-    # The math on modified_rating, whole_stars, and half_stars mirrors what
-    # is done when creating a review, computed here over the *average*. The
-    # page no longer draws these columns — each row carries the live star
-    # ladder, painted from /movie_states with the latest verdict — but they
-    # still ride the row tuple the template unpacks.
-
-    rating = (
-        db.session.query(
-            UserMovieReview.user_id,
-            UserMovieReview.movie_id,
-            db.func.avg(UserMovieReview.rating).label("rating"),
-            (db.func.round(db.func.avg(UserMovieReview.rating) * 2) / 2).label(
-                "modified_rating"
-            ),
-            db.func.floor(
-                db.func.round(db.func.avg(UserMovieReview.rating) * 2) / 2
-            ).label("whole_stars"),
-            db.case(
-                (
-                    db.func.mod(
-                        (db.func.round(db.func.avg(UserMovieReview.rating) * 2) / 2),
-                        1,
-                    )
-                    == 0,
-                    0,
-                ),
-                else_=(1),
-            ).label("half_stars"),
-        )
-        .group_by(UserMovieReview.user_id, UserMovieReview.movie_id)
-        .subquery()
-    )
-
-    # Subqueries to get the preference associated with different quality thresholds
-
-    dvd_quality = (
-        db.session.query(RefQuality.preference)
-        .filter(RefQuality.quality_title == "DVD")
-        .scalar()
-    )
-    bluray_quality = (
-        db.session.query(db.func.min(RefQuality.preference))
-        .filter(RefQuality.quality_title.like("Bluray-1080%"))
-        .filter(RefQuality.physical_media == True)
-        .scalar()
-    )
-    uhd_quality = (
-        db.session.query(db.func.min(RefQuality.preference))
-        .filter(RefQuality.quality_title.like("Bluray-2160%"))
-        .filter(RefQuality.physical_media == True)
-        .scalar()
-    )
-
-    CriterionQuality = db.aliased(RefQuality)
-
-    # These CASE expressions are shared by every shopping query variant
-
-    shopping_instruction_case = db.case(
-        (Movie.shopping_list_exclude == True, "Already owned"),
-        (
-            db.and_(
-                db.or_(
-                    Movie.criterion_spine_number != None,
-                    Movie.criterion_set_title != None,
-                ),
-                Movie.criterion_disc_owned == True,
-                #                                 db.and_(
-                #                                     db.or_(
-                #                                         db.and_(
-                #                                             CriterionQuality.preference == dvd_quality,
-                #                                             RefQuality.preference >= dvd_quality,
-                #                                         ),
-                #                                         db.and_(
-                #                                             CriterionQuality.preference
-                #                                             >= bluray_quality,
-                #                                             RefQuality.preference >= bluray_quality,
-                #                                         ),
-                #                                     ),
-                #                                 ),
-            ),
-            "Already owned",
+    # The list reads the precomputed projection (app.shopping_list):
+    # every verdict and ordering key is already on the row, so each
+    # filter below is a range scan rather than a re-derivation of the
+    # whole library
+
+    ensure_shopping_list()
+
+    items = (
+        db.session.query(ShoppingListItem, File, Movie, RefQuality)
+        .select_from(ShoppingListItem)
+        .join(Movie, (Movie.id == ShoppingListItem.movie_id))
+        .outerjoin(File, (File.id == ShoppingListItem.file_id))
+        .outerjoin(RefQuality, (RefQuality.id == File.quality_id))
+    )
+
+    # Owned copies within the quality range. Films with no local copy
+    # count as the virtual bottom quality, so they only appear when the
+    # range's minimum reaches down to "Not in library" — and only the
+    # ones the reader liked
+
+    owned_in_range = db.and_(
+        ShoppingListItem.file_id != None,
+        ShoppingListItem.preference >= min_preference,
+        ShoppingListItem.preference <= max_preference,
+    )
+    liked_unowned = db.and_(
+        ShoppingListItem.file_id == None,
+        db.exists().where(
+            UserMovieReview.movie_id == ShoppingListItem.movie_id,
+            UserMovieReview.user_id == int(current_user.id),
+            UserMovieReview.liked == True,
         ),
-        (
-            db.and_(
-                db.or_(
-                    Movie.criterion_spine_number != None,
-                    Movie.criterion_set_title != None,
-                ),
-                Movie.criterion_disc_owned == False,
-                CriterionQuality.preference == uhd_quality,
-                # RefQuality.preference <= uhd_quality,
-            ),
-            "Buy Criterion edition on 4K UHD Blu-Ray",
-        ),
-        (
-            db.and_(
-                db.or_(
-                    Movie.criterion_spine_number != None,
-                    Movie.criterion_set_title != None,
-                ),
-                Movie.criterion_disc_owned == False,
-                CriterionQuality.preference == bluray_quality,
-                # RefQuality.preference <= bluray_quality,
-            ),
-            "Buy Criterion edition on Blu-Ray",
-        ),
-        (
-            db.and_(
-                db.or_(
-                    Movie.criterion_spine_number != None,
-                    Movie.criterion_set_title != None,
-                ),
-                Movie.criterion_disc_owned == False,
-                CriterionQuality.preference == dvd_quality,
-                # RefQuality.preference <= dvd_quality,
-            ),
-            "Buy Criterion edition on DVD",
-        ),
-        # A liked movie with no files (possible since the Letterboxd
-        # import) is wanted but entirely unowned
-        (File.id == None, "Buy on Blu-Ray"),
-        (File.fullscreen == True, "Buy any non-fullscreen release"),
-        (
-            RefQuality.preference < dvd_quality,
-            "Buy on DVD or Blu-Ray",
-        ),
-        (RefQuality.preference < bluray_quality, "Buy on Blu-Ray"),
-        else_=("Already owned"),
     )
-
-    shopping_urgency_order_case = db.case(
-        (Movie.criterion_disc_owned == True, -1),
-        (Movie.shopping_list_exclude == True, -1),
-        (File.id == None, 1),
-        (RefQuality.preference < bluray_quality, 1),
-        (
-            db.and_(
-                db.or_(
-                    Movie.criterion_spine_number != None,
-                    Movie.criterion_set_title != None,
-                ),
-                db.or_(
-                    Movie.criterion_disc_owned == False,
-                    Movie.criterion_disc_owned == None,
-                ),
-            ),
-            1,
-        ),
-        else_=(-1),
+    in_range = (
+        db.or_(owned_in_range, liked_unowned)
+        if min_preference <= bottom_quality
+        else owned_in_range
     )
 
-    cart_priority_order_case = db.case(
-        (Movie.criterion_disc_owned == True, 0),
-        (
-            db.and_(
-                File.id == None,
-                db.or_(
-                    Movie.shopping_list_exclude == False,
-                    Movie.shopping_list_exclude == None,
-                ),
-            ),
-            Movie.shopping_cart_priority,
-        ),
-        (
-            db.and_(
-                db.or_(
-                    Movie.shopping_list_exclude == False,
-                    Movie.shopping_list_exclude == None,
-                ),
-                RefQuality.preference < bluray_quality,
-            ),
-            Movie.shopping_cart_priority,
-        ),
-        (
-            db.and_(
-                db.or_(
-                    Movie.criterion_spine_number != None,
-                    Movie.criterion_set_title != None,
-                ),
-                db.or_(
-                    Movie.criterion_disc_owned == False,
-                    Movie.criterion_disc_owned == None,
-                ),
-            ),
-            Movie.shopping_cart_priority,
-        ),
-        else_=(0),
+    title_order = (
+        ShoppingListItem.sort_title.asc(),
+        ShoppingListItem.year.asc(),
+        ShoppingListItem.edition.asc(),
     )
-
-    quality_order_case = db.case(
-        (Movie.criterion_disc_owned == True, 99),
-        # Nothing owned at all sorts ahead of even the worst owned quality
-        (
-            db.and_(
-                File.id == None,
-                db.or_(
-                    Movie.shopping_list_exclude == False,
-                    Movie.shopping_list_exclude == None,
-                ),
-            ),
-            0,
-        ),
-        (
-            db.and_(
-                db.or_(
-                    Movie.shopping_list_exclude == False,
-                    Movie.shopping_list_exclude == None,
-                ),
-                RefQuality.preference < bluray_quality,
-            ),
-            RefQuality.preference,
-        ),
-        (
-            db.and_(
-                db.or_(
-                    Movie.criterion_spine_number != None,
-                    Movie.criterion_set_title != None,
-                ),
-                db.or_(
-                    Movie.criterion_disc_owned == False,
-                    Movie.criterion_disc_owned == None,
-                ),
-            ),
-            RefQuality.preference,
-        ),
-        else_=(99),
+    shopping_order = (
+        ShoppingListItem.urgency.desc(),
+        ShoppingListItem.cart_priority.desc(),
+        ShoppingListItem.quality_order.asc(),
+        ShoppingListItem.cart_age.desc(),
+        *title_order,
+        ShoppingListItem.date_added.asc(),
     )
 
-    cart_age_order_case = db.case(
-        (Movie.criterion_disc_owned == True, 0),
-        (
-            db.and_(
-                File.id == None,
-                db.or_(
-                    Movie.shopping_list_exclude == False,
-                    Movie.shopping_list_exclude == None,
-                ),
-            ),
-            Movie.shopping_cart_add_date,
-        ),
-        (
-            db.and_(
-                db.or_(
-                    Movie.shopping_list_exclude == False,
-                    Movie.shopping_list_exclude == None,
-                ),
-                RefQuality.preference < bluray_quality,
-            ),
-            Movie.shopping_cart_add_date,
-        ),
-        (
-            db.and_(
-                db.or_(
-                    Movie.criterion_spine_number != None,
-                    Movie.criterion_set_title != None,
-                ),
-                db.or_(
-                    Movie.criterion_disc_owned == False,
-                    Movie.criterion_disc_owned == None,
-                ),
-            ),
-            Movie.shopping_cart_add_date,
-        ),
-        else_=(0),
-    )
-
-    # Movies with a liked review but no files (possible since the
-    # Letterboxd import) belong on the shopping list too: they're wanted
-    # films not owned in any form. Selecting File and RefQuality through
-    # always-false outer joins yields NULL columns for them, so these rows
-    # take the same shape as owned titles and can be UNIONed in below.
-
-    liked_movie_ids = db.session.query(UserMovieReview.movie_id).filter(
-        UserMovieReview.user_id == int(current_user.id),
-        UserMovieReview.liked == True,
-    )
+    # The Criterion filter narrows the browsing views, not searches
 
-    # TV episode files carry a NULL movie_id, and a single NULL in a NOT IN
-    # subquery makes the predicate false for every row — filter them out
-
-    owned_movie_ids = db.session.query(File.movie_id).filter(
-        File.feature_type_id == None, File.movie_id != None
-    )
-
-    def liked_unowned_query():
-        return (
-            db.session.query(
-                File,
-                Movie,
-                RefQuality,
-                rating.c.rating,
-                rating.c.modified_rating,
-                rating.c.whole_stars,
-                rating.c.half_stars,
-                shopping_instruction_case.label("instruction"),
-            )
-            .select_from(Movie)
-            .outerjoin(File, db.and_(File.movie_id == Movie.id, File.id == None))
-            .outerjoin(RefQuality, RefQuality.id == File.quality_id)
-            .outerjoin(
-                CriterionQuality, (CriterionQuality.id == Movie.criterion_quality_id)
-            )
-            .outerjoin(
-                rating,
-                (rating.c.movie_id == Movie.id) & (rating.c.user_id == current_user.id),
-            )
-            .filter(Movie.id.in_(liked_movie_ids))
-            .filter(Movie.id.not_in(owned_movie_ids))
-        )
+    if criterion_release and not q:
+        items = items.filter(ShoppingListItem.criterion == True)
 
     if q:
         if re.match(r"tmdb:(?P<tmdb_id>\d+)", q):
@@ -558,240 +278,44 @@ def movie_shopping():
                 title = f"Upgrade details for TMDB ID {tmdb_id}"
             else:
                 title = f"Upgrade details for \"{movie.tmdb_title if movie.tmdb_title else movie.title} ({movie.tmdb_release_date.strftime('%Y') if movie.tmdb_title else movie.year})\""
-            movies = (
-                db.session.query(
-                    File,
-                    Movie,
-                    RefQuality,
-                    rating.c.rating,
-                    rating.c.modified_rating,
-                    rating.c.whole_stars,
-                    rating.c.half_stars,
-                    shopping_instruction_case.label("instruction"),
-                )
-                .join(Movie, (Movie.id == File.movie_id))
-                .join(RefQuality, (RefQuality.id == File.quality_id))
-                .outerjoin(
-                    CriterionQuality,
-                    (CriterionQuality.id == Movie.criterion_quality_id),
-                )
-                .outerjoin(
-                    rating,
-                    (rating.c.movie_id == Movie.id)
-                    & (rating.c.user_id == current_user.id),
-                )
-                .join(ranked_files, (ranked_files.c.file_id == File.id))
-                .filter(File.feature_type_id == None)
-                .filter(ranked_files.c.rank == 1)
-                .filter(RefQuality.preference >= min_preference)
-                .filter(RefQuality.preference <= max_preference)
+            items = (
+                items.filter(owned_in_range)
                 .filter(Movie.tmdb_id == tmdb_id)
                 .order_by(
-                    db.func.regexp_replace(Movie.title, "^(The|A|An) ", "").asc(),
-                    Movie.year.asc(),
-                    File.edition.asc(),
-                    RefQuality.preference.asc(),
-                    File.date_added.asc(),
+                    *title_order,
+                    ShoppingListItem.preference.asc(),
+                    ShoppingListItem.date_added.asc(),
                 )
-                .paginate(page=page, per_page=100, error_out=False)
             )
 
         else:
             title = f"Movies to upgrade matching '{q}'"
-            owned_matches = (
-                db.session.query(
-                    File,
-                    Movie,
-                    RefQuality,
-                    rating.c.rating,
-                    rating.c.modified_rating,
-                    rating.c.whole_stars,
-                    rating.c.half_stars,
-                    shopping_instruction_case.label("instruction"),
-                )
-                .join(Movie, (Movie.id == File.movie_id))
-                .join(RefQuality, (RefQuality.id == File.quality_id))
-                .outerjoin(
-                    CriterionQuality,
-                    (CriterionQuality.id == Movie.criterion_quality_id),
-                )
-                .outerjoin(
-                    rating,
-                    (rating.c.movie_id == Movie.id)
-                    & (rating.c.user_id == current_user.id),
-                )
-                .join(ranked_files, (ranked_files.c.file_id == File.id))
-                .filter(File.feature_type_id == None)
-                .filter(ranked_files.c.rank == 1)
-                .filter(RefQuality.preference >= min_preference)
-                .filter(RefQuality.preference <= max_preference)
+            items = (
+                items.filter(in_range)
                 .filter(
                     db.or_(
                         Movie.title.ilike(f"%{q}%"), Movie.tmdb_title.ilike(f"%{q}%")
                     )
                 )
-            )
-            liked_matches = liked_unowned_query().filter(
-                db.or_(Movie.title.ilike(f"%{q}%"), Movie.tmdb_title.ilike(f"%{q}%"))
-            )
-
-            # Films with no local copy count as the virtual bottom quality, so they
-            # only appear when the range's minimum reaches down to "Not in library"
-
-            candidates = (
-                owned_matches.union_all(liked_matches)
-                if min_preference <= bottom_quality
-                else owned_matches
-            )
-            movies = candidates.order_by(
-                db.func.regexp_replace(Movie.title, "^(The|A|An) ", "").asc(),
-                Movie.year.asc(),
-                File.edition.asc(),
-                RefQuality.preference.asc(),
-                File.date_added.asc(),
-            ).paginate(page=page, per_page=100, error_out=False)
-
-    elif media == "digital":
-        physical_media = (
-            db.session.query(
-                File.movie_id,
-            )
-            .join(Movie, (Movie.id == File.movie_id))
-            .join(RefQuality, (RefQuality.id == File.quality_id))
-            .filter(
-                db.or_(
-                    RefQuality.physical_media == True,
-                    RefQuality.quality_title == "SDTV",
-                    RefQuality.quality_title.ilike("HDTV-%"),
+                .order_by(
+                    *title_order,
+                    ShoppingListItem.preference.asc(),
+                    ShoppingListItem.date_added.asc(),
                 )
             )
-            .subquery()
-        )
 
-        movies = (
-            db.session.query(
-                File,
-                Movie,
-                RefQuality,
-                rating.c.rating,
-                rating.c.modified_rating,
-                rating.c.whole_stars,
-                rating.c.half_stars,
-                shopping_instruction_case.label("instruction"),
-            )
-            .join(Movie, (Movie.id == File.movie_id))
-            .join(RefQuality, (RefQuality.id == File.quality_id))
-            .outerjoin(
-                CriterionQuality, (CriterionQuality.id == Movie.criterion_quality_id)
-            )
-            .outerjoin(
-                rating,
-                (rating.c.movie_id == Movie.id) & (rating.c.user_id == current_user.id),
-            )
-            .join(ranked_files, (ranked_files.c.file_id == File.id))
-            .filter(File.feature_type_id == None)
-            .filter(ranked_files.c.rank == 1)
-            .filter(RefQuality.preference >= min_preference)
-            .filter(RefQuality.preference <= max_preference)
-            .filter(Movie.id.not_in(db.select(physical_media.c.movie_id)))
-            .filter(
-                db.or_(
-                    db.and_(
-                        criterion_release == True,
-                        db.or_(
-                            Movie.criterion_spine_number != None,
-                            Movie.criterion_set_title != None,
-                        ),
-                        # Movie.criterion_in_print == 1,
-                        # CriterionQuality.preference >= RefQuality.preference,
-                    ),
-                    criterion_release != True,
-                ),
-            )
-            .order_by(
-                shopping_urgency_order_case.desc(),
-                cart_priority_order_case.desc(),
-                quality_order_case.asc(),
-                cart_age_order_case.desc(),
-                db.func.regexp_replace(Movie.title, "^(The|A|An) ", "").asc(),
-                Movie.year.asc(),
-                File.edition.asc(),
-                File.date_added.asc(),
-            )
-            .paginate(page=page, per_page=100, error_out=False)
+    elif media == "digital":
+        items = (
+            items.filter(owned_in_range)
+            .filter(ShoppingListItem.digital_only == True)
+            .order_by(*shopping_order)
         )
 
     else:
-        owned_titles = (
-            db.session.query(
-                File,
-                Movie,
-                RefQuality,
-                rating.c.rating,
-                rating.c.modified_rating,
-                rating.c.whole_stars,
-                rating.c.half_stars,
-                shopping_instruction_case.label("instruction"),
-            )
-            .join(Movie, (Movie.id == File.movie_id))
-            .join(RefQuality, (RefQuality.id == File.quality_id))
-            .outerjoin(
-                CriterionQuality, (CriterionQuality.id == Movie.criterion_quality_id)
-            )
-            .outerjoin(
-                rating,
-                (rating.c.movie_id == Movie.id) & (rating.c.user_id == current_user.id),
-            )
-            .join(ranked_files, (ranked_files.c.file_id == File.id))
-            .filter(File.feature_type_id == None)
-            .filter(ranked_files.c.rank == 1)
-            .filter(RefQuality.preference >= min_preference)
-            .filter(RefQuality.preference <= max_preference)
-            .filter(
-                db.or_(
-                    db.and_(
-                        criterion_release == True,
-                        db.or_(
-                            Movie.criterion_spine_number != None,
-                            Movie.criterion_set_title != None,
-                        ),
-                        # Movie.criterion_in_print == 1,
-                        # CriterionQuality.preference >= RefQuality.preference,
-                    ),
-                    criterion_release != True,
-                ),
-            )
-        )
-        liked_titles = liked_unowned_query().filter(
-            db.or_(
-                db.and_(
-                    criterion_release == True,
-                    db.or_(
-                        Movie.criterion_spine_number != None,
-                        Movie.criterion_set_title != None,
-                    ),
-                ),
-                criterion_release != True,
-            ),
-        )
-        # Films with no local copy count as the virtual bottom quality, so they only
-        # appear when the range's minimum reaches down to "Not in library"
+        items = items.filter(in_range).order_by(*shopping_order)
 
-        candidates = (
-            owned_titles.union_all(liked_titles)
-            if min_preference <= bottom_quality
-            else owned_titles
-        )
-        movies = candidates.order_by(
-            shopping_urgency_order_case.desc(),
-            cart_priority_order_case.desc(),
-            quality_order_case.asc(),
-            cart_age_order_case.desc(),
-            db.func.regexp_replace(Movie.title, "^(The|A|An) ", "").asc(),
-            Movie.year.asc(),
-            File.edition.asc(),
-            File.date_added.asc(),
-        ).paginate(page=page, per_page=100, error_out=False)
+    movies = items.paginate(page=page, per_page=100, error_out=False)
+    rows = [_shopping_row(*item) for item in movies.items]
 
     movie_shopping_exclude_form = MovieShoppingExcludeForm()
 
@@ -869,7 +393,7 @@ def movie_shopping():
     return render_template(
         "shopping_movie.html",
         title=title,
-        movies=movies.items,
+        movies=rows,
         next_url=next_url,
         prev_url=prev_url,
         pages=movies,
@@ -893,13 +417,13 @@ def tv_shopping():
                    (defaults to "Bluray-1080p")
     """
 
+    reference = reference_data()
+
     q = request.args.get("q", None, type=str)
     min_quality = request.args.get("min_quality", 0, type=str)
     max_quality = request.args.get(
         "max_quality",
-        db.session.query(RefQuality.id)
-        .filter(RefQuality.quality_title == "Bluray-2160p Remux")
-        .scalar(),
+        reference.quality_id("Bluray-2160p Remux"),
         type=str,
     )
 
@@ -912,41 +436,27 @@ def tv_shopping():
     # "Not in library" is the movie shopping list's virtual quality; TV has no
     # unowned rows, so it stays out of this dropdown
 
-    qualities = (
-        db.session.query(RefQuality.id, RefQuality.quality_title)
-        .filter(RefQuality.quality_title != "Not in library")
-        .order_by(RefQuality.preference.asc())
-        .all()
-    )
+    qualities = [
+        (quality.id, quality.quality_title)
+        for quality in reference.qualities
+        if quality.quality_title != "Not in library"
+    ]
     filter_form.quality.choices = [(str(id), title) for (id, title) in qualities]
 
     # If the min_quality ID doesn't exist in our RefQuality table, default to "Unknown"
 
-    if not RefQuality.query.filter_by(id=int(min_quality)).first():
-        min_quality = int(
-            db.session.query(RefQuality.id)
-            .filter(RefQuality.quality_title == "Unknown")
-            .scalar()
-        )
+    if not reference.quality(int(min_quality)):
+        min_quality = int(reference.quality_id("Unknown"))
 
     # If the max_quality ID doesn't exist in our RefQuality table, default to "Bluray-1080p"
 
-    if not RefQuality.query.filter_by(id=int(max_quality)).first():
-        max_quality = int(
-            db.session.query(RefQuality.id)
-            .filter(RefQuality.quality_title == "Bluray-1080p")
-            .filter(RefQuality.physical_media == True)
-            .scalar()
-        )
+    if not reference.quality(int(max_quality)):
+        max_quality = int(reference.quality_id("Bluray-1080p"))
 
     # Find the preference associated with the quality ID, and set as the dropdown default
 
-    min_preference = (
-        db.session.query(RefQuality.preference).filter_by(id=int(min_quality)).scalar()
-    )
-    max_preference = (
-        db.session.query(RefQuality.preference).filter_by(id=int(max_quality)).scalar()
-    )
+    min_preference = reference.quality(int(min_quality)).preference
+    max_preference = reference.quality(int(max_quality)).preference
 
     # If the minimum quality outranks the maximum, collapse the range to
     # the maximum. Compared by preference — quality ids don't reliably
@@ -986,40 +496,18 @@ def tv_shopping():
 
     # Subqueries to get the preference associated with different quality thresholds
 
-    dvd_quality = (
-        db.session.query(RefQuality.preference)
-        .filter(RefQuality.quality_title == "DVD")
-        .scalar()
-    )
-    bluray_quality = (
-        db.session.query(db.func.min(RefQuality.preference))
-        .filter(RefQuality.quality_title.like("Bluray-1080%"))
-        .filter(RefQuality.physical_media == True)
-        .scalar()
-    )
-
-    # Subquery to get the worst quality for each tv show season
-
-    subquery = (
-        db.session.query(
-            File.series_id,
-            File.season,
-            db.func.count(db.func.distinct(File.episode)).label("episodes"),
-            db.func.min(RefQuality.preference).label("preference"),
-        )
-        .group_by(File.series_id, File.season)
-        .join(RefQuality, (RefQuality.id == File.quality_id))
-        .subquery()
-    )
+    dvd_quality = reference.preference("DVD")
+    bluray_quality = reference.min_preference("Bluray-1080", physical_media=True)
 
-    # Run the season aggregate once for the whole library and bucket the rows
-    # by series, rather than re-running the subquery once per series
+    # The seasons' precomputed worst qualities (app.tv_summary): the
+    # filter is a range scan over one row per season instead of an
+    # aggregate over every TV file
 
     season_rows = (
         db.session.query(
-            subquery.c.series_id,
-            subquery.c.season,
-            subquery.c.episodes,
+            TVSeasonSummary.series_id,
+            TVSeasonSummary.season,
+            TVSeasonSummary.episode_count,
             RefQuality.quality_title,
             db.case(
                 (RefQuality.preference < dvd_quality, "Buy on DVD or Blu-Ray"),
@@ -1027,13 +515,13 @@ def tv_shopping():
                 else_="Already owned",
             ).label("instruction"),
         )
-        .join(RefQuality, (RefQuality.preference == subquery.c.preference))
+        .join(RefQuality, (RefQuality.id == TVSeasonSummary.lowest_quality_id))
         .filter(RefQuality.preference >= min_preference)
         .filter(RefQuality.preference <= max_preference)
         .order_by(
-            subquery.c.series_id,
-            db.case((subquery.c.season == 0, 1), else_=0).asc(),
-            subquery.c.season.asc(),
+            TVSeasonSummary.series_id,
+            db.case((TVSeasonSummary.season == 0, 1), else_=0).asc(),
+            TVSeasonSummary.season.asc(),
         )
         .all()
     )
@@ -1059,14 +547,12 @@ def tv_shopping():
                     TVSeries.title.ilike(f"%{q}%"), TVSeries.tmdb_name.ilike(f"%{q}%")
                 )
             )
-            .order_by(db.func.regexp_replace(TVSeries.title, "^(The|A|An) ", "").asc())
+            .order_by(TVSeries.sort_title.asc())
             .all()
         )
 
     else:
-        t = TVSeries.query.order_by(
-            db.func.regexp_replace(TVSeries.title, "^(The|A|An) ", "").asc()
-        ).all()
+        t = TVSeries.query.order_by(TVSeries.sort_title.asc()).all()
         title = "TV Shows to upgrade"
 
     for series in t:
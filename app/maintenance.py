@@ -6,9 +6,11 @@ import json
 import os
 import shutil
 import subprocess
+import tempfile
 import threading
 import time
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
 import requests
@@ -21,6 +23,14 @@ from sqlalchemy.engine import make_url
 from werkzeug.local import LocalProxy
 
 from app import db, get_app
+from app.backup_stream import (
+    TABLE_MARKER,
+    TRAILER_MARKER,
+    VIEW_MARKERS,
+    ParallelGzipWriter,
+    S3MultipartSink,
+    read_gzip_range,
+)
 from app.email import task_send_email
 
 # This process's app instance, resolved lazily so importing this module from
@@ -280,11 +290,21 @@ def observer_health(connection):
 
     Only the import-program workers watch (supervisor.py scopes the
     observer to them), so the expected count is that program's numprocs.
+    Every one of them heartbeats, but only the lease holder named in
+    leader is watching at any moment; the rest are its standbys.
     """
 
+    from app.import_watcher import LEASE_KEY
+
     watchers = sum(1 for _ in connection.scan_iter(f"{OBSERVER_KEY_PREFIX}*"))
     expected = PROGRAM_COUNTS.get("fitzflix-import", 1)
-    return {"ok": watchers >= expected, "watchers": watchers, "expected": expected}
+    leader = connection.get(LEASE_KEY)
+    return {
+        "ok": watchers >= expected,
+        "watchers": watchers,
+        "expected": expected,
+        "leader": leader.decode() if isinstance(leader, bytes) else leader,
+    }
 
 
 def scheduler_health(connection):
@@ -527,6 +547,7 @@ def system_health(flask_app):
         "disks": disk_health(flask_app.config),
         "missing_mounts": missing_volumes(flask_app.config),
         "backup": backup_health(flask_app.config),
+        "backup_stats": backup_throughput(flask_app.redis),
         "observer": observer_health(flask_app.redis),
         "scheduler": scheduler_health(flask_app.redis),
         "probes": probe_health(flask_app.redis),
@@ -577,6 +598,277 @@ def rotate_logs():
         )
 
 
+# Each dump's table manifest sits beside it, locally and in S3, under the
+# dump's own name plus this suffix
+
+MANIFEST_SUFFIX = ".tables.json"
+
+# Durations and throughput of the last backup and restore, for the System page
+
+BACKUP_STATS_KEY = "fitzflix:backup:stats"
+
+# A per-table dump is spooled in memory up to this size before spilling to
+# a temporary file in DB_BACKUP_DIR
+
+DUMP_SPOOL_BYTES = 64 * 1024 * 1024
+
+
+def _megabytes_per_second(size, seconds):
+    """Throughput rounded for display, guarding instant runs."""
+
+    return round(size / 1024 / 1024 / max(seconds, 0.001), 1)
+
+
+def record_backup_stats(connection, kind, seconds, raw_bytes, stored_bytes, jobs):
+    """Remember how long the last backup or restore took and how much it
+    moved. kind is "backup" or "restore"."""
+
+    connection.hset(
+        BACKUP_STATS_KEY,
+        mapping={
+            f"{kind}_at": datetime.now(timezone.utc).isoformat(),
+            f"{kind}_seconds": round(seconds, 2),
+            f"{kind}_raw_bytes": raw_bytes,
+            f"{kind}_bytes": stored_bytes,
+            f"{kind}_jobs": jobs,
+        },
+    )
+
+
+def backup_throughput(connection):
+    """The last backup's and restore's timings for the System page, or
+    None for whichever hasn't run yet."""
+
+    stored = {
+        key.decode(): value.decode()
+        for key, value in connection.hgetall(BACKUP_STATS_KEY).items()
+    }
+    stats = {}
+    for kind in ("backup", "restore"):
+        if f"{kind}_at" not in stored:
+            stats[kind] = None
+            continue
+        seconds = float(stored[f"{kind}_seconds"])
+        raw_bytes = int(stored[f"{kind}_raw_bytes"])
+        stats[kind] = {
+            "at": datetime.fromisoformat(stored[f"{kind}_at"]),
+            "seconds": seconds,
+            "size": _human_size(int(stored[f"{kind}_bytes"])),
+            "mb_per_second": _megabytes_per_second(raw_bytes, seconds),
+            "jobs": int(stored[f"{kind}_jobs"]),
+        }
+    return stats
+
+
+def _stream_dump(command, env, writer):
+    """Run one mysqldump into writer, starting a new section at each
+    table's structure header, and a postamble section at each view's
+    (the stand-ins among the tables, the definitions at the end) and
+    at the closing statements, so a parallel restore creates views
+    only once every table they read exists."""
+
+    # stderr goes to a file, not a pipe: a pipe nobody reads until the
+    # dump ends fills on a chatty run and stalls both processes
+
+    with tempfile.TemporaryFile() as errors:
+        dump = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=errors,
+            env=env,
+        )
+        for line in dump.stdout:
+            if line.startswith(TABLE_MARKER):
+                name = line[len(TABLE_MARKER) :].strip().strip(b"`")
+                writer.section(name.decode("utf-8", "replace"))
+            elif line.startswith(VIEW_MARKERS):
+                name = line.rsplit(b" ", 1)[-1].strip().strip(b"`")
+                writer.section(name.decode("utf-8", "replace"), postamble=True)
+            elif line.startswith(TRAILER_MARKER):
+                writer.section("trailer", postamble=True)
+            writer.write(line)
+        dump.stdout.close()
+        if dump.wait() != 0:
+            errors.seek(0)
+            stderr = errors.read().decode("utf-8", "replace")
+            raise RuntimeError(f"mysqldump exited {dump.returncode}: {stderr[:300]}")
+
+
+def _backup_table_names(database):
+    """The database's tables, largest first, so the longest dumps start
+    first and the pool drains evenly."""
+
+    return (
+        db.session.execute(
+            text(
+                "SELECT table_name FROM information_schema.tables "
+                "WHERE table_schema = :schema AND table_type = 'BASE TABLE' "
+                "ORDER BY data_length DESC"
+            ),
+            {"schema": database},
+        )
+        .scalars()
+        .all()
+    )
+
+
+def _backup_view_names(database):
+    """The database's views (ranked_files, criterion_collection, ...),
+    which a per-table backup dumps separately, definitions only."""
+
+    return (
+        db.session.execute(
+            text(
+                "SELECT table_name FROM information_schema.tables "
+                "WHERE table_schema = :schema AND table_type = 'VIEW' "
+                "ORDER BY table_name"
+            ),
+            {"schema": database},
+        )
+        .scalars()
+        .all()
+    )
+
+
+def _dump_tables_in_parallel(command, database, env, sinks, jobs):
+    """Dump each table with its own mysqldump, several at once, appending
+    each finished table to the sinks as one self-contained section.
+
+    Each table is consistent on its own, but the tables aren't one
+    snapshot: a write landing mid-backup can show up in one table and not
+    another. That's why DB_BACKUP_DUMP_JOBS defaults to a single stream.
+    The views follow the tables as one --no-data dump, the postamble a
+    restore replays after every table. Returns the uncompressed size
+    and the table manifest.
+    """
+
+    lock = threading.Lock()
+    sections = []
+    postamble = []
+    written = 0
+    backup_dir = current_app.config["DB_BACKUP_DIR"]
+
+    def dump_section(arguments, ranges, name):
+        nonlocal written
+        with tempfile.SpooledTemporaryFile(
+            max_size=DUMP_SPOOL_BYTES, dir=backup_dir
+        ) as spool:
+            writer = ParallelGzipWriter([spool], threads=1)
+            try:
+                _stream_dump(command + arguments, env, writer)
+            except Exception:
+                writer.abort()
+                raise
+            writer.close()
+            spool.seek(0)
+            with lock:
+                start = written
+                while chunk := spool.read(1024 * 1024):
+                    for sink in sinks:
+                        sink.write(chunk)
+                    written += len(chunk)
+                if name is None:
+                    ranges.append([start, written])
+                else:
+                    ranges.append({"name": name, "start": start, "end": written})
+        return writer.raw_bytes
+
+    def dump_table(table):
+        return dump_section([database, table], sections, table)
+
+    with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="backup-dump") as pool:
+        raw_bytes = sum(pool.map(dump_table, _backup_table_names(database)))
+
+    views = _backup_view_names(database)
+    if views:
+        raw_bytes += dump_section(["--no-data", database, *views], postamble, None)
+
+    # Every section carries its own session setup, so there's no shared
+    # preamble to replay
+
+    return raw_bytes, {"preamble": [0, 0], "tables": sections, "postamble": postamble}
+
+
+def _mysql_client(url):
+    """The mysql command line and environment for the database at url."""
+
+    env = dict(os.environ)
+    if url.password:
+        env["MYSQL_PWD"] = url.password
+    command = [current_app.config["MYSQL_BIN"], f"--user={url.username}"]
+    if url.host:
+        command.append(f"--host={url.host}")
+    if url.port:
+        command.append(f"--port={url.port}")
+    return command, env
+
+
+def restore_dump(path, database, manifest=None, jobs=1):
+    """Load a backup dump into database, returning the bytes loaded.
+
+    With a table manifest and more than one job, each table's section goes
+    to its own mysql session, several at once, after the dump's preamble
+    (the character set and disabled foreign-key checks) is replayed in
+    it. The postamble — views and the dump's closing statements — then
+    loads in one more session once every table exists, since a view
+    can't be created ahead of the tables it reads. Without a manifest,
+    such as an older dump, the file streams through a single session.
+    Either way the dump is decompressed on the fly rather than read into
+    memory. A failed load raises subprocess.CalledProcessError carrying
+    mysql's stderr.
+    """
+
+    command, env = _mysql_client(
+        make_url(current_app.config["SQLALCHEMY_DATABASE_URI"])
+    )
+    if manifest and manifest["tables"] and jobs > 1:
+        preamble = b"".join(read_gzip_range(path, *manifest["preamble"]))
+        ranges = [[(table["start"], table["end"])] for table in manifest["tables"]]
+        postamble = [tuple(part) for part in manifest.get("postamble", [])]
+    else:
+        preamble = b""
+        ranges = [[(0, os.path.getsize(path))]]
+        postamble = []
+
+    def load(byte_ranges):
+        # mysql's stderr goes to a file: as a pipe read only after the
+        # section is written, a session warning enough to fill it
+        # would block mysql while this thread blocked on its stdin
+
+        with tempfile.TemporaryFile() as errors:
+            session = subprocess.Popen(
+                command + [database],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=errors,
+                env=env,
+            )
+            loaded = len(preamble)
+            try:
+                session.stdin.write(preamble)
+                for byte_range in byte_ranges:
+                    for chunk in read_gzip_range(path, *byte_range):
+                        session.stdin.write(chunk)
+                        loaded += len(chunk)
+                session.stdin.close()
+            except BrokenPipeError:
+                # mysql stopped reading at an error; its stderr says which
+                pass
+            if session.wait() != 0:
+                errors.seek(0)
+                raise subprocess.CalledProcessError(
+                    session.returncode, command, stderr=errors.read()
+                )
+        return loaded
+
+    workers = max(1, min(jobs, len(ranges)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="restore") as pool:
+        loaded = sum(pool.map(load, ranges))
+    if postamble:
+        loaded += load(postamble)
+    return loaded
+
+
 def backup_database():
     """Dump the database to a compressed backup and prune old backups.
 
@@ -585,6 +877,13 @@ def backup_database():
     nightly dump with its own retention window. Each dump is also copied to
     the S3 bucket so a machine failure can't take the database and its
     backups with it; remote copies are pruned on the same retention window.
+
+    The dump streams through a multi-threaded gzip compressor straight into
+    the local file and an S3 multipart upload together, so compression
+    isn't held to one core and the finished file is never read back for
+    the upload. Alongside each dump goes a table manifest that lets
+    restore_dump load tables in parallel. DB_BACKUP_DUMP_JOBS > 1 also
+    dumps tables in parallel, trading the single snapshot for speed.
     """
 
     with app.app_context():
@@ -609,7 +908,6 @@ def backup_database():
             command.append(f"--host={url.host}")
         if url.port:
             command.append(f"--port={url.port}")
-        command.append(url.database)
 
         # Pass the password through the environment so it doesn't appear in
         # the process list
@@ -618,34 +916,13 @@ def backup_database():
         if url.password:
             env["MYSQL_PWD"] = url.password
 
-        try:
-            with gzip.open(backup_file, "wb") as target:
-                dump = subprocess.Popen(
-                    command,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    env=env,
-                )
-                shutil.copyfileobj(dump.stdout, target)
-                dump.stdout.close()
-                stderr = dump.stderr.read().decode("utf-8", "replace")
-                if dump.wait() != 0:
-                    raise RuntimeError(
-                        f"mysqldump exited {dump.returncode}: {stderr[:300]}"
-                    )
-
-        except Exception:
-            # Don't leave a partial backup that looks like a good one
-            if os.path.exists(backup_file):
-                os.remove(backup_file)
-            raise
-
-        size_mb = round(os.path.getsize(backup_file) / 1024 / 1024, 1)
-
-        # Copy the backup to the S3 bucket. The backup prefix sits outside
-        # AWS_UNTOUCHED_PREFIX, so the S3 sync task's pruning of unreferenced
-        # media keys never touches it
+        # Copy the backup to the S3 bucket as it's written: the compressed
+        # blocks stream into a multipart upload alongside the local file,
+        # so the dump is never read back. The backup prefix sits outside
+        # AWS_UNTOUCHED_PREFIX, so the S3 sync task's pruning of
+        # unreferenced media keys never touches it
 
+        client = None
         uploaded_key = None
         remote_deleted = []
         if current_app.config["AWS_BUCKET"]:
@@ -656,14 +933,73 @@ def backup_database():
             backup_prefix = current_app.config["AWS_BACKUP_PREFIX"]
             uploaded_key = f"{backup_prefix}/{os.path.basename(backup_file)}"
             client = aws_s3_client(with_retries=True)
+
+        dump_jobs = current_app.config["DB_BACKUP_DUMP_JOBS"]
+        started = time.monotonic()
+        upload = None
+        try:
+            with open(backup_file, "wb") as target:
+                sinks = [target]
+                if client is not None:
+                    upload = S3MultipartSink(
+                        client, current_app.config["AWS_BUCKET"], uploaded_key
+                    )
+                    sinks.append(upload)
+                if dump_jobs > 1:
+                    raw_bytes, manifest = _dump_tables_in_parallel(
+                        command, url.database, env, sinks, dump_jobs
+                    )
+                else:
+                    writer = ParallelGzipWriter(
+                        sinks, threads=current_app.config["DB_BACKUP_THREADS"]
+                    )
+                    try:
+                        _stream_dump(command + [url.database], env, writer)
+                    except Exception:
+                        writer.abort()
+                        raise
+                    writer.close()
+                    raw_bytes, manifest = writer.raw_bytes, writer.manifest()
+
+        except Exception:
+            # Don't leave a partial backup that looks like a good one
+            if upload is not None:
+                upload.abort()
+            if os.path.exists(backup_file):
+                os.remove(backup_file)
+            raise
+
+        # The table manifest lets a restore load tables in parallel; the
+        # dump itself restores serially without it
+
+        manifest_file = f"{backup_file}{MANIFEST_SUFFIX}"
+        with open(manifest_file, "w") as f:
+            json.dump(manifest, f)
+
+        if upload is not None:
+            try:
+                upload.close()
+            except Exception:
+                upload.abort()
+                raise
             client.upload_file(
-                backup_file, current_app.config["AWS_BUCKET"], uploaded_key
+                manifest_file,
+                current_app.config["AWS_BUCKET"],
+                f"{uploaded_key}{MANIFEST_SUFFIX}",
             )
             current_app.logger.info(
                 f"Uploaded '{backup_file}' to "
                 f"'s3://{os.path.join(current_app.config['AWS_BUCKET'], uploaded_key)}'"
             )
 
+        elapsed = time.monotonic() - started
+        stored_bytes = os.path.getsize(backup_file)
+        size_mb = round(stored_bytes / 1024 / 1024, 1)
+        record_backup_stats(
+            app.redis, "backup", elapsed, raw_bytes, stored_bytes, dump_jobs
+        )
+
+        if client is not None:
             # Back up the environment file too — it's the one configuration
             # that exists nowhere else — encrypted with BACKUP_PASSPHRASE.
             # The passphrase belongs in a password manager: it's the key to
@@ -778,11 +1114,14 @@ def backup_database():
                 datetime.fromtimestamp(os.path.getmtime(path)) < cutoff
             ):
                 os.remove(path)
+                if os.path.exists(f"{path}{MANIFEST_SUFFIX}"):
+                    os.remove(f"{path}{MANIFEST_SUFFIX}")
                 deleted.append(os.path.basename(path))
 
         current_app.logger.info(
             f"Backed up the database to {os.path.basename(backup_file)} "
-            f"({size_mb} MB)"
+            f"({size_mb} MB in {elapsed:.1f}s, "
+            f"{_megabytes_per_second(raw_bytes, elapsed)} MB/s uncompressed)"
             f"{f', uploaded to AWS as {uploaded_key!r}' if uploaded_key else ''}, "
             f"deleted {len(deleted)} local backup(s) and {len(remote_deleted)} "
             f"remote backup(s) older than {retention_days} days"
@@ -824,6 +1163,10 @@ def restore_drill():
 
         GRANT ALL PRIVILEGES ON `fitzflix_restore_check`.* TO '<user>'@'localhost';
 
+    Tables load in parallel (DB_RESTORE_JOBS sessions) from the dump's
+    table manifest, the same path a real recovery takes through
+    `flask backup restore`, and the timing lands on the System page.
+
     A failure raises, which lands the job on the failed-tasks page and
     emails the error.
     """
@@ -837,6 +1180,10 @@ def restore_drill():
 
         from app.videos import aws_s3_client, get_matching_s3_objects
 
+        # botocore loads with the first client (see aws_client)
+
+        import botocore.exceptions
+
         url = make_url(current_app.config["SQLALCHEMY_DATABASE_URI"])
         backup_prefix = current_app.config["AWS_BACKUP_PREFIX"]
 
@@ -855,31 +1202,39 @@ def restore_drill():
         download_path = os.path.join(
             current_app.config["DB_BACKUP_DIR"], ".restore-drill.sql.gz"
         )
+        manifest_path = f"{download_path}{MANIFEST_SUFFIX}"
         os.makedirs(current_app.config["DB_BACKUP_DIR"], exist_ok=True)
         client = aws_s3_client(with_retries=True)
         client.download_file(current_app.config["AWS_BUCKET"], key, download_path)
 
-        mysql_env = dict(os.environ)
-        if url.password:
-            mysql_env["MYSQL_PWD"] = url.password
-        mysql_command = [
-            current_app.config["MYSQL_BIN"],
-            f"--user={url.username}",
-        ]
-        if url.host:
-            mysql_command.append(f"--host={url.host}")
-        if url.port:
-            mysql_command.append(f"--port={url.port}")
+        # Dumps from before table manifests existed restore serially
+
+        manifest = None
+        try:
+            client.download_file(
+                current_app.config["AWS_BUCKET"],
+                f"{key}{MANIFEST_SUFFIX}",
+                manifest_path,
+            )
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        except botocore.exceptions.ClientError:
+            current_app.logger.info(
+                f"'{key}' has no table manifest, restoring it serially"
+            )
+
+        command, env = _mysql_client(url)
 
         def run_mysql(arguments, **kwargs):
             return subprocess.run(
-                mysql_command + arguments,
-                env=mysql_env,
+                command + arguments,
+                env=env,
                 check=True,
                 capture_output=True,
                 **kwargs,
             )
 
+        jobs = current_app.config["DB_RESTORE_JOBS"]
         try:
             run_mysql(
                 [
@@ -888,8 +1243,19 @@ def restore_drill():
                     f"CREATE DATABASE {RESTORE_CHECK_DATABASE}",
                 ]
             )
-            with gzip.open(download_path, "rb") as f:
-                run_mysql([RESTORE_CHECK_DATABASE], input=f.read())
+            started = time.monotonic()
+            raw_bytes = restore_dump(
+                download_path, RESTORE_CHECK_DATABASE, manifest, jobs
+            )
+            elapsed = time.monotonic() - started
+            record_backup_stats(
+                app.redis,
+                "restore",
+                elapsed,
+                raw_bytes,
+                os.path.getsize(download_path),
+                jobs if manifest else 1,
+            )
 
             # The restored schema must be at a migration state
 
@@ -926,7 +1292,9 @@ def restore_drill():
 
             current_app.logger.info(
                 f"Restore drill passed: '{key}' restored at migration "
-                f"{version} ({', '.join(summary)})"
+                f"{version} in {elapsed:.1f}s "
+                f"({_megabytes_per_second(raw_bytes, elapsed)} MB/s; "
+                f"{', '.join(summary)})"
             )
 
         except subprocess.CalledProcessError as e:
@@ -939,10 +1307,11 @@ def restore_drill():
                 run_mysql(["-e", f"DROP DATABASE IF EXISTS {RESTORE_CHECK_DATABASE}"])
             except Exception:
                 pass
-            try:
-                os.remove(download_path)
-            except OSError:
-                pass
+            for path in (download_path, manifest_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
 
         return True
 
@@ -1,6 +1,8 @@
 import json
 import os
+import re
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from time import sleep, time
 
@@ -13,7 +15,7 @@ from unidecode import unidecode
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask import current_app, render_template
 from flask_login import UserMixin
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, validates
 
 from app import db, login
 from app.email import task_send_email as send_email
@@ -104,6 +106,14 @@ tv_seasons = db.Table(
 )
 
 
+def sort_title(title):
+    """The title as the library sorts it: a leading "The", "A" or "An"
+    dropped, the rule the pages used to apply with regexp_replace at
+    query time."""
+
+    return re.sub(r"^(The|A|An) ", "", title) if title is not None else None
+
+
 class Utilities(object):
     """Static string helpers shared by the import pipeline."""
 
@@ -165,6 +175,51 @@ def tmdb_get(url, **kwargs):
     return requests.get(url, **kwargs)
 
 
+# TMDb serves at most 20 appended blocks per request; a TV refresh's
+# season batches are requested this many at a time
+
+TMDB_APPEND_LIMIT = 20
+TMDB_SEASON_WORKERS = 4
+
+
+def tmdb_stale_seasons(tmdb_info, snapshot):
+    """The season numbers in a TV base payload whose episode blocks need
+    fetching, given tmdb_season_snapshot's view of the database.
+
+    A season is skipped only when TMDb's summary of it — air date and
+    episode count — matches the stored one and every episode already
+    has a row; the season holding the last or next episode to air is
+    always fetched, since its episodes' titles and air dates are the
+    ones still moving.
+    """
+
+    airing = {
+        (tmdb_info.get(key) or {}).get("season_number")
+        for key in ("last_episode_to_air", "next_episode_to_air")
+    }
+    stale = []
+    for season in tmdb_info.get("seasons", []):
+        n = season.get("season_number")
+        if n is None:
+            continue
+        stored = snapshot["stored"].get(n)
+        air_date = (
+            datetime.strptime(season["air_date"], "%Y-%m-%d")
+            if season.get("air_date")
+            else None
+        )
+        count = season.get("episode_count")
+        if (
+            n in airing
+            or stored is None
+            or stored[0] != air_date
+            or stored[1] != count
+            or stored[2] != (count or 0)
+        ):
+            stale.append(n)
+    return stale
+
+
 def tmdb_objects(entries, owner, what):
     """Yield the dict entries of a TMDb credits list, logging and
     skipping anything else.
@@ -579,6 +634,47 @@ class TMDBMixin(object):
 
         return self.tmdb_movie_apply(self.tmdb_movie_fetch(tmdb_id))
 
+    def tmdb_season_snapshot(self):
+        """What the database holds of this series' seasons, for deciding
+        which season blocks a refresh needs: {"stored": {season_number:
+        (air_date, episode_count, stored episode rows)}, "likely_stale":
+        season numbers worth appending to the base request}.
+
+        Likely stale, before TMDb has said anything: every season whose
+        stored episode rows fall short of its count, and the newest
+        season, where episodes are still airing. A series never
+        refreshed has no snapshot, so its first seasons are guessed —
+        TMDb just leaves out a season that doesn't exist.
+        """
+
+        if self.id is None:
+            return {"stored": {}, "likely_stale": list(range(TMDB_APPEND_LIMIT))}
+
+        episode_rows = dict(
+            db.session.query(TVEpisode.season, db.func.count(TVEpisode.id))
+            .filter(TVEpisode.series_id == self.id)
+            .group_by(TVEpisode.season)
+        )
+        stored = {
+            season.season_number: (
+                season.air_date,
+                season.episode_count,
+                episode_rows.get(season.season_number, 0),
+            )
+            for season in self.seasons
+            if season.season_number is not None
+        }
+        if not stored:
+            return {"stored": {}, "likely_stale": list(range(TMDB_APPEND_LIMIT))}
+
+        likely_stale = sorted(
+            n for n, (_, count, rows) in stored.items() if count and rows < count
+        )
+        newest = max(stored)
+        if newest not in likely_stale:
+            likely_stale.insert(0, newest)
+        return {"stored": stored, "likely_stale": likely_stale}
+
     def tmdb_tv_fetch(self, tmdb_id=None):
         """Network half of a TMDb TV refresh; see tmdb_movie_fetch."""
 
@@ -595,6 +691,19 @@ class TMDBMixin(object):
 
         requested_info = "aggregate_credits,external_ids,keywords"
         current_app.logger.info(f"{self} Getting TMDB data")
+
+        # Season blocks ride in the base request too, up to TMDb's
+        # 20-item append limit: the seasons the stored snapshot already
+        # says will need fetching, so a nightly refresh of a running
+        # show is usually this one request
+
+        snapshot = self.tmdb_season_snapshot()
+        early_seasons = snapshot["likely_stale"][
+            : TMDB_APPEND_LIMIT - len(requested_info.split(","))
+        ]
+        base_append = ",".join(
+            [requested_info] + [f"season/{n}" for n in early_seasons]
+        )
         if tmdb_id == None:
             r = tmdb_get(
                 tmdb_api_url + "/search/tv",
@@ -615,7 +724,7 @@ class TMDBMixin(object):
                     tmdb_api_url + "/tv/" + str(tmdb_id),
                     params={
                         "api_key": tmdb_api_key,
-                        "append_to_response": requested_info,
+                        "append_to_response": base_append,
                     },
                 )
                 r.raise_for_status()
@@ -642,41 +751,62 @@ class TMDBMixin(object):
             current_app.logger.debug(f"{r.url}: {r.json()}")
             tmdb_info = r.json()
 
-            # Episode payloads: the base payload lists the seasons;
-            # fetch each one's episode block in appended batches (TMDb
-            # caps append_to_response at 20). A failed batch is logged
-            # and skipped — the apply side only touches seasons present
-            # in the payload, so a miss leaves that season's stored
-            # episodes alone instead of deleting them.
-
-            season_numbers = [
-                season.get("season_number")
-                for season in tmdb_info.get("seasons", [])
-                if season.get("season_number") is not None
+            # Episode payloads: the base payload lists the seasons; of
+            # those, fetch the ones that changed since the stored snapshot
+            # and didn't already arrive with it, in appended batches
+            # (TMDb caps append_to_response at 20) requested side by
+            # side. A failed batch is logged and skipped — the apply side
+            # only touches seasons present in the payload, so a miss
+            # leaves that season's stored episodes alone instead of
+            # deleting them.
+
+            stale = tmdb_stale_seasons(tmdb_info, snapshot)
+            wanted = [n for n in stale if f"season/{n}" not in tmdb_info]
+            batches = [
+                wanted[start : start + TMDB_APPEND_LIMIT]
+                for start in range(0, len(wanted), TMDB_APPEND_LIMIT)
             ]
-            for start in range(0, len(season_numbers), 20):
-                batch = season_numbers[start : start + 20]
+            flask_app = current_app._get_current_object()
+            label = str(self)
+
+            def fetch_batch(batch):
+                """One batch of season blocks, or None if it failed."""
+
                 appended = ",".join(f"season/{n}" for n in batch)
-                try:
-                    r = tmdb_get(
-                        tmdb_api_url + "/tv/" + str(tmdb_id),
-                        params={
-                            "api_key": tmdb_api_key,
-                            "append_to_response": appended,
-                        },
-                    )
-                    r.raise_for_status()
-                except requests.exceptions.RequestException:
-                    current_app.logger.warning(
-                        f"{self} Season batch '{appended}' failed, skipping"
-                    )
-                    continue
+                with flask_app.app_context():
+                    try:
+                        r = tmdb_get(
+                            tmdb_api_url + "/tv/" + str(tmdb_id),
+                            params={
+                                "api_key": tmdb_api_key,
+                                "append_to_response": appended,
+                            },
+                        )
+                        r.raise_for_status()
+                        return r.json()
+                    except requests.exceptions.RequestException:
+                        current_app.logger.warning(
+                            f"{label} Season batch '{appended}' failed, skipping"
+                        )
+                        return None
 
-                season_payload = r.json()
-                for n in batch:
-                    block = season_payload.get(f"season/{n}")
-                    if block:
-                        tmdb_info[f"season/{n}"] = block
+            with ThreadPoolExecutor(max_workers=TMDB_SEASON_WORKERS) as executor:
+                for batch, season_payload in zip(
+                    batches, executor.map(fetch_batch, batches)
+                ):
+                    if not season_payload:
+                        continue
+                    for n in batch:
+                        block = season_payload.get(f"season/{n}")
+                        if block:
+                            tmdb_info[f"season/{n}"] = block
+
+            skipped = len(tmdb_info.get("seasons", [])) - len(stale)
+            if skipped > 0:
+                current_app.logger.info(
+                    f"{self} {skipped} season(s) unchanged since the last "
+                    "refresh, not fetched"
+                )
 
         return tmdb_info or None
 
@@ -1427,6 +1557,11 @@ class Movie(db.Model, TMDBMixin, Utilities):
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(220), nullable=False, index=True)
+
+    # Kept in step with title by _set_sort_title, so library orderings
+    # are an index scan instead of a per-row regexp_replace
+
+    sort_title = db.Column(db.String(220), index=True)
     year = db.Column(db.Integer, nullable=False, index=True)
     date_created = db.Column(
         db.DateTime, nullable=False, index=True, default=db.func.utc_timestamp()
@@ -1555,6 +1690,13 @@ class Movie(db.Model, TMDBMixin, Utilities):
 
     __table_args__ = (db.UniqueConstraint("title", "year"),)
 
+    @validates("title")
+    def _set_sort_title(self, key, title):
+        """Derive sort_title whenever the title is set."""
+
+        self.sort_title = sort_title(title)
+        return title
+
     def __repr__(self):
         return f"<Movie '{self.title} ({self.year})'>"
 
@@ -1564,6 +1706,7 @@ class TVSeries(db.Model, TMDBMixin):
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(220), nullable=False, unique=True, index=True)
+    sort_title = db.Column(db.String(220), index=True)
     date_created = db.Column(
         db.DateTime, nullable=False, index=True, default=db.func.utc_timestamp()
     )
@@ -1651,10 +1794,112 @@ class TVSeries(db.Model, TMDBMixin):
         cascade="all,delete",
     )
 
+    @validates("title")
+    def _set_sort_title(self, key, title):
+        """Derive sort_title whenever the title is set."""
+
+        self.sort_title = sort_title(title)
+        return title
+
     def __repr__(self):
         return f"<TVSeries '{self.title}'>"
 
 
+class TVSeasonSummary(db.Model):
+    """One owned season of a TV series as the TV library lists it: how
+    many episodes are on hand and the worst quality among each
+    episode's best copy.
+
+    Derived from File rows, never edited directly: app.tv_summary
+    recomputes a season whenever a commit adds, removes, or changes one
+    of its files, and the nightly rebuild catches anything written
+    around the ORM.
+    """
+
+    series_id = db.Column(
+        db.Integer,
+        db.ForeignKey("tv_series.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    season = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    episode_count = db.Column(db.Integer, nullable=False)
+    quality_id = db.Column(db.Integer, db.ForeignKey("ref_quality.id"))
+
+    # The worst quality among all of the season's files, best copy or
+    # not — the TV shopping list's measure
+
+    lowest_quality_id = db.Column(db.Integer, db.ForeignKey("ref_quality.id"))
+    date_updated = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f"<TVSeasonSummary {self.series_id} S{self.season:02d}>"
+
+
+class ShoppingListItem(db.Model):
+    """One line of the movie shopping list, precomputed: a film's best
+    copy of each edition (or, for a liked film with no copy, a row with
+    no file) with everything the filters and orderings read.
+
+    Derived from files, reviews, and the film's shopping and Criterion
+    fields by app.shopping_list, which recomputes a film's rows in the
+    same commit that changes any of them. The verdict columns carry what
+    the page's CASE expressions used to compute per view.
+    """
+
+    id = db.Column(db.Integer, primary_key=True)
+    movie_id = db.Column(
+        db.Integer,
+        db.ForeignKey("movie.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    file_id = db.Column(
+        db.Integer, db.ForeignKey("file.id", ondelete="CASCADE"), unique=True
+    )
+
+    # NULL when no copy is owned: those rows sit below every quality,
+    # at the "Not in library" end of the range
+
+    preference = db.Column(db.Integer, index=True)
+    criterion = db.Column(db.Boolean, nullable=False, default=False)
+
+    # No physical, SDTV, or HDTV copy of any kind: the digital-only view
+
+    digital_only = db.Column(db.Boolean, nullable=False, default=False)
+
+    # Household review aggregates across every user
+
+    rating = db.Column(db.Float)
+    review_count = db.Column(db.Integer, nullable=False, default=0)
+    liked_count = db.Column(db.Integer, nullable=False, default=0)
+
+    instruction = db.Column(db.String(64), nullable=False)
+    urgency = db.Column(db.Integer, nullable=False)
+    cart_priority = db.Column(db.Integer)
+    quality_order = db.Column(db.Integer)
+    cart_age = db.Column(db.DateTime)
+    sort_title = db.Column(db.String(220))
+    year = db.Column(db.Integer)
+    edition = db.Column(db.String(219))
+    date_added = db.Column(db.DateTime)
+
+    # The default view's ordering, so the page reads rows in index order
+
+    __table_args__ = (
+        db.Index(
+            "ix_shopping_list_item_order",
+            "urgency",
+            "cart_priority",
+            "quality_order",
+            "cart_age",
+            "sort_title",
+        ),
+    )
+
+    def __repr__(self):
+        return f"<ShoppingListItem {self.movie_id}:{self.file_id}>"
+
+
 class TVEpisode(db.Model):
     """One TMDb episode of a TV series: the season/episode slot's
     title, overview, air date, runtime, and still.
@@ -1945,9 +2190,11 @@ class File(db.Model):
 
         better_files = []
 
-        source_quality = RefQuality.query.filter_by(
-            quality_title=self.quality_title
-        ).first()
+        # Imported here because app.reference_data imports this module
+
+        from app.reference_data import reference_data
+
+        source_quality = reference_data().quality_by_title.get(self.quality_title)
 
         current_app.logger.debug(f"Import vars: {vars(self)}")
 
@@ -2348,9 +2595,10 @@ class MovieCrew(db.Model):
 class MovieAward(db.Model):
     """An award win or nomination for a film, read from Wikidata.
 
-    Rows are current-truth: the weekly refresh replaces a film's rows
-    wholesale, so absence means Wikidata lists nothing (or the film has
-    no Wikidata item) — coverage is strong for major ceremonies and
+    Rows are current-truth: the weekly refresh brings each changed
+    film's rows in line with Wikidata (writing just the difference), so
+    absence means Wikidata lists nothing (or the film has no Wikidata
+    item) — coverage is strong for major ceremonies and
     patchy for niche festivals, so surfaces must never imply
     completeness.
     """
@@ -0,0 +1,275 @@
+"""The movie page's view model (Oct 2026).
+
+The movie page is the app's most-visited, and it used to assemble the
+same household-wide facts on every view: the cast scroller walked the
+film's MovieCast rows and lazily loaded each role's credit — one query
+per actor, often fifty to a hundred on a big cast — and separate
+queries fetched the directors, genres, US certifications, awards,
+main-feature files, and extras. None of that depends on who's looking.
+
+Here it's gathered in a handful of queries (the cast joined to its
+credits in one) into a plain payload and kept in Redis per movie. A
+view is one pipelined read of that payload and two version counters;
+the route loads the Movie row itself and overlays only what is the
+viewer's own — their latest review, watchlist and not-interested
+state, and the estimate — at render time.
+
+Payloads are stamped with the versions they were built under. Writes
+to a film's row (every TMDb apply stamps tmdb_data_as_of, and the
+genre and certification collections hang off it), its cast, crew,
+awards, or files bump that film's counter; an edit to a shared credit
+or genre name bumps the household's. A stale stamp is a miss, so a
+build that races a write is never served. Bulk query deletes skip the
+session events, but the one that touches these tables — the TMDb
+apply's cast and crew wipe — always writes the Movie row too.
+"""
+
+import json
+import traceback
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session, joinedload
+
+from app import db
+from app.models import (
+    File,
+    Movie,
+    MovieAward,
+    MovieCast,
+    MovieCrew,
+    RefQuality,
+    RefTMDBCertification,
+    TMDBCredit,
+    TMDBGenre,
+    movie_certifications,
+    movie_genres,
+)
+
+DETAIL_KEY = "fitzflix:movie:detail:{movie_id}"
+GENERATION_KEY = "fitzflix:movie:detail:generation"
+VERSION_KEY = "fitzflix:movie:detail:version:{movie_id}"
+
+# A payload nobody has viewed in a week ages out on its own
+
+DETAIL_TTL = 7 * 86400
+
+# Rows whose writes change only their own film's payload
+
+_MOVIE_ROWS = (MovieCast, MovieCrew, MovieAward, File)
+
+# Shared rows whose renames can show on any film's page
+
+_SHARED_ROWS = (TMDBCredit, TMDBGenre)
+
+
+def build_movie_detail(movie_id):
+    """The user-independent part of a film's page, as JSON-ready data."""
+
+    cast = [
+        {
+            "id": role.starring.id,
+            "name": role.starring.name,
+            "profile_path": role.starring.tmdb_profile_path,
+            "character": role.character,
+        }
+        for role in MovieCast.query.options(joinedload(MovieCast.starring))
+        .filter(MovieCast.movie_id == movie_id)
+        .filter(MovieCast.credit_id.isnot(None))
+        .order_by(MovieCast.billing_order.asc())
+    ]
+
+    # (credit id, name) pairs so the directed-by line links to
+    # filmography pages, like the rating drive's featured card
+
+    directors = [
+        [credit_id, name]
+        for credit_id, name in db.session.query(TMDBCredit.id, TMDBCredit.name)
+        .join(MovieCrew, MovieCrew.credit_id == TMDBCredit.id)
+        .filter(MovieCrew.movie_id == movie_id)
+        .filter(MovieCrew.job == "Director")
+        .distinct()
+    ]
+    genres = [
+        [genre_id, name]
+        for genre_id, name in db.session.query(TMDBGenre.id, TMDBGenre.name)
+        .join(movie_genres, movie_genres.c.genre_id == TMDBGenre.id)
+        .filter(movie_genres.c.movie_id == movie_id)
+    ]
+    certifications = [
+        certification
+        for certification, in db.session.query(RefTMDBCertification.certification)
+        .join(
+            movie_certifications,
+            movie_certifications.c.certification_id == RefTMDBCertification.id,
+        )
+        .filter(movie_certifications.c.movie_id == movie_id)
+        .filter(RefTMDBCertification.country == "US")
+    ]
+    awards = [
+        {"award_name": award.award_name, "win": bool(award.win), "year": award.year}
+        for award in MovieAward.query.filter_by(movie_id=movie_id).order_by(
+            MovieAward.win.desc(), MovieAward.year.asc(), MovieAward.award_name.asc()
+        )
+    ]
+
+    # Main features best-first, the way the shopping list ranks them,
+    # then extras by name — one query for both
+
+    films = []
+    features = []
+    for file, quality_title in (
+        db.session.query(File, RefQuality.quality_title)
+        .outerjoin(RefQuality, RefQuality.id == File.quality_id)
+        .filter(File.movie_id == movie_id)
+        .order_by(
+            File.fullscreen.asc(),
+            File.edition.asc(),
+            RefQuality.preference.desc(),
+            File.basename.asc(),
+        )
+    ):
+        row = {
+            "id": file.id,
+            "basename": file.basename,
+            "edition": file.edition,
+            "fullscreen": bool(file.fullscreen),
+            "quality_title": quality_title,
+        }
+        if file.feature_type_id is None:
+            if quality_title is not None:
+                films.append(row)
+        else:
+            features.append(row)
+    features.sort(key=lambda row: row["basename"] or "")
+
+    return {
+        "cast": cast,
+        "directors": directors,
+        "genres": genres,
+        "certifications": certifications,
+        "awards": awards,
+        "films": films,
+        "features": features,
+    }
+
+
+def _decoded(value):
+    """A Redis reply as text."""
+
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _stamp(household, version):
+    """The versions a payload was built under."""
+
+    return f"{_decoded(household) or 0}:{_decoded(version) or 0}"
+
+
+def movie_detail(movie_id):
+    """A film's user-independent page data: the stored payload when
+    it's current, otherwise freshly built and stored. Redis trouble
+    degrades to a live build."""
+
+    movie_id = int(movie_id)
+    try:
+        pipe = current_app.redis.pipeline()
+        pipe.get(DETAIL_KEY.format(movie_id=movie_id))
+        pipe.get(GENERATION_KEY)
+        pipe.get(VERSION_KEY.format(movie_id=movie_id))
+        stored, household, version = pipe.execute()
+    except Exception:
+        current_app.logger.warning(traceback.format_exc())
+        return build_movie_detail(movie_id)
+
+    stamp = _stamp(household, version)
+    if stored:
+        try:
+            payload = json.loads(stored)
+            if payload.get("stamp") == stamp:
+                return payload["detail"]
+        except (ValueError, KeyError, TypeError):
+            pass
+
+    detail = build_movie_detail(movie_id)
+    try:
+        current_app.redis.set(
+            DETAIL_KEY.format(movie_id=movie_id),
+            json.dumps({"stamp": stamp, "detail": detail}, separators=(",", ":")),
+            ex=DETAIL_TTL,
+        )
+    except Exception:
+        current_app.logger.warning(traceback.format_exc())
+    return detail
+
+
+def invalidate_movie_detail(movie_ids=None):
+    """Retire stored payloads: the given films', or every film's for
+    None."""
+
+    pipe = current_app.redis.pipeline()
+    if movie_ids is None:
+        pipe.incr(GENERATION_KEY)
+    else:
+        for movie_id in movie_ids:
+            pipe.incr(VERSION_KEY.format(movie_id=int(movie_id)))
+    pipe.execute()
+
+
+def _collect(session):
+    """Note whose payloads the pending flush changes: movie ids, or
+    "household" for a shared row every film's page can show."""
+
+    touched = session.info.setdefault("movie_detail_changes", set())
+    written = list(session.new | session.deleted) + [
+        instance for instance in session.dirty if session.is_modified(instance)
+    ]
+    with session.no_autoflush:
+        for instance in written:
+            if isinstance(instance, Movie):
+                touched.add(instance.id)
+            elif isinstance(instance, _MOVIE_ROWS):
+                touched.add(instance.movie_id)
+            elif isinstance(instance, _SHARED_ROWS) and instance not in session.new:
+                touched.add("household")
+    touched.discard(None)
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_previous(session, flush_context, instances):
+    """Note the films written rows belong to before the flush — a
+    file moved to another film changes both pages."""
+
+    _collect(session)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_current(session, flush_context):
+    """Note them after it too — a new row only has its ids now."""
+
+    _collect(session)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changes(session):
+    """Retire the payloads the committed writes changed. Advisory: the
+    commit has landed whatever Redis says."""
+
+    touched = session.info.pop("movie_detail_changes", None)
+    if not touched or not has_app_context():
+        return
+    try:
+        if "household" in touched:
+            invalidate_movie_detail()
+            touched.discard("household")
+        if touched:
+            invalidate_movie_detail(touched)
+    except Exception:
+        current_app.logger.warning(traceback.format_exc())
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    """A rolled-back flush changed nothing."""
+
+    session.info.pop("movie_detail_changes", None)
@@ -24,6 +24,12 @@ seven days of TTL (matching the File Activity page's SQL window, so a
 landed card keeps its chips as long as it stays on the page), newest
 hundred files kept.
 
+A trail is a capped Redis list of JSON entries beside a small hash of
+the file's name and timestamps, and each event is applied by one Lua
+script (TRAIL_EVENT_SCRIPT) — one round trip, atomic against every
+other writer, where a WATCHed read-modify-write used to retry through
+the handoff races of a busy import.
+
 Trails are keyed by basename, and a file can be RENAMED mid-flight
 (the parse canonicalizes titles against existing series; container
 conversion swaps the extension to .mkv). Localization then calls
@@ -36,17 +42,29 @@ import hashlib
 import json
 import os
 import time
-import traceback
 
 from datetime import datetime
 
 from rq import Queue, SimpleWorker
+from rq.job import JobStatus
+
+from app.advisory import log_warning
+from app.job_metrics import record_job_metrics, start_measurement
+from app.profiling import finish_task_profile, start_task_profile
 
 FILE_KEY = "fitzflix:pipeline:file:{digest}"
+TRAIL_KEY = "fitzflix:pipeline:trail:{digest}"
 ALIAS_KEY = "fitzflix:pipeline:alias:{digest}"
 ACTIVE_KEY = "fitzflix:pipeline:active"
 TRAIL_TTL_SECONDS = 7 * 86400
 ACTIVE_LIMIT = 100
+TRAIL_LIMIT = 40
+
+# Jobs per TrackedQueue.enqueue_many transaction: big enough that a
+# fan-out costs a handful of round trips, small enough that no single
+# transaction holds Redis for long
+
+ENQUEUE_BATCH = 500
 
 
 def _basename_from_path(args, kwargs):
@@ -69,8 +87,8 @@ def _basename_from_second_arg(args, kwargs):
     return args[1] if len(args) > 1 else None
 
 
-def _basename_from_file_id(args, kwargs):
-    """The File record's basename, looked up by a leading file_id.
+def _file_basenames(file_ids):
+    """{file_id: basename} for File records, in one query.
 
     Enqueue-side hooks already run inside an app context (the test
     app's included — never trust the get_app() singleton in tests);
@@ -78,8 +96,8 @@ def _basename_from_file_id(args, kwargs):
     own app.
     """
 
-    if not args:
-        return None
+    if not file_ids:
+        return {}
     from flask import current_app
 
     from app import db
@@ -93,8 +111,17 @@ def _basename_from_file_id(args, kwargs):
     from app.models import File
 
     with flask_app.app_context():
-        file = db.session.get(File, args[0])
-        return file.basename if file else None
+        return dict(
+            db.session.query(File.id, File.basename).filter(File.id.in_(list(file_ids)))
+        )
+
+
+def _basename_from_file_id(args, kwargs):
+    """The File record's basename, looked up by a leading file_id."""
+
+    if not args:
+        return None
+    return _file_basenames([args[0]]).get(args[0])
 
 
 # Every per-file pipeline task, by rq function name: the stage label
@@ -137,6 +164,42 @@ def _stage_for(job):
     return basename, label
 
 
+def _func_name(func):
+    """The dotted name rq records for a job's function."""
+
+    if isinstance(func, str):
+        return func
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def _stages_for_batch(job_datas):
+    """[(basename, stage label) or None] for a batch of rq EnqueueData,
+    looking every file_id-keyed job's basename up in one query rather
+    than one per job."""
+
+    entries = [STAGES.get(_func_name(data.func)) for data in job_datas]
+    file_ids = {
+        data.args[0]
+        for data, entry in zip(job_datas, entries)
+        if entry is not None and entry[1] is _basename_from_file_id and data.args
+    }
+    basenames = _file_basenames(file_ids)
+
+    stages = []
+    for data, entry in zip(job_datas, entries):
+        if entry is None:
+            stages.append(None)
+            continue
+        label, extractor = entry
+        args = data.args or ()
+        if extractor is _basename_from_file_id:
+            basename = basenames.get(args[0]) if args else None
+        else:
+            basename = extractor(args, data.kwargs or {})
+        stages.append((basename, label) if basename else None)
+    return stages
+
+
 def _digest(basename):
     """The stable Redis key fragment for one file's trail."""
 
@@ -149,6 +212,17 @@ def _decode_trail(raw):
     return json.loads(raw) if raw else []
 
 
+def _trail_entries(connection, digest):
+    """A file's trail entries, oldest first — from its list, or from
+    the JSON field trails were kept in before the list, until the next
+    event converts them."""
+
+    raw = connection.lrange(TRAIL_KEY.format(digest=digest), 0, -1)
+    if raw:
+        return [json.loads(entry) for entry in raw]
+    return _decode_trail(connection.hget(FILE_KEY.format(digest=digest), "trail"))
+
+
 def _resolve_basename(connection, basename):
     """The basename's current identity, following the rename alias
     migrate_trail leaves behind — bounded, in case renames ever chain
@@ -165,6 +239,154 @@ def _resolve_basename(connection, basename):
     return basename
 
 
+# One stage event, applied inside Redis so it costs one round trip and
+# can never interleave with another writer's. It follows the rename
+# alias and derives the file's keys itself (Fitzflix runs one
+# standalone Redis, so keys outside KEYS are fine), converts a trail
+# still in the old JSON field, then applies the same rules the Python
+# read-modify-write loop did:
+#
+#   - the same job moving through its lifecycle updates its own entry
+#     in place — queued → started → done is one line, not three; a
+#     re-enqueued retry is a NEW job id, so it appends a fresh entry
+#     and the earlier failure stays visible. A task-emitted sub-stage
+#     shares its job's id but carries its own stage label, so it is
+#     its own line;
+#   - a sub-stage reports preparatory work inside its job (the staging
+#     copy precedes the localizing proper), so it slots in AHEAD of the
+#     job's own entry — the chips then read in pipeline order, not in
+#     order of first stamp (Glenn, Aug 2026);
+#   - a sub-stage event may adjust its job's own entry in the same
+#     write, so only one chip reads "running" at a time (Glenn, Aug
+#     20). Update-only — a sibling is never created;
+#   - the file's FIRST start is the running banners' sort anchor
+#     (Glenn's original banner-ordering ask): it never moves once set,
+#     so a file hopping queues keeps its place.
+#
+# KEYS: the active set. ARGV: basename, stage, status, job id, now,
+# "1" for a sub-stage, sibling stage and status ("" for none), TTL,
+# active-set score, active limit, trail cap, then the file, trail,
+# and alias key prefixes.
+
+TRAIL_EVENT_SCRIPT = """
+local basename = ARGV[1]
+local function digest_of(name)
+  return string.sub(redis.sha1hex(name), 1, 16)
+end
+for _ = 1, 4 do
+  local alias = redis.call("GET", ARGV[15] .. digest_of(basename))
+  if not alias or alias == basename then break end
+  basename = alias
+end
+local digest = digest_of(basename)
+local file_key = ARGV[13] .. digest
+local trail_key = ARGV[14] .. digest
+
+if redis.call("EXISTS", trail_key) == 0 then
+  local legacy = redis.call("HGET", file_key, "trail")
+  if legacy then
+    for _, entry in ipairs(cjson.decode(legacy)) do
+      redis.call("RPUSH", trail_key, cjson.encode(entry))
+    end
+  end
+end
+redis.call("HDEL", file_key, "trail")
+
+local stage, status, job, now = ARGV[2], ARGV[3], ARGV[4], ARGV[5]
+local entries = redis.call("LRANGE", trail_key, 0, -1)
+
+local function find(wanted)
+  for i = #entries, 1, -1 do
+    local entry = cjson.decode(entries[i])
+    if entry.job == job and entry.stage == wanted then return i end
+  end
+end
+
+local function update(index, new_status)
+  local entry = cjson.decode(entries[index])
+  entry.status = new_status
+  entry.at = now
+  entries[index] = cjson.encode(entry)
+  redis.call("LSET", trail_key, index - 1, entries[index])
+end
+
+local own = find(stage)
+if own then
+  update(own, status)
+else
+  local encoded = cjson.encode({stage = stage, status = status, at = now, job = job})
+  local pivot = nil
+  if ARGV[6] == "1" then
+    for i = 1, #entries do
+      if cjson.decode(entries[i]).job == job then
+        pivot = i
+        break
+      end
+    end
+  end
+  if pivot then
+    redis.call("LINSERT", trail_key, "BEFORE", entries[pivot], encoded)
+    table.insert(entries, pivot, encoded)
+  else
+    redis.call("RPUSH", trail_key, encoded)
+    table.insert(entries, encoded)
+  end
+end
+
+if ARGV[7] ~= "" then
+  local sibling = find(ARGV[7])
+  if sibling then update(sibling, ARGV[8]) end
+end
+redis.call("LTRIM", trail_key, -tonumber(ARGV[12]), -1)
+
+if status == "started" then
+  redis.call("HSETNX", file_key, "first_run", now)
+end
+redis.call("HSET", file_key, "basename", basename, "updated", now)
+redis.call("EXPIRE", file_key, ARGV[9])
+redis.call("EXPIRE", trail_key, ARGV[9])
+redis.call("ZADD", KEYS[1], ARGV[10], digest)
+redis.call("ZREMRANGEBYRANK", KEYS[1], 0, -(tonumber(ARGV[11]) + 1))
+return digest
+"""
+
+_trail_event_script = None
+
+
+def _trail_event(
+    client, basename, stage, status, job_id, before_job=False, sibling=None
+):
+    """Run the trail script for one event — or queue it, when client is
+    a pipeline. EVALSHA, loading the script the first time a server
+    hasn't seen it."""
+
+    global _trail_event_script
+    if _trail_event_script is None:
+        _trail_event_script = client.register_script(TRAIL_EVENT_SCRIPT)
+    sibling_stage, sibling_status = sibling or ("", "")
+    return _trail_event_script(
+        keys=[ACTIVE_KEY],
+        args=[
+            basename,
+            stage,
+            status,
+            job_id,
+            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "1" if before_job else "",
+            sibling_stage,
+            sibling_status,
+            TRAIL_TTL_SECONDS,
+            time.time(),
+            ACTIVE_LIMIT,
+            TRAIL_LIMIT,
+            FILE_KEY.format(digest=""),
+            TRAIL_KEY.format(digest=""),
+            ALIAS_KEY.format(digest=""),
+        ],
+        client=client,
+    )
+
+
 def _write_trail_entry(
     connection, basename, stage, status, job_id, before_job=False, sibling=None
 ):
@@ -174,99 +396,14 @@ def _write_trail_entry(
     starts the instant the localization task enqueues it, so the
     file-operation worker's "started" stamp races the import worker's
     "done" stamp for the stage before it. A plain read-modify-write
-    lets whichever lands second erase the other's update (the trails revisit froze
-    two files at "Localizing · running" forever), so the write WATCHes
-    the trail key and retries from a fresh read when it changed
-    underneath. Bounded retries: the trail is advisory, never worth
-    stalling a worker over.
+    lets whichever lands second erase the other's update (the trails
+    revisit froze two files at "Localizing · running" forever). The
+    write used to WATCH the trail and retry; it is now one script run
+    inside Redis, which no other write can interleave with, so an event
+    costs one round trip however busy the handoff.
     """
 
-    from redis import WatchError
-
-    basename = _resolve_basename(connection, basename)
-    digest = _digest(basename)
-    key = FILE_KEY.format(digest=digest)
-
-    for _ in range(10):
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        with connection.pipeline() as pipe:
-            try:
-                pipe.watch(key)
-                trail = _decode_trail(pipe.hget(key, "trail"))
-
-                # The same job moving through its lifecycle updates its
-                # own entry — queued → started → done is one line, not
-                # three; a re-enqueued retry is a NEW job id, so it
-                # appends a fresh entry and the earlier failure stays
-                # visible. A task-emitted sub-stage shares its job's id
-                # but carries its own stage label, so it is its own line.
-
-                for entry in reversed(trail):
-                    if entry.get("job") == job_id and entry.get("stage") == stage:
-                        entry["status"] = status
-                        entry["at"] = now
-                        break
-                else:
-                    # A sub-stage reports preparatory work inside its job
-                    # (the staging copy precedes the localizing proper),
-                    # so it slots in AHEAD of the job's own entry — the
-                    # chips then read in pipeline order, not in order of
-                    # first stamp, which the job-level entry always wins
-                    # by existing from enqueue time (Glenn, Aug 2026)
-
-                    index = len(trail)
-                    if before_job:
-                        for position, existing in enumerate(trail):
-                            if existing.get("job") == job_id:
-                                index = position
-                                break
-                    trail.insert(
-                        index,
-                        {"stage": stage, "status": status, "at": now, "job": job_id},
-                    )
-
-                # A sub-stage event may adjust its job's own entry in the
-                # same atomic write, so only one chip reads "running" at a
-                # time (Glenn, Aug 20): the job chip drops to "queued"
-                # while its sub-stage runs and resumes "started" after.
-                # Update-only — a sibling is never created here
-
-                if sibling is not None:
-                    sibling_stage, sibling_status = sibling
-                    for entry in reversed(trail):
-                        if (
-                            entry.get("job") == job_id
-                            and entry.get("stage") == sibling_stage
-                        ):
-                            entry["status"] = sibling_status
-                            entry["at"] = now
-                            break
-                del trail[:-40]
-
-                pipe.multi()
-
-                # The file's FIRST start is the running banners' sort
-                # anchor (Glenn's original banner-ordering ask): it never moves once
-                # set, so a file hopping queues keeps its place
-
-                if status == "started":
-                    pipe.hsetnx(key, "first_run", now)
-
-                pipe.hset(
-                    key,
-                    mapping={
-                        "basename": basename,
-                        "trail": json.dumps(trail),
-                        "updated": now,
-                    },
-                )
-                pipe.expire(key, TRAIL_TTL_SECONDS)
-                pipe.zadd(ACTIVE_KEY, {digest: time.time()})
-                pipe.zremrangebyrank(ACTIVE_KEY, 0, -(ACTIVE_LIMIT + 1))
-                pipe.execute()
-                return
-            except WatchError:
-                continue
+    _trail_event(connection, basename, stage, status, job_id, before_job, sibling)
 
 
 def migrate_trail(connection, old_basename, new_basename):
@@ -282,7 +419,8 @@ def migrate_trail(connection, old_basename, new_basename):
     move's "queued" stamp already lands on the merged trail; an alias
     redirects the writes that arrive under the old name AFTER the
     rename (the localization worker's own "done" stamp fires once the
-    task body returns) onto it too. Advisory like every hook: failures
+    task body returns) onto it too. Once per renamed file, so it keeps
+    its WATCHed read-modify-write. Advisory like every hook: failures
     are logged and swallowed, bounded retries."""
 
     try:
@@ -294,14 +432,16 @@ def migrate_trail(connection, old_basename, new_basename):
         new_digest = _digest(new_basename)
         old_key = FILE_KEY.format(digest=old_digest)
         new_key = FILE_KEY.format(digest=new_digest)
+        old_trail_key = TRAIL_KEY.format(digest=old_digest)
+        new_trail_key = TRAIL_KEY.format(digest=new_digest)
         alias_key = ALIAS_KEY.format(digest=old_digest)
 
         for _ in range(10):
             now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             with connection.pipeline() as pipe:
                 try:
-                    pipe.watch(old_key, new_key)
-                    old_trail = _decode_trail(pipe.hget(old_key, "trail"))
+                    pipe.watch(old_key, new_key, old_trail_key, new_trail_key)
+                    old_trail = _trail_entries(pipe, old_digest)
                     old_first = pipe.hget(old_key, "first_run")
 
                     # Nothing recorded under the old name (expired, or
@@ -317,23 +457,26 @@ def migrate_trail(connection, old_basename, new_basename):
                     # already under the new name; the current run's
                     # entries are newer, so they append after
 
-                    merged = _decode_trail(pipe.hget(new_key, "trail")) + old_trail
-                    del merged[:-40]
+                    merged = _trail_entries(pipe, new_digest) + old_trail
+                    del merged[:-TRAIL_LIMIT]
 
                     pipe.multi()
                     if old_first is not None:
                         pipe.hsetnx(new_key, "first_run", old_first)
+                    pipe.hdel(new_key, "trail")
                     pipe.hset(
                         new_key,
-                        mapping={
-                            "basename": new_basename,
-                            "trail": json.dumps(merged),
-                            "updated": now,
-                        },
+                        mapping={"basename": new_basename, "updated": now},
                     )
                     pipe.expire(new_key, TRAIL_TTL_SECONDS)
+                    pipe.delete(new_trail_key)
+                    if merged:
+                        pipe.rpush(
+                            new_trail_key, *[json.dumps(entry) for entry in merged]
+                        )
+                        pipe.expire(new_trail_key, TRAIL_TTL_SECONDS)
                     pipe.set(alias_key, new_basename, ex=TRAIL_TTL_SECONDS)
-                    pipe.delete(old_key)
+                    pipe.delete(old_key, old_trail_key)
                     pipe.zrem(ACTIVE_KEY, old_digest)
                     pipe.zadd(ACTIVE_KEY, {new_digest: time.time()})
                     pipe.zremrangebyrank(ACTIVE_KEY, 0, -(ACTIVE_LIMIT + 1))
@@ -342,12 +485,7 @@ def migrate_trail(connection, old_basename, new_basename):
                 except WatchError:
                     continue
     except Exception:
-        try:
-            from flask import current_app
-
-            current_app.logger.warning(traceback.format_exc())
-        except Exception:
-            pass
+        log_warning()
 
 
 def record_job_event(connection, job, event):
@@ -362,12 +500,7 @@ def record_job_event(connection, job, event):
         basename, stage = found
         _write_trail_entry(connection, basename, stage, event, job.id)
     except Exception:
-        try:
-            from flask import current_app
-
-            current_app.logger.warning(traceback.format_exc())
-        except Exception:
-            pass
+        log_warning()
 
 
 def record_task_stage(stage, status):
@@ -410,12 +543,7 @@ def record_task_stage(stage, status):
             sibling=sibling,
         )
     except Exception:
-        try:
-            from flask import current_app
-
-            current_app.logger.warning(traceback.format_exc())
-        except Exception:
-            pass
+        log_warning()
 
 
 def first_run(connection, job):
@@ -441,16 +569,25 @@ def pipeline_trails(connection, limit=25):
 
     Each entry carries the rq job id it was stamped by, which is how a
     queue-page row finds its own file's trail: exact, with no
-    basename-versus-description matching to go stale."""
+    basename-versus-description matching to go stale. Every trail on
+    the page is read in one pipelined call."""
 
     trails = []
     try:
-        digests = connection.zrevrange(ACTIVE_KEY, 0, limit - 1)
+        digests = [
+            digest.decode() if isinstance(digest, bytes) else digest
+            for digest in connection.zrevrange(ACTIVE_KEY, 0, limit - 1)
+        ]
+        pipe = connection.pipeline(transaction=False)
         for digest in digests:
-            digest = digest.decode() if isinstance(digest, bytes) else digest
-            data = connection.hgetall(FILE_KEY.format(digest=digest))
+            pipe.hgetall(FILE_KEY.format(digest=digest))
+            pipe.lrange(TRAIL_KEY.format(digest=digest), 0, -1)
+        replies = pipe.execute()
+
+        expired = []
+        for digest, data, raw_entries in zip(digests, replies[::2], replies[1::2]):
             if not data:
-                connection.zrem(ACTIVE_KEY, digest)
+                expired.append(digest)
                 continue
             decoded = {
                 (k.decode() if isinstance(k, bytes) else k): (
@@ -458,6 +595,11 @@ def pipeline_trails(connection, limit=25):
                 )
                 for k, v in data.items()
             }
+            stored = (
+                [json.loads(entry) for entry in raw_entries]
+                if raw_entries
+                else _decode_trail(decoded.get("trail"))
+            )
             entries = [
                 {
                     "stage": entry.get("stage"),
@@ -465,7 +607,7 @@ def pipeline_trails(connection, limit=25):
                     "at": entry.get("at"),
                     "job": entry.get("job"),
                 }
-                for entry in json.loads(decoded.get("trail") or "[]")
+                for entry in stored
             ]
             trails.append(
                 {
@@ -474,13 +616,10 @@ def pipeline_trails(connection, limit=25):
                     "entries": entries,
                 }
             )
+        if expired:
+            connection.zrem(ACTIVE_KEY, *expired)
     except Exception:
-        try:
-            from flask import current_app
-
-            current_app.logger.warning(traceback.format_exc())
-        except Exception:
-            pass
+        log_warning()
     return trails
 
 
@@ -498,6 +637,61 @@ class TrackedQueue(Queue):
         record_job_event(self.connection, job, "queued")
         return job
 
+    def enqueue_many(self, job_datas, pipeline=None, group_id=None):
+        """Enqueue many jobs (from Queue.prepare_data) a batch at a time,
+        each batch one transaction with its "queued" trail stamps — a
+        whole-library fan-out is a few round trips per thousand jobs,
+        not several per job. A caller's own pipeline gets the stamps
+        queued on it unwatched."""
+
+        job_datas = list(job_datas)
+        jobs = []
+        for start in range(0, len(job_datas), ENQUEUE_BATCH):
+            jobs += self._enqueue_batch(
+                job_datas[start : start + ENQUEUE_BATCH], pipeline, group_id
+            )
+        return jobs
+
+    def _enqueue_batch(self, job_datas, pipeline, group_id):
+        """One enqueue_many batch: the jobs and a trail-script run per
+        pipeline job, sent as one transaction."""
+
+        # rq enqueues a batch's dependency-free jobs first, in order;
+        # only those are queued now, so only those are stamped
+
+        immediate = [data for data in job_datas if not data.depends_on]
+        try:
+            stages = [
+                (index, entry)
+                for index, entry in enumerate(_stages_for_batch(immediate))
+                if entry is not None
+            ]
+        except Exception:
+            log_warning()
+            stages = []
+
+        pipe = pipeline if pipeline is not None else self.connection.pipeline()
+        jobs = super().enqueue_many(job_datas, pipeline=pipe, group_id=group_id)
+        for index, (basename, stage) in stages:
+            _trail_event(pipe, basename, stage, "queued", jobs[index].id)
+        if pipeline is None:
+            # A trail script that fails mustn't fail the enqueue, which
+            # has landed regardless: the trail is advisory
+
+            failures = [
+                reply
+                for reply in pipe.execute(raise_on_error=False)
+                if isinstance(reply, Exception)
+            ]
+            if failures:
+                try:
+                    from flask import current_app
+
+                    current_app.logger.warning(f"Trail stamps failed: {failures[0]!r}")
+                except Exception:
+                    pass
+        return jobs
+
     def schedule_job(self, job, datetime, pipeline=None, unique=False):
         """Schedule and stamp the trail: a deferred retry is booked."""
 
@@ -508,13 +702,28 @@ class TrackedQueue(Queue):
 
 class PipelineWorker(SimpleWorker):
     """A SimpleWorker that stamps the trail around execution: started
-    when a job is picked up, done or failed when it lands."""
+    when a job is picked up, done or failed when it lands — and records
+    every job's timings and resource use in app.job_metrics, pipeline
+    or not, profiling the task types app.profiling has switched on."""
 
     def execute_job(self, job, queue):
-        """Stamp started, then run the job as SimpleWorker does."""
+        """Stamp started, then run the job as SimpleWorker does,
+        measuring it from pickup to landing."""
 
         record_job_event(self.connection, job, "started")
-        return super().execute_job(job, queue)
+        measurement = start_measurement(job)
+        profile = start_task_profile(self.connection, job)
+        try:
+            return super().execute_job(job, queue)
+        finally:
+            finish_task_profile(self.connection, profile)
+            record_job_metrics(
+                self.connection,
+                job,
+                queue.name,
+                measurement,
+                job.get_status(refresh=False) == JobStatus.FINISHED,
+            )
 
     def handle_job_success(self, job, queue, started_job_registry):
         """Run rq's success handling, then stamp the trail done."""
@@ -0,0 +1,132 @@
+"""Custom poster derivatives (Oct 2026).
+
+A custom poster — uploaded, or picked from TMDb's gallery, which
+arrives as the full-size original — is served at six widths. Making
+them used to open the image twice (once to verify it, once to work),
+copy the full-resolution decode for every width and shrink each copy
+from scratch, then re-encode the original too, all inside the web
+request; a large scanned poster held the page for seconds.
+
+Here the upload is decoded once. A JPEG decodes through Pillow's
+draft mode, which has libjpeg scale by 1/2, 1/4, or 1/8 while
+decoding, to the smallest scale still at least as big as the widest
+derivative — a 6000px scan is never held at full size. Each width is
+then resized from the next-larger one rather than from the source, so
+every step is a small reduction. The original is written as uploaded
+(no re-encode), and the widths are encoded at once on a few threads —
+Pillow releases the GIL while encoding — so the request waits about
+as long as the widest encode rather than all six in a row. It does
+wait for them: custom posters are served from /static/, which the
+service worker caches first, so nothing but a poster's final bytes
+may ever sit at its path.
+
+JPEG derivatives are progressive, so even a slow connection paints
+the whole poster early. Every file lands by rename, never half-written.
+"""
+
+import io
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+from app.artwork import write_atomically
+
+# Widest first: each width is resized from the one before it
+
+DERIVATIVE_WIDTHS = (780, 500, 342, 185, 154, 92)
+
+# The 780px encode costs more than the five narrower ones together, so
+# a few threads finish the set in about the time it takes
+
+ENCODER_THREADS = 3
+
+JPEG_QUALITY = 95
+
+
+def decode_poster(data, filename):
+    """The poster in data, decoded once — at reduced scale for a JPEG
+    much wider than the widest derivative. Raises ValueError with a
+    flash-ready message for anything that isn't a usable poster."""
+
+    # Pillow loads with the first poster rather than with the blueprint
+
+    from PIL import Image
+
+    try:
+        image = Image.open(io.BytesIO(data))
+    except Exception:
+        raise ValueError(f"'{filename}' is corrupted!")
+    current_app.logger.info(f"Uploaded poster format: {image.format}")
+    if image.format not in ["JPEG", "PNG"]:
+        raise ValueError(f"'{image.format}' is not an appropriate file type!")
+
+    width, height = image.size
+    if image.format == "JPEG" and width > DERIVATIVE_WIDTHS[0]:
+        widest = DERIVATIVE_WIDTHS[0]
+        image.draft(image.mode, (widest, max(1, height * widest // width)))
+    try:
+        image.load()
+    except Exception:
+        raise ValueError(f"'{filename}' is corrupted!")
+    return image
+
+
+def cascade(image):
+    """[(width, image)] for every derivative width, widest first, each
+    resized from the previous one. Like thumbnail(), never enlarges: a
+    poster narrower than a width is kept at its own size there."""
+
+    from PIL import Image
+
+    derivatives = []
+    current = image
+    for width in DERIVATIVE_WIDTHS:
+        if current.width > width:
+            height = max(1, round(current.height * width / current.width))
+            current = current.resize((width, height), Image.Resampling.LANCZOS)
+        derivatives.append((width, current))
+    return derivatives
+
+
+def encode(image, image_format):
+    """A derivative's bytes in the original's format."""
+
+    buffer = io.BytesIO()
+    if image_format == "JPEG":
+        image.save(
+            buffer, "JPEG", quality=JPEG_QUALITY, progressive=True, optimize=True
+        )
+    else:
+        image.save(buffer, image_format, optimize=True)
+    return buffer.getvalue()
+
+
+def build_poster_derivatives(
+    data, poster_filename, custom_poster_dir, source_name=None
+):
+    """Write a poster's original and its derivatives under
+    custom_poster_dir, all on disk when this returns. Returns the
+    original's path."""
+
+    image = decode_poster(data, source_name or poster_filename)
+    image_format = image.format
+
+    original_file = os.path.join(custom_poster_dir, "original", poster_filename)
+    write_atomically(original_file, data)
+
+    def write_derivative(derivative):
+        width, resized = derivative
+        write_atomically(
+            os.path.join(custom_poster_dir, f"w{width}", poster_filename),
+            encode(resized, image_format),
+        )
+
+    derivatives = cascade(image)
+    with ThreadPoolExecutor(
+        max_workers=ENCODER_THREADS, thread_name_prefix="poster-encoder"
+    ) as pool:
+        list(pool.map(write_derivative, derivatives))
+    current_app.logger.info(f"'{original_file}' Wrote {len(derivatives)} derivatives")
+    return original_file
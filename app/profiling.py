@@ -0,0 +1,564 @@
+"""Opt-in profiling for web requests and rq jobs (Oct 2026).
+
+Working out why a page or a task is slow used to mean reading code.
+An admin can now add ?profile=1 to any page (?profile=cpu also samples
+the CPU), or switch profiling on for a task type from the System page,
+and get a stored report covering:
+
+- every SQL statement, grouped by its text with IN-lists collapsed,
+  with counts, total time, and the app line that first issued it;
+- Redis commands and round trips, a pipeline counting as one;
+- outbound HTTP calls, grouped by service (TMDb, Wikidata, Plex, AWS,
+  or the host);
+- optionally, a sampled CPU profile of the profiled thread: its stack
+  every few milliseconds, folded into the hottest stacks and functions.
+
+A SELECT repeated N_PLUS_ONE_THRESHOLD times or more within one profile
+is flagged as a likely N+1: a query inside a loop that one eager load
+or IN-query would replace.
+
+The hooks are installed once per process and cost one ContextVar read
+per SQL statement, Redis command, or HTTP call when nothing is being
+profiled. Only the profiled request's or job's own thread is measured;
+work it hands to a thread pool isn't. Reports live in Redis for a
+week, the newest REPORTS_KEPT listed on the System page.
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+import traceback
+import uuid
+
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from app.advisory import log_warning
+
+REPORT_KEY = "fitzflix:profile:report:{report_id}"
+REPORTS_KEY = "fitzflix:profile:reports"
+
+# {task function name: "counts" or "cpu"} for the task types being
+# profiled
+
+TASKS_KEY = "fitzflix:profile:tasks"
+
+REPORT_TTL_SECONDS = 7 * 86400
+REPORTS_KEPT = 50
+
+N_PLUS_ONE_THRESHOLD = 10
+SAMPLE_INTERVAL = 0.005
+STACK_DEPTH = 30
+TOP_ENTRIES = 25
+
+_active = ContextVar("fitzflix_profile", default=None)
+_installed = False
+_aws_installed = False
+
+_APP_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+_THIS_FILE = os.path.abspath(__file__)
+
+# An IN-list of bound parameters, however long, reads as one statement
+
+_IN_LIST = re.compile(
+    r"\((?:\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*,)+\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*\)"
+)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement):
+    """A statement's grouping key: whitespace folded and IN-lists of
+    parameters collapsed to one."""
+
+    return _IN_LIST.sub("(?…)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def _app_origin():
+    """ "app/module.py:line in function" for the innermost app frame on
+    the stack, outside this module — where a statement came from."""
+
+    for frame in reversed(traceback.extract_stack()):
+        filename = os.path.abspath(frame.filename)
+        if filename.startswith(_APP_DIR) and filename != _THIS_FILE:
+            return f"app/{filename[len(_APP_DIR):]}:{frame.lineno} in {frame.name}"
+    return None
+
+
+def _service(url, plex_host=None):
+    """The service an outbound URL belongs to, for grouping."""
+
+    host = (urlsplit(url).hostname or "").lower()
+    if host.endswith("themoviedb.org") or host.endswith("tmdb.org"):
+        return "TMDb"
+    if host.endswith("wikidata.org"):
+        return "Wikidata"
+    if host.endswith("plex.tv") or host.endswith("plex.direct"):
+        return "Plex"
+    if plex_host and host == plex_host:
+        return "Plex"
+    return host or "other"
+
+
+class _Sampler(threading.Thread):
+    """Samples one thread's stack every SAMPLE_INTERVAL until stopped."""
+
+    def __init__(self, thread_id):
+        super().__init__(name="fitzflix-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.stacks = Counter()
+        self.samples = 0
+        self._done = threading.Event()
+
+    def run(self):
+        """Fold a sample of the target thread's stack until stopped."""
+
+        while not self._done.wait(SAMPLE_INTERVAL):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None and len(stack) < STACK_DEPTH:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[tuple(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self):
+        """Stop sampling and wait for the thread to finish."""
+
+        self._done.set()
+        self.join()
+
+
+class Profile:
+    """What one profiled request or job did, gathered by the hooks while
+    it's the active profile."""
+
+    def __init__(self, kind, name, cpu=False, plex_host=None):
+        self.kind = kind
+        self.name = name
+        self.cpu = cpu
+        self.plex_host = plex_host
+        self.sql = {}
+        self.redis_commands = Counter()
+        self.redis_round_trips = 0
+        self.http = {}
+        self._sampler = None
+        self._token = None
+
+    def start(self):
+        """Make this the active profile for the current context."""
+
+        self.started_at = datetime.utcnow()
+        self._clock = time.perf_counter()
+        self._token = _active.set(self)
+        if self.cpu:
+            self._sampler = _Sampler(threading.get_ident())
+            self._sampler.start()
+
+    def stop(self):
+        """Stop gathering; safe to call more than once."""
+
+        if self._token is not None:
+            _active.reset(self._token)
+            self._token = None
+            self.wall_ms = (time.perf_counter() - self._clock) * 1000
+        if self._sampler is not None:
+            self._sampler.stop()
+
+    def record_sql(self, statement, elapsed):
+        """One executed statement."""
+
+        key = normalize_sql(statement)
+        entry = self.sql.get(key)
+        if entry is None:
+            entry = self.sql[key] = {"count": 0, "ms": 0.0, "origin": _app_origin()}
+        entry["count"] += 1
+        entry["ms"] += elapsed * 1000
+
+    def record_redis(self, commands):
+        """One round trip carrying these command names."""
+
+        self.redis_round_trips += 1
+        for command in commands:
+            self.redis_commands[str(command).upper()] += 1
+
+    def record_http(self, service, call, elapsed):
+        """One outbound call."""
+
+        entry = self.http.setdefault(
+            service, {"count": 0, "ms": 0.0, "calls": Counter()}
+        )
+        entry["count"] += 1
+        entry["ms"] += elapsed * 1000
+        entry["calls"][call] += 1
+
+    def report(self):
+        """The profile as the JSON-able dict stored for the System page."""
+
+        statements = sorted(
+            (
+                {
+                    "statement": statement,
+                    "count": entry["count"],
+                    "ms": round(entry["ms"], 2),
+                    "origin": entry["origin"],
+                    "n_plus_one": entry["count"] >= N_PLUS_ONE_THRESHOLD
+                    and statement.upper().startswith("SELECT"),
+                }
+                for statement, entry in self.sql.items()
+            ),
+            key=lambda entry: (entry["n_plus_one"], entry["ms"]),
+            reverse=True,
+        )
+        report = {
+            "kind": self.kind,
+            "name": self.name,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "wall_ms": round(self.wall_ms, 1),
+            "sql": {
+                "count": sum(entry["count"] for entry in statements),
+                "ms": round(sum(entry["ms"] for entry in statements), 2),
+                "statements": statements,
+                "n_plus_one": sum(1 for entry in statements if entry["n_plus_one"]),
+            },
+            "redis": {
+                "round_trips": self.redis_round_trips,
+                "commands": dict(self.redis_commands.most_common()),
+            },
+            "http": {
+                service: {
+                    "count": entry["count"],
+                    "ms": round(entry["ms"], 1),
+                    "calls": dict(entry["calls"].most_common(TOP_ENTRIES)),
+                }
+                for service, entry in sorted(self.http.items())
+            },
+            "cpu": None,
+        }
+        if self._sampler is not None:
+            sampler = self._sampler
+            functions = Counter()
+            for stack, count in sampler.stacks.items():
+                if stack:
+                    functions[stack[-1]] += count
+            report["cpu"] = {
+                "samples": sampler.samples,
+                "interval_ms": SAMPLE_INTERVAL * 1000,
+                "stacks": [
+                    {"stack": list(stack), "count": count}
+                    for stack, count in sampler.stacks.most_common(TOP_ENTRIES)
+                ],
+                "functions": functions.most_common(TOP_ENTRIES),
+            }
+        return report
+
+    def save(self, connection):
+        """Store the report and list it; returns its id, or None if
+        Redis couldn't take it."""
+
+        report_id = uuid.uuid4().hex[:12]
+        report = self.report()
+        try:
+            pipe = connection.pipeline(transaction=False)
+            pipe.set(
+                REPORT_KEY.format(report_id=report_id),
+                json.dumps(report),
+                ex=REPORT_TTL_SECONDS,
+            )
+            pipe.zadd(REPORTS_KEY, {report_id: time.time()})
+            pipe.zremrangebyrank(REPORTS_KEY, 0, -REPORTS_KEPT - 1)
+            pipe.execute()
+        except Exception:
+            log_warning()
+            return None
+        return report_id
+
+
+def active_profile():
+    """The profile gathering in this context, or None."""
+
+    return _active.get()
+
+
+def _install_hooks():
+    """Hook SQLAlchemy, redis-py, and requests, once per process, and
+    botocore once it's loaded (see install_aws_hook). Each hook does
+    nothing unless a profile is active."""
+
+    global _installed
+    if _installed:
+        return
+    _installed = True
+
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        """Note when a statement started."""
+
+        if _active.get() is not None:
+            conn.info.setdefault("fitzflix_profile_started", []).append(
+                time.perf_counter()
+            )
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        """Record the statement against the active profile."""
+
+        profile = _active.get()
+        started = conn.info.get("fitzflix_profile_started")
+        if profile is not None and started:
+            profile.record_sql(statement, time.perf_counter() - started.pop())
+
+    import redis.client
+
+    execute_command = redis.client.Redis.execute_command
+    pipeline_execute = redis.client.Pipeline.execute
+
+    def profiled_execute_command(self, *args, **options):
+        """Redis.execute_command, counted."""
+
+        profile = _active.get()
+        if profile is not None and args:
+            profile.record_redis([args[0]])
+        return execute_command(self, *args, **options)
+
+    def profiled_pipeline_execute(self, *args, **kwargs):
+        """Pipeline.execute, counted as one round trip."""
+
+        profile = _active.get()
+        if profile is not None and self.command_stack:
+            profile.record_redis(
+                [command_args[0] for command_args, _ in self.command_stack]
+            )
+        return pipeline_execute(self, *args, **kwargs)
+
+    redis.client.Redis.execute_command = profiled_execute_command
+    redis.client.Pipeline.execute = profiled_pipeline_execute
+
+    import requests.sessions
+
+    session_request = requests.sessions.Session.request
+
+    def profiled_request(self, method, url, *args, **kwargs):
+        """Session.request, timed against the service it calls."""
+
+        profile = _active.get()
+        if profile is None:
+            return session_request(self, method, url, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return session_request(self, method, url, *args, **kwargs)
+        finally:
+            parts = urlsplit(url)
+            profile.record_http(
+                _service(url, profile.plex_host),
+                f"{method.upper()} {parts.path}",
+                time.perf_counter() - started,
+            )
+
+    requests.sessions.Session.request = profiled_request
+
+    # botocore costs a worker about 0.1s to import, so its hook waits
+    # for the first AWS client (see aws_client) unless it's loaded already
+
+    if "botocore.client" in sys.modules:
+        install_aws_hook()
+
+
+def install_aws_hook():
+    """Hook botocore, once per process, so AWS calls are timed. Inert
+    until a profile is active, like the other hooks."""
+
+    global _aws_installed
+    if _aws_installed:
+        return
+    _aws_installed = True
+
+    import botocore.client
+
+    make_api_call = botocore.client.BaseClient._make_api_call
+
+    def profiled_api_call(self, operation_name, api_params):
+        """A boto3 call, timed as AWS."""
+
+        profile = _active.get()
+        if profile is None:
+            return make_api_call(self, operation_name, api_params)
+        started = time.perf_counter()
+        try:
+            return make_api_call(self, operation_name, api_params)
+        finally:
+            profile.record_http(
+                "AWS",
+                f"{self.meta.service_model.service_name} {operation_name}",
+                time.perf_counter() - started,
+            )
+
+    botocore.client.BaseClient._make_api_call = profiled_api_call
+
+
+def _plex_host(config):
+    """The configured Plex server's host, so local calls group as Plex."""
+
+    return urlsplit(config.get("PLEX_URL") or "").hostname
+
+
+def install(app):
+    """Install the hooks and the ?profile= request switch on an app."""
+
+    from flask import g, request, url_for
+    from flask_login import current_user
+
+    _install_hooks()
+
+    @app.before_request
+    def _start_request_profile():
+        """Start profiling an admin's request that asks for it."""
+
+        mode = request.args.get("profile")
+        if mode not in ("1", "cpu"):
+            return
+        if not (current_user.is_authenticated and current_user.admin):
+            return
+        profile = Profile(
+            "request",
+            f"{request.method} {request.endpoint or request.path}",
+            cpu=mode == "cpu",
+            plex_host=_plex_host(app.config),
+        )
+        profile.start()
+        g.fitzflix_profile = profile
+
+    @app.after_request
+    def _finish_request_profile(response):
+        """Store the request's report and point to it from a header."""
+
+        profile = g.pop("fitzflix_profile", None)
+        if profile is not None:
+            profile.stop()
+            report_id = profile.save(app.redis)
+            if report_id:
+                response.headers["X-Fitzflix-Profile"] = url_for(
+                    "main.profile_report", report_id=report_id
+                )
+        return response
+
+    @app.teardown_request
+    def _discard_request_profile(error=None):
+        """A request that raised still releases its profile."""
+
+        profile = g.pop("fitzflix_profile", None)
+        if profile is not None:
+            profile.stop()
+
+
+def profiled_tasks(connection):
+    """{task function name: mode} for the task types being profiled."""
+
+    return {
+        (name.decode() if isinstance(name, bytes) else name): (
+            mode.decode() if isinstance(mode, bytes) else mode
+        )
+        for name, mode in connection.hgetall(TASKS_KEY).items()
+    }
+
+
+def set_task_profiling(connection, func_name, mode):
+    """Profile every run of a task type ("counts" or "cpu"), or stop
+    (mode None)."""
+
+    if mode is None:
+        connection.hdel(TASKS_KEY, func_name)
+    else:
+        connection.hset(TASKS_KEY, func_name, mode)
+
+
+def start_task_profile(connection, job):
+    """Start profiling a job if its task type is switched on; returns
+    the profile, or None. Advisory: never raises."""
+
+    try:
+        mode = connection.hget(TASKS_KEY, job.func_name)
+        if mode is None:
+            return None
+        mode = mode.decode() if isinstance(mode, bytes) else mode
+        plex_host = None
+        try:
+            from flask import current_app
+
+            plex_host = _plex_host(current_app.config)
+        except Exception:
+            pass
+        profile = Profile("task", job.func_name, cpu=mode == "cpu", plex_host=plex_host)
+        profile.start()
+        return profile
+    except Exception:
+        log_warning()
+        return None
+
+
+def finish_task_profile(connection, profile):
+    """Stop a job's profile and store its report."""
+
+    if profile is None:
+        return
+    try:
+        profile.stop()
+        profile.save(connection)
+    except Exception:
+        log_warning()
+
+
+def recent_reports(connection, limit=REPORTS_KEPT):
+    """The newest reports' summaries, newest first, for the System page."""
+
+    summaries = []
+    try:
+        report_ids = [
+            report_id.decode() if isinstance(report_id, bytes) else report_id
+            for report_id in connection.zrevrange(REPORTS_KEY, 0, limit - 1)
+        ]
+        if not report_ids:
+            return []
+        stored = connection.mget(
+            [REPORT_KEY.format(report_id=report_id) for report_id in report_ids]
+        )
+        for report_id, raw in zip(report_ids, stored):
+            if raw is None:
+                connection.zrem(REPORTS_KEY, report_id)
+                continue
+            report = json.loads(raw)
+            summaries.append(
+                {
+                    "id": report_id,
+                    "kind": report["kind"],
+                    "name": report["name"],
+                    "started_at": datetime.fromisoformat(report["started_at"]),
+                    "wall_ms": report["wall_ms"],
+                    "sql_count": report["sql"]["count"],
+                    "n_plus_one": report["sql"]["n_plus_one"],
+                    "redis_round_trips": report["redis"]["round_trips"],
+                    "http_count": sum(
+                        entry["count"] for entry in report["http"].values()
+                    ),
+                }
+            )
+    except Exception:
+        log_warning()
+    return summaries
+
+
+def load_report(connection, report_id):
+    """One stored report, or None once it has expired."""
+
+    raw = connection.get(REPORT_KEY.format(report_id=report_id))
+    return json.loads(raw) if raw else None
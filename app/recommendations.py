@@ -15,7 +15,6 @@ a weighted sum of soft per-class averages.
 """
 
 import bisect
-import json
 import random
 
 from datetime import datetime
@@ -40,6 +39,7 @@ from app.models import (
     movie_genres,
     movie_keywords,
 )
+from app.recs_storage import cached_artifact, store_artifacts
 
 # This process's app instance, resolved lazily so importing this module
 # from a process that already has an application doesn't build a second one
@@ -48,7 +48,8 @@ app = LocalProxy(get_app)
 
 
 # How strongly each feature class steers scoring; `flask recs evaluate`
-# reports how alternates fare before these are changed
+# reports how alternates fare before these are changed, and `flask recs
+# tune` searches for better ones (and for FEATURE_CLASS_SHRINKAGE's)
 
 FEATURE_CLASS_WEIGHTS = {
     "genre": 1.0,
@@ -128,9 +129,13 @@ PROFILE_KEY = "fitzflix:recs:profile:{user_id}"
 
 # The complete score map: every scoreable unlogged film's full-
 # recipe engine score, so any surface can show an estimated rating
-# with one Redis read — the ranking above keeps only the positive cut
+# with one Redis read — the ranking above keeps only the positive cut.
+# A hash of movie id to score, so a read fetches just the films asked
+# about; it replaced a JSON string under fitzflix:recs:scores:{user_id},
+# which the recompute clears
 
-SCORES_KEY = "fitzflix:recs:scores:{user_id}"
+SCORES_KEY = "fitzflix:recs:scores:map:{user_id}"
+LEGACY_SCORES_KEY = "fitzflix:recs:scores:{user_id}"
 
 # Films scored live between recomputes — records created after the
 # last nightly run — patch into the map through this overlay hash, so
@@ -344,10 +349,12 @@ def user_movie_weights(user_id):
     return weights
 
 
-def build_profile(weights, features_by_movie):
+def build_profile(weights, features_by_movie, shrinkage=None):
     """The taste profile: per-feature affinities shrunk toward zero, from
-    {movie_id: weight} and that user's movies' features."""
+    {movie_id: weight} and that user's movies' features. shrinkage
+    overrides FEATURE_CLASS_SHRINKAGE for `flask recs tune` trials."""
 
+    shrinkage = shrinkage or FEATURE_CLASS_SHRINKAGE
     sums, counts, labels, classes = {}, {}, {}, {}
     for movie_id, weight in weights.items():
         for cls, key, label in features_by_movie.get(movie_id, []):
@@ -361,7 +368,7 @@ def build_profile(weights, features_by_movie):
             "class": classes[key],
             "label": labels[key],
             "count": counts[key],
-            "score": sums[key] / (counts[key] + FEATURE_CLASS_SHRINKAGE[classes[key]]),
+            "score": sums[key] / (counts[key] + shrinkage[classes[key]]),
         }
         for key in sums
     }
@@ -995,29 +1002,43 @@ def shuffle_daily(items, seed):
 
 
 def stored_recommendations(redis, user_id):
-    """The nightly recompute's stored payload for a user, or None."""
+    """The nightly recompute's stored payload for a user, or None.
+    Shared with other requests, so read-only."""
 
-    payload = redis.get(RECS_KEY.format(user_id=int(user_id)))
-    return json.loads(payload) if payload else None
+    return cached_artifact(redis, user_id, RECS_KEY.format(user_id=int(user_id)))
 
 
-def stored_scores(redis, user_id):
+def stored_scores(redis, user_id, movie_ids=None):
     """The score map — {movie_id: full-recipe score} over every
-    scoreable unlogged film — or {} before the first compute. The
-    nightly base merges with the live-scored patch overlay, base
-    winning: a film in both was rescored overnight from fresher
-    inputs. JSON keys come back as strings, so they're re-inted
-    here."""
+    scoreable unlogged film, or just the given films' entries — or {}
+    before the first compute. The nightly base merges with the
+    live-scored patch overlay, base winning: a film in both was
+    rescored overnight from fresher inputs. The returned dict is the
+    caller's own to extend."""
+
+    user_id = int(user_id)
+    base_key = SCORES_KEY.format(user_id=user_id)
+    patch_key = PATCH_SCORES_KEY.format(user_id=user_id)
+    pipeline = redis.pipeline(transaction=False)
+    if movie_ids is None:
+        pipeline.hgetall(patch_key)
+        pipeline.hgetall(base_key)
+        patch, base = pipeline.execute()
+        layers = [patch.items(), base.items()]
+    else:
+        fields = [str(int(movie_id)) for movie_id in dict.fromkeys(movie_ids)]
+        if not fields:
+            return {}
+        pipeline.hmget(patch_key, fields)
+        pipeline.hmget(base_key, fields)
+        patch, base = pipeline.execute()
+        layers = [zip(fields, patch), zip(fields, base)]
 
     scores = {}
-    for movie_id, score in redis.hgetall(
-        PATCH_SCORES_KEY.format(user_id=int(user_id))
-    ).items():
-        scores[int(movie_id)] = float(score)
-    payload = redis.get(SCORES_KEY.format(user_id=int(user_id)))
-    if payload:
-        for movie_id, score in json.loads(payload).items():
-            scores[int(movie_id)] = score
+    for layer in layers:
+        for movie_id, score in layer:
+            if score is not None:
+                scores[int(movie_id)] = float(score)
     return scores
 
 
@@ -1032,7 +1053,7 @@ def resolved_score(redis, user_id, movie, profile, scores=None):
     per-film Redis read."""
 
     if scores is None:
-        scores = stored_scores(redis, user_id)
+        scores = stored_scores(redis, user_id, [movie.id])
     if movie.id in scores:
         return scores[movie.id]
     score = single_movie_score(user_id, movie, profile)
@@ -1084,10 +1105,10 @@ def resolved_tmdb_score(redis, user_id, tmdb_id, profile, scores=None):
 
 
 def stored_profile(redis, user_id):
-    """The nightly recompute's stored taste profile for a user, or None."""
+    """The nightly recompute's stored taste profile for a user, or None.
+    Shared with other requests, so read-only."""
 
-    payload = redis.get(PROFILE_KEY.format(user_id=int(user_id)))
-    return json.loads(payload) if payload else None
+    return cached_artifact(redis, user_id, PROFILE_KEY.format(user_id=int(user_id)))
 
 
 def recommended_movie_ids(redis, user_id):
@@ -1182,20 +1203,32 @@ def recompute_recommendations():
             profile, ranked, scores = compute_user_recommendations(user_id)
             if profile is None:
                 continue
-            current_app.redis.set(
-                PROFILE_KEY.format(user_id=user_id), json.dumps(profile)
-            )
-            current_app.redis.set(
-                RECS_KEY.format(user_id=user_id),
-                json.dumps({"computed_at": computed_at, "items": ranked}),
-            )
             # The fresh map supersedes any live-scored patches — drop
-            # both overlays in the same pipeline so no read sees the
+            # both overlays in the same transaction so no read sees the
             # new base with old patches still layered under it, and
             # tmdb-lane scores re-derive against the fresh profile
             # (their cached payloads make that cheap)
             pipeline = current_app.redis.pipeline()
-            pipeline.set(SCORES_KEY.format(user_id=user_id), json.dumps(scores))
+            store_artifacts(
+                pipeline,
+                user_id,
+                {
+                    PROFILE_KEY.format(user_id=user_id): profile,
+                    RECS_KEY.format(user_id=user_id): {
+                        "computed_at": computed_at,
+                        "items": ranked,
+                    },
+                },
+            )
+            pipeline.delete(SCORES_KEY.format(user_id=user_id))
+            pipeline.delete(LEGACY_SCORES_KEY.format(user_id=user_id))
+            if scores:
+                pipeline.hset(
+                    SCORES_KEY.format(user_id=user_id),
+                    mapping={
+                        str(movie_id): score for movie_id, score in scores.items()
+                    },
+                )
             pipeline.delete(PATCH_SCORES_KEY.format(user_id=user_id))
             pipeline.delete(TMDB_PATCH_SCORES_KEY.format(user_id=user_id))
             pipeline.execute()
@@ -1203,18 +1236,21 @@ def recompute_recommendations():
                 f"Recommendations: stored {len(ranked)} films "
                 f"({len(scores)} scored) for user {user_id}"
             )
-        return True
 
+        # The landing shelves were drawn from the old rankings; imported
+        # here since that module imports this one
 
-def evaluate_user(user_id, class_weights=None, positive_threshold=0.5):
-    """Leave-one-out ranking metrics for one user under the given (or
-    current) class weights.
+        from app.landing_shelves import invalidate_landing_shelves
 
-    Each film the user clearly liked is removed from the profile in
-    turn and ranked against every local candidate plus itself; a good
-    weighting ranks the held-out film near the top. Returns None for a
-    user without enough positive films to measure.
-    """
+        invalidate_landing_shelves()
+        return True
+
+
+def evaluation_data(user_id, positive_threshold=0.5):
+    """Everything a leave-one-out evaluation of one user reads, as plain
+    picklable data, or None for a user without enough positive films
+    to measure — queried once, then reused by every fold and every
+    trial weighting, in this process or a pool's."""
 
     weights = user_movie_weights(user_id)
     positives = [
@@ -1243,47 +1279,306 @@ def evaluate_user(user_id, class_weights=None, positive_threshold=0.5):
     entries_by_tmdb = copref_entries(
         weights_by_tmdb, copref_anchor_sims(weights_by_tmdb)
     )
+    return {
+        "user_id": int(user_id),
+        "weights": weights,
+        "positives": positives,
+        "candidates": candidates,
+        "features": features,
+        "tmdb_of": tmdb_of,
+        "entries_by_tmdb": entries_by_tmdb,
+    }
 
-    percentiles = []
-    hits_at_10 = 0
-    hits_at_25 = 0
-    for held_out in positives:
-        if not features.get(held_out):
-            continue
-        remaining = {
-            movie_id: weight
-            for movie_id, weight in weights.items()
-            if movie_id != held_out
+
+class LeaveOneOut:
+    """One user's leave-one-out folds under one weighting, computed
+    incrementally.
+
+    Rebuilding the profile and rescoring every candidate per held-out
+    film made a fold O(candidates × features). Here the full profile
+    and every candidate's score are computed once. A fold then only
+    touches what the held-out film can move: the affinities of its own
+    features — re-summed from each feature's recorded contributions,
+    in build_profile's order, so every value is bit-identical to a
+    rebuild — and the candidates sharing one of those features or
+    listing the film as a co-preference anchor. Every other candidate
+    scores exactly as it did under the full profile, so it's counted
+    from a sorted array of those scores by bisection.
+    """
+
+    def __init__(self, data, class_weights=None, shrinkage=None):
+        self.data = data
+        self.class_weights = class_weights or FEATURE_CLASS_WEIGHTS
+        self.shrinkage = shrinkage or FEATURE_CLASS_SHRINKAGE
+
+        features = data["features"]
+        self.profile = build_profile(data["weights"], features, self.shrinkage)
+
+        # Each feature's contributions in build_profile's order, for
+        # re-summing without the held-out film
+
+        self.contributions = {}
+        self.feature_class = {}
+        for movie_id, weight in data["weights"].items():
+            for cls, key, _ in features.get(movie_id, []):
+                self.contributions.setdefault(key, []).append((movie_id, weight))
+                self.feature_class[key] = cls
+
+        # Which candidates a feature or a co-preference anchor can move
+
+        self.by_feature = {}
+        self.by_anchor = {}
+        for movie_id in data["candidates"]:
+            for _, key, _ in features.get(movie_id, []):
+                self.by_feature.setdefault(key, set()).add(movie_id)
+            for _, anchor, _ in data["entries_by_tmdb"].get(
+                data["tmdb_of"].get(movie_id), []
+            ):
+                self.by_anchor.setdefault(anchor, set()).add(movie_id)
+
+        self.base = {
+            movie_id: self._score(movie_id, self.profile, None)
+            for movie_id in data["candidates"]
         }
-        profile = build_profile(remaining, features)
-        held_tmdb = tmdb_of.get(held_out)
+        self.ordered = sorted(self.base.values())
 
-        held_score, _ = score_movie(features[held_out], profile, class_weights)
-        held_score += _copref_value(
-            entries_by_tmdb.get(held_tmdb, []), excluded=held_tmdb
+    def _score(self, movie_id, profile, excluded):
+        """A film's score against a profile, co-preference included."""
+
+        data = self.data
+        score, _ = score_movie(
+            data["features"].get(movie_id, []), profile, self.class_weights
         )
-        rank = 1
-        for movie_id in candidates:
-            score, _ = score_movie(features.get(movie_id, []), profile, class_weights)
-            score += _copref_value(
-                entries_by_tmdb.get(tmdb_of.get(movie_id), []), excluded=held_tmdb
-            )
-            if score > held_score:
-                rank += 1
-        total = len(candidates) + 1
+        return score + _copref_value(
+            data["entries_by_tmdb"].get(data["tmdb_of"].get(movie_id), []),
+            excluded=excluded,
+        )
+
+    def _fold_profile(self, held_out):
+        """The profile without the held-out film, as build_profile would
+        have made it."""
+
+        affinities = dict(self.profile["affinities"])
+        for _, key, _ in self.data["features"][held_out]:
+            remaining = [
+                weight
+                for movie_id, weight in self.contributions[key]
+                if movie_id != held_out
+            ]
+            if not remaining:
+                affinities.pop(key, None)
+                continue
+            total = 0.0
+            for weight in remaining:
+                total += weight
+            cls = self.feature_class[key]
+            affinities[key] = {
+                **affinities[key],
+                "count": len(remaining),
+                "score": total / (len(remaining) + self.shrinkage[cls]),
+            }
+        return {"affinities": affinities}
+
+    def rank(self, held_out):
+        """The held-out film's 1-based rank among the candidates plus
+        itself, or None for a film with no features to score."""
+
+        features = self.data["features"].get(held_out)
+        if not features:
+            return None
+        held_tmdb = self.data["tmdb_of"].get(held_out)
+        profile = self._fold_profile(held_out)
+        held_score = self._score(held_out, profile, held_tmdb)
+
+        affected = set()
+        for _, key, _ in features:
+            affected |= self.by_feature.get(key, set())
+        if held_tmdb is not None:
+            affected |= self.by_anchor.get(held_tmdb, set())
+
+        above = len(self.ordered) - bisect.bisect_right(self.ordered, held_score)
+        for movie_id in affected:
+            if self.base[movie_id] > held_score:
+                above -= 1
+            if self._score(movie_id, profile, held_tmdb) > held_score:
+                above += 1
+        return above + 1
+
+    def ranks(self, held_out_ids):
+        """[(rank, total)] for the measurable films among these."""
+
+        total = len(self.data["candidates"]) + 1
+        ranks = (self.rank(held_out) for held_out in held_out_ids)
+        return [(rank, total) for rank in ranks if rank is not None]
 
-        percentiles.append((rank - 1) / max(total - 1, 1))
-        if rank <= 10:
-            hits_at_10 += 1
-        if rank <= 25:
-            hits_at_25 += 1
 
-    if not percentiles:
+def ranking_metrics(ranks):
+    """Mean percentile and hit rates from [(rank, total)], or None."""
+
+    if not ranks:
         return None
-    measured = len(percentiles)
+    measured = len(ranks)
     return {
         "positives": measured,
-        "mean_percentile": sum(percentiles) / measured,
-        "hit_at_10": hits_at_10 / measured,
-        "hit_at_25": hits_at_25 / measured,
+        "mean_percentile": sum((rank - 1) / max(total - 1, 1) for rank, total in ranks)
+        / measured,
+        "hit_at_10": sum(1 for rank, _ in ranks if rank <= 10) / measured,
+        "hit_at_25": sum(1 for rank, _ in ranks if rank <= 25) / measured,
+    }
+
+
+# Pool workers receive the evaluation data once, at start, rather than
+# with every task
+
+_pool_data = {}
+
+
+def _init_evaluation_worker(datasets):
+    """Pool initializer: keep the users' evaluation data in the worker."""
+
+    _pool_data.clear()
+    _pool_data.update(datasets)
+
+
+def _fold_ranks(user_id, class_weights, shrinkage, held_out_ids):
+    """Pool task: one user's ranks for a slice of held-out films."""
+
+    return LeaveOneOut(_pool_data[user_id], class_weights, shrinkage).ranks(
+        held_out_ids
+    )
+
+
+def _trial_ranks(class_weights, shrinkage):
+    """Pool task: every user's ranks under one trial weighting."""
+
+    return {
+        user_id: LeaveOneOut(data, class_weights, shrinkage).ranks(data["positives"])
+        for user_id, data in _pool_data.items()
+    }
+
+
+def evaluation_pool(datasets, workers):
+    """A process pool whose workers hold the given {user_id: data}."""
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_evaluation_worker,
+        initargs=(datasets,),
+    )
+
+
+def evaluate_user(
+    user_id, class_weights=None, positive_threshold=0.5, shrinkage=None, workers=1
+):
+    """Leave-one-out ranking metrics for one user under the given (or
+    current) class weights and shrinkage.
+
+    Each film the user clearly liked is removed from the profile in
+    turn and ranked against every local candidate plus itself; a good
+    weighting ranks the held-out film near the top. With workers > 1
+    the folds are split across a process pool. Returns None for a user
+    without enough positive films to measure.
+    """
+
+    data = evaluation_data(user_id, positive_threshold)
+    if data is None:
+        return None
+    positives = data["positives"]
+    if workers <= 1:
+        return ranking_metrics(
+            LeaveOneOut(data, class_weights, shrinkage).ranks(positives)
+        )
+
+    chunk = -(-len(positives) // workers)
+    with evaluation_pool({data["user_id"]: data}, workers) as pool:
+        futures = [
+            pool.submit(
+                _fold_ranks,
+                data["user_id"],
+                class_weights,
+                shrinkage,
+                positives[start : start + chunk],
+            )
+            for start in range(0, len(positives), chunk)
+        ]
+        ranks = [rank for future in futures for rank in future.result()]
+    return ranking_metrics(ranks)
+
+
+# The multipliers `flask recs tune` tries on each class's weight and
+# shrinkage per round of coordinate descent
+
+TUNE_STEPS = (0.5, 0.75, 1.25, 1.5, 2.0)
+
+
+def _household_score(ranks_by_user):
+    """The tuning objective: the mean percentile over every user's
+    held-out films pooled — lower is better — and the metrics behind
+    it."""
+
+    ranks = [rank for ranks in ranks_by_user.values() for rank in ranks]
+    metrics = ranking_metrics(ranks)
+    return (metrics["mean_percentile"] if metrics else 1.0), metrics
+
+
+def tune_weights(datasets, workers=1, rounds=2, steps=TUNE_STEPS, log=None):
+    """Coordinate descent over class weights and shrinkage.
+
+    Each round visits every class's weight, then its shrinkage, trying
+    each multiplier in steps — the trials for one coordinate run side
+    by side in the pool — and keeps whichever lowers the household's
+    pooled mean percentile. Returns the best weights, shrinkage, and
+    metrics alongside the current settings' metrics.
+    """
+
+    class_weights = dict(FEATURE_CLASS_WEIGHTS)
+    shrinkage = dict(FEATURE_CLASS_SHRINKAGE)
+    log = log or (lambda message: None)
+
+    with evaluation_pool(datasets, max(1, workers)) as pool:
+        best, best_metrics = _household_score(
+            pool.submit(_trial_ranks, class_weights, shrinkage).result()
+        )
+        baseline = best_metrics
+        log(f"current settings: mean percentile {best:.4f}")
+
+        for round_number in range(1, rounds + 1):
+            improved = False
+            for setting in ("weight", "shrinkage"):
+                for cls in FEATURE_CLASS_WEIGHTS:
+                    current = class_weights if setting == "weight" else shrinkage
+                    trials = []
+                    for step in steps:
+                        trial = dict(current)
+                        trial[cls] = round(current[cls] * step, 4)
+                        trials.append(
+                            (
+                                trial,
+                                pool.submit(
+                                    _trial_ranks,
+                                    trial if setting == "weight" else class_weights,
+                                    trial if setting == "shrinkage" else shrinkage,
+                                ),
+                            )
+                        )
+                    for trial, future in trials:
+                        score, metrics = _household_score(future.result())
+                        if score < best:
+                            best, best_metrics = score, metrics
+                            current[cls] = trial[cls]
+                            improved = True
+                            log(
+                                f"round {round_number}: {cls} {setting} "
+                                f"{trial[cls]} -> mean percentile {score:.4f}"
+                            )
+            if not improved:
+                break
+
+    return {
+        "class_weights": class_weights,
+        "shrinkage": shrinkage,
+        "metrics": best_metrics,
+        "baseline": baseline,
     }
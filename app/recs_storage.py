@@ -0,0 +1,101 @@
+"""Storage for the recommendation engine's per-user artifacts (Oct 2026).
+
+The nightly recomputes leave four things per user in Redis: the taste
+profile, the ranked recommendations, the streaming rail, and the score
+map. Each was one JSON string, and every surface that needed any part
+of one fetched and parsed all of it — a landing page view, a tile
+batch, or a single movie page's estimate each paid for multi-hundred-
+entry blobs, several times over.
+
+The profile, recommendations, and rail are now stored compressed
+(zlib over compact JSON, roughly a fifth of the bytes) and decoded at
+most once per process per recompute: decoded values sit in a small
+LRU, validated by a per-user version stamp that every write replaces
+in the same transaction as its payload. A read is one GET of the
+stamp; only a changed stamp fetches and decodes the payload again.
+The stamp is a random token rather than a counter, so a Redis that
+lost its data can never hand a process a stamp it cached against.
+Plain JSON payloads written before the change still read.
+
+The score map became a Redis hash (see stored_scores), so a surface
+asking about a handful of films reads only those fields.
+
+Cached values are shared across requests: callers treat them as
+read-only.
+"""
+
+import json
+import threading
+import uuid
+import zlib
+
+from collections import OrderedDict
+
+VERSION_KEY = "fitzflix:recs:version:{user_id}"
+
+# Decoded artifacts this process keeps: three per user covers a
+# household many times over
+
+CACHE_ENTRIES = 64
+
+COMPRESSION_LEVEL = 6
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def encode_artifact(value):
+    """A JSON-ready value as a compressed payload."""
+
+    return zlib.compress(
+        json.dumps(value, separators=(",", ":")).encode(), COMPRESSION_LEVEL
+    )
+
+
+def decode_artifact(payload):
+    """A stored payload's value, or None for a missing one. Plain JSON
+    — written before compression, or by hand — passes through."""
+
+    if not payload:
+        return None
+    if isinstance(payload, str) or payload[:1] in (b"{", b"["):
+        return json.loads(payload)
+    return json.loads(zlib.decompress(payload))
+
+
+def store_artifacts(pipeline, user_id, artifacts):
+    """Queue {key: value} writes for a user on a transactional pipeline,
+    along with a fresh version stamp, so no reader ever pairs a new
+    stamp with an old payload. The caller executes the pipeline."""
+
+    for key, value in artifacts.items():
+        pipeline.set(key, encode_artifact(value))
+    pipeline.set(VERSION_KEY.format(user_id=int(user_id)), uuid.uuid4().hex)
+
+
+def cached_artifact(redis, user_id, key):
+    """A user's stored artifact, decoded once per version stamp."""
+
+    version = redis.get(VERSION_KEY.format(user_id=int(user_id)))
+    if version is None:
+        # Nothing written through store_artifacts yet: nothing to
+        # validate a cached copy against
+
+        return decode_artifact(redis.get(key))
+
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == version:
+            _cache.move_to_end(key)
+            return entry[1]
+
+    # A write landing between the two GETs caches the newer payload
+    # under the older stamp, which the next read simply misses
+
+    value = decode_artifact(redis.get(key))
+    with _cache_lock:
+        _cache[key] = (version, value)
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_ENTRIES:
+            _cache.popitem(last=False)
+    return value
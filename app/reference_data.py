@@ -0,0 +1,198 @@
+"""Process-local copies of the reference tables (Oct 2026): qualities,
+special-feature types, and TMDb genres.
+
+These tables change a few times a year, yet the shopping lists, the
+library pages, the upgrade badge, and every import looked them up row
+by row — movie_shopping alone spent a dozen round trips on "what's the
+id of Bluray-1080p" and "what's the preference of quality 7" before
+its real query ran. Here each process loads all three tables once and
+answers those lookups from dicts.
+
+Freshness rides the ORM, the way the search index's does: a session
+listener notes every committed write to a reference row and stamps a
+new token under VERSION_KEY. Each app context (a request, a task)
+compares the token once on its first lookup and reloads when it moved,
+so an edit in one process reaches the others by their next request. A
+missing token (Redis restarted or flushed) counts as a change too.
+"""
+
+import uuid
+
+from typing import NamedTuple
+
+from flask import current_app, g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import RefFeatureType, RefQuality, TMDBGenre
+
+VERSION_KEY = "fitzflix:reference:version"
+
+_EXTENSION = "fitzflix_reference_data"
+_REFERENCE_MODELS = (RefQuality, RefFeatureType, TMDBGenre)
+
+
+class Quality(NamedTuple):
+    """A RefQuality row, detached from any session."""
+
+    id: int
+    quality_title: str
+    preference: int
+    physical_media: bool
+
+
+class ReferenceData:
+    """One snapshot of the reference tables.
+
+    qualities is ordered by preference, worst first, the order every
+    quality dropdown uses. Quality titles are unique, so a title maps to
+    exactly one row.
+    """
+
+    def __init__(self, qualities, feature_types, genres, version=None):
+        self.version = version
+        self.qualities = tuple(
+            sorted(qualities, key=lambda quality: (quality.preference, quality.id))
+        )
+        self.quality_by_id = {quality.id: quality for quality in self.qualities}
+        self.quality_by_title = {
+            quality.quality_title: quality for quality in self.qualities
+        }
+        self.feature_types = tuple(name for _, name in feature_types)
+        self.feature_type_ids = {name: id for id, name in feature_types}
+        self.genres = dict(genres)
+
+    def quality(self, quality_id):
+        """The quality with this id, or None — including for ids that
+        don't parse as one, the way a hand-edited query string arrives."""
+
+        try:
+            return self.quality_by_id.get(int(quality_id))
+        except (TypeError, ValueError):
+            return None
+
+    def quality_id(self, quality_title):
+        """The id of the quality with this title, or None."""
+
+        quality = self.quality_by_title.get(quality_title)
+        return quality.id if quality else None
+
+    def preference(self, quality_title):
+        """The preference of the quality with this title, or None."""
+
+        quality = self.quality_by_title.get(quality_title)
+        return quality.preference if quality else None
+
+    def min_preference(self, prefix, physical_media=None):
+        """The lowest preference among titles starting with prefix
+        (optionally only physical or only digital), or None — the
+        dict form of the shopping lists' min(preference) LIKE 'x%'."""
+
+        preferences = [
+            quality.preference
+            for quality in self.qualities
+            if quality.quality_title.startswith(prefix)
+            and (
+                physical_media is None or bool(quality.physical_media) == physical_media
+            )
+        ]
+        return min(preferences, default=None)
+
+
+def load_reference_data(version=None):
+    """Read all three tables into a new snapshot."""
+
+    qualities = [
+        Quality(id, title, preference, bool(physical_media))
+        for id, title, preference, physical_media in db.session.query(
+            RefQuality.id,
+            RefQuality.quality_title,
+            RefQuality.preference,
+            RefQuality.physical_media,
+        )
+    ]
+    feature_types = (
+        db.session.query(RefFeatureType.id, RefFeatureType.feature_type)
+        .order_by(RefFeatureType.id.asc())
+        .all()
+    )
+    genres = db.session.query(TMDBGenre.id, TMDBGenre.name).all()
+    return ReferenceData(qualities, feature_types, genres, version)
+
+
+def reference_data():
+    """This process's snapshot, reloaded if another process changed a
+    reference row since it was read. Checked once per app context."""
+
+    if _EXTENSION in g:
+        return g.get(_EXTENSION)
+
+    snapshot = current_app.extensions.get(_EXTENSION)
+    try:
+        version = current_app.redis.get(VERSION_KEY)
+    except Exception:
+        # Without Redis there's no way to hear about changes; a snapshot
+        # a few minutes stale beats a page that fails outright
+
+        current_app.logger.warning("Couldn't check the reference data version")
+        version = snapshot.version if snapshot else None
+
+    if snapshot is None or version is None or snapshot.version != version:
+        if version is None:
+            version = uuid.uuid4().hex.encode()
+            try:
+                current_app.redis.set(VERSION_KEY, version, nx=True)
+                version = current_app.redis.get(VERSION_KEY) or version
+            except Exception:
+                pass
+        snapshot = load_reference_data(version)
+        current_app.extensions[_EXTENSION] = snapshot
+
+    setattr(g, _EXTENSION, snapshot)
+    return snapshot
+
+
+def _forget_snapshot():
+    """Drop this process's snapshot, so the next lookup reloads it."""
+
+    current_app.extensions.pop(_EXTENSION, None)
+    g.pop(_EXTENSION, None)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    """Note whether this flush wrote a reference row."""
+
+    # A genre appended to a film's genres shows up as dirty without any
+    # of its own columns changing; only real edits count
+
+    written = [*session.new, *session.deleted] + [
+        instance
+        for instance in session.dirty
+        if session.is_modified(instance, include_collections=False)
+    ]
+    if any(isinstance(instance, _REFERENCE_MODELS) for instance in written):
+        session.info["reference_data_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_changes(session):
+    """Stamp a new version so every process reloads its snapshot."""
+
+    if not session.info.pop("reference_data_changed", False):
+        return
+    if not has_app_context():
+        return
+    _forget_snapshot()
+    try:
+        current_app.redis.set(VERSION_KEY, uuid.uuid4().hex)
+    except Exception:
+        current_app.logger.warning("Couldn't publish a reference data change")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    """A rolled-back flush changed nothing."""
+
+    session.info.pop("reference_data_changed", None)
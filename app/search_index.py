@@ -0,0 +1,488 @@
+"""The library search index (Oct 2026): one in-process lookup for the
+search page and the navbar type-ahead across movies, TV series,
+episodes, and credited people.
+
+The old search ran four ILIKE '%term%' scans plus a CASE ranking per
+keystroke — none of which an index can serve, so the type-ahead slowed
+with every credit the TMDb refreshes added. Here each process holds
+the documents in memory with a trigram index, accent-folded through
+Unidecode the way the filename sanitizer folds titles, and answers all
+four result types from one call in a few milliseconds. Words of three
+letters or more match anywhere, as the old wildcard did; one- and
+two-letter words match only the start of a word (a word-prefix index
+serves them), so "up" finds "Up" and "Blow-Up" but not "Cup".
+
+Freshness rides the ORM: a session listener notes every committed
+write to a searchable row (a TMDb apply's titles and credits, an
+import's new file, a delete) and appends it to a Redis journal, which
+every process replays — re-reading just those rows — before its next
+lookup. The nightly rebuild reloads everything from the database,
+snapshots it to disk so a restarted process starts warm, and trims the
+journal under a new generation token; a process that finds no token
+at all (Redis restarted) rebuilds on its own.
+"""
+
+import json
+import os
+import re
+import threading
+import uuid
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from unidecode import unidecode
+from werkzeug.local import LocalProxy
+
+from app import db, get_app
+from app.models import (
+    File,
+    Movie,
+    MovieCast,
+    MovieCrew,
+    TMDBCredit,
+    TVCast,
+    TVCrew,
+    TVEpisode,
+    TVSeries,
+)
+
+# This process's app instance, resolved lazily so importing this module
+# from a process that already has an application doesn't build a second one
+
+app = LocalProxy(get_app)
+
+GENERATION_KEY = "fitzflix:search:generation"
+JOURNAL_KEY = "fitzflix:search:journal"
+
+KINDS = ("movie", "series", "episode", "person")
+
+
+def fold(text):
+    """Lowercase ASCII words separated by single spaces: "Amélie" and
+    "amelie" meet, and punctuation ("Blow-Up", "Jacob's") stops
+    mattering the way the old wildcard search made it not matter."""
+
+    return re.sub(r"[^a-z0-9]+", " ", unidecode(text or "").casefold()).strip()
+
+
+def _grams(word):
+    """A word's trigrams."""
+
+    return {word[i : i + 3] for i in range(len(word) - 2)}
+
+
+class SearchIndex:
+    """Documents and their postings, per result type.
+
+    A document is (fields, sort): the folded strings a query matches
+    against and the tie-break order within a match tier. Postings map
+    each trigram, and each word's one- and two-letter prefix, to the
+    ids carrying it; lookups intersect those and then confirm the
+    query's words appear in order within one field — anywhere for
+    words of three letters or more, at a word's start for shorter
+    ones.
+    """
+
+    def __init__(self):
+        """An empty index that has seen no journal yet."""
+
+        self.docs = {kind: {} for kind in KINDS}
+        self.grams = {kind: {} for kind in KINDS}
+        self.prefixes = {kind: {} for kind in KINDS}
+        self.generation = None
+        self.applied = 0
+        self.lock = threading.RLock()
+
+    def _postings(self, fields):
+        """The (trigram, prefix) keys a document's fields produce."""
+
+        grams = set()
+        prefixes = set()
+        for field in fields:
+            for word in field.split():
+                grams |= _grams(word)
+                prefixes.add(word[:1])
+                prefixes.add(word[:2])
+        return grams, prefixes
+
+    def put(self, kind, doc_id, doc):
+        """Add or replace one document."""
+
+        self.remove(kind, doc_id)
+        self.docs[kind][doc_id] = doc
+        grams, prefixes = self._postings(doc[0])
+        for gram in grams:
+            self.grams[kind].setdefault(gram, set()).add(doc_id)
+        for prefix in prefixes:
+            self.prefixes[kind].setdefault(prefix, set()).add(doc_id)
+
+    def remove(self, kind, doc_id):
+        """Drop one document, if present."""
+
+        doc = self.docs[kind].pop(doc_id, None)
+        if doc is None:
+            return
+        grams, prefixes = self._postings(doc[0])
+        for key, postings in ((grams, self.grams), (prefixes, self.prefixes)):
+            for entry in key:
+                ids = postings[kind].get(entry)
+                if ids is not None:
+                    ids.discard(doc_id)
+                    if not ids:
+                        del postings[kind][entry]
+
+    def load(self, docs_by_kind):
+        """Replace every document at once."""
+
+        self.docs = {kind: {} for kind in KINDS}
+        self.grams = {kind: {} for kind in KINDS}
+        self.prefixes = {kind: {} for kind in KINDS}
+        for kind, docs in docs_by_kind.items():
+            for doc_id, doc in docs.items():
+                self.put(kind, doc_id, doc)
+
+    def _candidates(self, kind, words):
+        """Ids whose postings cover every query word."""
+
+        candidates = None
+        for word in words:
+            if len(word) >= 3:
+                ids = None
+                for gram in _grams(word):
+                    postings = self.grams[kind].get(gram, set())
+                    ids = set(postings) if ids is None else ids & postings
+                    if not ids:
+                        return set()
+            else:
+                ids = self.prefixes[kind].get(word, set())
+            candidates = set(ids) if candidates is None else candidates & ids
+            if not candidates:
+                return set()
+        return candidates or set()
+
+    def search(self, q, limits):
+        """Ranked ids per result type for a raw query string.
+
+        Titles tier exact, then prefix, then anywhere (so "Up" finds
+        the film named Up before Blow-Up); people tier an exact full
+        name first, then by library film count; episodes keep series,
+        season, and episode order.
+        """
+
+        folded = fold(q)
+        words = folded.split()
+        results = {kind: [] for kind in KINDS}
+        if not words:
+            return results
+        pattern = re.compile(
+            ".*?".join(
+                re.escape(word) if len(word) >= 3 else rf"\b{re.escape(word)}"
+                for word in words
+            )
+        )
+        with self.lock:
+            for kind in KINDS:
+                limit = limits.get(kind)
+                if not limit:
+                    continue
+                ranked = []
+                for doc_id in self._candidates(kind, words):
+                    fields, sort = self.docs[kind][doc_id]
+                    if not any(pattern.search(field) for field in fields):
+                        continue
+                    if kind == "episode":
+                        tier = 0
+                    elif any(field == folded for field in fields):
+                        tier = 0
+                    elif kind != "person" and any(
+                        field.startswith(folded) for field in fields
+                    ):
+                        tier = 1
+                    else:
+                        tier = 2
+                    ranked.append(((tier, *sort), doc_id))
+                ranked.sort()
+                results[kind] = [doc_id for _, doc_id in ranked[:limit]]
+        return results
+
+
+def load_documents(kind, ids=None):
+    """{id: (fields, sort)} for the rows of one result type that belong
+    in the index — all of them, or just the given ids. Movies need a
+    main-feature file (review-only records belong to the TMDb search),
+    people a credited library role (the People page's rule)."""
+
+    docs = {}
+    if kind == "movie":
+        query = db.session.query(
+            Movie.id, Movie.title, Movie.tmdb_title, Movie.year
+        ).filter(Movie.files.any(File.feature_type_id.is_(None)))
+        if ids is not None:
+            query = query.filter(Movie.id.in_(ids))
+        for movie_id, title, tmdb_title, year in query:
+            docs[movie_id] = (
+                [fold(title), fold(tmdb_title)],
+                [fold(title), year or 0],
+            )
+
+    elif kind == "series":
+        query = db.session.query(TVSeries.id, TVSeries.title, TVSeries.tmdb_name)
+        if ids is not None:
+            query = query.filter(TVSeries.id.in_(ids))
+        for series_id, title, tmdb_name in query:
+            docs[series_id] = ([fold(title), fold(tmdb_name)], [fold(title)])
+
+    elif kind == "episode":
+        query = (
+            db.session.query(
+                TVEpisode.id,
+                TVEpisode.title,
+                TVSeries.title,
+                TVEpisode.season,
+                TVEpisode.episode,
+            )
+            .join(TVSeries, TVSeries.id == TVEpisode.series_id)
+            .filter(TVEpisode.title.isnot(None))
+        )
+        if ids is not None:
+            query = query.filter(TVEpisode.id.in_(ids))
+        for episode_id, title, series_title, season, episode in query:
+            docs[episode_id] = ([fold(title)], [fold(series_title), season, episode])
+
+    elif kind == "person":
+        # The credited-pairs rule lives with the people pages; lazy so
+        # the module import direction stays one-way
+
+        from app.main.library import _credited_film_pairs
+
+        pairs = _credited_film_pairs()
+        film_count = db.func.count(db.distinct(pairs.c.movie_id))
+        query = (
+            db.session.query(TMDBCredit.id, TMDBCredit.name, film_count)
+            .join(pairs, pairs.c.credit_id == TMDBCredit.id)
+            .group_by(TMDBCredit.id, TMDBCredit.name)
+        )
+        if ids is not None:
+            query = query.filter(TMDBCredit.id.in_(ids))
+        for credit_id, name, count in query:
+            folded = fold(name)
+            surname = folded.rsplit(" ", 1)[-1]
+            docs[credit_id] = ([folded], [-count, surname, folded])
+
+    return docs
+
+
+def _snapshot_path():
+    """Where this deployment keeps the on-disk snapshot."""
+
+    return current_app.config["SEARCH_INDEX_PATH"]
+
+
+def _write_snapshot(index):
+    """Persist the documents with their generation and journal offset,
+    atomically, so a process starting later loads instead of
+    rebuilding."""
+
+    path = _snapshot_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(
+            {
+                "generation": index.generation,
+                "applied": index.applied,
+                "docs": {
+                    kind: [[doc_id, *doc] for doc_id, doc in docs.items()]
+                    for kind, docs in index.docs.items()
+                },
+            },
+            f,
+        )
+    os.replace(temporary, path)
+
+
+def _read_snapshot(generation):
+    """The snapshot's (docs, applied) if it belongs to the given
+    generation, else None."""
+
+    try:
+        with open(_snapshot_path()) as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if snapshot.get("generation") != generation:
+        return None
+    docs = {
+        kind: {doc_id: (fields, sort) for doc_id, fields, sort in rows}
+        for kind, rows in snapshot["docs"].items()
+    }
+    return docs, snapshot["applied"]
+
+
+def _rebuild(index, generation):
+    """Reload every document from the database under the given token.
+
+    The journal offset is read BEFORE the database, so a write landing
+    mid-build is replayed afterwards rather than lost (replays are
+    idempotent re-reads)."""
+
+    offset = current_app.redis.llen(JOURNAL_KEY)
+    index.load({kind: load_documents(kind) for kind in KINDS})
+    index.generation = generation
+    index.applied = offset
+    try:
+        _write_snapshot(index)
+    except OSError:
+        current_app.logger.warning("Couldn't write the search index snapshot")
+
+
+def _replay(index, entries):
+    """Re-read the rows named by journal entries ("movie:12")."""
+
+    ids_by_kind = {}
+    for entry in entries:
+        kind, _, doc_id = entry.decode().partition(":")
+        if kind in index.docs and doc_id.isdigit():
+            ids_by_kind.setdefault(kind, set()).add(int(doc_id))
+    for kind, ids in ids_by_kind.items():
+        fresh = load_documents(kind, ids)
+        for doc_id in ids:
+            if doc_id in fresh:
+                index.put(kind, doc_id, fresh[doc_id])
+            else:
+                index.remove(kind, doc_id)
+
+
+def search_index():
+    """This process's index, brought current: one pipelined read of the
+    generation token and journal length, then whatever the journal
+    gained since the last lookup."""
+
+    index = current_app.extensions.setdefault("fitzflix_search_index", SearchIndex())
+    redis = current_app.redis
+    with index.lock:
+        pipe = redis.pipeline(transaction=False)
+        pipe.get(GENERATION_KEY)
+        pipe.llen(JOURNAL_KEY)
+        generation, length = pipe.execute()
+
+        if generation is None:
+            # Redis lost the token (a restart, or a fresh install):
+            # rebuild and publish one; a racing process's token wins
+            # and this build adopts it, being just as fresh
+            token = uuid.uuid4().hex
+            redis.set(GENERATION_KEY, token, nx=True)
+            _rebuild(index, (redis.get(GENERATION_KEY) or token.encode()).decode())
+            return index
+
+        generation = generation.decode()
+        if generation != index.generation:
+            snapshot = _read_snapshot(generation)
+            if snapshot is None:
+                _rebuild(index, generation)
+                return index
+            docs, applied = snapshot
+            index.load(docs)
+            index.generation = generation
+            index.applied = applied
+
+        if length > index.applied:
+            entries = redis.lrange(JOURNAL_KEY, index.applied, length - 1)
+            _replay(index, entries)
+            index.applied = length
+    return index
+
+
+def search_library(q, limits):
+    """Ranked ids for every result type in one lookup, e.g.
+    search_library("jaws", {"movie": 5, "series": 5, "person": 5})."""
+
+    return search_index().search(q, limits)
+
+
+def rebuild_search_index():
+    """Nightly task: rebuild from the database under a new generation,
+    snapshot to disk, and trim the journal the snapshot already covers,
+    so replay stays short and restarted processes start warm."""
+
+    with app.app_context():
+        redis = current_app.redis
+        index = SearchIndex()
+        offset = redis.llen(JOURNAL_KEY)
+        index.load({kind: load_documents(kind) for kind in KINDS})
+        index.generation = uuid.uuid4().hex
+
+        # The snapshot lands before the generation that names it, so a
+        # process that sees the new token always finds its snapshot
+        # instead of rebuilding inline. Entries written during the build
+        # survive the trim and are replayed from the new start —
+        # harmless re-reads
+
+        _write_snapshot(index)
+        pipe = redis.pipeline(transaction=True)
+        pipe.ltrim(JOURNAL_KEY, offset, -1)
+        pipe.set(GENERATION_KEY, index.generation)
+        pipe.execute()
+        current_app.extensions["fitzflix_search_index"] = index
+        counts = ", ".join(f"{len(index.docs[kind])} {kind}" for kind in KINDS)
+        current_app.logger.info(f"Rebuilt the search index: {counts}")
+        return True
+
+
+# The journal writers: every committed write to a searchable row names
+# the documents it can change. Bulk query deletes bypass the ORM (the
+# TMDb applies clear credits that way) but their re-inserts are seen,
+# and the nightly rebuild catches the rest
+
+
+def _changed_documents(instance):
+    """The (kind, id) documents a written row can change."""
+
+    if isinstance(instance, Movie):
+        return [("movie", instance.id)]
+    if isinstance(instance, File):
+        return [("movie", instance.movie_id)] if instance.movie_id else []
+    if isinstance(instance, TVSeries):
+        return [("series", instance.id)]
+    if isinstance(instance, TVEpisode):
+        return [("episode", instance.id)]
+    if isinstance(instance, TMDBCredit):
+        return [("person", instance.id)]
+    if isinstance(instance, (MovieCast, MovieCrew, TVCast, TVCrew)):
+        return [("person", instance.credit_id)] if instance.credit_id else []
+    return []
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    """Note the searchable rows this flush wrote."""
+
+    changed = session.info.setdefault("search_index_changes", set())
+    for instance in session.new | session.deleted:
+        changed.update(_changed_documents(instance))
+    for instance in session.dirty:
+        if session.is_modified(instance, include_collections=False):
+            changed.update(_changed_documents(instance))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_changes(session):
+    """Append the committed changes to the journal."""
+
+    changed = session.info.pop("search_index_changes", None)
+    if not changed or not has_app_context():
+        return
+    try:
+        current_app.redis.rpush(
+            JOURNAL_KEY, *(f"{kind}:{doc_id}" for kind, doc_id in changed)
+        )
+    except Exception:
+        current_app.logger.warning("Couldn't journal search index changes")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    """A rolled-back flush changed nothing."""
+
+    session.info.pop("search_index_changes", None)
@@ -0,0 +1,433 @@
+"""The movie shopping list's projection (Oct 2026).
+
+movie_shopping used to build its list from scratch on every view: the
+movie_file_rank window over every file, a physical-media subquery, an
+average-rating aggregate over the whole diary with its rounding and
+half-star CASEs, and four CASE expressions per row for the verdict and
+the orderings — then joined all of it across the library for whichever
+filter combination was asked for. Here each film's rows are computed
+once, when something they depend on changes, and kept in
+ShoppingListItem; the page becomes a range scan over that table.
+
+A film's rows depend on its main-feature files, the household's
+reviews of it, and its own shopping and Criterion fields. Session
+listeners note the films each flush touches through any of those, and
+their rows are recomputed inside the same commit. Quality preferences
+feed the verdicts too, but only change with a deploy; the nightly
+rebuild covers them, and anything written around the ORM. A process
+that finds no generation token (a fresh deploy, Redis restarted)
+rebuilds before it serves the list, the way the search index does;
+while one process rebuilds, the others keep serving the previous rows,
+which the rebuild replaces in a single commit.
+"""
+
+import uuid
+
+from datetime import datetime
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from werkzeug.local import LocalProxy
+
+from app import db, get_app
+from app.models import (
+    File,
+    Movie,
+    RefQuality,
+    ShoppingListItem,
+    UserMovieReview,
+    movie_file_rank,
+)
+from app.reference_data import reference_data
+
+# This process's app instance, resolved lazily so importing this module
+# from a process that already has an application doesn't build a second one
+
+app = LocalProxy(get_app)
+
+GENERATION_KEY = "fitzflix:shopping:generation"
+
+# Claimed by the one process rebuilding after the generation went
+# missing; it expires in case that process dies mid-build
+
+BUILDING_KEY = "fitzflix:shopping:building"
+BUILDING_SECONDS = 600
+
+# Films recomputed per round of queries
+
+REFRESH_CHUNK = 500
+
+# Stands in for the "0" the old cart-age CASE sorted below every date
+
+NO_CART_AGE = datetime(1970, 1, 1)
+
+# The Movie columns a row's verdict or ordering reads
+
+_MOVIE_FIELDS = (
+    "title",
+    "sort_title",
+    "year",
+    "criterion_spine_number",
+    "criterion_set_title",
+    "criterion_disc_owned",
+    "criterion_quality_id",
+    "shopping_list_exclude",
+    "shopping_cart_priority",
+    "shopping_cart_add_date",
+)
+
+
+def _verdict(movie, file, preference, criterion_preference, thresholds):
+    """The instruction and ordering keys for one row — the page's old
+    CASE expressions, evaluated in the same order and with SQL's NULL
+    behavior: a NULL never equals or falls below anything."""
+
+    dvd, bluray, uhd = thresholds
+    criterion = bool(movie.criterion_spine_number or movie.criterion_set_title)
+    owned = movie.criterion_disc_owned is True
+    excluded = movie.shopping_list_exclude is True
+    unowned_criterion = criterion and not owned
+
+    def below(threshold):
+        return (
+            preference is not None and threshold is not None and preference < threshold
+        )
+
+    def criterion_at(threshold):
+        return (
+            criterion_preference is not None
+            and threshold is not None
+            and criterion_preference == threshold
+        )
+
+    if excluded or (criterion and owned):
+        instruction = "Already owned"
+    elif criterion and movie.criterion_disc_owned is False and criterion_at(uhd):
+        instruction = "Buy Criterion edition on 4K UHD Blu-Ray"
+    elif criterion and movie.criterion_disc_owned is False and criterion_at(bluray):
+        instruction = "Buy Criterion edition on Blu-Ray"
+    elif criterion and movie.criterion_disc_owned is False and criterion_at(dvd):
+        instruction = "Buy Criterion edition on DVD"
+    elif file is None:
+        instruction = "Buy on Blu-Ray"
+    elif file.fullscreen:
+        instruction = "Buy any non-fullscreen release"
+    elif below(dvd):
+        instruction = "Buy on DVD or Blu-Ray"
+    elif below(bluray):
+        instruction = "Buy on Blu-Ray"
+    else:
+        instruction = "Already owned"
+
+    if owned or excluded:
+        urgency = -1
+    elif file is None or below(bluray) or unowned_criterion:
+        urgency = 1
+    else:
+        urgency = -1
+
+    wanted = not owned and (
+        (file is None and not excluded)
+        or (not excluded and below(bluray))
+        or unowned_criterion
+    )
+    cart_priority = movie.shopping_cart_priority if wanted else 0
+    cart_age = movie.shopping_cart_add_date if wanted else NO_CART_AGE
+
+    if owned:
+        quality_order = 99
+    elif file is None and not excluded:
+        quality_order = 0
+    elif (not excluded and below(bluray)) or unowned_criterion:
+        quality_order = preference
+    else:
+        quality_order = 99
+
+    return {
+        "instruction": instruction,
+        "urgency": urgency,
+        "cart_priority": cart_priority,
+        "quality_order": quality_order,
+        "cart_age": cart_age,
+    }
+
+
+def _thresholds():
+    """The DVD, Blu-ray, and UHD preferences the verdicts compare to."""
+
+    reference = reference_data()
+    return (
+        reference.preference("DVD"),
+        reference.min_preference("Bluray-1080", physical_media=True),
+        reference.min_preference("Bluray-2160", physical_media=True),
+    )
+
+
+def _compute_rows(movie_ids, session):
+    """The ShoppingListItem rows these films should have."""
+
+    reference = reference_data()
+    thresholds = _thresholds()
+
+    movies = session.query(Movie).filter(Movie.id.in_(movie_ids)).all()
+
+    ranked_files = (
+        session.query(File.id.label("file_id"), movie_file_rank())
+        .join(Movie, (Movie.id == File.movie_id))
+        .join(RefQuality, (RefQuality.id == File.quality_id))
+        .filter(File.movie_id.in_(movie_ids))
+        .filter(File.feature_type_id == None)
+        .subquery()
+    )
+    best_files = {}
+    for file, preference in (
+        session.query(File, RefQuality.preference)
+        .join(RefQuality, (RefQuality.id == File.quality_id))
+        .join(ranked_files, (ranked_files.c.file_id == File.id))
+        .filter(ranked_files.c.rank == 1)
+    ):
+        best_files.setdefault(file.movie_id, []).append((file, preference))
+
+    # The digital-only view's test looks at every file, special features
+    # included, as it always has
+
+    not_digital = {
+        movie_id
+        for (movie_id,) in session.query(File.movie_id)
+        .join(RefQuality, (RefQuality.id == File.quality_id))
+        .filter(File.movie_id.in_(movie_ids))
+        .filter(
+            db.or_(
+                RefQuality.physical_media == True,
+                RefQuality.quality_title == "SDTV",
+                RefQuality.quality_title.ilike("HDTV-%"),
+            )
+        )
+        .distinct()
+    }
+
+    reviews = {
+        movie_id: (rating, count, liked or 0)
+        for movie_id, rating, count, liked in session.query(
+            UserMovieReview.movie_id,
+            db.func.avg(UserMovieReview.rating),
+            db.func.count(UserMovieReview.id),
+            db.func.sum(db.case((UserMovieReview.liked == True, 1), else_=0)),
+        )
+        .filter(UserMovieReview.movie_id.in_(movie_ids))
+        .group_by(UserMovieReview.movie_id)
+    }
+
+    rows = []
+    for movie in movies:
+        rating, review_count, liked_count = reviews.get(movie.id, (None, 0, 0))
+        criterion_quality = reference.quality(movie.criterion_quality_id)
+        criterion_preference = (
+            criterion_quality.preference if criterion_quality else None
+        )
+        copies = best_files.get(movie.id)
+
+        # A film with no main-feature copy is only on the list if someone
+        # liked it; the page narrows that to the reader's own likes
+
+        if not copies:
+            if not liked_count:
+                continue
+            copies = [(None, None)]
+
+        for file, preference in copies:
+            rows.append(
+                ShoppingListItem(
+                    movie_id=movie.id,
+                    file_id=file.id if file else None,
+                    preference=preference,
+                    criterion=bool(
+                        movie.criterion_spine_number or movie.criterion_set_title
+                    ),
+                    digital_only=movie.id not in not_digital,
+                    rating=rating,
+                    review_count=review_count,
+                    liked_count=liked_count,
+                    sort_title=movie.sort_title,
+                    year=movie.year,
+                    edition=file.edition if file else None,
+                    date_added=file.date_added if file else None,
+                    **_verdict(
+                        movie, file, preference, criterion_preference, thresholds
+                    ),
+                )
+            )
+    return rows
+
+
+def refresh_shopping_list(movie_ids, session=None):
+    """Replace these films' rows with freshly computed ones."""
+
+    session = session or db.session
+    movie_ids = sorted({movie_id for movie_id in movie_ids if movie_id is not None})
+    for start in range(0, len(movie_ids), REFRESH_CHUNK):
+        chunk = movie_ids[start : start + REFRESH_CHUNK]
+        with session.no_autoflush:
+            rows = _compute_rows(chunk, session)
+        session.query(ShoppingListItem).filter(
+            ShoppingListItem.movie_id.in_(chunk)
+        ).delete(synchronize_session=False)
+        session.add_all(rows)
+
+
+def rebuild_shopping_list():
+    """Recompute every film's rows; returns the number of rows written.
+
+    Every row is computed before any is written, then the whole table
+    is swapped in one transaction, so other sessions read the previous
+    rows right up to the commit (and the delete's locks last only as
+    long as the inserts). The new generation is published, and the
+    rebuild claim released, in one MULTI after it."""
+
+    with app.app_context():
+        movie_ids = sorted(
+            {
+                movie_id
+                for (movie_id,) in db.session.query(File.movie_id)
+                .filter(File.movie_id != None)
+                .distinct()
+            }
+            | {
+                movie_id
+                for (movie_id,) in db.session.query(UserMovieReview.movie_id)
+                .filter(UserMovieReview.liked == True)
+                .distinct()
+            }
+        )
+        rows = []
+        with db.session.no_autoflush:
+            for start in range(0, len(movie_ids), REFRESH_CHUNK):
+                rows += _compute_rows(
+                    movie_ids[start : start + REFRESH_CHUNK], db.session
+                )
+        # Nothing reads the new rows back, so they go in by bulk INSERT
+        # rather than a statement per row fetching its id; every row
+        # names every column (NULLs too) so they share one statement
+
+        columns = [
+            column.key
+            for column in ShoppingListItem.__table__.columns
+            if not column.primary_key
+        ]
+        db.session.query(ShoppingListItem).delete(synchronize_session=False)
+        db.session.bulk_insert_mappings(
+            ShoppingListItem,
+            [{key: getattr(row, key) for key in columns} for row in rows],
+            render_nulls=True,
+        )
+        db.session.commit()
+
+        pipe = current_app.redis.pipeline(transaction=True)
+        pipe.set(GENERATION_KEY, uuid.uuid4().hex)
+        pipe.delete(BUILDING_KEY)
+        pipe.execute()
+        return len(rows)
+
+
+def ensure_shopping_list():
+    """Rebuild the projection if no process has since Redis last started
+    empty — a fresh deploy or a restarted Redis — claiming the rebuild
+    so concurrent requests don't all run it. Those requests serve the
+    previous rows meanwhile; a rebuild that fails drops its claim so the
+    next view retries."""
+
+    redis = current_app.redis
+    if redis.exists(GENERATION_KEY):
+        return
+    if redis.set(BUILDING_KEY, uuid.uuid4().hex, nx=True, ex=BUILDING_SECONDS):
+        try:
+            rebuild_shopping_list()
+        except Exception:
+            db.session.rollback()
+            redis.delete(BUILDING_KEY)
+            raise
+
+
+def _touched_movies(instance, session):
+    """The films a written row's change can move on the list."""
+
+    if isinstance(instance, Movie):
+        if instance in session.new or instance in session.deleted:
+            return {instance.id}
+        state = inspect(instance)
+        if any(state.attrs[field].history.has_changes() for field in _MOVIE_FIELDS):
+            return {instance.id}
+        return set()
+    if isinstance(instance, (File, UserMovieReview)):
+        state = inspect(instance)
+        return {instance.movie_id, *state.attrs.movie_id.history.deleted}
+    return set()
+
+
+def _collect(session):
+    """Add the films the pending flush touches to the session's set."""
+
+    touched = session.info.setdefault("shopping_list_changes", set())
+    with session.no_autoflush:
+        for instance in session.new | session.deleted:
+            touched.update(_touched_movies(instance, session))
+        for instance in session.dirty:
+            if session.is_modified(instance, include_collections=False):
+                touched.update(_touched_movies(instance, session))
+    touched.discard(None)
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_previous(session, flush_context, instances):
+    """Note the films written rows belong to before the flush, while a
+    deleted row's film can still be loaded."""
+
+    _collect(session)
+
+    # A row expired by the last commit doesn't remember the film it's
+    # being moved from, but the database still does
+
+    for model in (File, UserMovieReview):
+        moved = [
+            instance.id
+            for instance in session.dirty
+            if isinstance(instance, model)
+            and inspect(instance).attrs.movie_id.history.has_changes()
+        ]
+        if moved:
+            session.info["shopping_list_changes"].update(
+                movie_id
+                for (movie_id,) in session.execute(
+                    db.select(model.movie_id).where(model.id.in_(moved))
+                )
+                if movie_id is not None
+            )
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_current(session, flush_context):
+    """Note the films written rows belong to after it — a file attached
+    through file.movie only has its movie_id now, as does a new film."""
+
+    _collect(session)
+
+
+@event.listens_for(Session, "before_commit")
+def _refresh_changes(session):
+    """Bring the touched films' rows up to date inside the transaction
+    being committed."""
+
+    if not has_app_context():
+        return
+    session.flush()
+    touched = session.info.pop("shopping_list_changes", None)
+    if touched:
+        refresh_shopping_list(touched, session)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    """A rolled-back flush changed nothing."""
+
+    session.info.pop("shopping_list_changes", None)
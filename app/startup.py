@@ -0,0 +1,118 @@
+"""Process startup: what each worker loads, and where the time goes (Oct 2026).
+
+Every worker used to import app.videos — and through it the whole file
+pipeline, boto3, pymediainfo, and the rest — before taking its first
+job, whatever its queues, so a supervisorctl restart (a deploy, or
+heal_worker_processes reviving a worker) took the better part of a
+second per process before the worker was back on its queues. The
+heavy libraries now load where they're used (boto3 with the first AWS
+client, pymediainfo with the first scan, Pillow with the first image),
+and supervisor.py preloads only what its own queues run, per
+WORKER_PRELOADS. Anything it doesn't preload, rq imports by job string
+on the first job that needs it.
+
+`flask startup-profile` measures a cold start in a fresh interpreter:
+the slowest imports, by their own time and with their children, and
+how long each create_app phase took (see app.startup_phases).
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from importlib import import_module
+
+# Modules each queue's jobs live in, imported when a worker starts so
+# its first job doesn't pay for them. The file-pipeline queues run the
+# app.videos stages back to back, so their workers load them up front;
+# the maintenance, SQL, and user-request queues run a wide spread of
+# short jobs, each of which imports its own module on first use
+
+WORKER_PRELOADS = {
+    "fitzflix-import": ("app.videos",),
+    "fitzflix-file-operation": ("app.videos",),
+    "fitzflix-transcode": ("app.videos", "app.atmos"),
+    "fitzflix-maintenance": (),
+    "fitzflix-sql": (),
+    "fitzflix-user-request": (),
+}
+
+# The cold start startup-profile measures: a web process's or, given
+# queues, a worker's — the same imports supervisor.py makes. Its result
+# is the one line of standard output; -X importtime reports on stderr
+
+_PROFILE_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+from app.startup import preload_worker_modules
+imported = time.perf_counter()
+queues = sys.argv[1:]
+app = create_app()
+built = time.perf_counter()
+preload_worker_modules(queues)
+print(json.dumps({
+    "import_seconds": imported - started,
+    "create_app_seconds": built - imported,
+    "preload_seconds": time.perf_counter() - built,
+    "phases": app.startup_phases,
+}))
+"""
+
+
+def worker_preloads(queues):
+    """The modules a worker on queues preloads, in order, once each."""
+
+    modules = []
+    for queue in queues:
+        for module in WORKER_PRELOADS.get(queue, ()):
+            if module not in modules:
+                modules.append(module)
+    return modules
+
+
+def preload_worker_modules(queues):
+    """Import the modules a worker on queues preloads."""
+
+    for module in worker_preloads(queues):
+        import_module(module)
+
+
+def parse_import_times(report):
+    """[(module, self µs, cumulative µs)] from -X importtime output."""
+
+    times = []
+    for line in report.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the column header
+        times.append(
+            (fields[2].strip(), int(fields[0].strip()), int(fields[1].strip()))
+        )
+    return times
+
+
+def profile_startup(queues=()):
+    """A cold start, measured in a fresh interpreter: the import times
+    of every module it loaded, and its create_app (and, for queues, its
+    worker preload) timings."""
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROFILE_SCRIPT, *queues],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(
+            f"Profiled startup exited {result.returncode}: "
+            f"{result.stderr.strip().splitlines()[-1:]}"
+        )
+    profile = json.loads(result.stdout.strip().splitlines()[-1])
+    profile["imports"] = parse_import_times(result.stderr)
+    return profile
@@ -46,11 +46,14 @@ self.addEventListener("fetch", function (event) {
 
 	var isManifest = url.pathname.endsWith("/site.webmanifest");
 
-	// Static assets and CDN resources: cache first, fetch once
+	// Static assets, cached TMDb artwork (whose URLs never change
+	// content), and CDN resources: cache first, fetch once
 
 	if (
 		!isManifest &&
-		(url.pathname.startsWith("/static/") || url.origin !== location.origin)
+		(url.pathname.startsWith("/static/") ||
+			url.pathname.startsWith("/artwork/") ||
+			url.origin !== location.origin)
 	) {
 		event.respondWith(
 			caches.match(request).then(function (cached) {
@@ -11,11 +11,24 @@ fetches under the rate limiter), and displays are customized to each
 user's chosen services —
 a per-user Profile setting, never site-wide. The payload carries no
 deep links; the only outbound link is the film's TMDb watch page.
+
+Since Oct 2026 the nightly refresh is tiered rather than whole-library.
+Each fetch records the payload's content hash and when it last changed
+under AVAILABILITY_STATE_KEY. Watchlisted films, owned copies worth
+upgrading, and titles whose availability moved in the last week are
+re-fetched daily; the long tail rotates through a weekly schedule, each
+film on the night its TMDb id falls on, and a film TMDb's change feed
+names since the last pass is due that night whatever its tier. Library
+entries are held for a rotation plus the usual two days' grace.
 """
 
+import hashlib
 import json
+import time
 import traceback
 
+from datetime import datetime, timedelta
+
 from concurrent.futures import ThreadPoolExecutor
 
 import requests
@@ -24,7 +37,8 @@ from flask import current_app
 from werkzeug.local import LocalProxy
 
 from app import db, get_app
-from app.models import Movie, tmdb_get
+from app.criterion_catalog import rebuild_criterion_index
+from app.models import Movie, ShoppingListItem, UserWatchlist, tmdb_get
 
 # This process's app instance, resolved lazily so the warm task can run
 # on a worker without building a second application
@@ -37,6 +51,29 @@ REFRESH_WORKERS = 20
 REGISTRY_KEY = "fitzflix:tmdb:watch-providers:registry"
 AVAILABILITY_KEY = "fitzflix:tmdb:watch-providers:movie:{tmdb_id}"
 
+# {tmdb_id: {"hash", "changed", "checked"}}, epoch seconds, for every
+# title fetched since the tiers began
+
+AVAILABILITY_STATE_KEY = "fitzflix:tmdb:watch-providers:state"
+CHANGES_SINCE_KEY = "fitzflix:tmdb:watch-providers:changes-since"
+
+# The long tail's cycle, and how long a library entry is held: a full
+# rotation plus the two days a missed night has always been allowed
+
+ROTATION_DAYS = 7
+TRACKED_CACHE_SECONDS = ROTATION_DAYS * 86400 + CACHE_SECONDS
+
+# A daily-tier title checked this recently (by the change feed, or a
+# late run the night before) isn't fetched again
+
+DAILY_SECONDS = 20 * 3600
+
+# TMDb's change feed pages 100 ids at a time and only reaches back two
+# weeks
+
+CHANGES_MAX_PAGES = 500
+CHANGES_MAX_DAYS = 14
+
 
 def provider_registry():
     """US movie watch providers from TMDb's registry, sorted by display
@@ -80,9 +117,9 @@ def provider_registry():
     return providers
 
 
-def title_availability(tmdb_id, refresh=False):
+def title_availability(tmdb_id, refresh=False, ttl=CACHE_SECONDS):
     """The film's US watch-provider payload {link, flatrate, ads, rent,
-    buy}, cached for CACHE_SECONDS; None while unknown (no key, TMDb
+    buy}, cached for ttl seconds; None while unknown (no key, TMDb
     down). refresh skips the cache read — the nightly task's way of
     re-fetching a title whose entry is still live.
 
@@ -129,12 +166,56 @@ def title_availability(tmdb_id, refresh=False):
             }
             for p in region.get(kind) or []
         ]
-    current_app.redis.set(cache_key, json.dumps(payload), ex=CACHE_SECONDS)
+    _store_availability(int(tmdb_id), payload, ttl)
     return payload
 
 
+def _store_availability(tmdb_id, payload, ttl):
+    """Cache a fetched payload and update the title's state: checked
+    now, and changed now too unless the content hash matches the last
+    fetch's."""
+
+    serialized = json.dumps(payload, sort_keys=True)
+    content_hash = hashlib.sha1(serialized.encode()).hexdigest()
+    now = time.time()
+    previous = availability_states([tmdb_id]).get(tmdb_id)
+    changed = (
+        previous["changed"]
+        if previous and previous.get("hash") == content_hash
+        else now
+    )
+
+    pipe = current_app.redis.pipeline(transaction=False)
+    pipe.set(AVAILABILITY_KEY.format(tmdb_id=tmdb_id), serialized, ex=ttl)
+    pipe.hset(
+        AVAILABILITY_STATE_KEY,
+        tmdb_id,
+        json.dumps({"hash": content_hash, "changed": changed, "checked": now}),
+    )
+    pipe.execute()
+
+
+def availability_states(tmdb_ids):
+    """{tmdb_id: {"hash", "changed", "checked"}} for the titles that
+    have been fetched, in one HMGET."""
+
+    ids = [int(tmdb_id) for tmdb_id in tmdb_ids]
+    if not ids:
+        return {}
+    states = current_app.redis.hmget(AVAILABILITY_STATE_KEY, ids)
+    return {
+        tmdb_id: json.loads(state)
+        for tmdb_id, state in zip(ids, states)
+        if state is not None
+    }
+
+
 def batch_title_availability(
-    tmdb_ids, max_workers=REFRESH_WORKERS, fetch_limit=None, refresh=False
+    tmdb_ids,
+    max_workers=REFRESH_WORKERS,
+    fetch_limit=None,
+    refresh=False,
+    ttl=CACHE_SECONDS,
 ):
     """(payloads, deferred): availability for many titles at once, as
     {tmdb_id: payload-or-None} plus the ids that weren't fetched.
@@ -146,7 +227,8 @@ def batch_title_availability(
     it — leftover ids come back for the caller to warm in the
     background instead. The page renders pass fetch_limit=0 (Aug 2026):
     they answer from the cache the nightly refresh keeps full and never
-    fetch inline. refresh re-fetches every id, cached or not."""
+    fetch inline. refresh re-fetches every id, cached or not, and ttl
+    is what the fetched entries are held for."""
 
     results = {}
     ids = sorted({int(t) for t in tmdb_ids if t is not None})
@@ -179,7 +261,7 @@ def batch_title_availability(
         """One title's availability under its own app context."""
 
         with flask_app.app_context():
-            return tmdb_id, title_availability(tmdb_id, refresh=refresh)
+            return tmdb_id, title_availability(tmdb_id, refresh=refresh, ttl=ttl)
 
     with ThreadPoolExecutor(max_workers=max_workers) as pool:
         for tmdb_id, payload in pool.map(fetch, misses):
@@ -197,13 +279,112 @@ def warm_title_availability(tmdb_ids):
         return True
 
 
+def daily_tier():
+    """The TMDb ids refreshed every night: films on anyone's watchlist
+    and owned films the shopping list says are worth upgrading — the
+    two places a streaming change decides what happens next."""
+
+    watchlisted = (
+        db.session.query(Movie.tmdb_id)
+        .join(UserWatchlist, (UserWatchlist.movie_id == Movie.id))
+        .filter(Movie.tmdb_id.isnot(None))
+    )
+    upgradable = (
+        db.session.query(Movie.tmdb_id)
+        .join(ShoppingListItem, (ShoppingListItem.movie_id == Movie.id))
+        .filter(Movie.tmdb_id.isnot(None))
+        .filter(ShoppingListItem.file_id.isnot(None))
+        .filter(ShoppingListItem.instruction != "Already owned")
+    )
+    return {tmdb_id for (tmdb_id,) in watchlisted.union(upgradable)}
+
+
+def changed_tmdb_ids(since, until):
+    """The ids in TMDb's movie change feed between two dates, or None if
+    the feed couldn't be read in full."""
+
+    ids = set()
+    page = 1
+    while page <= CHANGES_MAX_PAGES:
+        try:
+            r = tmdb_get(
+                current_app.config["TMDB_API_URL"] + "/movie/changes",
+                params={
+                    "api_key": current_app.config["TMDB_API_KEY"],
+                    "start_date": since.isoformat(),
+                    "end_date": until.isoformat(),
+                    "page": page,
+                },
+                timeout=10,
+            )
+            r.raise_for_status()
+            body = r.json()
+        except Exception:
+            current_app.logger.warning(traceback.format_exc())
+            return None
+        ids.update(
+            int(entry["id"])
+            for entry in body.get("results") or []
+            if entry.get("id") is not None
+        )
+        if page >= (body.get("total_pages") or 1):
+            return ids
+        page += 1
+    # A truncated feed isn't a complete one: the caller falls back to
+    # the tiered refresh and keeps its since-date, so the changes past
+    # the cutoff are read again rather than skipped
+
+    current_app.logger.warning(
+        f"TMDb's change feed ran past {CHANGES_MAX_PAGES} pages; "
+        f"falling back to the tiered refresh"
+    )
+    return None
+
+
+def due_for_refresh(tmdb_ids, daily, changed, now=None):
+    """The subset of tmdb_ids tonight's pass fetches.
+
+    Due are titles never fetched or whose entry is gone, titles the
+    change feed named, daily-tier titles (including any whose payload
+    changed within a rotation) not checked in the last DAILY_SECONDS,
+    and long-tail titles on tonight's slot of the rotation or overdue
+    from a missed one.
+    """
+
+    now = now if now is not None else time.time()
+    ids = sorted({int(tmdb_id) for tmdb_id in tmdb_ids})
+    states = availability_states(ids)
+    pipe = current_app.redis.pipeline(transaction=False)
+    for tmdb_id in ids:
+        pipe.exists(AVAILABILITY_KEY.format(tmdb_id=tmdb_id))
+    cached = dict(zip(ids, pipe.execute()))
+    tonight = int(now // 86400) % ROTATION_DAYS
+    rotation = ROTATION_DAYS * 86400
+
+    due = []
+    for tmdb_id in ids:
+        state = states.get(tmdb_id)
+        if state is None or not cached[tmdb_id] or tmdb_id in changed:
+            due.append(tmdb_id)
+            continue
+        age = now - state["checked"]
+        if tmdb_id in daily or now - state["changed"] < rotation:
+            if age >= DAILY_SECONDS:
+                due.append(tmdb_id)
+        elif tmdb_id % ROTATION_DAYS == tonight or age >= rotation:
+            due.append(tmdb_id)
+    return due
+
+
 def refresh_availability():
-    """Nightly task (Aug 2026): re-fetch availability for every film
-    with a TMDb id, so the pages that read it — the watchlist, the
-    Criterion catalog, filmographies — always answer from a full cache
-    and never block on TMDb. Whole-library cost is a few thousand
-    requests, minutes under the rate limiter, and each entry's two-day
-    TTL restarts, so one missed night still serves yesterday's data."""
+    """Nightly task (Aug 2026; tiered Oct 2026): keep availability
+    fresh for every film with a TMDb id, so the pages that read it —
+    the watchlist, the Criterion catalog, filmographies — always answer
+    from a full cache and never block on TMDb. Only the titles
+    due_for_refresh picks are fetched: the daily tier, a seventh of the
+    long tail, and whatever the change feed reported since the last
+    pass — a few hundred requests where the whole library was a few
+    thousand."""
 
     with app.app_context():
         if not current_app.config["TMDB_API_KEY"]:
@@ -214,11 +395,40 @@ def refresh_availability():
             .filter(Movie.tmdb_id.isnot(None))
             .distinct()
         ]
-        results, _ = batch_title_availability(tmdb_ids, refresh=True)
+
+        # Read the change feed from the last pass that read it in full.
+        # TMDb's dates are whole days, so the boundary day is read
+        # twice rather than missed
+
+        today = datetime.utcnow().date()
+        since = current_app.redis.get(CHANGES_SINCE_KEY)
+        since = (
+            datetime.strptime(since.decode(), "%Y-%m-%d").date()
+            if since
+            else today - timedelta(days=1)
+        )
+        since = max(since, today - timedelta(days=CHANGES_MAX_DAYS))
+        changed = changed_tmdb_ids(since, today)
+
+        due = due_for_refresh(tmdb_ids, daily_tier(), changed or set())
+        results, _ = batch_title_availability(
+            due, refresh=True, ttl=TRACKED_CACHE_SECONDS
+        )
         fetched = sum(1 for payload in results.values() if payload is not None)
+        if changed is not None and fetched == len(due):
+            current_app.redis.set(CHANGES_SINCE_KEY, today.isoformat())
         current_app.logger.info(
-            f"Streaming availability refresh: {fetched} of {len(tmdb_ids)} films fetched"
+            f"Streaming availability refresh: {fetched} of {len(due)} due films "
+            f"fetched ({len(tmdb_ids)} in the library)"
         )
+
+        # The Criterion catalog page's index rides the nightly pass, so
+        # TMDb renames and new records reach it within a day
+
+        try:
+            rebuild_criterion_index()
+        except Exception:
+            current_app.logger.warning(traceback.format_exc())
         return True
 
 
@@ -10,6 +10,13 @@ first. Survivors are enriched with full credits so crew features score
 too, and each recommendation carries its provenance (which named query
 produced it) alongside its top contributing features.
 
+Since Oct 2026 the nightly run plans every user's rail together
+(plan_rails): the distinct discover queries across all users run once,
+each distinct candidate is verified and enriched once, and each
+profile scores the shared candidate set through one inverted feature
+index — so the night's TMDb and Redis traffic grows with the distinct
+titles in play rather than with users times titles.
+
 Films already in the library or in the user's diary are excluded — the
 rail recommends what to watch on services already paid for, never what
 to buy (that preference is physical media). The discover data and the
@@ -31,10 +38,12 @@ from app import db, get_app
 from app.models import File, Movie, User, UserMovieReview, UserMovieStatus
 from app.recommendations import (
     CREW_ROLE_JOBS,
+    FEATURE_CLASS_WEIGHTS,
     TOP_BILLING_CUTOFF,
     score_movie,
     stored_profile,
 )
+from app.recs_storage import cached_artifact, store_artifacts
 from app.streaming import (
     batch_title_availability,
     streaming_matches,
@@ -81,6 +90,12 @@ VERIFY_DEPTH = 100
 ENRICH_DEPTH = 50
 STORED_RAIL_ITEMS = 50
 
+# Concurrent discover pages and enrichment fetches; every call still
+# passes through tmdb_get's app-wide rate limiter
+
+DISCOVER_WORKERS = 10
+ENRICH_WORKERS = 10
+
 
 def _discover(params):
     """One discover page's results, [] on failure (the rail just gets
@@ -233,33 +248,37 @@ def _taste_queries(profile, provider_ids):
     return queries
 
 
-def _excluded_tmdb_ids(user_id):
-    """TMDb ids the rail must never recommend: films with a local
-    main-feature file, films already in this user's diary (owned or
-    review-only records alike), and films they've waved off."""
+def _excluded_tmdb_ids(user_ids):
+    """{user_id: TMDb ids} the rail must never recommend each user:
+    films with a local main-feature file (one set, shared), films
+    already in the user's diary (owned or review-only records alike),
+    and films they've waved off."""
 
-    owned = db.session.query(Movie.tmdb_id).filter(
-        Movie.tmdb_id.isnot(None),
-        Movie.files.any(File.feature_type_id.is_(None)),
-    )
+    owned = {
+        tmdb_id
+        for (tmdb_id,) in db.session.query(Movie.tmdb_id).filter(
+            Movie.tmdb_id.isnot(None),
+            Movie.files.any(File.feature_type_id.is_(None)),
+        )
+    }
+    user_ids = [int(user_id) for user_id in user_ids]
+    excluded = {user_id: set(owned) for user_id in user_ids}
     logged = (
-        db.session.query(Movie.tmdb_id)
+        db.session.query(UserMovieReview.user_id, Movie.tmdb_id)
         .join(UserMovieReview, UserMovieReview.movie_id == Movie.id)
         .filter(Movie.tmdb_id.isnot(None))
-        .filter(UserMovieReview.user_id == int(user_id))
+        .filter(UserMovieReview.user_id.in_(user_ids))
     )
     refused = (
-        db.session.query(Movie.tmdb_id)
+        db.session.query(UserMovieStatus.user_id, Movie.tmdb_id)
         .join(UserMovieStatus, UserMovieStatus.movie_id == Movie.id)
         .filter(Movie.tmdb_id.isnot(None))
-        .filter(UserMovieStatus.user_id == int(user_id))
+        .filter(UserMovieStatus.user_id.in_(user_ids))
         .filter(UserMovieStatus.kind == "not_interested")
     )
-    return (
-        {tmdb_id for (tmdb_id,) in owned}
-        | {tmdb_id for (tmdb_id,) in logged}
-        | {tmdb_id for (tmdb_id,) in refused}
-    )
+    for user_id, tmdb_id in logged.union(refused):
+        excluded[user_id].add(tmdb_id)
+    return excluded
 
 
 def _discover_features(item):
@@ -395,107 +414,235 @@ def _payload_features(payload):
     return unique
 
 
-def compute_user_rail(user):
-    """The ranked streaming rail for one user, or None when they lack a
-    taste profile or provider picks.
+def _feature_index(features_by_id):
+    """{feature key: [(tmdb_id, position, class)]} over a candidate
+    set, so a profile only touches the candidates its affinities
+    match."""
+
+    index = {}
+    for tmdb_id, features in features_by_id.items():
+        for position, (cls, key, _) in enumerate(features):
+            index.setdefault(key, []).append((tmdb_id, position, cls))
+    return index
+
+
+def score_candidates(profile, index, class_weights=None):
+    """{tmdb_id: score} for every indexed candidate the profile
+    matches; the rest score 0.0.
 
-    Pipeline: shared provider pools + taste-shaped queries -> coarse
-    affinity ranking -> per-title availability verification (discover
-    lies; the watch-provider cache doesn't) -> credits enrichment and
-    full-feature rescoring of the survivors.
+    One pass over the profile's affinities against the shared index
+    instead of score_movie per candidate. Each candidate's matches are
+    replayed in feature order through score_movie's arithmetic, so the
+    scores are the same to the last bit.
     """
 
+    class_weights = class_weights or FEATURE_CLASS_WEIGHTS
+    matched = {}
+    for key, entry in profile.get("affinities", {}).items():
+        for tmdb_id, position, cls in index.get(key, ()):
+            matched.setdefault(tmdb_id, []).append((position, cls, entry["score"]))
+
+    scores = {}
+    for tmdb_id, matches in matched.items():
+        matches.sort()
+        by_class = {}
+        for _, cls, affinity in matches:
+            by_class.setdefault(cls, []).append(affinity)
+        score = 0.0
+        for cls, affinities in by_class.items():
+            class_weight = class_weights.get(cls, 0.0)
+            denominator = len(affinities) + 1
+            for affinity in affinities:
+                score += class_weight * affinity / denominator
+        scores[tmdb_id] = score
+    return scores
+
+
+def _in_app_context(function):
+    """function wrapped to run under its own app context, for the
+    planner's thread pools."""
+
+    flask_app = current_app._get_current_object()
+
+    def wrapped(argument):
+        """One call under a fresh app context."""
+
+        with flask_app.app_context():
+            return function(argument)
+
+    return wrapped
+
+
+def _plan_user(user):
+    """What one user's rail needs from the shared work: their profile,
+    services, and taste-shaped discover queries — or None when they
+    lack a profile or provider picks."""
+
     profile = stored_profile(current_app.redis, user.id)
     provider_ids = user_provider_ids(user)
     if not profile or not provider_ids:
         return None
+    queries = [
+        (tag, {**_base_params(provider_ids), **extra_params, "page": page})
+        for tag, extra_params, pages in _taste_queries(profile, provider_ids)
+        for page in range(1, pages + 1)
+    ]
+    return {
+        "user_id": user.id,
+        "profile": profile,
+        "provider_ids": provider_ids,
+        "provider_names": {
+            row.provider_id: row.name for row in user.streaming_providers
+        },
+        "queries": queries,
+    }
 
-    provider_names = {row.provider_id: row.name for row in user.streaming_providers}
 
-    pool = {}
-    for provider_id in sorted(provider_ids):
-        shared = provider_pool(
-            provider_id, provider_names.get(provider_id) or f"provider {provider_id}"
+def plan_rails(users):
+    """{user_id: ranked rail} for every user with a taste profile and
+    provider picks, computed together.
+
+    Pipeline, each stage shared across users: provider pools for the
+    union of their services + the distinct taste-shaped queries ->
+    coarse affinity ranking per user over a shared feature index ->
+    availability verification of every user's candidates in one batch
+    (discover lies; the watch-provider cache doesn't) -> credits
+    enrichment of each distinct survivor once, and full-feature
+    rescoring per user.
+    """
+
+    plans = [plan for plan in map(_plan_user, users) if plan is not None]
+    if not plans:
+        return {}
+
+    provider_names = {}
+    for plan in plans:
+        for provider_id in plan["provider_ids"]:
+            name = plan["provider_names"].get(provider_id)
+            if name or provider_id not in provider_names:
+                provider_names[provider_id] = name or f"provider {provider_id}"
+    queries = {
+        json.dumps(params, sort_keys=True): params
+        for plan in plans
+        for _, params in plan["queries"]
+    }
+    with ThreadPoolExecutor(max_workers=DISCOVER_WORKERS) as executor:
+        pools = dict(
+            zip(
+                provider_names,
+                executor.map(
+                    _in_app_context(lambda pair: provider_pool(*pair)),
+                    provider_names.items(),
+                ),
+            )
         )
-        for tmdb_id, entry in shared.items():
-            _merge(pool, [entry["item"]], entry["sources"][0])
-            for source in entry["sources"][1:]:
-                _merge(pool, [entry["item"]], source)
-
-    for tag, extra_params, pages in _taste_queries(profile, provider_ids):
-        for page in range(1, pages + 1):
-            params = {**_base_params(provider_ids), **extra_params, "page": page}
-            _merge(pool, _discover(params), tag)
-
-    excluded = _excluded_tmdb_ids(user.id)
-    ranked = []
-    for tmdb_id, entry in pool.items():
-        tmdb_id = int(tmdb_id)
-        if tmdb_id in excluded:
-            continue
-        score, _ = score_movie(_discover_features(entry["item"]), profile)
-        popularity = entry["item"].get("popularity") or 0.0
-        ranked.append((score, popularity, tmdb_id, entry))
-    ranked.sort(key=lambda row: (row[0], row[1]), reverse=True)
+        pages = dict(
+            zip(queries, executor.map(_in_app_context(_discover), queries.values()))
+        )
+
+    # Each user's pool merges the shared results in the order a lone
+    # compute would, so provenance tags lead with the same source
+
+    excluded = _excluded_tmdb_ids([plan["user_id"] for plan in plans])
+    coarse_features = {}
+    for plan in plans:
+        pool = {}
+        for provider_id in sorted(plan["provider_ids"]):
+            for tmdb_id, entry in pools[provider_id].items():
+                for source in entry["sources"]:
+                    _merge(pool, [entry["item"]], source)
+        for tag, params in plan["queries"]:
+            _merge(pool, pages[json.dumps(params, sort_keys=True)], tag)
+        plan["pool"] = {
+            int(tmdb_id): entry
+            for tmdb_id, entry in pool.items()
+            if int(tmdb_id) not in excluded[plan["user_id"]]
+        }
+        for tmdb_id, entry in plan["pool"].items():
+            if tmdb_id not in coarse_features:
+                coarse_features[tmdb_id] = _discover_features(entry["item"])
+
+    coarse_index = _feature_index(coarse_features)
+    for plan in plans:
+        scores = score_candidates(plan["profile"], coarse_index)
+        ranked = [
+            (
+                scores.get(tmdb_id, 0.0),
+                entry["item"].get("popularity") or 0.0,
+                tmdb_id,
+                entry,
+            )
+            for tmdb_id, entry in plan["pool"].items()
+        ]
+        ranked.sort(key=lambda row: (row[0], row[1]), reverse=True)
+        plan["candidates"] = ranked[:VERIFY_DEPTH]
 
-    # Verification: only films genuinely streaming on this user's
+    # Verification: only films genuinely streaming on each user's
     # services survive (day-cached per title, shared with page views)
 
-    candidates = ranked[:VERIFY_DEPTH]
     availability, _ = batch_title_availability(
-        [tmdb_id for _, _, tmdb_id, _ in candidates]
+        {tmdb_id for plan in plans for _, _, tmdb_id, _ in plan["candidates"]}
     )
-    verified = []
-    for score, popularity, tmdb_id, entry in candidates:
-        matches = streaming_matches(availability.get(tmdb_id), provider_ids)
-        if matches:
-            verified.append((tmdb_id, entry, matches))
-        if len(verified) == ENRICH_DEPTH:
-            break
+    for plan in plans:
+        plan["verified"] = []
+        for score, popularity, tmdb_id, entry in plan["candidates"]:
+            matches = streaming_matches(availability.get(tmdb_id), plan["provider_ids"])
+            if matches:
+                plan["verified"].append((tmdb_id, entry, matches))
+            if len(plan["verified"]) == ENRICH_DEPTH:
+                break
 
     # Enrichment: full credits so crew affinities score, then the final
     # ranking with human-readable explanations
 
-    flask_app = current_app._get_current_object()
+    to_enrich = sorted(
+        {tmdb_id for plan in plans for tmdb_id, _, _ in plan["verified"]}
+    )
+    with ThreadPoolExecutor(max_workers=ENRICH_WORKERS) as executor:
+        payloads = dict(
+            zip(to_enrich, executor.map(_in_app_context(enriched_movie), to_enrich))
+        )
+    full_features = {
+        tmdb_id: _payload_features(payload)
+        for tmdb_id, payload in payloads.items()
+        if payload
+    }
 
-    def enrich(tmdb_id):
-        """One enriched payload under its own app context."""
+    rails = {}
+    for plan in plans:
+        items = []
+        for tmdb_id, entry, matches in plan["verified"]:
+            payload = payloads.get(tmdb_id)
+            if not payload:
+                continue
+            score, contributions = score_movie(full_features[tmdb_id], plan["profile"])
+            because = [entry["sources"][0]]
+            because += [
+                label for contribution, label in contributions[:3] if contribution > 0
+            ]
+            items.append(
+                {
+                    "tmdb_id": tmdb_id,
+                    "title": payload.get("title"),
+                    "year": payload.get("year"),
+                    "poster_path": payload.get("poster_path"),
+                    "runtime": payload.get("runtime"),
+                    "providers": matches,
+                    "because": because[:4],
+                    "score": round(score, 4),
+                }
+            )
+        items.sort(key=lambda item: item["score"], reverse=True)
+        rails[plan["user_id"]] = items[:STORED_RAIL_ITEMS]
+    return rails
 
-        with flask_app.app_context():
-            return tmdb_id, enriched_movie(tmdb_id)
-
-    payloads = {}
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        for tmdb_id, payload in executor.map(
-            enrich, [tmdb_id for tmdb_id, _, _ in verified]
-        ):
-            payloads[tmdb_id] = payload
-
-    items = []
-    for tmdb_id, entry, matches in verified:
-        payload = payloads.get(tmdb_id)
-        if not payload:
-            continue
-        score, contributions = score_movie(_payload_features(payload), profile)
-        because = [entry["sources"][0]]
-        because += [
-            label for contribution, label in contributions[:3] if contribution > 0
-        ]
-        items.append(
-            {
-                "tmdb_id": tmdb_id,
-                "title": payload.get("title"),
-                "year": payload.get("year"),
-                "poster_path": payload.get("poster_path"),
-                "runtime": payload.get("runtime"),
-                "providers": matches,
-                "because": because[:4],
-                "score": round(score, 4),
-            }
-        )
 
-    items.sort(key=lambda item: item["score"], reverse=True)
-    return items[:STORED_RAIL_ITEMS]
+def compute_user_rail(user):
+    """The ranked streaming rail for one user, or None when they lack a
+    taste profile or provider picks — plan_rails for a household of
+    one."""
+
+    return plan_rails([user]).get(user.id)
 
 
 def ensure_rail_records(items):
@@ -532,32 +679,44 @@ def ensure_rail_records(items):
 
 def recompute_streaming_rail():
     """Nightly task: rebuild the streaming rail for every user with a
-    taste profile and provider picks, into Redis for the landing page."""
+    taste profile and provider picks, planned together, into Redis for
+    the landing page."""
 
     with app.app_context():
         computed_at = datetime.now().strftime("%Y-%m-%d %H:%M")
+        users = [user for user in User.query.all() if user.streaming_providers.count()]
         rail_films = {}
-        for user in User.query.all():
-            if not user.streaming_providers.count():
-                continue
-            items = compute_user_rail(user)
-            if items is None:
-                continue
-            current_app.redis.set(
-                RAIL_KEY.format(user_id=user.id),
-                json.dumps({"computed_at": computed_at, "items": items}),
+        for user_id, items in plan_rails(users).items():
+            pipeline = current_app.redis.pipeline()
+            store_artifacts(
+                pipeline,
+                user_id,
+                {
+                    RAIL_KEY.format(user_id=user_id): {
+                        "computed_at": computed_at,
+                        "items": items,
+                    }
+                },
             )
+            pipeline.execute()
             current_app.logger.info(
-                f"Streaming rail: stored {len(items)} films for user {user.id}"
+                f"Streaming rail: stored {len(items)} films for user {user_id}"
             )
             for item in items:
                 rail_films.setdefault(item["tmdb_id"], item)
         ensure_rail_records(rail_films.values())
+
+        # The landing shelves were drawn from the old rails; imported
+        # here since that module imports this one
+
+        from app.landing_shelves import invalidate_landing_shelves
+
+        invalidate_landing_shelves()
         return True
 
 
 def stored_rail(redis, user_id):
-    """The nightly recompute's stored rail for a user, or None."""
+    """The nightly recompute's stored rail for a user, or None. Shared
+    with other requests, so read-only."""
 
-    payload = redis.get(RAIL_KEY.format(user_id=int(user_id)))
-    return json.loads(payload) if payload else None
+    return cached_artifact(redis, user_id, RAIL_KEY.format(user_id=int(user_id)))
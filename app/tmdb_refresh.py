@@ -608,7 +608,9 @@ def refresh_in_production_tv():
     Ended and canceled series change rarely; they are covered by the
     refresh-on-import trigger and the maintenance page's bulk refresh.
     A NULL status counts as in-production — it just means the series
-    hasn't been refreshed since before statuses were stored.
+    hasn't been refreshed since before statuses were stored. Each fetch
+    asks only for the seasons that changed (see tmdb_stale_seasons), so
+    a quiet series costs one TMDb request.
     """
 
     with app.app_context():
@@ -624,13 +626,17 @@ def refresh_in_production_tv():
             .order_by(TVSeries.title.asc())
             .all()
         )
-        for tv in series:
-            current_app.request_queue.enqueue(
-                "app.videos.refresh_tmdb_info",
-                args=("TV Shows", tv.id, tv.tmdb_id),
-                job_timeout=current_app.config["SQL_TASK_TIMEOUT"],
-                description=f"Refreshing TMDB data for '{tv.title}'",
-            )
+        current_app.request_queue.enqueue_many(
+            [
+                current_app.request_queue.prepare_data(
+                    "app.videos.refresh_tmdb_info",
+                    args=("TV Shows", tv.id, tv.tmdb_id),
+                    timeout=current_app.config["SQL_TASK_TIMEOUT"],
+                    description=f"Refreshing TMDB data for '{tv.title}'",
+                )
+                for tv in series
+            ]
+        )
 
         current_app.logger.info(
             f"Queued TMDb refreshes for {len(series)} in-production TV series"
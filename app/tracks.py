@@ -23,7 +23,6 @@ import traceback
 
 from datetime import datetime, timedelta, timezone
 
-from pymediainfo import MediaInfo
 from rq import get_current_job
 
 from flask import current_app
@@ -34,6 +33,19 @@ from app.aws_storage import aws_upload
 from app.models import File, FileAudioTrack, FileSubtitleTrack
 
 
+def parse_media_info(file_path):
+    """MediaInfo's report on a file.
+
+    pymediainfo is imported here rather than at module level: it loads
+    libmediainfo, a cost the workers whose queues never scan a file
+    (and the web processes) shouldn't pay at startup.
+    """
+
+    from pymediainfo import MediaInfo
+
+    return MediaInfo.parse(file_path)
+
+
 def watch_mkvmerge_progress(process, job, name, activity):
     """Stream a process's output, logging its progress and updating job meta."""
 
@@ -89,7 +101,7 @@ def _extract_media_details(file_path):
     records never have to open the file themselves.
     """
 
-    media_info = MediaInfo.parse(file_path)
+    media_info = parse_media_info(file_path)
     current_app.logger.debug(
         f"'{os.path.basename(file_path)}' -> {media_info.to_json()}"
     )
@@ -136,7 +148,7 @@ def extract_track_metadata(file_path):
     save_track_metadata on the sql queue.
     """
 
-    media_info = MediaInfo.parse(file_path)
+    media_info = parse_media_info(file_path)
     for track in media_info.tracks:
         if track.track_type == "General" and track.format == "Matroska":
             remove_empty_subtitle_tracks(file_path)
@@ -152,13 +164,17 @@ def track_metadata_scan_library():
         try:
 
             files = File.query.all()
-            for file in files:
-                current_app.file_queue.enqueue(
-                    "app.videos.track_metadata_scan_task",
-                    args=(file.id,),
-                    job_timeout=current_app.config["MKVPROPEDIT_TASK_TIMEOUT"],
-                    description=f"{file.basename} – Scanning track metadata",
-                )
+            current_app.file_queue.enqueue_many(
+                [
+                    current_app.file_queue.prepare_data(
+                        "app.videos.track_metadata_scan_task",
+                        args=(file.id,),
+                        timeout=current_app.config["MKVPROPEDIT_TASK_TIMEOUT"],
+                        description=f"{file.basename} – Scanning track metadata",
+                    )
+                    for file in files
+                ]
+            )
 
         except Exception:
             current_app.logger.error(traceback.format_exc())
@@ -445,7 +461,7 @@ def mkvpropedit_unlocked(
             FileAudioTrack.query.filter_by(file_id=file.id).delete()
             FileSubtitleTrack.query.filter_by(file_id=file.id).delete()
 
-            media_info = MediaInfo.parse(file_path)
+            media_info = parse_media_info(file_path)
             audio_tracks = get_audio_tracks_from_file(file_path)
             subtitle_tracks = get_subtitle_tracks_from_file(file_path)
 
@@ -553,7 +569,7 @@ def mkvpropedit_unlocked(
 
                 if default_audio_track is not None and default_audio_track != "1":
                     new_track_order = []
-                    media_info = MediaInfo.parse(file_path)
+                    media_info = parse_media_info(file_path)
 
                     # Default video tracks
                     for track in media_info.tracks:
@@ -771,7 +787,7 @@ def mkvmerge_unlocked(file_id, audio_tracks, subtitle_tracks):
             audio_start = None
             subtitle_start = None
 
-            media_info = MediaInfo.parse(file_path)
+            media_info = parse_media_info(file_path)
             tracks = [
                 track for track in media_info.tracks if track.track_id is not None
             ]
@@ -899,7 +915,7 @@ def get_audio_tracks_from_file(file_path):
     """Parse a file with MediaInfo and return its audio tracks."""
 
     audio_tracks = []
-    media_info = MediaInfo.parse(file_path)
+    media_info = parse_media_info(file_path)
     current_app.logger.debug(f"{os.path.basename(file_path)} -> {media_info.to_json()}")
 
     for track in media_info.tracks:
@@ -993,7 +1009,7 @@ def get_subtitle_tracks_from_file(file_path):
     """Parse a file with MediaInfo and return its subtitle tracks."""
 
     subtitle_tracks = []
-    media_info = MediaInfo.parse(file_path)
+    media_info = parse_media_info(file_path)
     current_app.logger.debug(f"{os.path.basename(file_path)} -> {media_info.to_json()}")
 
     for track in media_info.tracks:
@@ -1098,7 +1114,7 @@ def remove_empty_subtitle_tracks(file_path):
 
     basename = os.path.basename(file_path)
     job = get_current_job()
-    media_info = MediaInfo.parse(file_path)
+    media_info = parse_media_info(file_path)
 
     keep_track_ids = []
     empty_track_ids = []
@@ -1274,7 +1290,7 @@ def supplement_lossless_tracks(file_path, file_id=None):
                 return True
 
             current_app.logger.info(f"'{basename}' Parsing with MediaInfo")
-            media_info = MediaInfo.parse(file_path)
+            media_info = parse_media_info(file_path)
             current_app.logger.debug(f"'{basename}' -> {media_info.to_json()}")
 
             container = None
@@ -1437,7 +1453,7 @@ def _remux_audio_plan_unlocked(file_id, plan):
                 file_path, staging_source, job, basename, "Copying to local staging"
             )
 
-            media_info = MediaInfo.parse(staging_source)
+            media_info = parse_media_info(staging_source)
             container = None
             file_duration = None
             for track in media_info.tracks:
@@ -1497,7 +1513,7 @@ def _remux_audio_plan_unlocked(file_id, plan):
                         f"'{basename}' output track {position + 1} is "
                         f"{produced}, expected {expected}"
                     )
-            out_info = MediaInfo.parse(staging_output)
+            out_info = parse_media_info(staging_output)
             out_duration = None
             for track in out_info.tracks:
                 if track.track_type == "General" and track.duration:
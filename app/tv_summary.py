@@ -0,0 +1,228 @@
+"""The TV library's per-season summaries (Oct 2026).
+
+The TV library page used to rank every TV file through tv_file_rank's
+window and aggregate the result by season on every view, so its cost
+grew with the episode count however little had changed. Here the
+aggregate lives in TVSeasonSummary: one row per owned season with the
+episode count and the worst quality among each episode's best copy.
+
+Rows follow the files through the ORM. Session listeners note the
+(series, season) pairs each flush touched, before and after the write,
+so a file moved between seasons or series updates both; just before
+the commit those seasons are recomputed in the same transaction, so the
+summary never disagrees with the files it describes. Bulk query deletes
+bypass the listener; the nightly rebuild recomputes every season to
+cover them.
+"""
+
+from datetime import datetime
+
+from flask import has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from werkzeug.local import LocalProxy
+
+from app import db, get_app
+from app.models import File, RefQuality, TVSeasonSummary, TVSeries, tv_file_rank
+from app.reference_data import reference_data
+
+# This process's app instance, resolved lazily so importing this module
+# from a process that already has an application doesn't build a second one
+
+app = LocalProxy(get_app)
+
+
+def season_aggregates(series_ids=None, session=None):
+    """{(series_id, season): (episode_count, worst best-copy preference,
+    worst preference of any copy)} for the given series, or the whole
+    library — the TV library's and TV shopping list's old per-view
+    aggregates. The rank window partitions by series, so restricting
+    the series up front changes no ranking."""
+
+    session = session or db.session
+    ranked_files = (
+        session.query(File.id, tv_file_rank())
+        .join(TVSeries, (TVSeries.id == File.series_id))
+        .join(RefQuality, (RefQuality.id == File.quality_id))
+    )
+    if series_ids is not None:
+        ranked_files = ranked_files.filter(File.series_id.in_(series_ids))
+    ranked_files = ranked_files.subquery()
+
+    rows = (
+        session.query(
+            File.series_id,
+            File.season,
+            db.func.count(db.func.distinct(File.episode)),
+            db.func.min(RefQuality.preference),
+        )
+        .join(RefQuality, (RefQuality.id == File.quality_id))
+        .join(ranked_files, (ranked_files.c.id == File.id))
+        .filter(ranked_files.c.rank == 1)
+        .group_by(File.series_id, File.season)
+        .all()
+    )
+    lowest = session.query(
+        File.series_id, File.season, db.func.min(RefQuality.preference)
+    ).join(RefQuality, (RefQuality.id == File.quality_id))
+    if series_ids is not None:
+        lowest = lowest.filter(File.series_id.in_(series_ids))
+    lowest = {
+        (series_id, season): preference
+        for series_id, season, preference in lowest.group_by(
+            File.series_id, File.season
+        )
+    }
+    return {
+        (series_id, season): (episodes, preference, lowest.get((series_id, season)))
+        for series_id, season, episodes, preference in rows
+    }
+
+
+def _quality_ids_by_preference():
+    """The quality id for each preference, the first by id on a tie —
+    what the old join on preference settled on."""
+
+    quality_ids = {}
+    for quality in sorted(reference_data().qualities, key=lambda q: q.id):
+        quality_ids.setdefault(quality.preference, quality.id)
+    return quality_ids
+
+
+def refresh_season_summaries(keys, session=None):
+    """Recompute the summaries for these (series_id, season) pairs in
+    the session: updating, adding, or (for a season with no files left)
+    deleting each row."""
+
+    session = session or db.session
+    keys = {
+        (series_id, season)
+        for series_id, season in keys
+        if series_id is not None and season is not None
+    }
+    if not keys:
+        return
+    aggregates = season_aggregates({series_id for series_id, _ in keys}, session)
+    quality_ids = _quality_ids_by_preference()
+    now = datetime.utcnow()
+    for key in keys:
+        summary = session.get(TVSeasonSummary, key)
+        aggregate = aggregates.get(key)
+        if aggregate is None:
+            if summary is not None:
+                session.delete(summary)
+            continue
+        if summary is None:
+            summary = TVSeasonSummary(series_id=key[0], season=key[1])
+            session.add(summary)
+        summary.episode_count, preference, lowest_preference = aggregate
+        summary.quality_id = quality_ids.get(preference)
+        summary.lowest_quality_id = quality_ids.get(lowest_preference)
+        summary.date_updated = now
+
+
+def rebuild_season_summaries():
+    """Recompute every season summary from the files; returns the number
+    of seasons summarized."""
+
+    with app.app_context():
+        aggregates = season_aggregates()
+        existing = {
+            (summary.series_id, summary.season): summary
+            for summary in TVSeasonSummary.query.all()
+        }
+        for key in set(existing) - set(aggregates):
+            db.session.delete(existing[key])
+        refresh_season_summaries(aggregates)
+        db.session.commit()
+        return len(aggregates)
+
+
+def _touched_seasons(instance):
+    """The (series_id, season) pairs a File row belongs to, including
+    any values this flush is about to replace."""
+
+    state = inspect(instance)
+    series_ids = {instance.series_id, *state.attrs.series_id.history.deleted}
+    seasons = {instance.season, *state.attrs.season.history.deleted}
+    return {
+        (series_id, season)
+        for series_id in series_ids
+        for season in seasons
+        if series_id is not None and season is not None
+    }
+
+
+def _written_files(session):
+    """The File rows the pending flush inserts, deletes, or changes."""
+
+    for instance in session.new | session.deleted:
+        if isinstance(instance, File):
+            yield instance
+    for instance in session.dirty:
+        if isinstance(instance, File) and session.is_modified(
+            instance, include_collections=False
+        ):
+            yield instance
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_previous(session, flush_context, instances):
+    """Note the seasons written files belong to before the flush, while
+    a deleted row's values can still be loaded and a moved file's row
+    still carries its old series and season."""
+
+    touched = session.info.setdefault("tv_summary_changes", set())
+    moved = []
+    with session.no_autoflush:
+        for instance in _written_files(session):
+            touched.update(_touched_seasons(instance))
+            state = inspect(instance)
+            if state.persistent and (
+                state.attrs.series_id.history.has_changes()
+                or state.attrs.season.history.has_changes()
+            ):
+                moved.append(instance.id)
+
+        # A file expired by the last commit doesn't remember the values
+        # it's being moved from, but its row in the database still does
+
+        if moved:
+            touched.update(
+                (series_id, season)
+                for series_id, season in session.execute(
+                    db.select(File.series_id, File.season).where(File.id.in_(moved))
+                )
+            )
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_current(session, flush_context):
+    """Note the seasons written files belong to after the flush — a new
+    file attached through file.tv_series only has its series_id now."""
+
+    touched = session.info.setdefault("tv_summary_changes", set())
+    with session.no_autoflush:
+        for instance in _written_files(session):
+            if instance not in session.deleted:
+                touched.update(_touched_seasons(instance))
+
+
+@event.listens_for(Session, "before_commit")
+def _refresh_changes(session):
+    """Bring the touched seasons' summaries up to date inside the
+    transaction being committed."""
+
+    if not has_app_context():
+        return
+    session.flush()
+    touched = session.info.pop("tv_summary_changes", None)
+    if touched:
+        refresh_season_summaries(touched, session)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    """A rolled-back flush changed nothing."""
+
+    session.info.pop("tv_summary_changes", None)
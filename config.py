@@ -54,6 +54,15 @@ class Config(object):
     REJECTS_DIR                         = os.environ.get("REJECTS_DIR") or os.path.join(MEDIA_LOCATION, "rejects")
     TRANSCODES_DIR                      = os.environ.get("TRANSCODES_DIR") or os.path.join(MEDIA_LOCATION, "transcoded")
 
+    # The import directory is watched by one elected import worker:
+    # "auto" uses native filesystem events where the mount delivers them
+    # and adaptive stat polling otherwise (network shares); "native" or
+    # "poll" forces one. Polling tightens to the minimum interval when
+    # the directory changes and relaxes to the maximum while it's quiet
+    IMPORT_WATCH_MODE                   = os.environ.get("IMPORT_WATCH_MODE") or "auto"
+    IMPORT_POLL_MIN_SECONDS             = float(os.environ.get("IMPORT_POLL_MIN_SECONDS") or 1)
+    IMPORT_POLL_MAX_SECONDS             = float(os.environ.get("IMPORT_POLL_MAX_SECONDS") or 10)
+
     # Local scratch space: localization copies each source here and does its
     # processing against local disk, so sustained tool I/O never runs over SMB
     STAGING_DIR                         = os.environ.get("STAGING_DIR") or os.path.join(MEDIA_LOCATION, "staging")
@@ -88,6 +97,12 @@ class Config(object):
     FORCE_UPLOAD                        = os.environ.get("FORCE_UPLOAD") is not None
     AWS_SQS_URL                         = os.environ.get("AWS_SQS_URL") or None
 
+    # Restored-object downloads: how many byte ranges transfer at once.
+    # Each range is an object part, so a retry resumes from the last
+    # completed one rather than byte zero
+
+    AWS_DOWNLOAD_CONCURRENCY            = int(os.environ.get("AWS_DOWNLOAD_CONCURRENCY") or 8)
+
     # MediaConvert (TrueHD Atmos -> E-AC-3 Atmos supplement pipeline)
     AWS_MEDIACONVERT_PREFIX             = os.environ.get("AWS_MEDIACONVERT_PREFIX") or "mediaconvert-scratch"
     MEDIACONVERT_ENDPOINT               = os.environ.get("MEDIACONVERT_ENDPOINT") or "https://mediaconvert.us-east-1.amazonaws.com"
@@ -118,11 +133,24 @@ class Config(object):
     ENV_FILE                            = os.environ.get("ENV_FILE") or os.path.join(basedir, ".env")
     CUSTOM_ARTWORK_DIR                  = os.environ.get("CUSTOM_ARTWORK_DIR") or os.path.join(basedir, "app", "static", "custom")
 
+    # Backup and restore parallelism: compressor threads for the streamed
+    # dump, concurrent per-table mysqldumps (1 keeps the whole dump one
+    # consistent snapshot), and concurrent mysql sessions when restoring
+
+    DB_BACKUP_THREADS                   = int(os.environ.get("DB_BACKUP_THREADS") or min(4, os.cpu_count() or 1))
+    DB_BACKUP_DUMP_JOBS                 = int(os.environ.get("DB_BACKUP_DUMP_JOBS") or 1)
+    DB_RESTORE_JOBS                     = int(os.environ.get("DB_RESTORE_JOBS") or 4)
+
     # Subtitle-triage inspection aids: static-served but outside the
     # custom-artwork tree, so backups ignore them
 
     TRIAGE_SNAPSHOT_DIR                 = os.environ.get("TRIAGE_SNAPSHOT_DIR") or os.path.join(basedir, "app", "static", "triage")
 
+    # The library search index's on-disk snapshot, rewritten nightly so
+    # a restarted process loads it instead of rebuilding
+
+    SEARCH_INDEX_PATH                   = os.environ.get("SEARCH_INDEX_PATH") or os.path.join(basedir, "app", "search_index.json")
+
     # Name that Frame: the nightly pre-extracted frame pool —
     # served through an authenticated route, never the public static
     # path, since a frame's filename must not hint at its answer
@@ -189,8 +217,11 @@ class Config(object):
     # IP, so stay well below that
     TMDB_REQUESTS_PER_SECOND            = int(os.environ.get("TMDB_REQUESTS_PER_SECOND") or 10)
 
-    # Poster and cast artwork is hotlinked straight from TMDb's image CDN
+    # TMDb's image CDN, which the local artwork cache fills from;
+    # ARTWORK_HOTLINK skips the cache and links the CDN directly
     TMDB_IMAGE_URL                      = os.environ.get("TMDB_IMAGE_URL") or "https://image.tmdb.org/t/p"
+    ARTWORK_CACHE_DIR                   = os.environ.get("ARTWORK_CACHE_DIR") or os.path.join(basedir, "app", "artwork_cache")
+    ARTWORK_HOTLINK                     = os.environ.get("ARTWORK_HOTLINK") is not None
 
     WIKIDATA_SPARQL_URL                 = os.environ.get("WIKIDATA_SPARQL_URL") or "https://query.wikidata.org/sparql"
 
@@ -0,0 +1,96 @@
+"""Persisted sort titles for movies and TV series, and the TV library's
+per-season summary table.
+
+Revision ID: d41e8c7a2b90
+Revises: b7c4a90d51e2
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "d41e8c7a2b90"
+down_revision = "b7c4a90d51e2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add and backfill sort_title, then create and fill the season
+    summaries the way app.tv_summary computes them."""
+
+    with op.batch_alter_table("movie") as batch_op:
+        batch_op.add_column(sa.Column("sort_title", sa.String(220)))
+        batch_op.create_index("ix_movie_sort_title", ["sort_title"])
+    with op.batch_alter_table("tv_series") as batch_op:
+        batch_op.add_column(sa.Column("sort_title", sa.String(220)))
+        batch_op.create_index("ix_tv_series_sort_title", ["sort_title"])
+
+    # Same rule as app.models.sort_title, applied in Python so the
+    # backfill matches what the models write from now on
+
+    connection = op.get_bind()
+    for table in ("movie", "tv_series"):
+        rows = connection.execute(sa.text(f"SELECT id, title FROM {table}")).all()
+        if rows:
+            connection.execute(
+                sa.text(f"UPDATE {table} SET sort_title = :sort_title WHERE id = :id"),
+                [
+                    {"id": id, "sort_title": re.sub(r"^(The|A|An) ", "", title)}
+                    for id, title in rows
+                ],
+            )
+
+    op.create_table(
+        "tv_season_summary",
+        sa.Column("series_id", sa.Integer(), nullable=False),
+        sa.Column("season", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("episode_count", sa.Integer(), nullable=False),
+        sa.Column("quality_id", sa.Integer(), nullable=True),
+        sa.Column("date_updated", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["series_id"], ["tv_series.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["quality_id"], ["ref_quality.id"]),
+        sa.PrimaryKeyConstraint("series_id", "season"),
+    )
+    op.execute("""
+        INSERT INTO tv_season_summary
+            (series_id, season, episode_count, quality_id, date_updated)
+        SELECT seasons.series_id, seasons.season, seasons.episodes,
+            (SELECT MIN(q.id) FROM ref_quality q
+             WHERE q.preference = seasons.preference),
+            CURRENT_TIMESTAMP
+        FROM (
+            SELECT f.series_id, f.season,
+                COUNT(DISTINCT f.episode) AS episodes,
+                MIN(rq.preference) AS preference
+            FROM file f
+            JOIN ref_quality rq ON rq.id = f.quality_id
+            JOIN (
+                SELECT f2.id, ROW_NUMBER() OVER (
+                    PARTITION BY f2.series_id, f2.season, f2.episode
+                    ORDER BY f2.fullscreen ASC, q2.preference DESC,
+                        f2.last_episode DESC
+                ) AS file_rank
+                FROM file f2
+                JOIN tv_series t ON t.id = f2.series_id
+                JOIN ref_quality q2 ON q2.id = f2.quality_id
+            ) ranked ON ranked.id = f.id AND ranked.file_rank = 1
+            GROUP BY f.series_id, f.season
+        ) seasons
+        """)
+
+
+def downgrade():
+    """Drop the season summaries and the sort titles."""
+
+    op.drop_table("tv_season_summary")
+    with op.batch_alter_table("tv_series") as batch_op:
+        batch_op.drop_index("ix_tv_series_sort_title")
+        batch_op.drop_column("sort_title")
+    with op.batch_alter_table("movie") as batch_op:
+        batch_op.drop_index("ix_movie_sort_title")
+        batch_op.drop_column("sort_title")
@@ -0,0 +1,94 @@
+"""The movie shopping list's projection table, and each TV season's
+worst quality of any copy for the TV shopping list.
+
+Revision ID: e5b2f19c7d34
+Revises: d41e8c7a2b90
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "e5b2f19c7d34"
+down_revision = "d41e8c7a2b90"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create shopping_list_item and add tv_season_summary.lowest_quality_id.
+
+    The shopping rows aren't backfilled here: the first process to serve
+    the list after the deploy finds no generation token and rebuilds them
+    (app.shopping_list.ensure_shopping_list).
+    """
+
+    op.create_table(
+        "shopping_list_item",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("movie_id", sa.Integer(), nullable=False),
+        sa.Column("file_id", sa.Integer(), nullable=True),
+        sa.Column("preference", sa.Integer(), nullable=True),
+        sa.Column("criterion", sa.Boolean(), nullable=False),
+        sa.Column("digital_only", sa.Boolean(), nullable=False),
+        sa.Column("rating", sa.Float(), nullable=True),
+        sa.Column("review_count", sa.Integer(), nullable=False),
+        sa.Column("liked_count", sa.Integer(), nullable=False),
+        sa.Column("instruction", sa.String(64), nullable=False),
+        sa.Column("urgency", sa.Integer(), nullable=False),
+        sa.Column("cart_priority", sa.Integer(), nullable=True),
+        sa.Column("quality_order", sa.Integer(), nullable=True),
+        sa.Column("cart_age", sa.DateTime(), nullable=True),
+        sa.Column("sort_title", sa.String(220), nullable=True),
+        sa.Column("year", sa.Integer(), nullable=True),
+        sa.Column("edition", sa.String(219), nullable=True),
+        sa.Column("date_added", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["movie_id"], ["movie.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["file_id"], ["file.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("file_id"),
+    )
+    op.create_index(
+        "ix_shopping_list_item_movie_id", "shopping_list_item", ["movie_id"]
+    )
+    op.create_index(
+        "ix_shopping_list_item_preference", "shopping_list_item", ["preference"]
+    )
+    op.create_index(
+        "ix_shopping_list_item_order",
+        "shopping_list_item",
+        ["urgency", "cart_priority", "quality_order", "cart_age", "sort_title"],
+    )
+
+    with op.batch_alter_table("tv_season_summary") as batch_op:
+        batch_op.add_column(sa.Column("lowest_quality_id", sa.Integer()))
+        batch_op.create_foreign_key(
+            "fk_tv_season_summary_lowest_quality_id",
+            "ref_quality",
+            ["lowest_quality_id"],
+            ["id"],
+        )
+    op.execute("""
+        UPDATE tv_season_summary SET lowest_quality_id = (
+            SELECT MIN(q.id) FROM ref_quality q
+            WHERE q.preference = (
+                SELECT MIN(rq.preference) FROM file f
+                JOIN ref_quality rq ON rq.id = f.quality_id
+                WHERE f.series_id = tv_season_summary.series_id
+                    AND f.season = tv_season_summary.season
+            )
+        )
+        """)
+
+
+def downgrade():
+    """Drop the projection and the TV column."""
+
+    with op.batch_alter_table("tv_season_summary") as batch_op:
+        batch_op.drop_constraint(
+            "fk_tv_season_summary_lowest_quality_id", type_="foreignkey"
+        )
+        batch_op.drop_column("lowest_quality_id")
+    op.drop_table("shopping_list_item")
@@ -2,23 +2,28 @@ import sys
 
 from redis import Redis
 
-# Libraries to preload
-
-from app import db, get_app, videos
+from app import db, get_app
 from app.pipeline import PipelineWorker
+from app.startup import preload_worker_modules
 from config import Config
 
 qs = sys.argv[1:] or ["default"]
 
 # Build the worker's app at startup rather than at first task. Only the
 # import-program workers (their primary queue is first on the command line)
-# watch the import directory; the other programs that merely drain the
-# import queue don't need their own filesystem observer.
+# stand for election as the import-directory watcher; the other programs
+# that merely drain the import queue don't need to.
 
 get_app(watch_import_dir=qs[0] == "fitzflix-import")
 
 db.configure_mappers()
 
+# Libraries to preload: only what this worker's queues run (see
+# app.startup.WORKER_PRELOADS); rq imports anything else by job string
+# when a job first needs it
+
+preload_worker_modules(qs)
+
 # rq 2 removed the Connection context manager, so the worker takes its
 # connection explicitly. PipelineWorker is a SimpleWorker that also
 # stamps per-file trail entries around execution.
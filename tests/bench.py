@@ -0,0 +1,673 @@
+"""Benchmarks for the hot paths, against a synthetic library (Oct 2026).
+
+Each benchmark times one path the household hits constantly — the
+library, shopping list, and Criterion pages, search suggestions, tile
+hydration, the landing page — or one the nightly and weekly jobs lean
+on: the recommendation recompute and evaluation, the S3 sync, and
+the importer's filename and better-file checks. Every run counts its
+SQL statements too, and each benchmark carries a query budget that
+holds at every scale: a path whose statement count grows with the
+library (a lazy load per row, a query per film) blows its budget on
+the first run, long before anyone notices it in the timings.
+
+The pages that serve from a cache — the landing page, the shopping
+list, the Criterion catalog, search — each have a "_cold" twin whose
+setup drops that cache before every repetition, so the rebuild a
+restarted Redis or an invalidating write leaves behind is timed and
+budgeted too, not only the hit the warm-up run leaves in place.
+
+The suite runs two ways. test_bench.py runs every benchmark against
+the "smoke" library on each test run, enforcing the budgets. For
+timings, run it by hand at a larger preset and keep the JSON:
+
+    venv/bin/python -m tests.bench --scale medium --output before.json
+    venv/bin/python -m tests.bench --scale medium --compare before.json
+
+--compare exits non-zero when a benchmark got slower than the
+tolerance allows or used more queries than before. --database-uri
+points it at a scratch MySQL/MariaDB database instead of SQLite; the
+database must be empty (or hold a library generated earlier, with
+--reuse). Redis is database 9, as in the test suite, and is flushed.
+
+AWS and TMDb are replaced by in-process stand-ins (S3StandIn, and a
+canned TMDb search answer for evaluate_filename), so nothing leaves
+the machine and the network never shows up in a timing.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from contextlib import contextmanager
+from datetime import datetime
+from types import SimpleNamespace
+
+from tests.conftest import TestConfig
+from tests.synthetic import SCALES, generate_library, library_file_ids
+
+# The registry: name -> {"run", "setup", "max_queries"}, in the order
+# benchmarks run and report
+
+BENCHMARKS = {}
+
+# How much slower than the baseline a benchmark may get before
+# --compare calls it a regression; timings on a laptop wobble
+
+DEFAULT_TOLERANCE = 0.25
+
+# Sample sizes for the per-item paths, fixed so query budgets are too
+
+GALLERY_PAGE = 60
+SAMPLE_FILES = 50
+
+
+class BenchConfig(TestConfig):
+    """The test configuration, plus an S3 bucket for the sync to walk
+    (the stand-in answers for it) and its own library directory."""
+
+    AWS_BUCKET = "fitzflix-bench"
+    AWS_ACCESS_KEY = "AKIABENCHBENCHBENCH0"
+    AWS_SECRET_KEY = "bench-secret"
+
+
+def benchmark(name, max_queries, setup=None):
+    """Register a benchmark: run(context) is timed; setup(context), if
+    given, runs untimed before every repetition. max_queries is a
+    number, or max_queries(context) for a path that reads the library
+    a fixed number of films at a time."""
+
+    def register(run):
+        """Add run to the registry."""
+
+        BENCHMARKS[name] = {"run": run, "setup": setup, "max_queries": max_queries}
+        return run
+
+    return register
+
+
+class S3StandIn:
+    """The slice of the S3 client API the sync and restore paths call,
+    over an in-memory bucket. moto would serve, but it isn't one of
+    the app's dependencies and this needs only six calls."""
+
+    def __init__(self, sizes):
+        self.objects = dict(sizes)
+        self.calls = []
+
+    def get_paginator(self, operation):
+        """A list_objects_v2 paginator over the bucket."""
+
+        stand_in = self
+
+        class Paginator:
+            """Pages of up to a thousand keys, like S3's."""
+
+            def paginate(self, Bucket, Prefix=""):
+                """Yield the listing a page at a time."""
+
+                stand_in.calls.append(operation)
+                keys = sorted(key for key in stand_in.objects if key.startswith(Prefix))
+                for start in range(0, max(len(keys), 1), 1000):
+                    page = keys[start : start + 1000]
+                    if not page:
+                        yield {}
+                        return
+                    yield {
+                        "Contents": [
+                            {
+                                "Key": key,
+                                "Size": stand_in.objects[key],
+                                "StorageClass": "DEEP_ARCHIVE",
+                            }
+                            for key in page
+                        ]
+                    }
+
+        return Paginator()
+
+    def list_objects(self, Bucket, Prefix, MaxKeys=1000):
+        """The first keys under a prefix."""
+
+        self.calls.append("list_objects")
+        keys = sorted(key for key in self.objects if key.startswith(Prefix))[:MaxKeys]
+        if not keys:
+            return {}
+        return {
+            "Contents": [
+                {"Key": key, "Size": self.objects[key], "StorageClass": "DEEP_ARCHIVE"}
+                for key in keys
+            ]
+        }
+
+    def head_object(self, Bucket, Key):
+        """An archived object, not yet restored."""
+
+        self.calls.append("head_object")
+        return {"ContentLength": self.objects[Key], "StorageClass": "DEEP_ARCHIVE"}
+
+    def restore_object(self, Bucket, Key, RestoreRequest):
+        """Accept a restore request."""
+
+        self.calls.append("restore_object")
+        return {}
+
+    def put_object(self, Body, Bucket, Key):
+        """Store an object."""
+
+        self.calls.append("put_object")
+        self.objects[Key] = len(Body)
+        return {}
+
+    def delete_object(self, Bucket, Key):
+        """Remove an object."""
+
+        self.calls.append("delete_object")
+        self.objects.pop(Key, None)
+        return {}
+
+
+class TMDbSearchStandIn:
+    """tmdb_get, answering /search/movie with the synthetic film of
+    that title and year, as TMDb would for a library file."""
+
+    def __init__(self, films):
+        self.films = films
+
+    def __call__(self, url, params=None, **kwargs):
+        """A canned response for one search."""
+
+        film = self.films.get(
+            ((params or {}).get("query"), (params or {}).get("primary_release_year"))
+        )
+        results = []
+        if film:
+            results.append(
+                {
+                    "id": film["tmdb_id"],
+                    "title": film["title"],
+                    "release_date": f"{film['year']}-01-01",
+                }
+            )
+        return SimpleNamespace(
+            status_code=200,
+            json=lambda: {"results": results},
+            raise_for_status=lambda: None,
+        )
+
+
+@contextmanager
+def replaced(target, name, value):
+    """target.name set to value for the duration."""
+
+    original = getattr(target, name)
+    setattr(target, name, value)
+    try:
+        yield
+    finally:
+        setattr(target, name, original)
+
+
+@contextmanager
+def counted_queries(engine):
+    """A list that collects every statement the engine runs meanwhile."""
+
+    from sqlalchemy import event
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        """Note one statement."""
+
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def _get(context, url):
+    """GET a page as the admin; a benchmark of an error page would
+    measure nothing."""
+
+    response = context.client.get(url)
+    if response.status_code != 200:
+        raise AssertionError(f"{url} answered {response.status_code}")
+    return response
+
+
+@benchmark("movie_library", max_queries=8)
+def movie_library(context):
+    """The movie library gallery's first page."""
+
+    _get(context, "/library/movie")
+
+
+def _cold_shopping(context):
+    """Drop the shopping list's generation, as a restarted Redis does,
+    so the view rebuilds the whole projection first."""
+
+    from app.shopping_list import GENERATION_KEY
+
+    context.app.redis.delete(GENERATION_KEY)
+
+
+def _shopping_rebuild_budget(context):
+    """The page's statements plus the rebuild's: a few to list the
+    films, four per REFRESH_CHUNK of them, and the delete and insert."""
+
+    from app.shopping_list import REFRESH_CHUNK
+
+    chunks = -(-context.film_count // REFRESH_CHUNK)
+    return 10 + 4 * chunks
+
+
+@benchmark(
+    "movie_shopping_cold", max_queries=_shopping_rebuild_budget, setup=_cold_shopping
+)
+@benchmark("movie_shopping", max_queries=6)
+def movie_shopping(context):
+    """The movie shopping list."""
+
+    _get(context, "/shopping-list/movie")
+
+
+def _cold_criterion(context):
+    """Drop the Criterion catalog's index, as a fresh release list or
+    a hand-edited spine does, so the view rebuilds it first."""
+
+    from app.criterion_catalog import invalidate_criterion_index
+
+    invalidate_criterion_index()
+
+
+@benchmark("criterion_collection_cold", max_queries=16, setup=_cold_criterion)
+@benchmark("criterion_collection", max_queries=10)
+def criterion_collection(context):
+    """The Criterion catalog's first page."""
+
+    _get(context, "/library/criterion-collection")
+
+
+def _cold_search(context):
+    """Drop the search index's generation and this process's copy, as
+    a restarted Redis does, so the lookup rebuilds from the database."""
+
+    from app.search_index import GENERATION_KEY
+
+    context.app.redis.delete(GENERATION_KEY)
+    context.app.extensions.pop("fitzflix_search_index", None)
+
+
+@benchmark("search_json_cold", max_queries=24, setup=_cold_search)
+@benchmark("search_json", max_queries=16)
+def search_json(context):
+    """Type-ahead suggestions for a word half the titles share."""
+
+    _get(context, f"/search.json?q={context.search_term}")
+
+
+@benchmark("movie_states", max_queries=8)
+def movie_states(context):
+    """Tile state for a gallery page of films."""
+
+    ids = ",".join(str(movie_id) for movie_id in context.movie_ids)
+    _get(context, f"/movie_states?movie_ids={ids}")
+
+
+def _cold_landing(context):
+    """Retire every stored landing page, as a household-wide write
+    does, so the shelves render from the database."""
+
+    from app.landing_shelves import invalidate_landing_shelves
+
+    invalidate_landing_shelves()
+
+
+@benchmark("index_cold", max_queries=24, setup=_cold_landing)
+@benchmark("index", max_queries=6)
+def index(context):
+    """The landing page."""
+
+    _get(context, "/")
+
+
+@benchmark("compute_user_recommendations", max_queries=20)
+def compute_user_recommendations(context):
+    """The nightly recompute's work for the admin."""
+
+    from app.recommendations import compute_user_recommendations
+
+    compute_user_recommendations(context.user_id)
+
+
+@benchmark("evaluate_user", max_queries=16)
+def evaluate_user(context):
+    """A leave-one-out evaluation of the admin, in-process."""
+
+    from app.recommendations import evaluate_user
+
+    evaluate_user(context.user_id, workers=1)
+
+
+def _idle_queues(context):
+    """Empty the queues the last sync filled, so the next one doesn't
+    defer itself behind them."""
+
+    for queue in (
+        context.app.import_queue,
+        context.app.transcode_queue,
+        context.app.file_queue,
+        context.app.sql_queue,
+        context.app.request_queue,
+        context.app.maintenance_queue,
+    ):
+        queue.empty()
+
+
+@benchmark("sync_aws_s3_storage_task", max_queries=10, setup=_idle_queues)
+def sync_aws_s3_storage_task(context):
+    """The weekly S3 sync, against the stand-in bucket and a library
+    directory where every file exists."""
+
+    from app import aws_storage
+
+    config = context.app.config
+    library_dir = config["LIBRARY_DIR"]
+    config["LIBRARY_DIR"] = context.library_dir
+    try:
+        with replaced(aws_storage, "aws_s3_client", lambda *a, **kw: context.s3):
+            aws_storage.sync_aws_s3_storage_task()
+    finally:
+        config["LIBRARY_DIR"] = library_dir
+
+
+@benchmark("find_better_files", max_queries=SAMPLE_FILES + 5)
+def find_better_files(context):
+    """The importer's better-copy check, for a sample of incoming
+    files that each match a film already in the library."""
+
+    from app import db
+    from app.models import File
+
+    for details in context.file_details:
+        File(**details).find_better_files()
+    db.session.rollback()
+
+
+@benchmark("evaluate_filename", max_queries=SAMPLE_FILES + 5)
+def evaluate_filename(context):
+    """The importer's filename parse and TMDb match, over a sample of
+    library filenames."""
+
+    from app import importing
+
+    with replaced(importing, "tmdb_get", context.tmdb):
+        for filename in context.filenames:
+            importing.evaluate_filename(filename, log=False)
+
+
+def prepare(app, scale, client):
+    """Everything the benchmarks read, gathered once: a library whose
+    recommendations have been computed, as after a nightly run."""
+
+    from app import db
+    from app.models import File, Movie, User
+    from app.recommendations import recompute_recommendations
+
+    recompute_recommendations()
+
+    user_id = User.query.filter_by(admin=True).order_by(User.id).first().id
+    movie_ids = [
+        movie_id
+        for (movie_id,) in db.session.query(Movie.id)
+        .order_by(Movie.id)
+        .limit(GALLERY_PAGE)
+    ]
+    file_ids = library_file_ids(SAMPLE_FILES)
+
+    films = {}
+    for movie_id, title, year, tmdb_id in db.session.query(
+        Movie.id, Movie.title, Movie.year, Movie.tmdb_id
+    ):
+        films[(title, year)] = {"tmdb_id": tmdb_id, "title": title, "year": year}
+    filenames = [
+        os.path.join(app.config["IMPORT_DIR"], basename)
+        for (basename,) in db.session.query(File.basename)
+        .filter(File.id.in_(file_ids))
+        .order_by(File.id)
+    ]
+
+    # Every library file exists locally (empty, which the sync never
+    # reads) and every archived one is in the bucket, as on a healthy
+    # install: the sync walks it all, restores nothing, and queues
+    # uploads only for the few files the generator left unarchived
+
+    library_dir = tempfile.mkdtemp(prefix=f"fitzflix-bench-{scale}-")
+    sizes = {}
+    for file_path, key, size in db.session.query(
+        File.file_path, File.aws_untouched_key, File.aws_untouched_filesize_bytes
+    ):
+        path = os.path.join(library_dir, file_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, "wb").close()
+        if key:
+            sizes[key] = size
+
+    # What the importer knows about each sample file by the time it
+    # checks for better copies: evaluate_filename's answer
+
+    from app import importing
+
+    tmdb = TMDbSearchStandIn(films)
+    with replaced(importing, "tmdb_get", tmdb):
+        file_details = [
+            importing.evaluate_filename(filename, log=False) for filename in filenames
+        ]
+
+    return SimpleNamespace(
+        app=app,
+        client=client,
+        user_id=user_id,
+        movie_ids=movie_ids,
+        filenames=filenames,
+        file_details=file_details,
+        search_term="silent",
+        film_count=Movie.query.count(),
+        library_dir=library_dir,
+        s3=S3StandIn(sizes),
+        tmdb=tmdb,
+    )
+
+
+def run_benchmarks(context, repeat=3, names=None):
+    """{name: result} for each benchmark (or just those named), each
+    run repeat times with its statements counted.
+
+    A first, untimed run warms what the app caches on first use — the
+    reference data, the estimates movie_states patches into the nightly
+    score map — so the numbers are the steady state every later
+    request sees, and a budget can't pass on one run and fail on the
+    next."""
+
+    from app import db
+
+    results = {}
+    for name, entry in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        if entry["setup"]:
+            entry["setup"](context)
+        entry["run"](context)
+        seconds = []
+        queries = []
+        for _ in range(repeat):
+            if entry["setup"]:
+                entry["setup"](context)
+            with counted_queries(db.engine) as statements:
+                started = time.perf_counter()
+                entry["run"](context)
+                seconds.append(round(time.perf_counter() - started, 6))
+            queries.append(len(statements))
+        budget = entry["max_queries"]
+        if callable(budget):
+            budget = budget(context)
+        results[name] = {
+            "seconds": seconds,
+            "best": min(seconds),
+            "median": statistics.median(seconds),
+            "queries": queries,
+            "max_queries": budget,
+            "within_budget": max(queries) <= budget,
+        }
+    return results
+
+
+def compare(baseline, current, tolerance=DEFAULT_TOLERANCE):
+    """Regressions from baseline to current, as lines of text: a median
+    more than tolerance slower, or more queries than before."""
+
+    regressions = []
+    for name, result in current["benchmarks"].items():
+        before = baseline.get("benchmarks", {}).get(name)
+        if not before:
+            continue
+        if result["median"] > before["median"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: median {result['median'] * 1000:.1f}ms, "
+                f"was {before['median'] * 1000:.1f}ms"
+            )
+        if max(result["queries"]) > max(before["queries"]):
+            regressions.append(
+                f"{name}: {max(result['queries'])} queries, "
+                f"was {max(before['queries'])}"
+            )
+    return regressions
+
+
+def _commit():
+    """The checked-out commit, or None outside a git checkout."""
+
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    """Generate (or reuse) a library, run the suite, and report."""
+
+    parser = argparse.ArgumentParser(prog="python -m tests.bench")
+    parser.add_argument("--scale", choices=list(SCALES), default="small")
+    parser.add_argument(
+        "--database-uri",
+        help="A scratch database to benchmark on (default: a temporary SQLite file)",
+    )
+    parser.add_argument(
+        "--reuse",
+        action="store_true",
+        help="Benchmark the library already in the database instead of "
+        "generating one",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", action="append", choices=list(BENCHMARKS))
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="A previous run's JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    from tests.conftest import (
+        ADMIN_EMAIL,
+        _register_mysql_compat_functions,
+        _signed_in_client,
+        seed_reference_data,
+    )
+
+    workdir = tempfile.mkdtemp(prefix="fitzflix-bench-")
+    BenchConfig.SQLALCHEMY_DATABASE_URI = (
+        args.database_uri or f"sqlite:///{workdir}/fitzflix-bench.db"
+    )
+    BenchConfig.SEARCH_INDEX_PATH = os.path.join(workdir, "search_index.json")
+    for path in (BenchConfig.IMPORT_DIR, BenchConfig.STAGING_DIR):
+        os.makedirs(path, exist_ok=True)
+
+    from app import create_app, db
+    from app.models import Movie, RefQuality
+
+    app = create_app(BenchConfig)
+
+    # The sync alone logs a line per file; at the larger presets the
+    # logging would be most of what got timed
+
+    app.logger.setLevel(logging.WARNING)
+    app.redis.flushdb()
+    with app.app_context():
+        if db.engine.dialect.name == "sqlite":
+            _register_mysql_compat_functions(db.engine)
+        db.create_all()
+        if RefQuality.query.first() is None:
+            seed_reference_data()
+
+        started = time.perf_counter()
+        if Movie.query.first() is None:
+            counts = generate_library(args.scale)
+        elif args.reuse:
+            counts = {"movies": Movie.query.count(), "reused": True}
+        else:
+            parser.error("the database already holds a library; pass --reuse")
+        generated = time.perf_counter() - started
+        print(f"Library ready in {generated:.1f}s: {counts}", file=sys.stderr)
+
+        context = prepare(app, args.scale, _signed_in_client(app, ADMIN_EMAIL))
+        results = {
+            "scale": args.scale,
+            "library": counts,
+            "commit": _commit(),
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "database": db.engine.dialect.name,
+            "python": platform.python_version(),
+            "repeat": args.repeat,
+            "benchmarks": run_benchmarks(context, args.repeat, args.only),
+        }
+
+    for name, result in results["benchmarks"].items():
+        budget = "" if result["within_budget"] else "  OVER BUDGET"
+        print(
+            f"{name:32} {result['median'] * 1000:9.1f}ms median "
+            f"{max(result['queries']):6} queries (budget {result['max_queries']})"
+            f"{budget}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    failed = [
+        name
+        for name, result in results["benchmarks"].items()
+        if not result["within_budget"]
+    ]
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), results, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        failed += regressions
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
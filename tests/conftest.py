@@ -84,6 +84,7 @@ class TestConfig(Config):
     STAGING_DIR = os.path.join(_TMP, "staging")
     TRIAGE_SNAPSHOT_DIR = os.path.join(_TMP, "triage")
     FRAME_POOL_DIR = os.path.join(_TMP, "frame_pool")
+    SEARCH_INDEX_PATH = os.path.join(_TMP, "search_index.json")
     SMB_URL_PREFIX = None
 
     LOG_FILE = os.path.join(_TMP, "logs", "fitzflix.log")
@@ -91,6 +92,7 @@ class TestConfig(Config):
     BACKUP_PASSPHRASE = None
     ENV_FILE = os.path.join(_TMP, "dotenv-for-tests")
     CUSTOM_ARTWORK_DIR = os.path.join(_TMP, "custom-artwork")
+    ARTWORK_CACHE_DIR = os.path.join(_TMP, "artwork-cache")
 
     MAIL_SERVER = None
     MAIL_USERNAME = None
@@ -178,6 +180,30 @@ def _register_mysql_compat_functions(engine):
         dbapi_connection.create_function("utc_timestamp", 0, _utc_timestamp)
 
 
+def seed_reference_data():
+    """The qualities, feature types, and two users every test assumes;
+    the benchmarks (tests/bench.py) seed their database the same way."""
+
+    from app import db
+    from app.models import RefFeatureType, RefQuality, User
+
+    for title, preference, physical in QUALITIES:
+        db.session.add(
+            RefQuality(
+                quality_title=title, preference=preference, physical_media=physical
+            )
+        )
+    for feature_type in FEATURE_TYPES:
+        db.session.add(RefFeatureType(feature_type=feature_type))
+    admin = User(email=ADMIN_EMAIL, admin=True, api_key=ADMIN_API_KEY)
+    admin.set_password(ADMIN_PASSWORD)
+    db.session.add(admin)
+    member = User(email=MEMBER_EMAIL, admin=False, api_key=MEMBER_API_KEY)
+    member.set_password(MEMBER_PASSWORD)
+    db.session.add(member)
+    db.session.commit()
+
+
 @pytest.fixture(scope="session")
 def app():
     for path in (
@@ -194,7 +220,6 @@ def app():
         os.makedirs(path, exist_ok=True)
 
     from app import create_app, db
-    from app.models import RefFeatureType, RefQuality, User
 
     # watch_import_dir: the watchdog test drops files into IMPORT_DIR and
     # expects them noticed, so the test app opts into the observer that
@@ -225,21 +250,7 @@ def app():
     with application.app_context():
         _register_mysql_compat_functions(db.engine)
         db.create_all()
-        for title, preference, physical in QUALITIES:
-            db.session.add(
-                RefQuality(
-                    quality_title=title, preference=preference, physical_media=physical
-                )
-            )
-        for feature_type in FEATURE_TYPES:
-            db.session.add(RefFeatureType(feature_type=feature_type))
-        admin = User(email=ADMIN_EMAIL, admin=True, api_key=ADMIN_API_KEY)
-        admin.set_password(ADMIN_PASSWORD)
-        db.session.add(admin)
-        member = User(email=MEMBER_EMAIL, admin=False, api_key=MEMBER_API_KEY)
-        member.set_password(MEMBER_PASSWORD)
-        db.session.add(member)
-        db.session.commit()
+        seed_reference_data()
 
     yield application
 
@@ -2,6 +2,10 @@
 
 The date columns are passed explicitly because the models' server-side
 default (utc_timestamp()) only exists on MySQL/MariaDB, not SQLite.
+
+The *_row builders return the column values the make_* factories
+insert, so the synthetic-library generator (tests/synthetic.py) can
+bulk-insert thousands of rows named and shaped exactly like these.
 """
 
 from datetime import datetime
@@ -18,8 +22,12 @@ def feature_type(name):
     return RefFeatureType.query.filter_by(feature_type=name).one()
 
 
+def movie_row(title, year, **kwargs):
+    return dict(title=title, year=year, date_created=datetime.utcnow(), **kwargs)
+
+
 def make_movie(title, year, **kwargs):
-    movie = Movie(title=title, year=year, date_created=datetime.utcnow(), **kwargs)
+    movie = Movie(**movie_row(title, year, **kwargs))
     db.session.add(movie)
     db.session.flush()
     return movie
@@ -39,42 +47,71 @@ def make_tv_episode(series, season, episode, **kwargs):
     return row
 
 
-def make_file(basename, dirname, plex_title, media_library, quality_title, **kwargs):
-    file = File(
+def file_row(basename, dirname, plex_title, media_library, quality_id, **kwargs):
+    return dict(
         basename=basename,
         dirname=dirname,
         file_path=f"{dirname}/{basename}",
         plex_title=plex_title,
         media_library=media_library,
-        quality_id=quality(quality_title).id,
+        quality_id=quality_id,
         date_added=datetime.utcnow(),
         **kwargs,
     )
+
+
+def make_file(basename, dirname, plex_title, media_library, quality_title, **kwargs):
+    file = File(
+        **file_row(
+            basename,
+            dirname,
+            plex_title,
+            media_library,
+            quality(quality_title).id,
+            **kwargs,
+        )
+    )
     db.session.add(file)
     db.session.flush()
     return file
 
 
-def make_movie_file(movie, quality_title, feature_type_name=None, **kwargs):
-    plex_title = kwargs.pop("plex_title", f"{movie.title} ({movie.year})")
-    dirname = f"Movies/{movie.title} ({movie.year})"
+def movie_file_row(
+    movie_id, title, year, quality_title, quality_id, feature_type_name=None, **kwargs
+):
+    """A movie file's column values, laid out the way the importer
+    files them; extras go in their feature type's folder."""
+
+    plex_title = kwargs.pop("plex_title", f"{title} ({year})")
+    dirname = f"Movies/{title} ({year})"
     if feature_type_name:
         dirname = f"{dirname}/{feature_type_name}"
         basename = f"{plex_title}.mkv"
     else:
         basename = f"{plex_title} - [{quality_title}].mkv"
-    return make_file(
-        basename,
-        dirname,
-        plex_title,
-        "Movies",
-        quality_title,
-        movie_id=movie.id,
-        feature_type_id=(
-            feature_type(feature_type_name).id if feature_type_name else None
-        ),
-        **kwargs,
+    return file_row(
+        basename, dirname, plex_title, "Movies", quality_id, movie_id=movie_id, **kwargs
+    )
+
+
+def make_movie_file(movie, quality_title, feature_type_name=None, **kwargs):
+    file = File(
+        **movie_file_row(
+            movie.id,
+            movie.title,
+            movie.year,
+            quality_title,
+            quality(quality_title).id,
+            feature_type_name=feature_type_name,
+            feature_type_id=(
+                feature_type(feature_type_name).id if feature_type_name else None
+            ),
+            **kwargs,
+        )
     )
+    db.session.add(file)
+    db.session.flush()
+    return file
 
 
 def make_tv_file(series, season, episode, quality_title, **kwargs):
@@ -0,0 +1,504 @@
+"""A deterministic synthetic library, for benchmarks (Oct 2026).
+
+conftest's fixtures are a handful of rows on SQLite, which says nothing
+about how a page behaves against the real library's shape: tens of
+thousands of films, ten or so files apiece once extras are counted, a
+few dozen billed cast per film, and years of diary entries.
+generate_library() builds that shape at one of the SCALES presets, on
+whatever database the app is bound to (SQLite or MySQL/MariaDB).
+
+Rows are named and laid out by the same builders the test factories
+insert with (tests/factories.py), but go in by bulk INSERT — flushing
+a million cast rows one ORM object at a time would take longer than
+any benchmark. Bulk inserts skip the session listeners, so the
+projections those listeners maintain (the shopping list, the search
+index) are rebuilt at the end, the way the nightly jobs would, and
+the Criterion spine cache is seeded in Redis as Wikidata would fill
+it.
+
+The same scale and seed always produce the same library, so timings
+from different commits compare like for like.
+"""
+
+import json
+import random
+
+from datetime import datetime, timedelta
+
+from tests.factories import movie_file_row, movie_row
+
+SEED = 20261019
+
+# Presets by name. "large" is the production library's shape; "smoke"
+# is small enough for the test suite to run every benchmark against
+
+SCALES = {
+    "smoke": {"movies": 40, "files": 100, "cast": 400, "diary": 40, "criterion": 12},
+    "small": {
+        "movies": 1000,
+        "files": 10000,
+        "cast": 50000,
+        "diary": 500,
+        "criterion": 150,
+    },
+    "medium": {
+        "movies": 5000,
+        "files": 50000,
+        "cast": 250000,
+        "diary": 2500,
+        "criterion": 600,
+    },
+    "large": {
+        "movies": 20000,
+        "files": 200000,
+        "cast": 1000000,
+        "diary": 10000,
+        "criterion": 1500,
+    },
+}
+
+# Rows per INSERT batch: a few megabytes of parameters at most, well
+# inside MySQL's max_allowed_packet
+
+INSERT_BATCH = 5000
+
+# TMDb's own movie genre ids, which TMDBGenre rows keep as their ids
+
+GENRES = [
+    (28, "Action"),
+    (12, "Adventure"),
+    (16, "Animation"),
+    (35, "Comedy"),
+    (80, "Crime"),
+    (99, "Documentary"),
+    (18, "Drama"),
+    (10751, "Family"),
+    (14, "Fantasy"),
+    (36, "History"),
+    (27, "Horror"),
+    (10402, "Music"),
+    (9648, "Mystery"),
+    (10749, "Romance"),
+    (878, "Science Fiction"),
+    (10770, "TV Movie"),
+    (53, "Thriller"),
+    (10752, "War"),
+    (37, "Western"),
+]
+
+KEYWORDS = 200
+
+ADJECTIVES = (
+    "Silent Hidden Last Golden Broken Crimson Distant Endless Frozen Gentle "
+    "Hollow Iron Lonely Midnight Northern Pale Quiet Restless Scarlet Secret "
+    "Shattered Silver Strange Summer Velvet Wandering Wild Winter Wicked Young"
+).split()
+NOUNS = (
+    "Night River Garden Empire Harbor Journey Kingdom Letter Machine Mirror "
+    "Mountain Ocean Orchard Passage Promise Road Shadow Sky Station Storm "
+    "Stranger Sun Tide Tower Valley Voyage Window Witness Woman Years"
+).split()
+FIRST_NAMES = (
+    "Ada Akira Anna Bruno Carla Chen Dario Elena Farid Greta Hana Igor Ines "
+    "Jonas Kenji Lena Luca Maria Marta Nadia Omar Paulo Rosa Sami Sofia "
+    "Tomas Ugo Vera Yuki Zara"
+).split()
+LAST_NAMES = (
+    "Abe Bergman Costa Dreyer Ekberg Fellini Garcia Hara Ivens Jensen Kato "
+    "Lang Moreau Novak Ozu Petri Quinn Rossi Sato Tanaka Ueda Varda Weir "
+    "Xavier Yates Zeller"
+).split()
+LANGUAGES = ["en"] * 6 + ["fr", "fr", "ja", "ja", "it", "de", "ko", "sv", "es"]
+
+# Qualities a main feature is filed under, commonest first
+
+MAIN_QUALITIES = [
+    "Bluray-1080p",
+    "Bluray-1080p",
+    "WEBDL-1080p",
+    "DVD",
+    "Bluray-2160p",
+    "Bluray-720p",
+    "WEBRip-1080p",
+    "Bluray-1080p Remux",
+    "HDTV-1080p",
+    "SDTV",
+]
+
+# One job per crew class the recommendation engine scores
+
+CREW_JOBS = [
+    ("Directing", "Director"),
+    ("Writing", "Screenplay"),
+    ("Camera", "Director of Photography"),
+    ("Sound", "Original Music Composer"),
+    ("Editing", "Editor"),
+]
+
+# A fixed origin for every generated date, so reruns match exactly
+
+EPOCH = datetime(2015, 1, 1)
+
+
+def _spread(total, count, index):
+    """Index's share when total is split as evenly as possible over
+    count."""
+
+    return total // count + (1 if index < total % count else 0)
+
+
+def _insert(table, rows):
+    """Bulk-insert rows into a table, a batch at a time. An executemany
+    takes one set of columns, so rows are grouped by theirs; a column a
+    row leaves out keeps its default."""
+
+    from app import db
+
+    shapes = {}
+    for row in rows:
+        shapes.setdefault(tuple(sorted(row)), []).append(row)
+    for shape in shapes.values():
+        for start in range(0, len(shape), INSERT_BATCH):
+            db.session.execute(table.insert(), shape[start : start + INSERT_BATCH])
+    db.session.commit()
+
+
+def untouched_basename(row):
+    """The name a file's original arrived under: its own basename, or
+    for an extra (whose basename is only its Plex title) prefixed with
+    its film, so no two originals share an S3 key."""
+
+    if not row.get("feature_type_id"):
+        return row["basename"]
+    return f"{row['dirname'].split('/')[1]} - {row['basename']}"
+
+
+def _next_id(model):
+    """The first free id in a model's table."""
+
+    from sqlalchemy import func
+
+    from app import db
+
+    return (db.session.query(func.max(model.id)).scalar() or 0) + 1
+
+
+def generate_library(scale="smoke", seed=SEED, aws_prefix="untouched"):
+    """Fill the bound database (and Redis) with a synthetic library at a
+    preset scale; returns the row counts written."""
+
+    from flask import current_app
+
+    from app.criterion_catalog import CRITERION_CACHE_KEY
+    from app.diary import star_rating_fields
+    from app.models import (
+        File,
+        Movie,
+        MovieCast,
+        MovieCrew,
+        RefFeatureType,
+        RefQuality,
+        TMDBCredit,
+        TMDBGenre,
+        TMDBKeyword,
+        User,
+        UserMovieReview,
+        UserWatchlist,
+        movie_genres,
+        movie_keywords,
+    )
+    from app.search_index import rebuild_search_index
+    from app.shopping_list import rebuild_shopping_list
+
+    spec = SCALES[scale]
+    rng = random.Random(f"{seed}:{scale}")
+    now = datetime.utcnow()
+    quality_ids = {row.quality_title: row.id for row in RefQuality.query}
+    feature_types = [(row.id, row.feature_type) for row in RefFeatureType.query]
+    user_ids = [row.id for row in User.query.order_by(User.admin.desc(), User.id)]
+
+    # Shared reference rows: the genres and keywords films draw from
+
+    existing_genres = {row.id for row in TMDBGenre.query}
+    _insert(
+        TMDBGenre.__table__,
+        [
+            {"id": genre_id, "name": name}
+            for genre_id, name in GENRES
+            if genre_id not in existing_genres
+        ],
+    )
+    first_keyword = _next_id(TMDBKeyword)
+    keyword_ids = list(range(first_keyword, first_keyword + KEYWORDS))
+    _insert(
+        TMDBKeyword.__table__,
+        [
+            {"id": keyword_id, "name": f"{rng.choice(NOUNS).lower()} {n}"}
+            for n, keyword_id in enumerate(keyword_ids)
+        ],
+    )
+
+    # People: a pool of actors big enough that billing is mostly
+    # distinct per film, and a smaller one of regular crew
+
+    first_credit = _next_id(TMDBCredit)
+    actor_count = max(spec["cast"] // 15, 60)
+    crew_count = max(spec["movies"] // 4, 20)
+    credit_rows = []
+    for n in range(actor_count + crew_count):
+        credit_rows.append(
+            {
+                "id": first_credit + n,
+                "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {n}",
+                "gender": rng.choice((1, 2)),
+                "tmdb_profile_path": f"/synthetic-person-{n}.jpg",
+            }
+        )
+    _insert(TMDBCredit.__table__, credit_rows)
+    actor_ids = [row["id"] for row in credit_rows[:actor_count]]
+    crew_ids = [row["id"] for row in credit_rows[actor_count:]]
+
+    # Films, a share of them Criterion releases
+
+    first_movie = _next_id(Movie)
+    movies = []
+    seen_titles = set()
+    spines = rng.sample(range(1, spec["criterion"] * 2 + 1), spec["criterion"])
+    criterion_indexes = dict(
+        zip(rng.sample(range(spec["movies"]), spec["criterion"]), spines)
+    )
+    for n in range(spec["movies"]):
+        year = rng.randint(1920, 2025)
+        title = f"The {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}"
+        if (title, year) in seen_titles:
+            title = f"{title} {n}"
+        seen_titles.add((title, year))
+        release = datetime(year, rng.randint(1, 12), rng.randint(1, 28))
+        row = movie_row(
+            title,
+            year,
+            id=first_movie + n,
+            sort_title=title[4:],
+            tmdb_id=100000 + n,
+            tmdb_title=title,
+            tmdb_original_title=title,
+            tmdb_release_date=release,
+            tmdb_original_language=rng.choice(LANGUAGES),
+            tmdb_runtime=rng.randint(75, 190),
+            tmdb_popularity=round(rng.uniform(0.5, 80.0), 3),
+            tmdb_vote_average=round(rng.uniform(4.0, 8.8), 1),
+            tmdb_vote_count=rng.randint(10, 20000),
+            tmdb_poster_path=f"/synthetic-poster-{n}.jpg",
+            tmdb_overview=f"A synthetic film about a {title[4:].lower()}.",
+            tmdb_data_as_of=now,
+        )
+        if n in criterion_indexes:
+            row.update(
+                criterion_spine_number=criterion_indexes[n],
+                criterion_in_print=rng.random() < 0.8,
+                criterion_disc_owned=rng.random() < 0.3,
+                criterion_quality_id=quality_ids["Bluray-1080p"],
+            )
+        movies.append(row)
+    _insert(Movie.__table__, movies)
+
+    genre_rows = []
+    keyword_rows = []
+    cast_rows = []
+    crew_rows = []
+    genre_ids = [genre_id for genre_id, _ in GENRES]
+    first_cast = _next_id(MovieCast)
+    first_crew = _next_id(MovieCrew)
+    for n, movie in enumerate(movies):
+        for genre_id in rng.sample(genre_ids, rng.randint(1, 3)):
+            genre_rows.append({"movie_id": movie["id"], "genre_id": genre_id})
+        for keyword_id in rng.sample(keyword_ids, rng.randint(2, 5)):
+            keyword_rows.append({"movie_id": movie["id"], "keyword_id": keyword_id})
+        billed = _spread(spec["cast"], spec["movies"], n)
+        for order, credit_id in enumerate(
+            rng.sample(actor_ids, min(billed, len(actor_ids)))
+        ):
+            cast_rows.append(
+                {
+                    "id": first_cast + len(cast_rows),
+                    "movie_id": movie["id"],
+                    "credit_id": credit_id,
+                    "character": f"Character {order + 1}",
+                    "billing_order": order,
+                }
+            )
+        for department, job in CREW_JOBS:
+            crew_rows.append(
+                {
+                    "id": first_crew + len(crew_rows),
+                    "movie_id": movie["id"],
+                    "credit_id": rng.choice(crew_ids),
+                    "department": department,
+                    "job": job,
+                }
+            )
+    _insert(movie_genres, genre_rows)
+    _insert(movie_keywords, keyword_rows)
+    _insert(MovieCast.__table__, cast_rows)
+    _insert(MovieCrew.__table__, crew_rows)
+
+    # Files: every film has a main feature, some a second copy in
+    # another quality (or edition), and the rest of its share as
+    # extras. Nearly everything has its untouched original archived
+
+    first_file = _next_id(File)
+    file_rows = []
+    for n, movie in enumerate(movies):
+        share = max(_spread(spec["files"], spec["movies"], n), 1)
+        mains = 2 if share > 1 and rng.random() < 0.3 else 1
+        qualities = []
+        while len(qualities) < mains:
+            candidate = rng.choice(MAIN_QUALITIES)
+            if candidate not in qualities:
+                qualities.append(candidate)
+        for copy, quality_title in enumerate(qualities):
+            file_rows.append(
+                movie_file_row(
+                    movie["id"],
+                    movie["title"],
+                    movie["year"],
+                    quality_title,
+                    quality_ids[quality_title],
+                    edition="Director's Cut" if copy and rng.random() < 0.2 else None,
+                )
+            )
+        for extra in range(share - mains):
+            feature_type_id, feature_type = feature_types[extra % len(feature_types)]
+            file_rows.append(
+                movie_file_row(
+                    movie["id"],
+                    movie["title"],
+                    movie["year"],
+                    qualities[0],
+                    quality_ids[qualities[0]],
+                    feature_type_name=feature_type,
+                    feature_type_id=feature_type_id,
+                    plex_title=f"{feature_type} {extra + 1}",
+                )
+            )
+    for n, row in enumerate(file_rows):
+        size = rng.randint(200, 60000) * 1048576
+        row.update(
+            id=first_file + n,
+            untouched_basename=untouched_basename(row),
+            filesize_bytes=size,
+            container="Matroska",
+            codec="AVC",
+        )
+        if rng.random() < 0.97:
+            row.update(
+                aws_untouched_key=f"{aws_prefix}/{row['untouched_basename']}",
+                aws_untouched_date_uploaded=EPOCH
+                + timedelta(days=rng.randint(0, 3500)),
+                aws_untouched_filesize_bytes=size,
+            )
+    _insert(File.__table__, file_rows)
+
+    # The diary, most of it the admin's, plus a watchlist of films
+    # nobody has logged yet
+
+    first_review = _next_id(UserMovieReview)
+    review_rows = []
+    logged = set()
+    for n in range(spec["diary"]):
+        user_id = (
+            user_ids[0] if rng.random() < 0.7 or len(user_ids) == 1 else user_ids[1]
+        )
+        movie = rng.choice(movies)
+        logged.add(movie["id"])
+        rating = rng.choice([None, 2.0, 2.5, 3.0, 3.5, 3.5, 4.0, 4.0, 4.5, 5.0])
+        watched = EPOCH + timedelta(days=rng.randint(0, 3900))
+        review_rows.append(
+            {
+                "id": first_review + n,
+                "user_id": user_id,
+                "movie_id": movie["id"],
+                "liked": bool(rating and rating >= 4.0 and rng.random() < 0.5),
+                "date_watched": watched,
+                "date_reviewed": watched if rating is not None else None,
+                "review": "Synthetic notes." if rng.random() < 0.2 else None,
+                **star_rating_fields(rating),
+            }
+        )
+    _insert(UserMovieReview.__table__, review_rows)
+
+    first_listed = _next_id(UserWatchlist)
+    unlogged = [movie["id"] for movie in movies if movie["id"] not in logged]
+    watchlist_rows = [
+        {
+            "id": first_listed + n,
+            "user_id": user_ids[n % len(user_ids)],
+            "movie_id": movie_id,
+            "date_added": EPOCH + timedelta(days=n),
+        }
+        for n, movie_id in enumerate(
+            rng.sample(unlogged, min(len(unlogged), spec["diary"] // 10))
+        )
+    ]
+    _insert(UserWatchlist.__table__, watchlist_rows)
+
+    # Wikidata's spine list: the library's Criterion films plus as many
+    # releases the library doesn't have
+
+    releases = [
+        {
+            "spine_number": movie["criterion_spine_number"],
+            "tmdb_id": movie["tmdb_id"],
+            "title": movie["title"].upper(),
+            "label": movie["title"],
+            "year": movie["year"],
+            "criterion_film_id": None,
+            "set_title": None,
+        }
+        for movie in movies
+        if movie.get("criterion_spine_number")
+    ]
+    missing_spines = sorted(set(range(1, spec["criterion"] * 2 + 1)) - set(spines))
+    for n, spine in enumerate(missing_spines):
+        title = f"Unowned {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {n}"
+        releases.append(
+            {
+                "spine_number": spine,
+                "tmdb_id": 900000 + n,
+                "title": title.upper(),
+                "label": title,
+                "year": rng.randint(1920, 2025),
+                "criterion_film_id": None,
+                "set_title": None,
+            }
+        )
+    releases.sort(key=lambda release: release["spine_number"])
+    current_app.redis.set(CRITERION_CACHE_KEY, json.dumps(releases))
+
+    rebuild_shopping_list()
+    rebuild_search_index()
+
+    return {
+        "movies": len(movies),
+        "files": len(file_rows),
+        "cast": len(cast_rows),
+        "crew": len(crew_rows),
+        "credits": len(credit_rows),
+        "diary": len(review_rows),
+        "watchlist": len(watchlist_rows),
+        "criterion_releases": len(releases),
+    }
+
+
+def library_file_ids(limit, seed=SEED):
+    """A deterministic sample of main-feature file ids."""
+
+    from app.models import File
+
+    ids = [
+        file_id
+        for (file_id,) in File.query.with_entities(File.id)
+        .filter(File.feature_type_id.is_(None))
+        .order_by(File.id)
+    ]
+    return sorted(random.Random(seed).sample(ids, min(limit, len(ids))))
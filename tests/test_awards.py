@@ -445,3 +445,129 @@ def test_awards_refresh_aborts_after_consecutive_failures(app, monkeypatch):
     assert sleeps == [awards.AWARDS_ERROR_PAUSE_SECONDS] * (
         awards.AWARDS_MAX_CONSECUTIVE_FAILURES - 1
     )
+
+
+def test_refresh_skips_unchanged_items_and_writes_only_diffs(app, monkeypatch):
+    """A film whose Wikidata item kept its revision skips the awards
+    query entirely; once the item moves, only the rows that left or
+    joined the film pass's baseline are written — craft rows the person
+    pass merged on top survive."""
+
+    import app.awards as awards
+
+    with app.app_context():
+        film = make_movie("Diffed Film", 1954, imdb_id="tt0047296")
+        db.session.commit()
+        film_id = film.id
+
+    state = {"rev": "100", "awards": ["Q103618"]}
+    queries = []
+
+    def fake_sparql(query):
+        """Revisions and awards from the mutable canned state."""
+
+        queries.append(query)
+        if "schema:version" in query:
+            return [{"ext": {"value": "tt0047296"}, "rev": {"value": state["rev"]}}]
+        return [
+            binding("tt0047296", award_q, f"Prize {award_q}", "win", 1955)
+            for award_q in state["awards"]
+        ]
+
+    monkeypatch.setattr(awards, "_wikidata_sparql", fake_sparql)
+    monkeypatch.setattr(awards.time, "sleep", lambda seconds: None)
+    monkeypatch.setitem(
+        app.config, "WIKIDATA_SPARQL_URL", "https://example.test/sparql"
+    )
+
+    with app.app_context():
+        awards.refresh_movie_awards()
+
+        # The person pass's craft row, layered on the fresh baseline
+
+        db.session.add(
+            MovieAward(
+                movie_id=film_id,
+                award_id="Q103360",
+                award_name="Academy Award for Best Directing",
+                win=True,
+                year=1955,
+            )
+        )
+        db.session.commit()
+        first_ids = {row.id for row in MovieAward.query.all()}
+
+        # Same revision: one cheap revision query, no awards query, no
+        # writes
+
+        queries.clear()
+        result = awards.refresh_movie_awards()
+        assert len(queries) == 1 and "schema:version" in queries[0]
+        assert "1 unchanged since the last run" in result
+        assert {row.id for row in MovieAward.query.all()} == first_ids
+
+        # The item moved: the dropped prize goes, the new one lands, the
+        # craft row stays
+
+        state.update(rev="101", awards=["Q106291"])
+        awards.refresh_movie_awards()
+        stored = {(row.award_id, row.win) for row in MovieAward.query.all()}
+
+    assert stored == {("Q106291", True), ("Q103360", True)}
+
+
+def test_refresh_prunes_sync_state_of_departed_films(app, monkeypatch):
+    """The per-film revision and baseline hashes hold only films still
+    in the library, and carry a TTL, so neither grows without bound."""
+
+    import app.awards as awards
+
+    with app.app_context():
+        kept = make_movie("Kept Film", 1957, imdb_id="tt0050083")
+        db.session.commit()
+        kept_id = kept.id
+        departed_id = kept_id + 1000
+        for key in (awards.AWARDS_REVISIONS_KEY, awards.AWARDS_FILM_ROWS_KEY):
+            app.redis.hset(key, departed_id, "stale")
+
+    def fake_sparql(query):
+        """A revision for the kept film, and no awards."""
+
+        if "schema:version" in query:
+            return [{"ext": {"value": "tt0050083"}, "rev": {"value": "7"}}]
+        return []
+
+    monkeypatch.setattr(awards, "_wikidata_sparql", fake_sparql)
+    monkeypatch.setattr(awards.time, "sleep", lambda seconds: None)
+    monkeypatch.setitem(
+        app.config, "WIKIDATA_SPARQL_URL", "https://example.test/sparql"
+    )
+
+    with app.app_context():
+        awards.refresh_movie_awards()
+
+    for key in (awards.AWARDS_REVISIONS_KEY, awards.AWARDS_FILM_ROWS_KEY):
+        assert app.redis.hkeys(key) == [str(kept_id).encode()]
+        assert 0 < app.redis.ttl(key) <= awards.AWARDS_STATE_SECONDS
+
+
+def test_pacer_opens_slots_on_fast_answers_and_backs_off(app):
+    """Fast answers shrink the pause and open slots up to the cap; a
+    slow answer or a 429 drops back to one slot with a doubled pause."""
+
+    import app.awards as awards
+
+    pacer = awards.WikidataPacer()
+    assert pacer.concurrency == 1
+    for _ in range(9):
+        pacer.record(0.5)
+    assert pacer.concurrency == awards.AWARDS_MAX_CONCURRENCY
+    assert pacer.pause < awards.AWARDS_BATCH_PAUSE_SECONDS
+
+    fast_pause = pacer.pause
+    pacer.record(0.5, throttled=True)
+    assert pacer.concurrency == 1
+    assert pacer.pause == fast_pause * 2
+
+    pacer.record(awards.AWARDS_SLOW_RESPONSE_SECONDS + 1)
+    assert pacer.pause == fast_pause * 4
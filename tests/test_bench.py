@@ -0,0 +1,153 @@
+"""The benchmark suite (tests/bench.py) at the smoke preset: every
+benchmark runs within its query budget and reports JSON-ready results,
+the synthetic library comes out the same for the same seed, and
+--compare notices a regression.
+"""
+
+import json
+
+import pytest
+
+from tests import bench
+from tests.conftest import ADMIN_EMAIL, _signed_in_client
+from tests.synthetic import SCALES, generate_library
+
+
+@pytest.fixture
+def bench_context(app, monkeypatch):
+    """A smoke-scale library, prepared as the bench CLI prepares one."""
+
+    from app import db
+
+    monkeypatch.setitem(app.config, "AWS_BUCKET", bench.BenchConfig.AWS_BUCKET)
+    monkeypatch.setitem(app.config, "AWS_ACCESS_KEY", bench.BenchConfig.AWS_ACCESS_KEY)
+    monkeypatch.setitem(app.config, "AWS_SECRET_KEY", bench.BenchConfig.AWS_SECRET_KEY)
+    with app.app_context():
+        counts = generate_library("smoke")
+        context = bench.prepare(app, "smoke", _signed_in_client(app, ADMIN_EMAIL))
+        context.counts = counts
+        yield context
+        db.session.rollback()
+
+
+def _fingerprint():
+    """What a generated library is made of, compactly."""
+
+    from app import db
+    from app.models import File, Movie, UserMovieReview
+
+    return (
+        [
+            tuple(row)
+            for row in db.session.query(Movie.id, Movie.title, Movie.year).order_by(
+                Movie.id
+            )
+        ],
+        [
+            tuple(row)
+            for row in db.session.query(
+                File.movie_id,
+                File.file_path,
+                File.filesize_bytes,
+                File.aws_untouched_key,
+            ).order_by(File.id)
+        ],
+        [
+            tuple(row)
+            for row in db.session.query(
+                UserMovieReview.movie_id, UserMovieReview.rating
+            ).order_by(UserMovieReview.id)
+        ],
+    )
+
+
+def test_every_benchmark_stays_within_its_query_budget(bench_context):
+    results = bench.run_benchmarks(bench_context, repeat=1)
+
+    assert list(results) == list(bench.BENCHMARKS)
+    over = {
+        name: result["queries"]
+        for name, result in results.items()
+        if not result["within_budget"]
+    }
+    assert over == {}
+    assert json.loads(json.dumps(results)) == results
+
+    # A cold twin rebuilds what its warm page finds cached
+
+    for name in ("index", "movie_shopping", "criterion_collection", "search_json"):
+        assert min(results[f"{name}_cold"]["queries"]) > max(results[name]["queries"])
+
+
+def test_sync_walks_the_stand_in_bucket_and_queues_only_the_unarchived(
+    bench_context,
+):
+    before = set(bench_context.s3.objects)
+
+    bench.run_benchmarks(bench_context, repeat=1, names=["sync_aws_s3_storage_task"])
+
+    assert "list_objects_v2" in bench_context.s3.calls
+    assert set(bench_context.s3.objects) - before == {"inventory/rank_1.csv"}
+    assert "restore_object" not in bench_context.s3.calls
+
+    # The few files the generator left unarchived queue their uploads
+
+    from app.models import File
+
+    assert (
+        bench_context.app.file_queue.count
+        == File.query.filter(File.aws_untouched_key.is_(None)).count()
+    )
+
+
+def test_evaluate_filename_matches_every_sample_to_its_library_file(bench_context):
+    from app import db
+    from app.models import File
+
+    library_paths = {path for (path,) in db.session.query(File.file_path)}
+
+    assert bench_context.file_details
+    assert all(
+        details["file_path"] in library_paths for details in bench_context.file_details
+    )
+
+
+def test_the_generator_is_deterministic(app):
+    from app import db
+
+    with app.app_context():
+        first_counts = generate_library("smoke")
+        first = _fingerprint()
+
+        keep = {"ref_quality", "ref_feature_type", "user"}
+        for table in reversed(db.metadata.sorted_tables):
+            if table.name not in keep:
+                db.session.execute(table.delete())
+        db.session.commit()
+
+        assert generate_library("smoke") == first_counts
+        assert _fingerprint() == first
+
+    assert first_counts["movies"] == SCALES["smoke"]["movies"]
+    assert first_counts["files"] == SCALES["smoke"]["files"]
+
+
+def test_compare_flags_slower_medians_and_more_queries():
+    baseline = {
+        "benchmarks": {
+            "index": {"median": 0.010, "queries": [2, 2]},
+            "search_json": {"median": 0.010, "queries": [9, 9]},
+        }
+    }
+    current = {
+        "benchmarks": {
+            "index": {"median": 0.011, "queries": [2, 2]},
+            "search_json": {"median": 0.020, "queries": [9, 11]},
+            "movie_states": {"median": 0.5, "queries": [4]},
+        }
+    }
+
+    regressions = bench.compare(baseline, current, tolerance=0.25)
+
+    assert len(regressions) == 2
+    assert all(line.startswith("search_json:") for line in regressions)
@@ -686,6 +686,153 @@ def test_criterion_catalog_pagination():
     assert _page_window(6, 12) == [1, 2, None, 4, 5, 6, 7, 8, None, 11, 12]
 
 
+def test_criterion_page_reads_the_precomputed_index(app, admin_client):
+    """The page serves its rows from the per-filter spine index: a warm
+    index answers without re-reading the release list, a new library
+    file moves the fingerprint and forces a rebuild, and an explicit
+    invalidation (a fresh release list) does the same."""
+
+    from app.criterion_catalog import (
+        CRITERION_INDEX_KEY,
+        invalidate_criterion_index,
+    )
+    from tests.factories import make_movie_file
+
+    with app.app_context():
+        owned = make_movie(
+            "Indexed Owned", 1950, tmdb_id=555101, criterion_spine_number=10
+        )
+        make_movie_file(owned, "Bluray-1080p")
+        db.session.commit()
+
+    _seed_release_cache(
+        app,
+        [
+            release(10, "Indexed Owned", 1950, tmdb_id=555101),
+            release(20, "Indexed Catalog", 1960, tmdb_id=555102),
+        ],
+    )
+
+    page = admin_client.get("/library/criterion-collection").get_data(as_text=True)
+    assert "#20 &ndash; Indexed Catalog (1960)" in page
+    assert app.redis.llen(CRITERION_INDEX_KEY.format(filter="all")) == 2
+    assert app.redis.llen(CRITERION_INDEX_KEY.format(filter="library")) == 1
+
+    # Warm: a changed release cache goes unread until something
+    # invalidates the index
+
+    _seed_release_cache(
+        app,
+        [
+            release(10, "Indexed Owned", 1950, tmdb_id=555101),
+            release(30, "Indexed Newcomer", 1970, tmdb_id=555103),
+        ],
+    )
+    page = admin_client.get("/library/criterion-collection").get_data(as_text=True)
+    assert "Indexed Catalog (1960)" in page
+    assert "Indexed Newcomer" not in page
+
+    with app.app_context():
+        invalidate_criterion_index()
+    page = admin_client.get("/library/criterion-collection").get_data(as_text=True)
+    assert "Indexed Catalog" not in page
+    assert "#30 &ndash; Indexed Newcomer (1970)" in page
+
+    # An import moves the library fingerprint: the new film rows up on
+    # the next view without any explicit invalidation
+
+    with app.app_context():
+        arrival = make_movie(
+            "Indexed Arrival", 1980, tmdb_id=555104, criterion_spine_number=40
+        )
+        make_movie_file(arrival, "DVD")
+        db.session.commit()
+    library_page = admin_client.get(
+        "/library/criterion-collection?filter=library"
+    ).get_data(as_text=True)
+    assert "#40 &ndash; Indexed Arrival (1980)" in library_page
+    assert app.redis.llen(CRITERION_INDEX_KEY.format(filter="library")) == 2
+
+
+def test_criterion_index_notices_ownership_edits_without_invalidation(
+    app, admin_client
+):
+    """Disc ownership feeds the settled filter, so the index fingerprint
+    covers it: an ownership write that bypasses the Criterion form
+    still shows on the next view."""
+
+    from tests.factories import make_movie_file
+
+    with app.app_context():
+        movie = make_movie(
+            "Indexed Disc",
+            1955,
+            tmdb_id=555201,
+            criterion_spine_number=50,
+            criterion_disc_owned=False,
+        )
+        make_movie_file(movie, "Bluray-1080p")
+        db.session.commit()
+        movie_id = movie.id
+
+    _seed_release_cache(app, [release(50, "Indexed Disc", 1955, tmdb_id=555201)])
+
+    settled = admin_client.get("/library/criterion-collection?filter=settled")
+    assert "Indexed Disc" not in settled.get_data(as_text=True)
+
+    with app.app_context():
+        db.session.get(Movie, movie_id).criterion_disc_owned = True
+        db.session.commit()
+
+    settled = admin_client.get("/library/criterion-collection?filter=settled")
+    assert "#50 &ndash; Indexed Disc (1955)" in settled.get_data(as_text=True)
+
+
+def test_criterion_index_notices_in_place_file_and_title_edits(app, admin_client):
+    """A file's quality edited in place, or a TMDb refresh retitling a
+    film, leaves the file count and ids alone; the fingerprint still
+    moves, so the next view shows the change."""
+
+    from datetime import datetime
+
+    from app.models import File, RefQuality
+    from tests.factories import make_movie_file
+
+    with app.app_context():
+        movie = make_movie(
+            "Edited Disc",
+            1956,
+            tmdb_id=555202,
+            criterion_spine_number=51,
+            criterion_disc_owned=True,
+        )
+        make_movie_file(movie, "DVD")
+        db.session.commit()
+        movie_id = movie.id
+
+    _seed_release_cache(app, [release(51, "Edited Disc", 1956, tmdb_id=555202)])
+
+    settled = admin_client.get("/library/criterion-collection?filter=settled")
+    assert "Edited Disc" not in settled.get_data(as_text=True)
+
+    with app.app_context():
+        bluray = RefQuality.query.filter_by(quality_title="Bluray-1080p").one()
+        File.query.filter_by(movie_id=movie_id).one().quality_id = bluray.id
+        db.session.commit()
+
+    settled = admin_client.get("/library/criterion-collection?filter=settled")
+    assert "#51 &ndash; Edited Disc (1956)" in settled.get_data(as_text=True)
+
+    with app.app_context():
+        movie = db.session.get(Movie, movie_id)
+        movie.title = "Edited Disc Restored"
+        movie.tmdb_data_as_of = datetime(2026, 10, 19, 4, 0)
+        db.session.commit()
+
+    page = admin_client.get("/library/criterion-collection?filter=library")
+    assert "#51 &ndash; Edited Disc Restored (1956)" in page.get_data(as_text=True)
+
+
 def test_shopping_list_links_direct_to_criterion_film_page(
     app, admin_client, monkeypatch
 ):
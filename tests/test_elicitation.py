@@ -1028,9 +1028,7 @@ def test_rate_featured_card_shows_the_estimate(app, admin_client):
         db.session.commit()
         featured_id = featured.id
 
-    app.redis.set(
-        SCORES_KEY.format(user_id=user_id), jsonlib.dumps({str(featured_id): 9.0})
-    )
+    app.redis.hset(SCORES_KEY.format(user_id=user_id), str(featured_id), 9.0)
     app.redis.set(
         PROFILE_KEY.format(user_id=user_id),
         jsonlib.dumps(
@@ -0,0 +1,179 @@
+"""The leader-elected import-directory watcher: the Redis lease, the
+exactly-once arrival claims, and the adaptive poller's interval."""
+
+import os
+
+import pytest
+
+from app import safe_job_id
+
+
+@pytest.fixture
+def quiet_app_watcher(app, monkeypatch):
+    """Pause the test app's own watcher loop, so its background ticks
+    can't take the lease in the middle of an election test."""
+
+    monkeypatch.setattr(app.import_watcher, "tick", lambda: None)
+
+
+def test_only_one_process_holds_the_watcher_lease(app, monkeypatch, quiet_app_watcher):
+    """Two candidates against one Redis: the first leads, the second
+    stands by, and takes over once the leader releases."""
+
+    from app import import_watcher
+
+    monkeypatch.setattr(
+        import_watcher.ImportWatcher, "start_watching", lambda self: None
+    )
+    monkeypatch.setattr(import_watcher, "enqueue_import_scan", lambda queue: None)
+
+    first = import_watcher.ImportWatcher(app)
+    second = import_watcher.ImportWatcher(app)
+    first.identity, second.identity = "host:1", "host:2"
+
+    app.redis.delete(import_watcher.LEASE_KEY)
+    first.tick()
+    second.tick()
+    assert first.leading is True
+    assert second.leading is False
+
+    # Renewal keeps the lease with its holder
+
+    first.tick()
+    second.tick()
+    assert first.leading is True
+    assert second.leading is False
+
+    first.release()
+    second.tick()
+    assert second.leading is True
+    assert app.redis.get(import_watcher.LEASE_KEY) == b"host:2"
+
+
+def test_a_stalled_leader_cannot_renew_its_successors_lease(
+    app, monkeypatch, quiet_app_watcher
+):
+    """Once the lease changes hands, the old holder's renewal fails and
+    it stops watching instead of extending someone else's lease."""
+
+    from app import import_watcher
+
+    monkeypatch.setattr(
+        import_watcher.ImportWatcher, "start_watching", lambda self: None
+    )
+    monkeypatch.setattr(import_watcher, "enqueue_import_scan", lambda queue: None)
+
+    stalled = import_watcher.ImportWatcher(app)
+    stalled.identity = "host:stalled"
+    app.redis.delete(import_watcher.LEASE_KEY)
+    stalled.tick()
+    assert stalled.leading is True
+
+    app.redis.set(import_watcher.LEASE_KEY, "host:successor")
+    stalled.tick()
+    assert stalled.leading is False
+    assert app.redis.get(import_watcher.LEASE_KEY) == b"host:successor"
+
+
+def test_an_arrival_is_enqueued_exactly_once(app, incoming_dir):
+    """Repeat reports of one file — duplicate events, a new leader's
+    snapshot — queue a single localization."""
+
+    from app.import_watcher import enqueue_arrival
+
+    basename = "Claimed Once (2021) - [DVD].mkv"
+    path = os.path.join(incoming_dir, basename)
+    with open(path, "wb") as f:
+        f.write(b"not a real video")
+
+    try:
+        with app.app_context():
+            assert enqueue_arrival(app, path) is True
+            assert enqueue_arrival(app, path) is False
+        assert app.import_queue.job_ids.count(safe_job_id(basename)) == 1
+    finally:
+        os.remove(path)
+
+
+def test_dotfiles_are_never_claimed(app, incoming_dir):
+    """A dot-prefixed copy in progress isn't an arrival yet."""
+
+    from app.import_watcher import ARRIVALS_KEY, enqueue_arrival
+
+    path = os.path.join(incoming_dir, ".Hidden (2021) - [DVD].mkv")
+    with open(path, "wb") as f:
+        f.write(b"partial")
+
+    try:
+        with app.app_context():
+            assert enqueue_arrival(app, path) is False
+        assert not app.redis.sismember(ARRIVALS_KEY, os.path.basename(path))
+    finally:
+        os.remove(path)
+
+
+def test_reconcile_releases_claims_for_departed_files(app):
+    """A claim outlives its file only until the next reconcile, so a
+    later re-drop of the same name is seen as new."""
+
+    from app.import_watcher import ARRIVALS_KEY, ImportWatcher
+
+    app.redis.sadd(ARRIVALS_KEY, "Long Gone (1999) - [DVD].mkv")
+    ImportWatcher(app).reconcile()
+    assert not app.redis.sismember(ARRIVALS_KEY, "Long Gone (1999) - [DVD].mkv")
+
+
+def test_poller_tightens_on_change_and_relaxes_when_quiet(tmp_path):
+    """The interval drops to the minimum when a listing changes and
+    stretches toward the maximum while the directory stays quiet."""
+
+    from app.import_watcher import AdaptivePoller
+
+    arrivals, departures = [], []
+    poller = AdaptivePoller(
+        str(tmp_path),
+        arrivals.append,
+        departures.extend,
+        minimum=1,
+        maximum=4,
+    )
+
+    (tmp_path / "Existing (2001) - [DVD].mkv").write_bytes(b"x")
+    poller.poll()
+    assert arrivals == []
+
+    poller.poll()
+    poller.poll()
+    poller.poll()
+    poller.poll()
+    assert poller.interval == 4
+
+    (tmp_path / ".Copying (2002) - [DVD].mkv").write_bytes(b"x")
+    poller.poll()
+    assert arrivals == []
+
+    (tmp_path / ".Copying (2002) - [DVD].mkv").rename(
+        tmp_path / "Copying (2002) - [DVD].mkv"
+    )
+    (tmp_path / "Existing (2001) - [DVD].mkv").unlink()
+    poller.poll()
+    assert arrivals == [str(tmp_path / "Copying (2002) - [DVD].mkv")]
+    assert departures == ["Existing (2001) - [DVD].mkv"]
+    assert poller.interval == 1
+
+
+def test_network_mounts_fall_back_to_polling(monkeypatch):
+    """Remote writes to SMB and NFS shares never raise local events."""
+
+    from app import import_watcher
+
+    monkeypatch.setattr(import_watcher, "mount_filesystem_type", lambda path: "cifs")
+    assert import_watcher.native_events_supported("/mnt/import") is False
+
+    monkeypatch.setattr(import_watcher, "mount_filesystem_type", lambda path: "ext4")
+    assert import_watcher.native_events_supported("/mnt/import") is True
+
+    # No mount table (macOS): the /Volumes convention decides
+
+    monkeypatch.setattr(import_watcher, "mount_filesystem_type", lambda path: None)
+    assert import_watcher.native_events_supported("/Volumes/Media/import") is False
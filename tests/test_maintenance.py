@@ -52,6 +52,29 @@ def test_rotate_logs_archives_and_prunes(app):
         os.remove(path)
 
 
+class MultipartUploads:
+    """The S3 calls the streamed backup upload makes, recording each
+    completed object's bytes by key."""
+
+    def create_multipart_upload(self, Bucket, Key):
+        self.parts = getattr(self, "parts", {})
+        self.parts[Key] = {}
+        return {"UploadId": f"upload-{Key}"}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.parts[Key][PartNumber] = Body
+        return {"ETag": f'"etag-{PartNumber}"'}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.completed = getattr(self, "completed", {})
+        self.completed[Key] = b"".join(
+            self.parts[Key][part["PartNumber"]] for part in MultipartUpload["Parts"]
+        )
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.aborted = getattr(self, "aborted", []) + [Key]
+
+
 @pytest.fixture
 def mysqldump_stub(app, tmp_path, monkeypatch):
     stub = tmp_path / "mysqldump"
@@ -124,7 +147,7 @@ def test_backup_database_uploads_to_s3_and_prunes_remote(
     uploads = []
     deletes = []
 
-    class FakeS3Client:
+    class FakeS3Client(MultipartUploads):
         def upload_file(self, filename, bucket, key, **kwargs):
             uploads.append((filename, bucket, key))
 
@@ -144,9 +167,8 @@ def test_backup_database_uploads_to_s3_and_prunes_remote(
         "LastModified": datetime.now(timezone.utc) - timedelta(days=999),
     }
 
-    monkeypatch.setattr(
-        videos, "aws_s3_client", lambda with_retries=False: FakeS3Client()
-    )
+    client = FakeS3Client()
+    monkeypatch.setattr(videos, "aws_s3_client", lambda with_retries=False: client)
     monkeypatch.setattr(
         videos,
         "get_matching_s3_objects",
@@ -156,12 +178,20 @@ def test_backup_database_uploads_to_s3_and_prunes_remote(
     with app.app_context():
         backup_database()
 
-    assert len(uploads) == 1
-    filename, bucket, key = uploads[0]
-    assert filename.endswith(".sql.gz")
-    assert bucket == "test-bucket"
+    # The dump streams up as a multipart upload, byte-identical to the
+    # local copy; only its small table manifest goes through upload_file
+
+    assert len(client.completed) == 1
+    key, uploaded = next(iter(client.completed.items()))
     assert key.startswith("backup/fitzflix_test-")
     assert key.endswith(".sql.gz")
+    assert uploaded == (backup_dir / os.path.basename(key)).read_bytes()
+
+    assert len(uploads) == 1
+    filename, bucket, manifest_key = uploads[0]
+    assert filename.endswith(".sql.gz.tables.json")
+    assert bucket == "test-bucket"
+    assert manifest_key == f"{key}.tables.json"
 
     # Only the stale backup is deleted: not the fresh one, not the
     # directory marker, and never the object just uploaded
@@ -206,7 +236,7 @@ def test_backup_uploads_encrypted_env(app, mysqldump_stub, monkeypatch, tmp_path
 
     captured = {}
 
-    class FakeS3Client:
+    class FakeS3Client(MultipartUploads):
         def upload_file(self, filename, bucket, key, **kwargs):
             with open(filename, "rb") as f:
                 captured[key] = f.read()
@@ -309,7 +339,7 @@ def test_backup_syncs_custom_posters(app, mysqldump_stub, monkeypatch):
     uploads = []
     deletes = []
 
-    class FakeS3Client:
+    class FakeS3Client(MultipartUploads):
         def upload_file(self, filename, bucket, key, **kwargs):
             uploads.append(key)
 
@@ -360,3 +390,285 @@ def test_restore_drill_skips_without_aws(app):
 
     with app.app_context():
         assert restore_drill() is True
+
+
+def test_parallel_gzip_blocks_read_back_as_one_stream(tmp_path):
+    """Out-of-order compression still writes members in order, and each
+    section's byte range decompresses on its own."""
+
+    from app.backup_stream import ParallelGzipWriter, read_gzip_range
+
+    path = tmp_path / "dump.sql.gz"
+    with open(path, "wb") as f:
+        writer = ParallelGzipWriter([f], threads=3, block_size=64)
+        writer.write(b"-- preamble\n")
+        for table in ("movie", "file"):
+            writer.section(table)
+            for row in range(50):
+                writer.write(f"INSERT INTO {table} VALUES ({row});\n".encode())
+        writer.close()
+
+    expected = b"-- preamble\n" + b"".join(
+        f"INSERT INTO {table} VALUES ({row});\n".encode()
+        for table in ("movie", "file")
+        for row in range(50)
+    )
+    with gzip.open(path, "rb") as f:
+        assert f.read() == expected
+
+    manifest = writer.manifest()
+    assert [table["name"] for table in manifest["tables"]] == ["movie", "file"]
+    assert b"".join(read_gzip_range(path, *manifest["preamble"])) == b"-- preamble\n"
+    movie = manifest["tables"][0]
+    movie_rows = b"".join(read_gzip_range(path, movie["start"], movie["end"]))
+    assert movie_rows.count(b"INSERT INTO movie") == 50
+    assert b"INSERT INTO file" not in movie_rows
+
+
+def test_backup_sections_restore_table_by_table(
+    app, mysqldump_stub, tmp_path, monkeypatch
+):
+    """The streamed backup writes a table manifest, and restore_dump
+    replays the preamble plus one table in each parallel session; both
+    runs' timings reach the System page's stats."""
+
+    import json
+
+    from app.maintenance import BACKUP_STATS_KEY, backup_throughput, restore_dump
+
+    stub, backup_dir = mysqldump_stub
+    stub.write_text(
+        "#!/bin/sh\n"
+        'echo "SET FOREIGN_KEY_CHECKS=0;"\n'
+        'echo "-- Table structure for table \\`movie\\`"\n'
+        'echo "INSERT INTO movie VALUES (1);"\n'
+        'echo "-- Table structure for table \\`file\\`"\n'
+        'echo "INSERT INTO file VALUES (1);"\n'
+    )
+    sessions = tmp_path / "sessions"
+    sessions.mkdir()
+    mysql = tmp_path / "mysql"
+    mysql.write_text(f'#!/bin/sh\ncat > "{sessions}/$$.sql"\n')
+    mysql.chmod(0o755)
+    monkeypatch.setitem(app.config, "MYSQL_BIN", str(mysql))
+    app.redis.delete(BACKUP_STATS_KEY)
+
+    with app.app_context():
+        backup_database()
+        (dump,) = backup_dir.glob("fitzflix_test-*.sql.gz")
+        manifest = json.loads((backup_dir / f"{dump.name}.tables.json").read_text())
+        assert [table["name"] for table in manifest["tables"]] == ["movie", "file"]
+
+        loaded = restore_dump(str(dump), "scratch", manifest, jobs=2)
+
+    replayed = sorted(path.read_text() for path in sessions.iterdir())
+    assert replayed == [
+        "SET FOREIGN_KEY_CHECKS=0;\n"
+        "-- Table structure for table `file`\nINSERT INTO file VALUES (1);\n",
+        "SET FOREIGN_KEY_CHECKS=0;\n"
+        "-- Table structure for table `movie`\nINSERT INTO movie VALUES (1);\n",
+    ]
+    assert loaded == sum(len(text.encode()) for text in replayed)
+
+    stats = backup_throughput(app.redis)
+    assert stats["backup"]["jobs"] == 1
+    assert stats["backup"]["mb_per_second"] >= 0
+    assert stats["restore"] is None
+
+
+def test_chatty_stderr_never_stalls_a_dump_or_restore(
+    app, mysqldump_stub, tmp_path, monkeypatch
+):
+    """mysqldump and mysql warning by the page, beyond any pipe buffer,
+    while a section larger than one streams through: neither run
+    blocks on the other's unread stderr."""
+
+    import threading
+
+    from app.maintenance import restore_dump
+
+    chatter = "head -c 262144 /dev/zero | tr '\\0' w >&2\n"
+    stub, backup_dir = mysqldump_stub
+    stub.write_text(
+        "#!/bin/sh\n"
+        + chatter
+        + 'echo "-- Table structure for table \\`movie\\`"\n'
+        + "head -c 262144 /dev/zero | tr '\\0' 1\n"
+        + "echo\n"
+    )
+    received = tmp_path / "received.sql"
+    mysql = tmp_path / "mysql"
+    mysql.write_text("#!/bin/sh\n" + chatter + f'cat > "{received}"\n')
+    mysql.chmod(0o755)
+    monkeypatch.setitem(app.config, "MYSQL_BIN", str(mysql))
+
+    loaded = []
+
+    def back_up_and_restore():
+        with app.app_context():
+            backup_database()
+            (dump,) = backup_dir.glob("fitzflix_test-*.sql.gz")
+            loaded.append(restore_dump(str(dump), "scratch"))
+
+    worker = threading.Thread(target=back_up_and_restore, daemon=True)
+    worker.start()
+    worker.join(timeout=30)
+
+    assert not worker.is_alive(), "the dump or restore stalled on stderr"
+    assert loaded == [received.stat().st_size]
+    assert loaded[0] > 262144
+
+
+def test_views_restore_after_every_table(app, mysqldump_stub, tmp_path, monkeypatch):
+    """A view's stand-in sorts among the tables and its definition
+    comes at the end of the dump, so neither may ride in a table's
+    section: both, with the closing statements, go to one last session
+    that starts only after every table session has finished."""
+
+    import json
+
+    from app.maintenance import restore_dump
+
+    stub, backup_dir = mysqldump_stub
+    stub.write_text(
+        "#!/bin/sh\n"
+        'echo "SET FOREIGN_KEY_CHECKS=0;"\n'
+        'echo "-- Table structure for table \\`file\\`"\n'
+        'echo "INSERT INTO file VALUES (1);"\n'
+        'echo "-- Temporary view structure for view \\`ranked_files\\`"\n'
+        'echo "CREATE VIEW ranked_files AS SELECT 1 AS id;"\n'
+        'echo "-- Table structure for table \\`movie\\`"\n'
+        'echo "INSERT INTO movie VALUES (1);"\n'
+        'echo "-- Final view structure for view \\`ranked_files\\`"\n'
+        'echo "CREATE OR REPLACE VIEW ranked_files AS SELECT id FROM file;"\n'
+        'echo "/*!40103 SET TIME_ZONE=@OLD_TIME_ZONE */;"\n'
+        'echo "-- Dump completed"\n'
+    )
+
+    # Each session records how many sessions had finished when it began
+
+    sessions = tmp_path / "sessions"
+    sessions.mkdir()
+    mysql = tmp_path / "mysql"
+    mysql.write_text(
+        "#!/bin/sh\n"
+        f'finished=$(ls "{sessions}" | grep -c done)\n'
+        "sleep 0.2\n"
+        f'cat > "{sessions}/$$.sql"\n'
+        f'echo "$finished" > "{sessions}/$$.seen"\n'
+        f'touch "{sessions}/$$.done"\n'
+    )
+    mysql.chmod(0o755)
+    monkeypatch.setitem(app.config, "MYSQL_BIN", str(mysql))
+
+    with app.app_context():
+        backup_database()
+        (dump,) = backup_dir.glob("fitzflix_test-*.sql.gz")
+        manifest = json.loads((backup_dir / f"{dump.name}.tables.json").read_text())
+        assert [table["name"] for table in manifest["tables"]] == ["file", "movie"]
+        assert len(manifest["postamble"]) == 3
+
+        restore_dump(str(dump), "scratch", manifest, jobs=2)
+
+    replayed = {
+        path.read_text(): int((sessions / f"{path.stem}.seen").read_text())
+        for path in sessions.glob("*.sql")
+    }
+    tables = [text for text in replayed if "VIEW" not in text]
+    (views,) = [text for text in replayed if "VIEW" in text]
+    assert sorted(tables) == [
+        "SET FOREIGN_KEY_CHECKS=0;\n"
+        "-- Table structure for table `file`\nINSERT INTO file VALUES (1);\n",
+        "SET FOREIGN_KEY_CHECKS=0;\n"
+        "-- Table structure for table `movie`\nINSERT INTO movie VALUES (1);\n",
+    ]
+    assert views == (
+        "SET FOREIGN_KEY_CHECKS=0;\n"
+        "-- Temporary view structure for view `ranked_files`\n"
+        "CREATE VIEW ranked_files AS SELECT 1 AS id;\n"
+        "-- Final view structure for view `ranked_files`\n"
+        "CREATE OR REPLACE VIEW ranked_files AS SELECT id FROM file;\n"
+        "/*!40103 SET TIME_ZONE=@OLD_TIME_ZONE */;\n"
+        "-- Dump completed\n"
+    )
+    assert replayed[views] == 2
+
+
+def test_parallel_table_dumps_are_self_contained_sections(
+    app, mysqldump_stub, monkeypatch
+):
+    """With DB_BACKUP_DUMP_JOBS above 1 every table gets its own
+    mysqldump, appended whole, so there's no shared preamble; the views
+    follow as one definitions-only dump in the postamble."""
+
+    import json
+
+    from app import maintenance
+
+    stub, backup_dir = mysqldump_stub
+    stub.write_text(
+        "#!/bin/sh\n"
+        'case " $* " in *" --no-data "*)\n'
+        '  echo "-- Final view structure for view \\`ranked_files\\`"\n'
+        '  echo "CREATE VIEW ranked_files AS SELECT 1;"\n'
+        "  exit 0;;\n"
+        "esac\n"
+        "for table; do :; done\n"
+        'echo "SET NAMES utf8mb4;"\n'
+        'echo "-- Table structure for table \\`$table\\`"\n'
+        'echo "INSERT INTO $table VALUES (1);"\n'
+    )
+    monkeypatch.setitem(app.config, "DB_BACKUP_DUMP_JOBS", 2)
+    monkeypatch.setattr(
+        maintenance, "_backup_table_names", lambda database: ["movie", "file", "user"]
+    )
+    monkeypatch.setattr(
+        maintenance, "_backup_view_names", lambda database: ["ranked_files"]
+    )
+
+    with app.app_context():
+        backup_database()
+
+    (dump,) = backup_dir.glob("fitzflix_test-*.sql.gz")
+    manifest = json.loads((backup_dir / f"{dump.name}.tables.json").read_text())
+    assert manifest["preamble"] == [0, 0]
+    assert sorted(table["name"] for table in manifest["tables"]) == [
+        "file",
+        "movie",
+        "user",
+    ]
+    for table in manifest["tables"]:
+        section = b"".join(
+            maintenance.read_gzip_range(str(dump), table["start"], table["end"])
+        )
+        assert section.startswith(b"SET NAMES utf8mb4;\n")
+        assert f"INSERT INTO {table['name']} VALUES (1);".encode() in section
+        assert b"CREATE VIEW" not in section
+
+    (views,) = manifest["postamble"]
+    assert b"".join(maintenance.read_gzip_range(str(dump), *views)) == (
+        b"-- Final view structure for view `ranked_files`\n"
+        b"CREATE VIEW ranked_files AS SELECT 1;\n"
+    )
+
+
+def test_failed_backup_aborts_the_multipart_upload(app, mysqldump_stub, monkeypatch):
+    """A dump that fails midway leaves neither a local file nor a
+    half-finished S3 upload."""
+
+    import app.videos as videos
+
+    stub, backup_dir = mysqldump_stub
+    stub.write_text('#!/bin/sh\necho "partial output"\nexit 2\n')
+    monkeypatch.setitem(app.config, "AWS_BUCKET", "test-bucket")
+
+    client = MultipartUploads()
+    monkeypatch.setattr(videos, "aws_s3_client", lambda **kwargs: client)
+
+    with app.app_context():
+        with pytest.raises(RuntimeError, match="mysqldump exited 2"):
+            backup_database()
+
+    assert list(backup_dir.glob("*.sql.gz")) == []
+    assert len(client.aborted) == 1
+    assert not getattr(client, "completed", None)
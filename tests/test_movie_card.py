@@ -141,9 +141,7 @@ def test_movie_states_batch_hydration_payload(app, admin_client):
         rated_id, estimated_id, flagged_id = rated.id, estimated.id, flagged.id
         listed_tmdb = listed.tmdb_id
 
-    app.redis.set(
-        SCORES_KEY.format(user_id=user_id), json.dumps({str(estimated_id): 9.0})
-    )
+    app.redis.hset(SCORES_KEY.format(user_id=user_id), str(estimated_id), 9.0)
     app.redis.set(
         PROFILE_KEY.format(user_id=user_id),
         json.dumps(
@@ -567,3 +565,90 @@ def test_movie_states_fills_a_whole_page_in_one_pass(app, admin_client):
         if payload["tmdb"][str(tmdb_id)]["estimated"] is not None
     ]
     assert len(estimated) == 30
+
+
+def test_movie_page_view_model_is_cached_until_the_film_changes(app, admin_client):
+    """The movie page's cast, credits, and awards load in a few queries
+    however big the cast, come from Redis on the next visit, and are
+    rebuilt once its awards, its files, or a credit's name change."""
+
+    from sqlalchemy import event
+
+    from app.models import File, MovieAward, MovieCast, TMDBCredit
+
+    with app.app_context():
+        director = make_person(889001, "Detail Director")
+        movie = make_candidate("Detail Film", 1971, director=director)
+        for order in range(40):
+            make_cast(
+                make_person(889100 + order, f"Player {order}"),
+                movie,
+                character=f"Role {order}",
+                order=order,
+            )
+        db.session.commit()
+        movie_id = movie.id
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    def visit():
+        statements.clear()
+        with app.app_context():
+            event.listen(db.engine, "before_cursor_execute", record)
+            try:
+                page = admin_client.get(f"/movie/{movie_id}").get_data(as_text=True)
+            finally:
+                event.remove(db.engine, "before_cursor_execute", record)
+        return page
+
+    def credit_queries():
+        return [s for s in statements if "tmdb_credit" in s]
+
+    # A cold visit loads the whole cast in one joined query, not one
+    # per actor
+
+    page = visit()
+    assert "Player 0" in page and "Player 39" in page
+    assert "Detail Director" in page
+    assert page.index("Player 0") < page.index("Player 39")
+    assert len(credit_queries()) <= 2
+
+    # A warm one doesn't touch the credits at all
+
+    page = visit()
+    assert "Player 39" in page
+    assert credit_queries() == []
+
+    # An award lands on the page straight away
+
+    with app.app_context():
+        db.session.add(
+            MovieAward(
+                movie_id=movie_id,
+                award_id="Q102427",
+                award_name="Palme d'Or",
+                win=True,
+                year=1971,
+            )
+        )
+        db.session.commit()
+    assert "Palme d&#39;Or (1971)" in visit()
+
+    # So does a renamed credit, shared by every film it's on
+
+    with app.app_context():
+        db.session.get(TMDBCredit, 889100).name = "Renamed Player"
+        db.session.commit()
+    assert "Renamed Player" in visit()
+
+    # And deleting the film's only file makes it unowned
+
+    assert 'name="not_interested_submit"' not in visit()
+    with app.app_context():
+        db.session.delete(File.query.filter_by(movie_id=movie_id).one())
+        db.session.commit()
+        assert MovieCast.query.filter_by(movie_id=movie_id).count() == 40
+    assert 'name="not_interested_submit"' in visit()
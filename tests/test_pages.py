@@ -482,3 +482,72 @@ def test_every_render_template_target_exists(app):
         except Exception:
             unresolved.append(f"{path.relative_to(root)} -> {name}")
     assert not unresolved, f"missing render_template targets: {unresolved}"
+
+
+def test_profile_query_flags_an_admin_request(app, admin_client, user_client):
+    """?profile=1 on an admin's request stores a report linked from a
+    response header and from the System page; anyone else's request
+    is served unprofiled."""
+
+    from app.profiling import load_report
+
+    response = admin_client.get("/system?profile=1")
+    link = response.headers["X-Fitzflix-Profile"]
+    report = load_report(app.redis, link.rsplit("/", 1)[1])
+    assert report["kind"] == "request"
+    assert report["name"] == "GET main.system"
+    assert report["sql"]["count"] > 0
+    assert report["redis"]["round_trips"] > 0
+    assert report["cpu"] is None
+
+    page = admin_client.get(link).get_data(as_text=True)
+    assert "Profiling report" in page
+    assert link in admin_client.get("/system").get_data(as_text=True)
+
+    assert "X-Fitzflix-Profile" not in user_client.get("/?profile=1").headers
+
+
+def test_profile_flags_repeated_selects_as_n_plus_one(app):
+    """A SELECT run once per row of an earlier query is flagged, IN-lists
+    of any length group as one statement, and a CPU profile samples
+    the profiled thread."""
+
+    import time
+
+    from app import db
+    from app.models import Movie
+    from app.profiling import N_PLUS_ONE_THRESHOLD, Profile, _service, normalize_sql
+    from tests.factories import make_movie
+
+    with app.app_context():
+        movies = [make_movie(f"Profiled {n}", 1990 + n) for n in range(12)]
+        db.session.commit()
+        ids = [movie.id for movie in movies]
+        db.session.expunge_all()
+
+        profile = Profile("test", "n+1", cpu=True)
+        profile.start()
+        for movie_id in ids:
+            Movie.query.filter_by(id=movie_id).first()
+        Movie.query.filter(Movie.id.in_(ids[:2])).all()
+        Movie.query.filter(Movie.id.in_(ids)).all()
+        time.sleep(0.05)
+        profile.stop()
+        report = profile.report()
+
+    flagged = [entry for entry in report["sql"]["statements"] if entry["n_plus_one"]]
+    assert len(flagged) == 1
+    assert flagged[0]["count"] == len(ids) >= N_PLUS_ONE_THRESHOLD
+    assert report["sql"]["statements"][0] is flagged[0]
+    in_lists = [
+        entry for entry in report["sql"]["statements"] if "(?…)" in entry["statement"]
+    ]
+    assert len(in_lists) == 1 and in_lists[0]["count"] == 2
+    assert normalize_sql("SELECT 1\n  FROM t WHERE id IN (?, ?,?)") == (
+        "SELECT 1 FROM t WHERE id IN (?…)"
+    )
+    assert report["cpu"]["samples"] > 0
+
+    assert _service("https://api.themoviedb.org/3/movie/1") == "TMDb"
+    assert _service("https://query.wikidata.org/sparql") == "Wikidata"
+    assert _service("http://127.0.0.1:32400/library", "127.0.0.1") == "Plex"
@@ -72,6 +72,82 @@ def test_file_id_stages_look_the_basename_up(app):
     assert trails[0]["entries"][0]["stage"] == "Archiving to S3"
 
 
+def test_enqueue_many_batches_jobs_and_trail_stamps(app, monkeypatch):
+    """A fan-out through enqueue_many lands every job in a few round
+    trips, one transaction per batch, with each pipeline job's trail
+    stamped queued alongside — file_id basenames looked up together."""
+
+    from sqlalchemy import event
+
+    from app import db, pipeline
+    from app.pipeline import pipeline_trails, record_job_event
+
+    monkeypatch.setattr(pipeline, "ENQUEUE_BATCH", 4)
+
+    with app.app_context():
+        files = [
+            make_movie_file(make_movie(f"Trail Fan Out {index}", 2001), "DVD")
+            for index in range(6)
+        ]
+        db.session.commit()
+        expected = {file.id: file.basename for file in files}
+
+        executed = []
+        sent = []
+        original = type(app.redis).execute_command
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            """Count the statements the enqueue issues."""
+
+            executed.append(statement)
+
+        def count(self, *args, **options):
+            """Count the commands sent outside a pipeline."""
+
+            sent.append(args[0])
+            return original(self, *args, **options)
+
+        event.listen(db.engine, "before_cursor_execute", record)
+        monkeypatch.setattr(type(app.redis), "execute_command", count)
+        try:
+            queue = app.file_queue
+            jobs = queue.enqueue_many(
+                [
+                    queue.prepare_data(
+                        "app.videos.upload_task",
+                        args=(file_id,),
+                        description=f"'{basename}'",
+                    )
+                    for file_id, basename in expected.items()
+                ]
+                + [queue.prepare_data("app.frames.extract_frame_task", args=(1,))]
+            )
+            commands = list(sent)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+
+        assert len(jobs) == 7
+        assert len(queue) == 7
+        assert [job.args[0] for job in jobs[:6]] == list(expected)
+
+        # Two batches: one basename query and no per-job commands each
+        assert len(executed) == 2
+        assert commands == []
+
+        trails = {trail["basename"]: trail for trail in pipeline_trails(app.redis)}
+        assert set(trails) == set(expected.values())
+        for job in jobs[:6]:
+            entries = trails[expected[job.args[0]]]["entries"]
+            assert [(e["stage"], e["status"], e["job"]) for e in entries] == [
+                ("Archiving to S3", "queued", job.id)
+            ]
+
+        # The worker's later stamps update the same entry in place
+        record_job_event(app.redis, jobs[0], "started")
+        entries = pipeline_trails(app.redis)[0]["entries"]
+        assert [(e["status"], e["job"]) for e in entries] == [("started", jobs[0].id)]
+
+
 def test_lifecycle_updates_one_entry_in_place(app):
     """A job moving queued → started → done is ONE trail line whose
     status advances — the worker hooks call the same recorder."""
@@ -116,15 +192,17 @@ def test_a_retry_after_failure_appends_a_fresh_entry(app):
     assert entries[0]["stage"] == entries[1]["stage"] == "Localizing"
 
 
-def test_concurrent_stage_writes_do_not_erase_each_other(app, monkeypatch):
+def test_concurrent_stage_writes_do_not_erase_each_other(app):
     """the move job starts the instant localization enqueues it,
     so the file-operation worker's "started" stamp races the import
     worker's "done" stamp on the same trail. The loser of the old
     read-modify-write erased the winner (two files froze at
-    "Localizing · running" overnight); the WATCHed write must retry
-    and keep both."""
+    "Localizing · running" overnight); each event is now one script
+    run inside Redis, so writers hammering one trail from many threads
+    all land."""
+
+    from concurrent.futures import ThreadPoolExecutor
 
-    import app.pipeline as pipeline
     from app.pipeline import pipeline_trails, record_job_event
 
     basename = "Trail Race (2026) - [DVD].mkv"
@@ -133,34 +211,92 @@ def test_concurrent_stage_writes_do_not_erase_each_other(app, monkeypatch):
             "app.videos.localization_task",
             args=(f"/import/{basename}",),
         )
+        moves = [
+            app.file_queue.enqueue(
+                "app.videos.move_localized_file",
+                args=(f"/staging/.{basename}", {"basename": basename}, None, None),
+            )
+            for _ in range(8)
+        ]
+    record_job_event(app.redis, localize, "started")
+
+    def stamp(job, event):
+        """One worker's lifecycle stamp."""
+
+        record_job_event(app.redis, job, event)
+
+    with ThreadPoolExecutor(max_workers=9) as pool:
+        futures = [pool.submit(stamp, localize, "done")] + [
+            pool.submit(stamp, move, "started") for move in moves
+        ]
+        for future in futures:
+            future.result()
+
+    entries = pipeline_trails(app.redis)[0]["entries"]
+    assert [(entry["stage"], entry["status"]) for entry in entries] == [
+        ("Localizing", "done")
+    ] + [("Moving into the library", "started")] * 8
+    assert [entry["job"] for entry in entries] == [localize.id] + [
+        move.id for move in moves
+    ]
+
+
+def test_a_trail_event_is_one_round_trip_and_converts_old_trails(app, monkeypatch):
+    """Each stage event is a single EVALSHA, and a trail still kept in
+    the old JSON hash field carries over into the list on its next
+    event rather than being lost."""
+
+    import json
+
+    from app.pipeline import FILE_KEY, _digest, pipeline_trails, record_job_event
+
+    basename = "Trail Legacy (2019) - [DVD].mkv"
+    app.redis.hset(
+        FILE_KEY.format(digest=_digest(basename)),
+        mapping={
+            "basename": basename,
+            "updated": "2026-10-01 09:00:00",
+            "trail": json.dumps(
+                [
+                    {
+                        "stage": "Localizing",
+                        "status": "done",
+                        "at": "2026-10-01 09:00:00",
+                        "job": "old-job",
+                    }
+                ]
+            ),
+        },
+    )
+    app.redis.zadd("fitzflix:pipeline:active", {_digest(basename): 1})
+    assert pipeline_trails(app.redis)[0]["entries"][0]["job"] == "old-job"
+
+    with app.app_context():
         move = app.file_queue.enqueue(
             "app.videos.move_localized_file",
             args=(f"/staging/.{basename}", {"basename": basename}, None, None),
         )
-    record_job_event(app.redis, localize, "started")
 
-    # Interleave deterministically: while the localization "done" write
-    # sits between its read and its write, the move job's "started"
-    # lands on the same trail — the WATCH must fire and re-read
+    sent = []
+    original = type(app.redis).execute_command
 
-    real_decode = pipeline._decode_trail
-    interleaved = []
+    def count(self, *args, **options):
+        """Record each command sent."""
 
-    def racing_decode(raw):
-        if not interleaved:
-            interleaved.append(True)
-            record_job_event(app.redis, move, "started")
-        return real_decode(raw)
+        sent.append(args[0])
+        return original(self, *args, **options)
 
-    monkeypatch.setattr(pipeline, "_decode_trail", racing_decode)
-    record_job_event(app.redis, localize, "done")
+    monkeypatch.setattr(type(app.redis), "execute_command", count)
+    record_job_event(app.redis, move, "started")
+    monkeypatch.undo()
+    assert sent == ["EVALSHA"]
 
-    statuses = {
-        (entry["stage"], entry["status"])
-        for entry in pipeline_trails(app.redis)[0]["entries"]
-    }
-    assert ("Localizing", "done") in statuses
-    assert ("Moving into the library", "started") in statuses
+    entries = pipeline_trails(app.redis)[0]["entries"]
+    assert [(entry["job"], entry["status"]) for entry in entries] == [
+        ("old-job", "done"),
+        (move.id, "started"),
+    ]
+    assert app.redis.hget(FILE_KEY.format(digest=_digest(basename)), "trail") is None
 
 
 def test_task_sub_stage_rides_the_jobs_trail(app, monkeypatch):
@@ -480,3 +616,153 @@ def test_running_banners_hold_first_run_order(app, admin_client):
     order = [item["id"] for item in payload["running"]]
     assert order == ["order-a-move", "order-b-localize"]
     assert payload["running"][0]["first_run"] == "2026-01-01 10:00:00"
+
+
+def test_worker_records_job_performance(app, admin_client):
+    """PipelineWorker measures every job it runs, pipeline or not: one
+    sample per job on its task's and its queue's series, failures
+    included, and the System page tables them."""
+
+    from app.job_metrics import QUEUE_KEY, TASK_KEY, job_performance
+    from app.pipeline import PipelineWorker
+
+    queue = app.maintenance_queue
+    queue.enqueue("time.sleep", args=(0.05,))
+    queue.enqueue("time.sleep", args=(0.05,))
+    queue.enqueue("math.sqrt", args=(-1,))
+    PipelineWorker([queue], connection=app.redis).work(burst=True)
+
+    assert app.redis.llen(TASK_KEY.format(name="time.sleep")) == 2
+    assert app.redis.llen(TASK_KEY.format(name="math.sqrt")) == 1
+    assert app.redis.llen(QUEUE_KEY.format(name=queue.name)) == 3
+
+    performance = job_performance(app.redis)
+    tasks = {row["name"]: row for row in performance["tasks"]}
+    assert tasks["time.sleep"]["count"] == 2
+    assert tasks["time.sleep"]["failures"] == 0
+    assert tasks["time.sleep"]["p50"] >= 50
+    assert tasks["time.sleep"]["wait_p95"] is not None
+    assert tasks["math.sqrt"]["failures"] == 1
+    assert [row["name"] for row in performance["queues"]] == [queue.name]
+
+    page = admin_client.get("/system").get_data(as_text=True)
+    assert "Task performance" in page
+    assert "time.sleep" in page
+
+
+def test_peak_rss_is_unknown_without_a_per_job_reset(app, admin_client, monkeypatch):
+    """Where the high-water mark can't be reset (macOS has no /proc),
+    the worker's lifetime peak isn't passed off as the job's: the
+    sample stores None and the System page shows a dash. ru_maxrss,
+    bytes there, still reads as KiB."""
+
+    from types import SimpleNamespace
+
+    import app.job_metrics as job_metrics
+    from app.pipeline import PipelineWorker
+
+    monkeypatch.setattr(job_metrics, "_reset_peak_rss", lambda: False)
+    queue = app.maintenance_queue
+    queue.enqueue("math.sqrt", args=(4,))
+    PipelineWorker([queue], connection=app.redis).work(burst=True)
+
+    tasks = {
+        row["name"]: row for row in job_metrics.job_performance(app.redis)["tasks"]
+    }
+    assert tasks["math.sqrt"]["peak_rss_kb"] is None
+    page = admin_client.get("/system").get_data(as_text=True)
+    assert "math.sqrt" in page
+
+    usage = SimpleNamespace(
+        ru_utime=0.0,
+        ru_stime=0.0,
+        ru_inblock=0,
+        ru_oublock=0,
+        ru_maxrss=512 * 1024 * 1024,
+    )
+    monkeypatch.setattr(job_metrics.resource, "getrusage", lambda who: usage)
+    monkeypatch.setattr(job_metrics.sys, "platform", "darwin")
+    assert job_metrics._usage()[3] == 512 * 1024
+
+
+def test_job_performance_flags_regressions(app):
+    """A series whose newest runs' p95 has grown by half over the older
+    runs' is flagged; one that holds steady isn't."""
+
+    import json
+
+    from app.job_metrics import (
+        FIELDS,
+        RECENT_SAMPLES,
+        TASK_KEY,
+        TASKS_KEY,
+        job_performance,
+    )
+
+    def plant(name, walls):
+        """Store samples newest first, as the worker's LPUSH leaves them."""
+
+        for wall in reversed(walls):
+            sample = dict.fromkeys(FIELDS, 0)
+            sample.update({"at": 1760000000, "ok": 1, "wall_ms": wall})
+            app.redis.lpush(
+                TASK_KEY.format(name=name), json.dumps([sample[f] for f in FIELDS])
+            )
+        app.redis.sadd(TASKS_KEY, name)
+
+    plant("app.slower", [3000] * RECENT_SAMPLES + [1000] * 40)
+    plant("app.steady", [1100] * RECENT_SAMPLES + [1000] * 40)
+
+    tasks = {row["name"]: row for row in job_performance(app.redis)["tasks"]}
+    assert tasks["app.slower"]["regressed"] is True
+    assert tasks["app.slower"]["recent_p95"] == 3000
+    assert tasks["app.steady"]["regressed"] is False
+    assert tasks["app.slower"]["p50"] == 1000
+
+
+def test_profiled_task_types_leave_reports(app):
+    """A task type switched on from the System page is profiled on every
+    run, CPU samples included when asked for; others run unprofiled."""
+
+    from app.pipeline import PipelineWorker
+    from app.profiling import recent_reports, set_task_profiling
+
+    set_task_profiling(app.redis, "time.sleep", "cpu")
+    queue = app.maintenance_queue
+    queue.enqueue("time.sleep", args=(0.05,))
+    queue.enqueue("math.sqrt", args=(4,))
+    PipelineWorker([queue], connection=app.redis).work(burst=True)
+
+    reports = recent_reports(app.redis)
+    assert [(report["kind"], report["name"]) for report in reports] == [
+        ("task", "time.sleep")
+    ]
+    assert reports[0]["wall_ms"] >= 50
+
+    set_task_profiling(app.redis, "time.sleep", None)
+    queue.enqueue("time.sleep", args=(0.01,))
+    PipelineWorker([queue], connection=app.redis).work(burst=True)
+    assert len(recent_reports(app.redis)) == 1
+
+
+def test_profiles_time_calls_through_a_lazily_hooked_aws_client(app):
+    """botocore is hooked as the first AWS client is built, not at
+    startup, and its calls still land in the active profile."""
+
+    from botocore.stub import Stubber
+
+    from app.aws_storage import aws_client
+    from app.profiling import Profile
+
+    with app.app_context():
+        client = aws_client("s3", region_name="us-east-1")
+    profile = Profile("request", "GET /aws")
+    with Stubber(client) as stubber:
+        stubber.add_response("list_buckets", {"Buckets": []})
+        profile.start()
+        try:
+            client.list_buckets()
+        finally:
+            profile.stop()
+
+    assert profile.http["AWS"]["calls"] == {"s3 ListBuckets": 1}
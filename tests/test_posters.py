@@ -436,5 +436,220 @@ def test_save_custom_poster_builds_thumbnails(app, tmp_path):
         original = save_custom_poster(upload, "poster.png", str(tmp_path))
 
     assert os.path.isfile(original)
+    with open(original, "rb") as f:
+        assert f.read() == png_bytes()
     for width in ("92", "154", "185", "342", "500", "780"):
         assert os.path.isfile(tmp_path / f"w{width}" / "poster.png"), width
+
+    # Thumbnails shrink to their width but never enlarge the 300px upload
+
+    with Image.open(tmp_path / "w185" / "poster.png") as thumbnail:
+        assert thumbnail.size == (185, 278)
+    with Image.open(tmp_path / "w500" / "poster.png") as thumbnail:
+        assert thumbnail.size == (300, 450)
+
+
+def test_large_jpeg_posters_decode_at_reduced_scale(app, tmp_path):
+    """A big scan decodes through draft mode at a scale still wider
+    than the widest thumbnail, and the thumbnails come out progressive."""
+
+    from app.poster_derivatives import build_poster_derivatives, decode_poster
+
+    buf = io.BytesIO()
+    Image.new("RGB", (3200, 4800), color=(20, 60, 90)).save(buf, "JPEG")
+    scan = buf.getvalue()
+
+    with app.app_context():
+        decoded = decode_poster(scan, "scan.jpg")
+        assert 780 <= decoded.width < 3200
+        build_poster_derivatives(scan, "poster.jpg", str(tmp_path))
+
+    with open(tmp_path / "original" / "poster.jpg", "rb") as f:
+        assert f.read() == scan
+    with Image.open(tmp_path / "w780" / "poster.jpg") as thumbnail:
+        assert thumbnail.size == (780, 1170)
+        assert thumbnail.info.get("progressive")
+
+    with app.app_context():
+        with pytest.raises(ValueError, match="corrupted"):
+            decode_poster(scan[: len(scan) // 3], "scan.jpg")
+
+
+def test_every_poster_width_is_final_when_the_upload_returns(
+    app, tmp_path, monkeypatch
+):
+    """The widths encode together on the encoder threads, but none is
+    left for later: the service worker pins whatever /static/ serves
+    first, so each path holds its own size once the upload returns."""
+
+    import threading
+
+    import app.poster_derivatives as poster_derivatives
+
+    encoded_on = set()
+    encode = poster_derivatives.encode
+
+    def recording_encode(image, image_format):
+        encoded_on.add(threading.current_thread().name)
+        return encode(image, image_format)
+
+    monkeypatch.setattr(poster_derivatives, "encode", recording_encode)
+    buf = io.BytesIO()
+    Image.new("RGB", (1000, 1500), color=(90, 20, 60)).save(buf, "JPEG")
+
+    with app.app_context():
+        poster_derivatives.build_poster_derivatives(
+            buf.getvalue(), "poster.jpg", str(tmp_path)
+        )
+
+    assert encoded_on
+    assert all(name.startswith("poster-encoder") for name in encoded_on)
+
+    for width in (92, 154, 185, 342, 500, 780):
+        with Image.open(tmp_path / f"w{width}" / "poster.jpg") as thumbnail:
+            assert thumbnail.width == width
+
+
+@pytest.fixture
+def artwork_cdn(app, monkeypatch, tmp_path):
+    """A fake TMDb image CDN behind an empty artwork cache."""
+
+    import app.artwork as artwork
+
+    monkeypatch.setitem(app.config, "ARTWORK_CACHE_DIR", str(tmp_path))
+    fetched = []
+
+    def fake_download(url):
+        fetched.append(url)
+        buf = io.BytesIO()
+        shade = sum(url.encode()) % 200
+        Image.new("RGB", (342, 513), color=(shade, 90, 160)).save(buf, "JPEG")
+        return buf.getvalue()
+
+    monkeypatch.setattr(artwork, "_download", fake_download)
+    return fetched
+
+
+def test_artwork_route_caches_tmdb_images_as_modern_formats(
+    app, admin_client, artwork_cdn
+):
+    """The proxy fetches a size once, serves WebP to browsers that take
+    it (the JPEG to those that don't) with a strong ETag and immutable
+    caching, and answers a revalidation with 304."""
+
+    webp = admin_client.get(
+        "/artwork/w342/cached.jpg", headers={"Accept": "image/webp,*/*"}
+    )
+    assert webp.status_code == 200
+    assert webp.mimetype == "image/webp"
+    assert "immutable" in webp.headers["Cache-Control"]
+    assert "Accept" in webp.headers["Vary"]
+    etag = webp.headers["ETag"]
+    assert etag.startswith('"') and etag.endswith('.webp"')
+    assert Image.open(io.BytesIO(webp.data)).format == "WEBP"
+
+    jpeg = admin_client.get(
+        "/artwork/w342/cached.jpg", headers={"Accept": "image/jpeg"}
+    )
+    assert jpeg.mimetype == "image/jpeg"
+    assert jpeg.headers["ETag"] != etag
+
+    revalidated = admin_client.get(
+        "/artwork/w342/cached.jpg",
+        headers={"Accept": "image/webp,*/*", "If-None-Match": etag},
+    )
+    assert revalidated.status_code == 304
+
+    # AVIF, when this Pillow can write it, wins over WebP
+
+    from app.artwork import supported_formats
+
+    if "avif" in supported_formats():
+        avif = admin_client.get(
+            "/artwork/w342/cached.jpg", headers={"Accept": "image/avif,image/webp"}
+        )
+        assert avif.mimetype == "image/avif"
+
+    # One CDN fetch served every format; another size is its own fetch
+
+    assert artwork_cdn == [f"{app.config['TMDB_IMAGE_URL']}/w342/cached.jpg"]
+    admin_client.get("/artwork/w185/cached.jpg")
+    assert len(artwork_cdn) == 2
+
+    # Anything but a TMDb size and image name is refused
+
+    assert admin_client.get("/artwork/original/cached.jpg").status_code == 404
+    assert admin_client.get("/artwork/w342/..%2Fsecret.jpg").status_code == 404
+
+
+def test_artwork_route_falls_back_to_the_cdn(app, admin_client, monkeypatch, tmp_path):
+    """A fetch TMDb can't answer redirects to the CDN instead of
+    breaking the image."""
+
+    import app.artwork as artwork
+
+    monkeypatch.setitem(app.config, "ARTWORK_CACHE_DIR", str(tmp_path))
+
+    def failing_download(url):
+        raise artwork.ArtworkUnavailable(url)
+
+    monkeypatch.setattr(artwork, "_download", failing_download)
+    response = admin_client.get("/artwork/w342/missing.jpg")
+    assert response.status_code == 302
+    assert response.location == f"{app.config['TMDB_IMAGE_URL']}/w342/missing.jpg"
+
+
+def test_galleries_link_posters_through_the_proxy(app, admin_client, monkeypatch):
+    """Templates render TMDb artwork through the local route, or the
+    CDN when ARTWORK_HOTLINK is set."""
+
+    with app.app_context():
+        movie = make_movie("Proxied Poster", 1980, tmdb_poster_path="/proxied.jpg")
+        db.session.commit()
+        movie_id = movie.id
+
+    page = admin_client.get(f"/movie/{movie_id}").get_data(as_text=True)
+    assert 'src="/artwork/w500/proxied.jpg"' in page
+
+    monkeypatch.setitem(app.config, "ARTWORK_HOTLINK", True)
+    page = admin_client.get(f"/movie/{movie_id}").get_data(as_text=True)
+    assert f'src="{app.config["TMDB_IMAGE_URL"]}/w500/proxied.jpg"' in page
+
+
+def test_warm_job_fills_the_cache_for_upcoming_posters(app, artwork_cdn):
+    """The nightly warm fetches tile posters for watchlisted and
+    recommended films, derivatives included, and skips custom posters."""
+
+    from app.artwork import supported_formats, warm_artwork
+    from app.models import User, UserWatchlist
+    from app.recommendations import RECS_KEY
+
+    with app.app_context():
+        user = User.query.first()
+        wanted = make_movie("Warm Wanted", 1981, tmdb_poster_path="/wanted.jpg")
+        picked = make_movie("Warm Picked", 1982, tmdb_poster_path="/picked.jpg")
+        custom = make_movie(
+            "Warm Custom", 1983, tmdb_poster_path="/custom.jpg", custom_poster="c.jpg"
+        )
+        db.session.add(UserWatchlist(user_id=user.id, movie_id=wanted.id))
+        db.session.add(UserWatchlist(user_id=user.id, movie_id=custom.id))
+        db.session.commit()
+        app.redis.set(
+            RECS_KEY.format(user_id=user.id),
+            json.dumps({"items": [{"movie_id": picked.id, "score": 1.0}]}),
+        )
+
+    assert warm_artwork() == 2
+    assert sorted(artwork_cdn) == [
+        f"{app.config['TMDB_IMAGE_URL']}/w342/picked.jpg",
+        f"{app.config['TMDB_IMAGE_URL']}/w342/wanted.jpg",
+    ]
+    objects = [
+        name
+        for _, _, names in os.walk(
+            os.path.join(app.config["ARTWORK_CACHE_DIR"], "objects")
+        )
+        for name in names
+    ]
+    for fmt in supported_formats():
+        assert len([name for name in objects if name.endswith(f".{fmt}")]) == 2
@@ -244,7 +244,11 @@ def test_seen_and_extras_only_films_are_not_candidates(app):
 
 
 def test_recompute_task_stores_recs_and_profile(app):
-    from app.recommendations import PROFILE_KEY, RECS_KEY, recompute_recommendations
+    from app.recommendations import (
+        recompute_recommendations,
+        stored_profile,
+        stored_recommendations,
+    )
 
     with app.app_context():
         user_id = admin_id()
@@ -262,14 +266,84 @@ def test_recompute_task_stores_recs_and_profile(app):
 
     assert recompute_recommendations() is True
 
-    stored = json.loads(app.redis.get(RECS_KEY.format(user_id=user_id)))
+    stored = stored_recommendations(app.redis, user_id)
     assert stored["computed_at"]
     assert [item["movie_id"] for item in stored["items"]] == [candidate_id]
 
-    profile = json.loads(app.redis.get(PROFILE_KEY.format(user_id=user_id)))
+    profile = stored_profile(app.redis, user_id)
     assert profile["affinities"]["genre:35"]["score"] > 0
 
 
+def test_stored_artifacts_are_compact_and_decoded_once_per_version(app, monkeypatch):
+    """The recompute stores compressed payloads and a hash score map;
+    readers decode a payload once per version stamp, fetch only the
+    score fields they ask for, and still read plain JSON."""
+
+    from app import recs_storage
+    from app.recommendations import (
+        PROFILE_KEY,
+        RECS_KEY,
+        SCORES_KEY,
+        recompute_recommendations,
+        stored_profile,
+        stored_recommendations,
+        stored_scores,
+    )
+
+    with app.app_context():
+        user_id = admin_id()
+        comedy = genre(35, "Comedy")
+        liked = make_movie("Compact Liked", 1994)
+        liked.genres.append(comedy)
+        log_watch(user_id, liked, liked=True)
+        candidates = []
+        for index in range(3):
+            candidate = make_movie(f"Compact Candidate {index}", 1995)
+            candidate.genres.append(comedy)
+            make_movie_file(candidate, "Bluray-1080p")
+            candidates.append(candidate.id)
+        from app import db
+
+        db.session.commit()
+
+    assert recompute_recommendations() is True
+
+    raw = app.redis.get(PROFILE_KEY.format(user_id=user_id))
+    assert not raw.startswith(b"{")
+    assert app.redis.type(SCORES_KEY.format(user_id=user_id)) == b"hash"
+
+    decoded = []
+    decode = recs_storage.decode_artifact
+    monkeypatch.setattr(
+        recs_storage,
+        "decode_artifact",
+        lambda payload: decoded.append(payload) or decode(payload),
+    )
+    first = stored_profile(app.redis, user_id)
+    assert stored_profile(app.redis, user_id) is first
+    assert len(decoded) == 1
+
+    # A recompute replaces the stamp, so the next read decodes afresh
+    assert recompute_recommendations() is True
+    assert stored_profile(app.redis, user_id) is not first
+    assert len(decoded) == 2
+
+    # Field-level reads: only the films asked about come back, and the
+    # caller may extend the result
+    subset = stored_scores(app.redis, user_id, [candidates[0], 999999])
+    assert set(subset) == {candidates[0]}
+    subset[candidates[1]] = 1.0
+    assert set(stored_scores(app.redis, user_id)) == set(candidates)
+
+    # Plain JSON written before the change still reads
+    app.redis.delete(recs_storage.VERSION_KEY.format(user_id=user_id))
+    app.redis.set(
+        RECS_KEY.format(user_id=user_id),
+        json.dumps({"computed_at": "2026-10-01 01:45", "items": []}),
+    )
+    assert stored_recommendations(app.redis, user_id)["items"] == []
+
+
 def test_landing_page_shows_recommendations(app, admin_client):
     from app.recommendations import RECS_KEY
 
@@ -344,6 +418,111 @@ def test_landing_page_onboards_users_without_history(app, user_client):
     assert app.maintenance_queue.jobs == []
 
 
+def test_landing_shelves_are_cached_until_a_write_retires_them(app, admin_client):
+    """The day's shelves render once; diary and file writes retire the
+    fragments, and each visit gets its own session's CSRF token."""
+
+    from app import db
+    from app.landing_shelves import CSRF_PLACEHOLDER
+    from app.models import Movie
+    from app.recommendations import RECS_KEY
+
+    with app.app_context():
+        user_id = admin_id()
+        first = make_movie("Cached Pick", 1995)
+        make_movie_file(first, "Bluray-1080p")
+        second = make_movie("Cached Later", 1996)
+        make_movie_file(second, "Bluray-1080p")
+        third = make_movie("Cached Third", 1997)
+        make_movie_file(third, "Bluray-1080p")
+        first_id, second_id, third_id = first.id, second.id, third.id
+        db.session.commit()
+
+    def store(movie_ids):
+        """Stand in for the nightly run's stored ranking."""
+
+        app.redis.set(
+            RECS_KEY.format(user_id=user_id),
+            json.dumps(
+                {
+                    "computed_at": "2026-10-19 01:45",
+                    "items": [
+                        {"movie_id": movie_id, "score": 1.0, "because": ["Drama"]}
+                        for movie_id in movie_ids
+                    ],
+                }
+            ),
+        )
+
+    store([first_id])
+    body = admin_client.get("/").get_data(as_text=True)
+    assert "Cached Pick (1995)" in body
+    assert CSRF_PLACEHOLDER not in body
+    assert 'name="csrf_token" value="' in body
+
+    # A Redis write behind the cache's back isn't seen — the visit is a
+    # read of today's fragments
+
+    store([first_id, second_id])
+    assert "Cached Later" not in admin_client.get("/").get_data(as_text=True)
+
+    # Logging the first film retires the admin's shelves: it drops out
+    # and the re-render picks up the new ranking
+
+    with app.app_context():
+        log_watch(user_id, db.session.get(Movie, first_id), rating=4)
+        db.session.commit()
+    body = admin_client.get("/").get_data(as_text=True)
+    assert "Cached Pick" not in body
+    assert "Cached Later (1996)" in body
+
+    # A file write retires every user's shelves, and the re-render
+    # reads the ranking as it now stands
+
+    store([second_id, third_id])
+    assert "Cached Third" not in admin_client.get("/").get_data(as_text=True)
+    with app.app_context():
+        make_movie_file(db.session.get(Movie, second_id), "DVD")
+        db.session.commit()
+    assert "Cached Third (1997)" in admin_client.get("/").get_data(as_text=True)
+
+
+def test_warm_job_prerenders_every_users_shelves(app, admin_client):
+    from datetime import date
+
+    from app import db
+    from app.landing_shelves import SHELVES_KEY, warm_landing_shelves
+    from app.models import User
+    from app.recommendations import RECS_KEY
+
+    with app.app_context():
+        user_id = admin_id()
+        movie = make_movie("Warmed Pick", 1997)
+        make_movie_file(movie, "Bluray-1080p")
+        db.session.commit()
+        app.redis.set(
+            RECS_KEY.format(user_id=user_id),
+            json.dumps(
+                {
+                    "computed_at": "2026-10-19 01:45",
+                    "items": [{"movie_id": movie.id, "score": 1.0}],
+                }
+            ),
+        )
+        user_count = User.query.count()
+
+    assert warm_landing_shelves() == user_count
+    key = SHELVES_KEY.format(user_id=user_id, day=date.today().isoformat())
+    assert b"Warmed Pick (1997)" in app.redis.hget(key, "recs")
+
+    # The visit serves the warmed fragment rather than rendering its own
+
+    app.redis.hset(
+        key, "recs", app.redis.hget(key, "recs").replace(b"Warmed", b"Prewarmed")
+    )
+    assert "Prewarmed Pick (1997)" in admin_client.get("/").get_data(as_text=True)
+
+
 def test_file_activity_lives_at_its_own_route(app, admin_client):
     body = admin_client.get("/file-activity").get_data(as_text=True)
     assert "File Activity" in body
@@ -570,6 +749,105 @@ def test_evaluate_applies_trial_class_weights(app):
     assert genre_led["mean_percentile"] != decade_led["mean_percentile"]
 
 
+def test_incremental_folds_match_a_full_rebuild(app):
+    """The incremental evaluator ranks every held-out film exactly where
+    rebuilding the profile and rescoring every candidate would — ties
+    included — whether its folds run here or in a process pool."""
+
+    from app import db
+    from app.models import MovieCopref
+    from app.recommendations import (
+        LeaveOneOut,
+        _copref_value,
+        build_profile,
+        evaluate_user,
+        evaluation_data,
+        ranking_metrics,
+        score_movie,
+    )
+
+    with app.app_context():
+        user_id = admin_id()
+        genres = [genre(35, "Comedy"), genre(18, "Drama"), genre(27, "Horror")]
+        for n in range(12):
+            movie = make_movie(f"Fold Liked {n}", 1950 + 7 * n, tmdb_id=7300 + n)
+            movie.genres.append(genres[n % 3])
+            if n % 4 == 0:
+                movie.genres.append(genres[(n + 1) % 3])
+            log_watch(user_id, movie, rating=3 + n % 3, liked=n % 2 == 0)
+        for n in range(30):
+            movie = make_movie(f"Fold Candidate {n}", 1950 + 3 * n, tmdb_id=7400 + n)
+            movie.genres.append(genres[n % 3])
+            make_movie_file(movie, "Bluray-1080p")
+        for a, b in ((7300, 7402), (7302, 7405), (7304, 7300), (7306, 7411)):
+            db.session.add(MovieCopref(tmdb_id_a=a, tmdb_id_b=b, similarity=0.4))
+        db.session.commit()
+
+        data = evaluation_data(user_id)
+
+        def rebuilt_rank(held_out):
+            """The rank the old evaluator computed, fold by fold."""
+
+            remaining = {
+                movie_id: weight
+                for movie_id, weight in data["weights"].items()
+                if movie_id != held_out
+            }
+            profile = build_profile(remaining, data["features"])
+            held_tmdb = data["tmdb_of"].get(held_out)
+
+            def score(movie_id):
+                value, _ = score_movie(data["features"].get(movie_id, []), profile)
+                return value + _copref_value(
+                    data["entries_by_tmdb"].get(data["tmdb_of"].get(movie_id), []),
+                    excluded=held_tmdb,
+                )
+
+            held_score = score(held_out)
+            return 1 + sum(1 for c in data["candidates"] if score(c) > held_score)
+
+        evaluator = LeaveOneOut(data)
+        total = len(data["candidates"]) + 1
+        expected = [(rebuilt_rank(held), total) for held in data["positives"]]
+        assert evaluator.ranks(data["positives"]) == expected
+
+        assert evaluate_user(user_id) == ranking_metrics(expected)
+        assert evaluate_user(user_id, workers=2) == ranking_metrics(expected)
+
+
+def test_tune_reports_the_best_settings(app):
+    from app import cli as app_cli
+    from app import db
+
+    # CLI commands attach in the fitzflix.py entrypoint, not create_app
+
+    if "recs" not in app.cli.commands:
+        app_cli.register(app)
+
+    with app.app_context():
+        user_id = admin_id()
+        comedy = genre(35, "Comedy")
+        drama = genre(18, "Drama")
+        for n in range(4):
+            liked = make_movie(f"Tune Liked {n}", 1950 + 10 * n)
+            liked.genres.append(comedy)
+            log_watch(user_id, liked, rating=5, liked=True)
+        for n in range(4):
+            candidate = make_movie(f"Tune Candidate {n}", 1950 + 10 * n)
+            candidate.genres.append(drama)
+            make_movie_file(candidate, "Bluray-1080p")
+        db.session.commit()
+
+    result = app.test_cli_runner().invoke(
+        args=["recs", "tune", "--workers", "2", "--rounds", "1"]
+    )
+    assert result.exit_code == 0, result.output
+    assert "Current: 4 positives" in result.output
+    assert "Best:    4 positives" in result.output
+    assert "FEATURE_CLASS_WEIGHTS = {" in result.output
+    assert "FEATURE_CLASS_SHRINKAGE = {" in result.output
+
+
 def test_runtime_filter_trims_the_library_rail(app, admin_client):
     """?minutes=N is a view filter: long films and unknown runtimes drop
     out while it's set, and the default view ignores length entirely."""
@@ -1106,9 +1384,7 @@ def test_movie_page_shows_estimated_rating(app, admin_client):
         db.session.commit()
         pick_id = pick.id
 
-    app.redis.set(
-        SCORES_KEY.format(user_id=user_id), jsonlib.dumps({str(pick_id): 9.0})
-    )
+    app.redis.hset(SCORES_KEY.format(user_id=user_id), str(pick_id), 9.0)
     app.redis.set(
         PROFILE_KEY.format(user_id=user_id),
         jsonlib.dumps(
@@ -1210,7 +1486,6 @@ def test_resolved_score_reads_and_patches_one_shared_source(app):
     batches, the rate drive — reads the identical number; the nightly
     base wins over a patch, since it was rescored from fresher inputs."""
 
-    import json as jsonlib
     from datetime import datetime
 
     from app import db
@@ -1244,9 +1519,7 @@ def test_resolved_score_reads_and_patches_one_shared_source(app):
         # An overnight rebuild that covers the film supersedes the
         # patch even before the overlay is dropped
 
-        app.redis.set(
-            SCORES_KEY.format(user_id=user_id), jsonlib.dumps({str(pick.id): 9.9})
-        )
+        app.redis.hset(SCORES_KEY.format(user_id=user_id), str(pick.id), 9.9)
         assert stored_scores(app.redis, user_id)[pick.id] == 9.9
         assert resolved_score(app.redis, user_id, pick, profile) == 9.9
 
@@ -1497,7 +1770,7 @@ def test_marker_bar_rides_with_the_profile(app):
     on the profile, computed from the user's own candidates."""
 
     from app import db
-    from app.recommendations import PROFILE_KEY, recompute_recommendations
+    from app.recommendations import recompute_recommendations, stored_profile
 
     with app.app_context():
         user_id = admin_id()
@@ -1511,7 +1784,7 @@ def test_marker_bar_rides_with_the_profile(app):
         db.session.commit()
 
     assert recompute_recommendations() is True
-    profile = json.loads(app.redis.get(PROFILE_KEY.format(user_id=user_id)))
+    profile = stored_profile(app.redis, user_id)
     assert profile["marker_bar"] > 0
 
 
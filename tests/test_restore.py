@@ -193,3 +193,149 @@ def test_estimate_prefers_recorded_aws_size_over_padded_local_size(app):
         + app.config["AWS_DOWNLOAD_PER_GB_COST"]
     )
     assert estimate["cost"] == (3 * per_request) + (6.5 * per_gb)
+
+
+class FakeSQS:
+    """Serves canned receive_message batches and records the batch calls."""
+
+    def __init__(self, batches=()):
+        self.batches = list(batches)
+        self.receives = []
+        self.visibility_batches = []
+        self.deleted = []
+
+    def receive_message(self, **kwargs):
+        self.receives.append(kwargs)
+        return {"Messages": self.batches.pop(0)} if self.batches else {}
+
+    def change_message_visibility_batch(self, QueueUrl, Entries):
+        self.visibility_batches.append(Entries)
+        return {"Successful": [{"Id": entry["Id"]} for entry in Entries]}
+
+    def delete_message_batch(self, QueueUrl, Entries):
+        self.deleted.extend(entry["ReceiptHandle"] for entry in Entries)
+        return {"Successful": [{"Id": entry["Id"]} for entry in Entries]}
+
+
+class FakeS3:
+    def __init__(self):
+        self.restores = []
+
+    def restore_object(self, Bucket, Key, RestoreRequest):
+        self.restores.append(Key)
+
+
+def restore_notification(key, receipt_handle):
+    import json
+
+    body = {"Records": [{"s3": {"object": {"key": key.replace(" ", "+")}}}]}
+    return {"ReceiptHandle": receipt_handle, "Body": json.dumps(body)}
+
+
+def test_sqs_poll_long_polls_in_batches_and_discards_test_events(app, monkeypatch):
+    """Ten-message long polls until the queue is empty; restore records
+    queue downloads and S3's test event is batch-deleted."""
+
+    import json
+
+    from app import aws_storage
+
+    sqs = FakeSQS(
+        [
+            [
+                restore_notification("untouched/A Film (2001).mkv", "r-1"),
+                {
+                    "ReceiptHandle": "r-test",
+                    "Body": json.dumps({"Event": "s3:TestEvent"}),
+                },
+                restore_notification("untouched/B Film (2002).mkv", "r-2"),
+            ]
+        ]
+    )
+    monkeypatch.setattr(aws_storage, "aws_sqs_client", lambda: sqs)
+    monkeypatch.setattr(aws_storage, "aws_s3_client", lambda **kwargs: FakeS3())
+
+    with app.app_context():
+        assert aws_storage.sqs_retrieve_task() is True
+
+    assert len(sqs.receives) == 2
+    assert all(call["MaxNumberOfMessages"] == 10 for call in sqs.receives)
+    assert all(call["WaitTimeSeconds"] > 0 for call in sqs.receives)
+    assert sqs.deleted == ["r-test"]
+
+    downloads = [
+        job
+        for job in app.file_queue.jobs
+        if job.func_name == "app.videos.download_task"
+    ]
+    assert [job.args for job in downloads] == [
+        ("untouched/A Film (2001).mkv", "A Film (2001).mkv", "r-1"),
+        ("untouched/B Film (2002).mkv", "B Film (2002).mkv", "r-2"),
+    ]
+    assert downloads[0].meta["sqs_receipt_handle"] == "r-1"
+
+
+def test_waiting_downloads_extend_in_batches_and_restores_twice_daily(app, monkeypatch):
+    """Twelve queued downloads: two visibility batches, one restore
+    extension each, and no repeat extension on the next poll. A live
+    consumer's heartbeat makes the hourly poll stand down."""
+
+    from app import aws_storage
+
+    for number in range(12):
+        app.file_queue.enqueue(
+            "app.videos.download_task",
+            args=(f"untouched/Film {number}.mkv", f"Film {number}.mkv", f"r-{number}"),
+            meta={"sqs_receipt_handle": f"r-{number}"},
+        )
+    app.file_queue.enqueue("app.videos.upload_task", args=(1,))
+
+    sqs = FakeSQS()
+    s3 = FakeS3()
+    monkeypatch.setattr(aws_storage, "aws_sqs_client", lambda: sqs)
+    monkeypatch.setattr(aws_storage, "aws_s3_client", lambda **kwargs: s3)
+
+    with app.app_context():
+        assert len(aws_storage.waiting_downloads(app)) == 12
+        aws_storage.sqs_retrieve_task()
+        assert [len(batch) for batch in sqs.visibility_batches] == [10, 2]
+        assert len(s3.restores) == 12
+
+        aws_storage.sqs_retrieve_task()
+        assert len(sqs.visibility_batches) == 4
+        assert len(s3.restores) == 12
+
+        app.redis.set(aws_storage.SQS_CONSUMER_KEY, 1)
+        sqs.receives.clear()
+        aws_storage.sqs_retrieve_task()
+        assert sqs.receives == []
+
+
+def test_continuous_consumer_long_polls_until_stopped(app, monkeypatch):
+    """The consumer holds a heartbeat while it runs, waits the full twenty
+    seconds per poll, and clears the heartbeat on a clean stop."""
+
+    import threading
+
+    from app import aws_storage
+
+    stop = threading.Event()
+    heartbeats = []
+
+    class StoppingSQS(FakeSQS):
+        def receive_message(self, **kwargs):
+            heartbeats.append(aws_storage.sqs_consumer_alive(app.redis))
+            stop.set()
+            return super().receive_message(**kwargs)
+
+    sqs = StoppingSQS([[restore_notification("untouched/C Film (2003).mkv", "r-3")]])
+    monkeypatch.setattr(aws_storage, "aws_sqs_client", lambda: sqs)
+    monkeypatch.setattr(aws_storage, "aws_s3_client", lambda **kwargs: FakeS3())
+
+    with app.app_context():
+        aws_storage.consume_sqs_notifications(stop)
+
+    assert heartbeats == [True]
+    assert sqs.receives[0]["WaitTimeSeconds"] == 20
+    assert not aws_storage.sqs_consumer_alive(app.redis)
+    assert app.file_queue.count == 1
@@ -1485,9 +1485,7 @@ def test_history_previews_estimates_for_unrated_viewings(app, admin_client):
         db.session.commit()
         watched_id = watched.id
 
-    app.redis.set(
-        SCORES_KEY.format(user_id=user_id), json.dumps({str(watched_id): 9.0})
-    )
+    app.redis.hset(SCORES_KEY.format(user_id=user_id), str(watched_id), 9.0)
     app.redis.set(
         PROFILE_KEY.format(user_id=user_id),
         json.dumps(
@@ -1535,7 +1533,7 @@ def test_clearing_stars_repaints_back_to_the_estimate(app, admin_client):
         db.session.commit()
         movie_id, review_id = movie.id, review.id
 
-    app.redis.set(SCORES_KEY.format(user_id=user_id), json.dumps({str(movie_id): 9.0}))
+    app.redis.hset(SCORES_KEY.format(user_id=user_id), str(movie_id), 9.0)
     app.redis.set(
         PROFILE_KEY.format(user_id=user_id),
         json.dumps(
@@ -594,9 +594,7 @@ def test_aws_download_reraises_transient_volume_errors(app, monkeypatch):
         def head_object(self, Bucket, Key):
             return {"ContentLength": 100}
 
-        def download_file(self, bucket, key, filename, Callback=None):
-            with open(filename, "wb") as f:
-                f.write(b"partial")
+        def get_object(self, **kwargs):
             raise OSError(errno.EBADF, "Bad file descriptor")
 
     monkeypatch.setattr(aws_storage, "aws_s3_client", lambda **kwargs: FakeS3())
@@ -647,7 +645,7 @@ def test_aws_download_missing_object_is_not_retried(app, monkeypatch):
         def head_object(self, Bucket, Key):
             raise _client_error("404", 404, "HeadObject")
 
-        def download_file(self, bucket, key, filename, Callback=None):
+        def get_object(self, **kwargs):
             raise _client_error("404", 404, "GetObject")
 
     sqs = _FakeSQS()
@@ -685,7 +683,7 @@ def test_aws_download_expired_restore_requests_new_restore(app, monkeypatch):
             # No Restore header: the object is back in cold storage
             return {"ContentLength": 100}
 
-        def download_file(self, bucket, key, filename, Callback=None):
+        def get_object(self, **kwargs):
             raise _client_error("InvalidObjectState", 403, "GetObject")
 
     sqs = _FakeSQS()
@@ -716,7 +714,7 @@ def test_aws_download_waits_for_restore_already_underway(app, monkeypatch):
         def head_object(self, Bucket, Key):
             return {"ContentLength": 100, "Restore": 'ongoing-request="true"'}
 
-        def download_file(self, bucket, key, filename, Callback=None):
+        def get_object(self, **kwargs):
             raise _client_error("InvalidObjectState", 403, "GetObject")
 
     sqs = _FakeSQS()
@@ -749,14 +747,14 @@ def test_aws_download_failed_status_check_spends_a_retry(app, monkeypatch):
             self.head_calls = 0
 
         def head_object(self, Bucket, Key):
-            # Odd calls come from the progress callback sizing the download;
+            # Odd calls come from sizing the ranged download;
             # even calls are the handler's restore-status check, which fails
             self.head_calls += 1
             if self.head_calls % 2 == 0:
                 raise _client_error("ServiceUnavailable", 503, "HeadObject")
             return {"ContentLength": 100}
 
-        def download_file(self, bucket, key, filename, Callback=None):
+        def get_object(self, **kwargs):
             raise _client_error("InvalidObjectState", 403, "GetObject")
 
     s3 = FakeS3()
@@ -784,9 +782,7 @@ def test_aws_download_exhausted_retries_clean_up_partial_file(app, monkeypatch):
         def head_object(self, Bucket, Key):
             return {"ContentLength": 100}
 
-        def download_file(self, bucket, key, filename, Callback=None):
-            with open(filename, "wb") as f:
-                f.write(b"partial")
+        def get_object(self, **kwargs):
             raise RuntimeError("connection reset")
 
     sqs = _FakeSQS()
@@ -814,7 +810,7 @@ def test_aws_download_backs_off_between_retries(app, monkeypatch):
         def head_object(self, Bucket, Key):
             return {"ContentLength": 100}
 
-        def download_file(self, bucket, key, filename, Callback=None):
+        def get_object(self, **kwargs):
             raise RuntimeError("connection reset")
 
     delays = []
@@ -844,7 +840,7 @@ def test_aws_download_gives_up_immediately_on_auth_errors(app, monkeypatch):
         def head_object(self, Bucket, Key):
             return {"ContentLength": 100}
 
-        def download_file(self, bucket, key, filename, Callback=None):
+        def get_object(self, **kwargs):
             self.attempts += 1
             raise _client_error("AccessDenied", 403, "GetObject")
 
@@ -865,6 +861,161 @@ def test_aws_download_gives_up_immediately_on_auth_errors(app, monkeypatch):
     assert sqs.deleted == []
 
 
+class _PartedObject:
+    """An S3 object uploaded in 16-byte parts, served by byte range; fail
+    and corrupt name the parts to break on their next fetch."""
+
+    PART = 16
+
+    def __init__(self, data, fail=(), corrupt=()):
+        import hashlib
+
+        self.data = data
+        self.fail = set(fail)
+        self.corrupt = set(corrupt)
+        self.fetched = []
+        parts = [data[i : i + self.PART] for i in range(0, len(data), self.PART)]
+        joined = b"".join(hashlib.md5(part).digest() for part in parts)
+        self.etag = f'"{hashlib.md5(joined).hexdigest()}-{len(parts)}"'
+
+    def head_object(self, Bucket, Key, PartNumber=None):
+        if PartNumber == 1:
+            return {"ContentLength": self.PART}
+        return {"ContentLength": len(self.data), "ETag": self.etag}
+
+    def get_object(self, Bucket, Key, Range, IfMatch=None):
+        import io
+
+        assert IfMatch == self.etag
+        start, end = (int(n) for n in Range.split("=")[1].split("-"))
+        index = start // self.PART
+        self.fetched.append(index)
+        if index in self.fail:
+            self.fail.discard(index)
+            raise RuntimeError("connection reset")
+        chunk = self.data[start : end + 1]
+        if index in self.corrupt:
+            self.corrupt.discard(index)
+            chunk = bytes(len(chunk))
+
+        class Body:
+            def iter_chunks(self, size):
+                stream = io.BytesIO(chunk)
+                return iter(lambda: stream.read(4), b"")
+
+        return {"Body": Body()}
+
+
+def test_aws_download_resumes_from_completed_parts(app, monkeypatch):
+    """Parts already on disk are never fetched again: not on an in-place
+    retry, and not when a later run (a restarted worker) picks up the
+    manifest a failed one left behind."""
+
+    import app.videos as videos
+
+    from app import aws_storage
+
+    data = bytes(range(56))
+    monkeypatch.setitem(app.config, "AWS_DOWNLOAD_CONCURRENCY", 1)
+    monkeypatch.setattr(aws_storage, "aws_sqs_client", lambda: _FakeSQS())
+    monkeypatch.setattr(aws_storage, "DOWNLOAD_RETRY_SLEEP", lambda seconds: None)
+
+    with app.app_context():
+        partial = os.path.join(app.config["IMPORT_DIR"], ".resume.mkv")
+        landed = os.path.join(app.config["IMPORT_DIR"], "resume.mkv")
+        try:
+            # A run that died on part 3 leaves parts 1-2 and the manifest
+
+            dying = _PartedObject(data, fail={2})
+            with pytest.raises(RuntimeError):
+                aws_storage.ranged_download(
+                    dying, "bucket", "untouched/resume.mkv", partial, concurrency=1
+                )
+            assert dying.fetched == [0, 1, 2]
+
+            # The next run fetches only what's missing, retrying in place
+            # from the part that fails rather than from byte zero
+
+            flaky = _PartedObject(data, fail={3})
+            monkeypatch.setattr(aws_storage, "aws_s3_client", lambda **kwargs: flaky)
+            assert (
+                videos.aws_download("untouched/resume.mkv", "resume.mkv")
+                == aws_storage.DOWNLOAD_COMPLETE
+            )
+            assert flaky.fetched == [2, 3, 3]
+
+            with open(landed, "rb") as f:
+                assert f.read() == data
+            assert not os.path.exists(partial)
+            assert not os.path.exists(f"{partial}.parts")
+        finally:
+            for path in (partial, f"{partial}.parts", landed):
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+def test_ranged_download_syncs_each_part_before_journaling_it(app, monkeypatch):
+    """A journaled part is one whose bytes are already on disk, so a
+    resume after an OS crash never skips a part the crash lost."""
+
+    from app import aws_storage
+
+    data = bytes(range(56))
+    s3 = _PartedObject(data)
+    journaled_at_sync = []
+    fsync = os.fsync
+
+    with app.app_context():
+        partial = os.path.join(app.config["IMPORT_DIR"], ".synced.mkv")
+
+        def recording_fsync(fd):
+            with open(f"{partial}.parts") as f:
+                journaled_at_sync.append(len(f.readlines()) - 1)
+            fsync(fd)
+
+        monkeypatch.setattr(aws_storage.os, "fsync", recording_fsync)
+        try:
+            aws_storage.ranged_download(
+                s3, "bucket", "untouched/synced.mkv", partial, concurrency=1
+            )
+            with open(partial, "rb") as f:
+                assert f.read() == data
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+
+    assert journaled_at_sync == [0, 1, 2, 3]
+
+
+def test_aws_download_etag_mismatch_starts_over(app, monkeypatch):
+    """A part that arrived damaged fails the multipart ETag check, so the
+    whole download is discarded and fetched again instead of imported."""
+
+    import app.videos as videos
+
+    from app import aws_storage
+
+    s3 = _PartedObject(bytes(range(40)), corrupt={1})
+    monkeypatch.setitem(app.config, "AWS_DOWNLOAD_CONCURRENCY", 1)
+    monkeypatch.setattr(aws_storage, "aws_s3_client", lambda **kwargs: s3)
+    monkeypatch.setattr(aws_storage, "aws_sqs_client", lambda: _FakeSQS())
+    monkeypatch.setattr(aws_storage, "DOWNLOAD_RETRY_SLEEP", lambda seconds: None)
+
+    with app.app_context():
+        landed = os.path.join(app.config["IMPORT_DIR"], "verify.mkv")
+        try:
+            assert (
+                videos.aws_download("untouched/verify.mkv", "verify.mkv")
+                == aws_storage.DOWNLOAD_COMPLETE
+            )
+            assert s3.fetched == [0, 1, 2, 0, 1, 2]
+            with open(landed, "rb") as f:
+                assert f.read() == bytes(range(40))
+        finally:
+            if os.path.exists(landed):
+                os.remove(landed)
+
+
 def test_download_task_reports_download_outcome(app, monkeypatch):
     """download_task must not report success when aws_download exhausted its
     retry budget; exhaustion is not a transient error, so no retry is
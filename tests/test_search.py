@@ -4,7 +4,7 @@ with in-library annotations.
 """
 
 from app import db
-from app.models import MovieCast, TMDBCredit, User, UserMovieReview
+from app.models import Movie, MovieCast, TMDBCredit, User, UserMovieReview
 
 from tests.factories import (
     make_movie,
@@ -701,3 +701,146 @@ def test_search_tmdb_rows_carry_the_star_ladder(app, admin_client, monkeypatch):
 
     assert page.count('class="star-btn') == 12
     assert page.count("star-btn x-btn") == 2
+
+
+def test_search_index_folds_accents(app, admin_client):
+    """Unidecode folding meets accented titles and names halfway."""
+
+    with app.app_context():
+        movie = make_movie("Amélie", 2001)
+        make_movie_file(movie, "Bluray-1080p")
+        make_person(904, "Jean-Pierre Jeunet", [movie])
+        db.session.commit()
+
+    page = admin_client.get("/search?q=amelie").get_data(as_text=True)
+    assert "Amélie (2001)" in page
+    data = admin_client.get("/search.json?q=jean pierre").get_json()
+    assert [r["title"] for r in data["results"] if r["type"] == "Person"] == [
+        "Jean-Pierre Jeunet"
+    ]
+
+
+def test_search_index_follows_imports_and_deletes(app, admin_client):
+    """A warm index picks up committed writes through the journal: a
+    new file makes its film findable, deleting the last main-feature
+    file drops it again, and a rename re-ranks it."""
+
+    with app.app_context():
+        build_library(app)
+
+    assert admin_client.get("/search.json?q=journaled").get_json() == {"results": []}
+
+    with app.app_context():
+        movie = make_movie("Journaled Arrival", 2020)
+        file = make_movie_file(movie, "DVD")
+        db.session.commit()
+        movie_id, file_id = movie.id, file.id
+
+    titles = [
+        r["title"]
+        for r in admin_client.get("/search.json?q=journaled").get_json()["results"]
+    ]
+    assert titles == ["Journaled Arrival (2020)"]
+
+    with app.app_context():
+        from app.models import File
+
+        db.session.get(Movie, movie_id).title = "Renamed Arrival"
+        db.session.commit()
+    assert admin_client.get("/search.json?q=journaled").get_json() == {"results": []}
+    assert admin_client.get("/search.json?q=renamed").get_json()["results"]
+
+    with app.app_context():
+        db.session.delete(db.session.get(File, file_id))
+        db.session.commit()
+    assert admin_client.get("/search.json?q=renamed").get_json() == {"results": []}
+
+
+def test_nightly_rebuild_snapshots_for_other_processes(app):
+    """The nightly rebuild publishes a new generation and a disk
+    snapshot; a process holding an older generation loads the snapshot
+    and replays only what the journal gained since."""
+
+    from app import search_index
+
+    with app.app_context():
+        movie = make_movie("Snapshot Feature", 1999)
+        make_movie_file(movie, "DVD")
+        db.session.commit()
+
+        assert search_index.rebuild_search_index() is True
+        generation = app.redis.get(search_index.GENERATION_KEY).decode()
+
+        # Another process, still on yesterday's generation
+
+        stale = search_index.SearchIndex()
+        stale.generation = "yesterday"
+        app.extensions["fitzflix_search_index"] = stale
+
+        later = make_movie("Snapshot Latecomer", 2001)
+        make_movie_file(later, "DVD")
+        db.session.commit()
+
+        ranked = search_index.search_library("snapshot", {"movie": 5})
+        assert stale.generation == generation
+        assert [
+            db.session.get(Movie, movie_id).title for movie_id in ranked["movie"]
+        ] == ["Snapshot Feature", "Snapshot Latecomer"]
+        assert stale.applied == app.redis.llen(search_index.JOURNAL_KEY)
+
+
+def test_rebuild_writes_the_snapshot_before_publishing_its_generation(app, monkeypatch):
+    """A process that sees the new generation must find its snapshot,
+    or it would rebuild the whole index inline: the snapshot lands
+    first."""
+
+    from app import search_index
+
+    published_at_write = []
+    write_snapshot = search_index._write_snapshot
+
+    def recording_write(index):
+        """Note the published generation as the snapshot is written."""
+
+        published_at_write.append(app.redis.get(search_index.GENERATION_KEY))
+        write_snapshot(index)
+
+    monkeypatch.setattr(search_index, "_write_snapshot", recording_write)
+
+    with app.app_context():
+        app.redis.set(search_index.GENERATION_KEY, "yesterday")
+        search_index.rebuild_search_index()
+        generation = app.redis.get(search_index.GENERATION_KEY)
+
+    assert published_at_write == [b"yesterday"]
+    assert generation != b"yesterday"
+
+
+def test_short_words_match_only_at_a_word_start(app, admin_client):
+    """Three letters or more match anywhere; one or two letters match
+    the start of a word, as the module documents."""
+
+    with app.app_context():
+        for title, year in (
+            ("Up", 2009),
+            ("Blow-Up", 1966),
+            ("The Cup", 1999),
+            ("Sun Cups", 1984),
+        ):
+            make_movie_file(make_movie(title, year), "DVD")
+        db.session.commit()
+
+    titles = {
+        r["title"] for r in admin_client.get("/search.json?q=up").get_json()["results"]
+    }
+    assert titles == {"Up (2009)", "Blow-Up (1966)"}
+
+    titles = {
+        r["title"]
+        for r in admin_client.get("/search.json?q=the c").get_json()["results"]
+    }
+    assert titles == {"The Cup (1999)"}
+
+    # "Sun Cups" carries an s-word, but the s after "cup" is mid-word
+
+    assert admin_client.get("/search.json?q=cup s").get_json() == {"results": []}
@@ -2,6 +2,8 @@
 Letterboxd import) appear as items to buy alongside owned upgrade
 candidates."""
 
+import pytest
+
 from app import db
 from app.models import User, UserMovieReview
 from app.videos import star_rating_fields
@@ -234,3 +236,181 @@ def test_shopping_rows_carry_popover_anchor_and_live_ladder(app, admin_client):
     assert f'action="/movie/{movie_id}"' in page
     assert "bi-star-fill" not in page
     assert "bi-star-half" not in page
+
+
+def test_shopping_list_reads_qualities_from_reference_snapshot(app, admin_client):
+    from sqlalchemy import event
+
+    from app.models import TMDBGenre
+    from app.reference_data import VERSION_KEY, reference_data
+
+    with app.app_context():
+        admin_client.get("/shopping-list/movie")
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            response = admin_client.get("/shopping-list/movie")
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+    assert response.status_code == 200
+    assert not [s for s in statements if s.lstrip().startswith("SELECT ref_quality.")]
+
+    # A genre committed here is visible to this process straight away,
+    # and stamps a new version for the others
+
+    with app.app_context():
+        before = app.redis.get(VERSION_KEY)
+        db.session.add(TMDBGenre(id=9648, name="Mystery"))
+        db.session.commit()
+        assert reference_data().genres[9648] == "Mystery"
+        assert app.redis.get(VERSION_KEY) != before
+
+
+def test_reference_snapshot_reloads_when_another_process_publishes(app):
+    from app.reference_data import VERSION_KEY, reference_data
+
+    with app.app_context():
+        dvd = reference_data().quality_by_title["DVD"]
+
+    # Another process's edit: the row changes underneath this process's
+    # snapshot, and the version token moves
+
+    with app.app_context():
+        db.session.execute(
+            db.text("UPDATE ref_quality SET preference = :p WHERE id = :id"),
+            {"p": dvd.preference + 1000, "id": dvd.id},
+        )
+        db.session.commit()
+        assert reference_data().preference("DVD") == dvd.preference
+
+    try:
+        app.redis.set(VERSION_KEY, "from-another-process")
+        with app.app_context():
+            assert reference_data().preference("DVD") == dvd.preference + 1000
+    finally:
+        with app.app_context():
+            db.session.execute(
+                db.text("UPDATE ref_quality SET preference = :p WHERE id = :id"),
+                {"p": dvd.preference, "id": dvd.id},
+            )
+            db.session.commit()
+            app.redis.set(VERSION_KEY, "restored")
+
+
+def test_shopping_projection_follows_files_reviews_and_exclusions(app, admin_client):
+    from app.models import ShoppingListItem
+    from app.shopping_list import GENERATION_KEY, rebuild_shopping_list
+
+    def rows(movie_id):
+        return [
+            (item.file_id is not None, item.instruction, item.liked_count)
+            for item in ShoppingListItem.query.filter_by(movie_id=movie_id)
+        ]
+
+    with app.app_context():
+        user_id = User.query.first().id
+        movie = make_movie("Projection Film", 1990)
+        db.session.commit()
+        movie_id = movie.id
+
+        # Nothing owned and nobody likes it: not on the list at all
+
+        assert rows(movie_id) == []
+
+        make_liked_review(user_id, movie)
+        db.session.commit()
+        assert rows(movie_id) == [(False, "Buy on Blu-Ray", 1)]
+
+        dvd = make_movie_file(movie, "DVD")
+        db.session.commit()
+        assert rows(movie_id) == [(True, "Buy on Blu-Ray", 1)]
+
+        movie.shopping_list_exclude = True
+        db.session.commit()
+        assert rows(movie_id) == [(True, "Already owned", 1)]
+
+        db.session.delete(dvd)
+        movie.shopping_list_exclude = None
+        db.session.commit()
+        assert rows(movie_id) == [(False, "Buy on Blu-Ray", 1)]
+
+        # The incremental upkeep agrees with a full rebuild
+
+        def snapshot():
+            return sorted(
+                (item.movie_id, item.file_id, item.instruction, item.urgency)
+                for item in ShoppingListItem.query
+            )
+
+        before = snapshot()
+        rebuild_shopping_list()
+        assert snapshot() == before
+        assert app.redis.exists(GENERATION_KEY)
+
+    page = admin_client.get("/shopping-list/movie").get_data(as_text=True)
+    assert "Projection Film" in page
+
+
+def test_shopping_list_rebuilds_when_generation_is_missing(app, admin_client):
+    from app.models import ShoppingListItem
+
+    with app.app_context():
+        movie = make_movie("Rebuilt Film", 1991)
+        make_movie_file(movie, "DVD")
+        db.session.commit()
+
+        # Rows written around the ORM's listeners, and no generation
+        # token: the first view rebuilds before it serves
+
+        db.session.query(ShoppingListItem).delete()
+        db.session.commit()
+
+    page = admin_client.get("/shopping-list/movie").get_data(as_text=True)
+    assert "Rebuilt Film" in page
+
+
+def test_shopping_list_serves_previous_rows_while_another_process_rebuilds(
+    app, admin_client, monkeypatch
+):
+    """A missing generation with the rebuild claimed elsewhere serves the
+    previous rows untouched, without a placeholder generation; a
+    rebuild that fails drops its claim, so the next view retries."""
+
+    from app import shopping_list
+    from app.shopping_list import BUILDING_KEY, GENERATION_KEY
+
+    with app.app_context():
+        movie = make_movie("Previous Generation Film", 1992)
+        make_movie_file(movie, "DVD")
+        db.session.commit()
+
+    app.redis.delete(GENERATION_KEY)
+    app.redis.set(BUILDING_KEY, "another-process")
+    page = admin_client.get("/shopping-list/movie").get_data(as_text=True)
+    assert "Previous Generation Film" in page
+    assert not app.redis.exists(GENERATION_KEY)
+
+    app.redis.delete(BUILDING_KEY)
+
+    def failing_rows(movie_ids, session):
+        """A rebuild that dies partway."""
+
+        raise RuntimeError("rebuild failed")
+
+    monkeypatch.setattr(shopping_list, "_compute_rows", failing_rows)
+    with app.app_context(), pytest.raises(RuntimeError):
+        shopping_list.ensure_shopping_list()
+    assert not app.redis.exists(BUILDING_KEY)
+    assert not app.redis.exists(GENERATION_KEY)
+
+    monkeypatch.undo()
+    page = admin_client.get("/shopping-list/movie").get_data(as_text=True)
+    assert "Previous Generation Film" in page
+    assert app.redis.exists(GENERATION_KEY)
+    assert not app.redis.exists(BUILDING_KEY)
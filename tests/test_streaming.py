@@ -809,10 +809,11 @@ def test_batch_availability_reads_the_cache_in_one_call(app, monkeypatch):
     ] == [NETFLIX]
 
 
-def test_refresh_availability_covers_every_film_with_a_tmdb_id(app, monkeypatch):
-    """The nightly task re-fetches every film's availability, cached or
-    not, and restarts each entry's two-day life — the pages read this
-    cache and never fetch inline, so it has to be full every morning."""
+def test_refresh_availability_fetches_every_film_it_has_never_seen(app, monkeypatch):
+    """A film the tiers have no record of — never fetched, or planted
+    before they began — is due on the first pass whatever its slot, and
+    its entry is held for a whole rotation — the pages read this cache
+    and never fetch inline, so it has to be full every morning."""
 
     import app.streaming as streaming
 
@@ -832,6 +833,8 @@ def test_refresh_availability_covers_every_film_with_a_tmdb_id(app, monkeypatch)
 
     def fake_tmdb_get(url, **kwargs):
         calls.append(url)
+        if url.endswith("/movie/changes"):
+            return FakeTMDb({"results": [], "page": 1, "total_pages": 1})
         return FakeTMDb({"results": {"US": {"flatrate": [NETFLIX]}}})
 
     monkeypatch.setitem(app.config, "TMDB_API_KEY", "test-key")
@@ -841,11 +844,124 @@ def test_refresh_availability_covers_every_film_with_a_tmdb_id(app, monkeypatch)
     assert sorted(calls) == [
         app.config["TMDB_API_URL"] + "/movie/940/watch/providers",
         app.config["TMDB_API_URL"] + "/movie/941/watch/providers",
+        app.config["TMDB_API_URL"] + "/movie/changes",
     ]
     for tmdb_id in (940, 941):
         key = streaming.AVAILABILITY_KEY.format(tmdb_id=tmdb_id)
         assert json.loads(app.redis.get(key))["flatrate"] == [NETFLIX]
-        assert app.redis.ttl(key) > 86400
+        assert app.redis.ttl(key) > streaming.ROTATION_DAYS * 86400
+    assert app.redis.get(streaming.CHANGES_SINCE_KEY)
+
+
+def test_refresh_availability_is_tiered(app, monkeypatch):
+    """Once every title has a state, a pass fetches only the daily tier
+    (watchlisted, owned-upgradable), tonight's slot of the long tail,
+    and what the change feed named; an unchanged payload keeps its
+    last-changed time."""
+
+    import time
+
+    import app.streaming as streaming
+
+    from app import db
+    from app.models import User, UserWatchlist
+
+    now = time.time()
+    tonight = int(now // 86400) % streaming.ROTATION_DAYS
+    slot = 7000 + tonight
+    other = 7000 + (tonight + 1) % streaming.ROTATION_DAYS
+    changed = 7000 + (tonight + 2) % streaming.ROTATION_DAYS + streaming.ROTATION_DAYS
+    watched = 7000 + (tonight + 3) % streaming.ROTATION_DAYS + streaming.ROTATION_DAYS
+    upgradable = (
+        7000 + (tonight + 4) % streaming.ROTATION_DAYS + streaming.ROTATION_DAYS
+    )
+    recent = 7000 + (tonight + 5) % streaming.ROTATION_DAYS + streaming.ROTATION_DAYS
+    payload = {"link": None, "flatrate": [MAX], "ads": [], "rent": [], "buy": []}
+
+    with app.app_context():
+        movies = {
+            tmdb_id: make_movie(f"Tier {tmdb_id}", 1980, tmdb_id=tmdb_id)
+            for tmdb_id in (slot, other, changed, watched, upgradable, recent)
+        }
+        db.session.add(
+            UserWatchlist(user_id=User.query.first().id, movie_id=movies[watched].id)
+        )
+        make_movie_file(movies[upgradable], "DVD")
+        db.session.commit()
+
+        # Every title fetched a day ago, unchanged for weeks — but one
+        # whose payload moved three days ago
+
+        day_ago = now - 86400
+        for tmdb_id in movies:
+            streaming._store_availability(tmdb_id, payload, 3600)
+            state = streaming.availability_states([tmdb_id])[tmdb_id]
+            state["checked"] = day_ago
+            state["changed"] = (
+                now - 3 * 86400 if tmdb_id == recent else now - 30 * 86400
+            )
+            app.redis.hset(streaming.AVAILABILITY_STATE_KEY, tmdb_id, json.dumps(state))
+
+    calls = []
+
+    def fake_tmdb_get(url, **kwargs):
+        calls.append(url)
+        if url.endswith("/movie/changes"):
+            return FakeTMDb({"results": [{"id": changed}, {"id": 1}], "total_pages": 1})
+        return FakeTMDb({"results": {"US": {"flatrate": [MAX]}}})
+
+    monkeypatch.setitem(app.config, "TMDB_API_KEY", "test-key")
+    monkeypatch.setattr(streaming, "tmdb_get", fake_tmdb_get)
+
+    assert streaming.refresh_availability() is True
+    fetched = {
+        int(url.split("/")[-3]) for url in calls if url.endswith("/watch/providers")
+    }
+    assert fetched == {slot, changed, watched, upgradable, recent}
+
+    with app.app_context():
+        state = streaming.availability_states([slot])[slot]
+    assert state["checked"] > day_ago
+    assert state["changed"] < now - 29 * 86400
+
+
+def test_truncated_change_feed_keeps_the_since_date(app, monkeypatch):
+    """A change feed that runs past the page cap isn't read in full:
+    the pass falls back to the tiered refresh and leaves the since-date
+    alone, so tomorrow re-reads the changes past the cutoff."""
+
+    import app.streaming as streaming
+
+    from app import db
+
+    with app.app_context():
+        make_movie("Truncated Feed", 1975, tmdb_id=960)
+        db.session.commit()
+
+    pages = []
+
+    def fake_tmdb_get(url, params=None, **kwargs):
+        if url.endswith("/movie/changes"):
+            pages.append(params["page"])
+            return FakeTMDb(
+                {"results": [{"id": 100 + params["page"]}], "total_pages": 99}
+            )
+        return FakeTMDb({"results": {"US": {"flatrate": [MAX]}}})
+
+    monkeypatch.setitem(app.config, "TMDB_API_KEY", "test-key")
+    monkeypatch.setattr(streaming, "tmdb_get", fake_tmdb_get)
+    monkeypatch.setattr(streaming, "CHANGES_MAX_PAGES", 3)
+    app.redis.set(streaming.CHANGES_SINCE_KEY, "2026-10-01")
+
+    with app.app_context():
+        today = streaming.datetime.utcnow().date()
+        assert streaming.changed_tmdb_ids(today, today) is None
+    assert pages == [1, 2, 3]
+
+    assert streaming.refresh_availability() is True
+    assert app.redis.get(streaming.CHANGES_SINCE_KEY) == b"2026-10-01"
+    with app.app_context():
+        assert streaming.availability_states([960])[960]["checked"]
 
 
 def test_list_pages_never_fetch_availability_inline(app, admin_client, monkeypatch):
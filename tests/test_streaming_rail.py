@@ -277,7 +277,7 @@ def test_compute_user_rail_excludes_verifies_and_explains(app, monkeypatch):
 
 
 def test_recompute_task_stores_rail_payloads(app, monkeypatch):
-    from app.streaming_rail import RAIL_KEY, recompute_streaming_rail
+    from app.streaming_rail import recompute_streaming_rail, stored_rail
 
     user_id = subscribe(app, 8, "Netflix")
     plant_profile(app, user_id, COMEDY_PROFILE)
@@ -288,7 +288,7 @@ def test_recompute_task_stores_rail_payloads(app, monkeypatch):
 
     assert recompute_streaming_rail() is True
 
-    stored = json.loads(app.redis.get(RAIL_KEY.format(user_id=user_id)))
+    stored = stored_rail(app.redis, user_id)
     assert stored["computed_at"]
     assert stored["items"][0]["title"] == "Rail Comedy"
 
@@ -335,6 +335,70 @@ def test_recompute_creates_records_for_recordless_rail_films(app, monkeypatch):
         assert Movie.query.filter_by(tmdb_id=5001).count() == 1
 
 
+def test_plan_rails_shares_queries_and_enrichment_across_users(app, monkeypatch):
+    """Two users on the same service with the same taste cost what one
+    did: each distinct discover query and each enrichment runs once,
+    and each user still gets a rail scored against their own
+    profile."""
+
+    import app.streaming_rail as streaming_rail
+
+    from app import db
+    from app.models import User, UserStreamingProvider
+    from app.recommendations import score_movie
+
+    admin_id = subscribe(app, 8, "Netflix")
+    with app.app_context():
+        member = User.query.filter_by(admin=False).first()
+        db.session.add(
+            UserStreamingProvider(
+                user_id=member.id,
+                provider_id=8,
+                name="Netflix",
+                logo_path="/logo8.jpg",
+            )
+        )
+        db.session.commit()
+        member_id = member.id
+    plant_profile(app, admin_id, COMEDY_PROFILE)
+    plant_profile(app, member_id, COMEDY_PROFILE)
+
+    discover_calls = []
+    install_rail_fakes(app, monkeypatch, discover_calls=discover_calls)
+    enrichments = []
+    real_enriched = streaming_rail.enriched_movie
+    monkeypatch.setattr(
+        streaming_rail,
+        "enriched_movie",
+        lambda tmdb_id: enrichments.append(tmdb_id) or real_enriched(tmdb_id),
+    )
+    plant_availability(app, 5001, [NETFLIX])
+    plant_availability(app, 5002, [NETFLIX])
+    plant_availability(app, 5005, [])
+
+    with app.app_context():
+        users = [db.session.get(User, admin_id), db.session.get(User, member_id)]
+        rails = streaming_rail.plan_rails(users)
+
+    distinct = {json.dumps(params, sort_keys=True) for params in discover_calls}
+    assert len(discover_calls) == len(distinct)
+    assert sorted(enrichments) == [5001, 5002]
+    for user_id in (admin_id, member_id):
+        assert [item["tmdb_id"] for item in rails[user_id]][0] == 5001
+
+    # The shared index scores exactly what score_movie would
+
+    features = {
+        item["id"]: streaming_rail._discover_features(item) for item in DISCOVER_ITEMS
+    }
+    scores = streaming_rail.score_candidates(
+        {"affinities": COMEDY_PROFILE}, streaming_rail._feature_index(features)
+    )
+    for tmdb_id, film_features in features.items():
+        expected, _ = score_movie(film_features, {"affinities": COMEDY_PROFILE})
+        assert scores.get(tmdb_id, 0.0) == expected
+
+
 def test_landing_page_renders_the_rail(app, admin_client):
     from app import db
     from app.models import UserMovieReview, User
@@ -416,6 +480,45 @@ def test_landing_page_renders_the_rail(app, admin_client):
     assert "Rail Logged Since" not in body
 
 
+def test_landing_page_leaves_the_shared_rail_payload_untouched(app, admin_client):
+    """The rail is decoded once per version and shared across requests,
+    so the page's watchlist flags go on copies of its items."""
+
+    from app.models import User
+    from app.recs_storage import store_artifacts
+    from app.streaming_rail import RAIL_KEY, stored_rail
+
+    with app.app_context():
+        user_id = User.query.filter_by(admin=True).first().id
+
+    item = {
+        "tmdb_id": 6101,
+        "title": "Rail Shared",
+        "year": "1994",
+        "poster_path": None,
+        "runtime": 95,
+        "providers": [{**NETFLIX, "kind": "flatrate"}],
+        "because": ["popular on Netflix"],
+        "score": 1.0,
+    }
+    pipeline = app.redis.pipeline()
+    store_artifacts(
+        pipeline,
+        user_id,
+        {
+            RAIL_KEY.format(user_id=user_id): {
+                "computed_at": "2026-08-12 02:15",
+                "items": [item],
+            }
+        },
+    )
+    pipeline.execute()
+
+    assert "Rail Shared (1994)" in admin_client.get("/").get_data(as_text=True)
+    with app.app_context():
+        assert stored_rail(app.redis, user_id)["items"] == [item]
+
+
 def test_landing_page_requests_rail_compute_once(app, admin_client):
     user_id = subscribe(app, 8, "Netflix")
     plant_profile(app, user_id, COMEDY_PROFILE)
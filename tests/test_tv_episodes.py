@@ -12,10 +12,12 @@ from tests.factories import make_tv_episode, make_tv_series
 
 class FakeTMDb:
     """A scripted TMDb: answers the base series call and season-batch
-    calls, recording every append_to_response it was asked for."""
+    calls — season blocks may ride either — recording every
+    append_to_response it was asked for."""
 
-    def __init__(self, season_count):
+    def __init__(self, season_count, airing=None):
         self.season_count = season_count
+        self.airing = airing
         self.appends = []
 
     def get(self, url, params=None, **kwargs):
@@ -34,27 +36,33 @@ class FakeTMDb:
             def raise_for_status(self):
                 pass
 
-        if "season/" not in append:
-            return Response(
-                {
-                    "id": 121,
-                    "name": "Doctor Who",
-                    "external_ids": {"imdb_id": "tt0056751", "tvdb_id": 76107},
-                    "seasons": [
-                        {
-                            "id": 1000 + n,
-                            "season_number": n,
-                            "episode_count": 2,
-                            "name": f"Season {n}",
-                        }
-                        for n in range(self.season_count)
-                    ],
-                }
-            )
-
         payload = {}
-        for part in append.split(","):
+        parts = append.split(",")
+        if "aggregate_credits" in parts:
+            payload = {
+                "id": 121,
+                "name": "Doctor Who",
+                "external_ids": {"imdb_id": "tt0056751", "tvdb_id": 76107},
+                "seasons": [
+                    {
+                        "id": 1000 + n,
+                        "season_number": n,
+                        "episode_count": 2,
+                        "air_date": "1963-11-23",
+                        "name": f"Season {n}",
+                    }
+                    for n in range(self.season_count)
+                ],
+            }
+            if self.airing is not None:
+                payload["last_episode_to_air"] = {"season_number": self.airing}
+
+        for part in parts:
+            if not part.startswith("season/"):
+                continue
             n = int(part.split("/")[1])
+            if n >= self.season_count:
+                continue
             payload[part] = {
                 "season_number": n,
                 "episodes": [
@@ -73,7 +81,7 @@ class FakeTMDb:
         return Response(payload)
 
 
-def test_fetch_batches_season_appends_in_twenties(app, monkeypatch):
+def test_fetch_packs_season_appends_in_twenties(app, monkeypatch):
     with app.app_context():
         series = make_tv_series("Doctor Who (1963)", tmdb_id=121)
         monkeypatch.setitem(app.config, "TMDB_API_KEY", "test-key")
@@ -85,17 +93,56 @@ def test_fetch_batches_season_appends_in_twenties(app, monkeypatch):
         info = series.tmdb_tv_fetch(121)
 
         # The base call asks for the series-wide credit aggregate (TV-overhaul
-        # step 4) alongside the original appended blocks
-        assert fake.appends[0] == "aggregate_credits,external_ids,keywords"
-
-        season_appends = [a for a in fake.appends if "season/" in a]
-        assert len(season_appends) == 2
-        assert len(season_appends[0].split(",")) == 20
-        assert len(season_appends[1].split(",")) == 5
+        # step 4) alongside the original appended blocks, and fills the
+        # rest of TMDb's 20 appends with the first seasons; one more
+        # request covers the remainder
+        base = fake.appends[0].split(",")
+        assert base[:3] == ["aggregate_credits", "external_ids", "keywords"]
+        assert base[3:] == [f"season/{n}" for n in range(17)]
+        assert len(fake.appends) == 2
+        assert fake.appends[1].split(",") == [f"season/{n}" for n in range(17, 25)]
         assert info["season/0"]["episodes"][0]["name"] == "S0E1"
         assert info["season/24"]["season_number"] == 24
 
 
+def test_refetch_skips_unchanged_seasons(app, monkeypatch):
+    """Once a series' seasons are stored, a refresh asks only for what
+    can have moved: the airing season, in the base request."""
+
+    with app.app_context():
+        series = make_tv_series("Doctor Who (1963)", tmdb_id=121)
+        monkeypatch.setitem(app.config, "TMDB_API_KEY", "test-key")
+        import app.models
+
+        monkeypatch.setattr(app.models.requests, "get", FakeTMDb(30).get)
+        series.tmdb_tv_apply(series.tmdb_tv_fetch(121))
+        db.session.commit()
+        assert series.episodes.count() == 60
+
+        fake = FakeTMDb(season_count=30, airing=12)
+        monkeypatch.setattr(app.models.requests, "get", fake.get)
+        info = series.tmdb_tv_fetch(121)
+
+        # The newest stored season is guessed up front; the airing one
+        # TMDb names is fetched too; nothing else is
+        assert fake.appends[0].endswith(",season/29")
+        assert fake.appends[1:] == ["season/12"]
+        assert sorted(key for key in info if key.startswith("season/")) == [
+            "season/12",
+            "season/29",
+        ]
+
+        # A season whose episode count moved is fetched again
+        season = TMDBSeason.query.filter_by(id=1005).one()
+        season.episode_count = 1
+        db.session.commit()
+        fake = FakeTMDb(season_count=30)
+        monkeypatch.setattr(app.models.requests, "get", fake.get)
+        info = series.tmdb_tv_fetch(121)
+        assert "season/5" in info
+        assert "season/6" not in info
+
+
 def test_apply_syncs_episode_rows_per_fetched_season(app):
     with app.app_context():
         series = make_tv_series("Columbo", tmdb_id=1041)
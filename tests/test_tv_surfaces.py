@@ -239,3 +239,89 @@ def test_tv_page_meta_line(app, admin_client):
     assert response.status_code == 200
     assert "1963–1989".encode() in response.data
     assert b"26 seasons, 694 episodes" in response.data
+
+
+def test_season_summaries_follow_file_writes(app):
+    from app.models import TVSeasonSummary
+    from app.tv_summary import rebuild_season_summaries, season_aggregates
+
+    def summaries(series_id):
+        return {
+            summary.season: (summary.episode_count, summary.quality_id)
+            for summary in TVSeasonSummary.query.filter_by(series_id=series_id)
+        }
+
+    with app.app_context():
+        from tests.factories import quality
+
+        series = make_tv_series("The Wire (2002)")
+        make_tv_file(series, 1, 1, "DVD")
+        make_tv_file(series, 1, 1, "Bluray-1080p")
+        make_tv_file(series, 1, 2, "WEBDL-720p")
+        moving = make_tv_file(series, 2, 1, "DVD")
+        db.session.commit()
+        series_id = series.id
+        assert series.sort_title == "Wire (2002)"
+
+        # Episode 1's best copy is the Blu-ray, so the season's worst
+        # best-copy is episode 2's WEBDL
+
+        assert summaries(series_id) == {
+            1: (2, quality("WEBDL-720p").id),
+            2: (1, quality("DVD").id),
+        }
+
+        # Moving a file updates both the season it left and the one it
+        # joined; deleting the last file of a season drops its row
+
+        moving.season = 1
+        moving.episode = 3
+        db.session.commit()
+        assert summaries(series_id) == {1: (3, quality("DVD").id)}
+
+        db.session.delete(moving)
+        db.session.commit()
+        assert summaries(series_id) == {1: (2, quality("WEBDL-720p").id)}
+
+        # The nightly rebuild agrees with the incremental upkeep
+
+        assert rebuild_season_summaries() == len(season_aggregates())
+        assert summaries(series_id) == {1: (2, quality("WEBDL-720p").id)}
+
+
+def test_tv_library_pages_by_sort_title_through_json(app, admin_client, monkeypatch):
+    from app.main import library
+
+    monkeypatch.setattr(library, "TV_LIBRARY_PAGE_SIZE", 2)
+    with app.app_context():
+        for title in ("Twin Peaks (1990)", "The Americans (2013)", "Atlanta (2016)"):
+            make_tv_file(make_tv_series(title), 1, 1, "WEBDL-1080p")
+        make_tv_series("No Files (2000)")
+        db.session.commit()
+        twin_peaks = db.session.execute(
+            db.text("SELECT id FROM tv_series WHERE title = 'Twin Peaks (1990)'")
+        ).scalar()
+
+    page = admin_client.get("/library/tv").get_data(as_text=True)
+    assert page.index("The Americans") < page.index("Atlanta (2016)")
+    assert "Twin Peaks" not in page
+    assert "No Files" not in page
+    assert 'data-next-url="/library/tv.json?after=' in page
+
+    next_url = page.split('data-next-url="')[1].split('"')[0].replace("&amp;", "&")
+    data = admin_client.get(next_url).get_json()
+    assert [series["title"] for series in data["series"]] == ["Twin Peaks (1990)"]
+    assert data["series"][0]["seasons"][0]["min_quality"] == "WEBDL-1080p"
+    assert "Twin Peaks" in data["html"]
+    assert data["next"] is None
+
+    # The series page's breadcrumb extends the first page through its
+    # series, so the anchor lands
+
+    page = admin_client.get(f"/library/tv?series={twin_peaks}").get_data(as_text=True)
+    assert f'id="{twin_peaks}"' in page
+
+    # A garbled cursor starts from the top rather than failing
+
+    data = admin_client.get("/library/tv.json?after=garbage").get_json()
+    assert data["series"][0]["title"] == "The Americans (2013)"
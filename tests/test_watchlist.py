@@ -495,7 +495,7 @@ def test_rail_pin_cap_keeps_the_rotation_alive(app, admin_client):
     freezing the streaming rail — discovery keeps most of the cards."""
 
     from app import db
-    from app.main.discover import WATCHLIST_PIN_LIMIT
+    from app.landing_shelves import WATCHLIST_PIN_LIMIT
     from app.models import UserWatchlist
     from app.streaming_rail import RAIL_KEY
 
@@ -544,7 +544,7 @@ def test_library_rail_pin_cap_keeps_the_rotation_alive(app, admin_client):
     the cap keeps the daily discovery slots in the majority."""
 
     from app import db
-    from app.main.discover import WATCHLIST_PIN_LIMIT
+    from app.landing_shelves import WATCHLIST_PIN_LIMIT
     from app.models import UserWatchlist
     from app.recommendations import RECS_KEY
 
@@ -674,7 +674,7 @@ def test_library_rail_mixes_pins_into_the_row(app, admin_client, monkeypatch):
             def today(cls):
                 return cls(*frozen)
 
-        monkeypatch.setattr("app.main.discover.date", FrozenDate)
+        monkeypatch.setattr("app.landing_shelves.date", FrozenDate)
         body = admin_client.get("/").get_data(as_text=True)
         shown = sorted(
             (body.index(title), title)